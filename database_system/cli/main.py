@@ -7,7 +7,8 @@ import os
 import sys
 import cmd
 import shlex
-from typing import List, Optional
+import argparse
+from typing import List, Optional, Dict, Any
 from pathlib import Path
 
 # 调试路径
@@ -24,17 +25,23 @@ from sql_compiler.lexer import Lexer
 from sql_compiler.parser import Parser
 from sql_compiler.semantic import SemanticAnalyzer
 from sql_compiler.planner import Planner
+from sql_compiler.prepared import StatementCompiler
 from sql_compiler.catalog import CatalogManager
 
 from storage.file_manager import FileManager
 from storage.buffer import BufferPool
 from storage.page import Page
+from storage.metrics import write_prometheus, MetricsServer
 
 from engine.catalog_manager import DBCatalogManager
 from engine.storage_engine import StorageEngine
+from engine.database import Database
+from engine.transaction import TRANSACTION_PLANS, SerializationError
+from engine.lock_manager import DeadlockError, LockTimeoutError
 
 
 from utils.constants import PAGE_SIZE
+from utils.config import load_config, parse_size, format_size
 
 
 class DatabaseCLI(cmd.Cmd):
@@ -48,35 +55,38 @@ class DatabaseCLI(cmd.Cmd):
 
     prompt = "LearnDB> "
 
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__()
-        self.data_dir = "data"
+        self.config = config or load_config()
+        self.data_dir = self.config['data_dir']
+        self.metrics_server = None
+        self.prepared_statements = {}
+        # 当前显式事务（BEGIN 开启），None 表示自动提交
+        self.transaction = None
         self._initialize_database()
 
     def _initialize_database(self):
         """初始化数据库系统"""
         try:
-            # 创建数据目录
-            os.makedirs(self.data_dir, exist_ok=True)
-
-            # 初始化各组件
-            self.file_manager = FileManager(self.data_dir)
-            self.buffer_pool = BufferPool(capacity=100, file_manager=self.file_manager)
-            self.catalog_manager = DBCatalogManager(self.data_dir)
-            self.storage_engine = StorageEngine(self.buffer_pool, self.file_manager)
-
-            # 修改：传递catalog_manager给Executor
-            self.executor = Executor(self.storage_engine, self.catalog_manager)
-
-            # 初始化编译器组件
+            # 组件的创建统一由 Database 完成
+            self.database = Database(self.config)
+            self.file_manager = self.database.file_manager
+            self.buffer_pool = self.database.buffer_pool
+            self.catalog_manager = self.database.catalog_manager
+            self.storage_engine = self.database.storage_engine
+            self.executor = self.database.executor
+
+            # 编译器组件（带执行计划缓存）
+            self.compiler = self.database.compiler
             self.lexer = Lexer()
-            self.parser = Parser(self.catalog_manager)
-            self.semantic_analyzer = SemanticAnalyzer(self.catalog_manager)
-            self.planner = Planner(self.catalog_manager)
+            self.parser = self.compiler.parser
+            self.semantic_analyzer = self.compiler.semantic_analyzer
+            self.planner = self.compiler.planner
 
             print("✅ 数据库系统初始化完成")
             print(f"📁 数据目录: {os.path.abspath(self.data_dir)}")
-            print(f"💾 缓冲池大小: 100 页 ({100 * PAGE_SIZE / 1024} KB)")
+            print(f"💾 缓冲池大小: {self.buffer_pool.capacity} 页 "
+                  f"({format_size(self.buffer_pool.memory_budget)})")
 
         except Exception as e:
             print(f"❌ 数据库初始化失败: {e}")
@@ -100,7 +110,14 @@ class DatabaseCLI(cmd.Cmd):
     def _cleanup(self):
         """清理资源"""
         try:
-            self.buffer_pool.flush_all()
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
+            if self.transaction is not None:
+                self.database.rollback(self.transaction)
+                self.transaction = None
+                print("↩️  未提交的事务已回滚")
+            self.database.close()
             print("💾 数据已持久化到磁盘")
         except Exception as e:
             print(f"⚠️  清理资源时发生错误: {e}")
@@ -122,33 +139,58 @@ class DatabaseCLI(cmd.Cmd):
             sql = sql[:-1].strip()
 
         try:
-            # 1. 词法分析
-            tokens = self.lexer.tokenize(sql)
-            if not tokens or (len(tokens) == 1 and tokens[0].type == 'EOF'):
-                print("⚠️  空的SQL语句")
-                return
+            # 1-4. 词法、语法、语义分析并生成执行计划（命中计划缓存时全部跳过）
+            plan = self.compiler.compile(sql)
 
-            # 2. 语法分析
-            ast = self.parser.parse(sql)
-
-            # 3. 语义分析
-            validated_ast = self.semantic_analyzer.analyze(ast)
-
-            # 4. 生成执行计划
-            plan = self.planner.create_plan(validated_ast)
-
-            # 5. 执行计划
-            result = self.executor.execute(plan)
+            # 5. 执行计划（事务控制语句由会话处理）
+            if plan.plan_type in TRANSACTION_PLANS:
+                self._execute_transaction(plan.plan_type)
+                return
+            result = self.database.execute_plan(plan, self.transaction)
 
             # 6. 显示结果
             self._display_result(result, plan)
 
+        except (DeadlockError, LockTimeoutError, SerializationError) as e:
+            print(f"❌ 锁冲突: {e}")
+            self._check_transaction()
         except Exception as e:
             print(f"❌ SQL执行错误: {e}")
             # 打印详细的错误信息（用于调试）
             import traceback
             traceback.print_exc()
 
+    def _execute_transaction(self, action: str):
+        """处理 BEGIN / COMMIT / ROLLBACK"""
+        if action == 'BEGIN':
+            if self.transaction is not None:
+                print("⚠️  已在事务中")
+                return
+            self.transaction = self.database.begin()
+            print(f"✅ 事务 {self.transaction.txn_id} 已开始")
+            return
+
+        if self.transaction is None:
+            print("⚠️  当前没有进行中的事务")
+            return
+        txn, self.transaction = self.transaction, None
+        if action == 'COMMIT':
+            written = self.database.commit(txn)
+            print(f"✅ 事务 {txn.txn_id} 已提交: 写入 {written} 行")
+        else:
+            self.database.rollback(txn)
+            print(f"↩️  事务 {txn.txn_id} 已回滚")
+
+    def _check_transaction(self):
+        """事务被选为死锁牺牲者时已自动回滚"""
+        if self.transaction is not None and not self.transaction.is_active:
+            print(f"↩️  事务 {self.transaction.txn_id} 已回滚")
+            self.transaction = None
+
+    def postcmd(self, stop, line):
+        self.prompt = "LearnDB*> " if self.transaction is not None else "LearnDB> "
+        return stop
+
     def _display_result(self, result, plan):
         """显示查询结果"""
         if plan.plan_type == 'SELECT':
@@ -163,12 +205,108 @@ class DatabaseCLI(cmd.Cmd):
         elif plan.plan_type == 'INSERT':
             print(f"✅ 插入成功: 影响了 {result} 行")
 
+        elif plan.plan_type == 'DELETE':
+            print(f"✅ 删除成功: 影响了 {result} 行")
+
+        elif plan.plan_type == 'UPDATE':
+            print(f"✅ 更新成功: 影响了 {result} 行")
+
+        elif plan.plan_type == 'VACUUM':
+            print(f"♻️  清理完成: {result['tables']} 张表, 扫描 {result['pages']} 页, "
+                  f"回收 {result['reclaimed']} 个旧版本, 归还 {result['freed_pages']} 个空页")
+
+        elif plan.plan_type == 'ANALYZE':
+            print(f"📊 统计完成: {result['tables']} 张表, 共 {result['rows']} 行")
+
         elif plan.plan_type == 'CREATE_TABLE':
             print(f"✅ 表创建成功: {plan.details['table_name']}")
 
+        elif plan.plan_type == 'CREATE_TABLESPACE':
+            print(f"✅ 表空间创建成功: {plan.details['tablespace']} -> {result}")
+
+        elif plan.plan_type == 'DROP_TABLESPACE':
+            print(f"✅ 表空间已删除: {plan.details['tablespace']}")
+
+        elif plan.plan_type == 'ALTER_TABLE':
+            action = "添加" if plan.details['action'] == 'ADD_PARTITION' else "删除"
+            print(f"✅ 已{action} {result} 个分区: {plan.details['table_name']}")
+
+        elif plan.plan_type == 'CREATE_VIEW':
+            print(f"✅ 物化视图创建成功: {plan.details['table_name']}（{result} 行）")
+
+        elif plan.plan_type == 'TRUNCATE_TABLE':
+            print(f"✅ 表已清空: {', '.join(plan.details['table_names'])}")
+
+        elif plan.plan_type in ('COPY_FROM', 'COPY_TO'):
+            action = "导入" if plan.plan_type == 'COPY_FROM' else "导出"
+            print(f"✅ {action}完成: {result['rows']} 行, 耗时 {result['seconds']:.2f} 秒, "
+                  f"{result['rows_per_second']:.0f} 行/秒")
+
         else:
             print(f"✅ 操作完成: {result}")
 
+    def do_prepare(self, arg):
+        """预编译语句: prepare <name> AS <sql>（参数用 ? 或 :name 占位）"""
+        parts = arg.split(None, 2)
+        if len(parts) < 3 or parts[1].upper() != 'AS':
+            print("❌ 用法: prepare <name> AS <sql>")
+            return
+
+        name, sql = parts[0], parts[2]
+        try:
+            stmt = self.compiler.prepare(sql)
+            self.prepared_statements[name] = stmt
+            print(f"✅ 语句 '{name}' 已预编译 ({stmt.param_count} 个参数)")
+        except Exception as e:
+            print(f"❌ 预编译失败: {e}")
+
+    def do_execute(self, arg):
+        """执行预编译语句: execute <name> [(value1, value2, ...)]"""
+        parts = arg.split(None, 1)
+        if not parts:
+            print("❌ 用法: execute <name> [(value1, value2, ...)]")
+            return
+
+        name = parts[0]
+        stmt = self.prepared_statements.get(name)
+        if stmt is None:
+            print(f"❌ 预编译语句 '{name}' 不存在")
+            return
+
+        try:
+            params = self._parse_params(parts[1]) if len(parts) > 1 else []
+            # 表结构变化后重新预编译，保证计划引用的是最新的表结构
+            stmt = self.compiler.prepare(stmt.sql)
+            self.prepared_statements[name] = stmt
+            if stmt.parameters and stmt.parameters[0].name is not None:
+                # 命名参数按首次出现的顺序依次对应
+                names = list(dict.fromkeys(p.name for p in stmt.parameters))
+                if len(params) != len(names):
+                    raise ValueError(f"Expected {len(names)} parameters, got {len(params)}")
+                params = dict(zip(names, params))
+            plan = stmt.bind(params)
+            result = self.database.execute_plan(plan, self.transaction)
+            self._display_result(result, plan)
+        except Exception as e:
+            print(f"❌ 执行失败: {e}")
+
+    def do_deallocate(self, arg):
+        """释放预编译语句: deallocate <name>"""
+        if self.prepared_statements.pop(arg.strip(), None) is None:
+            print(f"❌ 预编译语句 '{arg.strip()}' 不存在")
+        else:
+            print(f"✅ 已释放预编译语句 '{arg.strip()}'")
+
+    def _parse_params(self, text: str) -> List:
+        """将 (v1, v2, ...) 形式的参数文本解析为值列表"""
+        text = text.strip()
+        if not text.startswith('('):
+            text = f"({text})"
+        param_parser = Parser(self.catalog_manager)
+        param_parser.tokens = self.lexer.tokenize(text)
+        param_parser.pos = 0
+        return param_parser.parse_value_list()
+
     def do_tables(self, arg):
         """显示所有表: tables"""
         try:
@@ -185,6 +323,16 @@ class DatabaseCLI(cmd.Cmd):
         except Exception as e:
             print(f"❌ 获取表列表失败: {e}")
 
+    def do_tablespaces(self, arg):
+        """显示所有表空间: tablespaces"""
+        if not self.catalog_manager.tablespaces:
+            print("💽 没有表空间（全部表都在数据目录中）")
+            return
+        print("💽 表空间:")
+        for name, location in self.catalog_manager.tablespaces.items():
+            tables = self.catalog_manager.tables_in_tablespace(name)
+            print(f"  {name}: {location}（{len(tables)} 张表）")
+
     def do_desc(self, arg):
         """显示表结构: desc <table_name>"""
         if not arg:
@@ -215,10 +363,42 @@ class DatabaseCLI(cmd.Cmd):
 
             if schema.primary_key:
                 print(f"🔑 主键: {schema.primary_key}")
+            if schema.storage_format == 'columnar':
+                print("🗂️ 存储格式: 列式（PAX）")
+            if schema.dictionary_columns:
+                names = ', '.join(schema.columns[i]['name'] for i in schema.dictionary_columns)
+                print(f"📖 字典编码列: {names}")
+            if schema.engine == 'memory':
+                print("🧠 存储引擎: MEMORY（数据只在内存中，关闭后丢弃）")
+            if schema.tablespace:
+                print(f"💽 表空间: {schema.tablespace}（{self.catalog_manager.tablespace_location(schema.tablespace)}）")
+            if schema.view:
+                print(f"🪟 物化视图: {schema.view['query']}")
+            if schema.partition:
+                print(f"🧩 分区: {schema.partition['method']}({schema.partition['column']})")
+                for definition, physical in zip(schema.partition['partitions'], schema.partitions):
+                    bound = ''
+                    if schema.partition['method'] == 'RANGE':
+                        bound = ' < MAXVALUE' if definition['bound'] is None else f" < {definition['bound']!r}"
+                    page_count = self.file_manager.get_page_count(physical.table_name)
+                    print(f"   {definition['name']}{bound}: {page_count} 页")
+            compression = self.file_manager.compression_stats(table_name)
+            if compression:
+                print(f"🗜️ 页压缩: {compression['codec']}，{compression['pages']} 页占用 "
+                      f"{compression['stored_bytes'] / 1024:.1f}KB（压缩比 {compression['ratio']:.1f}x）")
 
         except Exception as e:
             print(f"❌ 获取表结构失败: {e}")
 
+    def do_gc(self, arg):
+        """回收旧版本: gc [table_name]"""
+        table_name = arg.strip() or None
+        try:
+            reclaimed = self.database.collect_garbage(table_name)
+            print(f"♻️  已回收 {reclaimed} 个旧版本")
+        except Exception as e:
+            print(f"❌ 回收失败: {e}")
+
     def do_clear(self, arg):
         """清空屏幕: clear"""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -227,30 +407,148 @@ class DatabaseCLI(cmd.Cmd):
         """显示数据库统计信息: stats"""
         try:
             # 缓冲池统计
-            buffer_stats = {
-                'total_pages': len(self.buffer_pool.pages),
-                'dirty_pages': len(self.buffer_pool.dirty_pages),
-                'pinned_pages': sum(1 for count in self.buffer_pool.pin_counts.values() if count > 0)
-            }
+            buffer_stats = self.buffer_pool.get_stats()
+            io_stats = self.file_manager.get_stats()
 
             # 表统计
             table_stats = []
-            for table_name in self.catalog_manager.schemas.keys():
-                page_count = self.file_manager.get_page_count(table_name)
+            for table_name, schema in self.catalog_manager.schemas.items():
+                page_count = sum(self.file_manager.get_page_count(physical.table_name)
+                                 for physical in schema.physical_schemas)
                 table_stats.append((table_name, page_count))
 
             print("📈 数据库统计信息:")
-            print(f"💾 缓冲池: {buffer_stats['total_pages']} 页, "
+            print(f"💾 缓冲池: {buffer_stats['pages']}/{buffer_stats['capacity']} 页, "
                   f"{buffer_stats['dirty_pages']} 脏页, "
                   f"{buffer_stats['pinned_pages']} 固定页")
+            print(f"🎯 命中率: {buffer_stats['hit_ratio'] * 100:.2f}% "
+                  f"(命中 {buffer_stats['hits']}, 缺失 {buffer_stats['misses']})")
+            print(f"♻️  置换: {buffer_stats['evictions']} 次, "
+                  f"脏页回写: {buffer_stats['dirty_writebacks']} 次")
+            print(f"📀 磁盘I/O: 读 {io_stats['reads']} 次 ({io_stats['bytes_read']} B), "
+                  f"写 {io_stats['writes']} 次 ({io_stats['bytes_written']} B)")
+            memory_tables = self.file_manager.memory_tables
+            if memory_tables:
+                memory_bytes = sum(table.nbytes for table in list(memory_tables.values()))
+                print(f"🧠 内存表: {len(memory_tables)} 张, 占用 {format_size(memory_bytes)}")
+            plan_stats = self.compiler.plan_cache.get_stats()
+            print(f"🗂️  计划缓存: {plan_stats['entries']}/{plan_stats['capacity']} 条, "
+                  f"命中率 {plan_stats['hit_ratio'] * 100:.2f}% "
+                  f"(命中 {plan_stats['hits']}, 缺失 {plan_stats['misses']})")
+            txn_stats = self.database.transaction_manager.get_stats()
+            print(f"🔒 事务: 活跃 {txn_stats['active']}, 提交 {txn_stats['commits']}, "
+                  f"回滚 {txn_stats['rollbacks']}, 死锁 {txn_stats['deadlocks']}")
+            print(f"🕒 MVCC: 已提交事务号 {txn_stats['committed_xid']}, "
+                  f"活跃快照 {txn_stats['active_snapshots']}")
+            scan_stats = self.database.executor.parallel_scanner.get_stats()
+            print(f"⚡ 并行扫描: {scan_stats['workers']} 个工作进程, 表达到 {scan_stats['min_pages']} 页时启用, "
+                  f"已执行 {scan_stats['scans']} 次")
+            print(f"⚡ 向量化扫描: {'开启' if self.database.executor.vectorized_scan else '关闭'}")
+            result_cache = self.database.executor.result_cache
+            if result_cache is not None:
+                cache_stats = result_cache.get_stats()
+                print(f"📦 结果缓存: {cache_stats['entries']} 条, "
+                      f"{cache_stats['bytes'] / 1024:.1f}/{cache_stats['max_bytes'] / 1024:.1f}KB, "
+                      f"命中率 {cache_stats['hit_ratio'] * 100:.2f}% "
+                      f"(命中 {cache_stats['hits']}, 缺失 {cache_stats['misses']})")
+            else:
+                print("📦 结果缓存: 关闭")
+            print(f"🗺️ 跳页扫描: 区域映射和 Bloom 过滤器已跳过 {self.database.storage_engine.skipped_pages} 页")
+            vacuum_stats = self.database.autovacuum.get_stats()
+            print(f"🧹 后台清理: {'开启' if vacuum_stats['enabled'] else '关闭'}, "
+                  f"回收 {vacuum_stats['reclaimed']} 个旧版本, 归还 {vacuum_stats['freed_pages']} 个空页")
 
             print("📊 表信息:")
             for table_name, page_count in table_stats:
-                print(f"  {table_name}: {page_count} 页")
+                table_io = io_stats['tables'].get(table_name)
+                if table_io:
+                    print(f"  {table_name}: {page_count} 页, "
+                          f"读 {table_io['reads']} 次 (平均 {table_io['read_latency']['avg'] * 1000:.3f} ms), "
+                          f"写 {table_io['writes']} 次 (平均 {table_io['write_latency']['avg'] * 1000:.3f} ms)")
+                else:
+                    print(f"  {table_name}: {page_count} 页")
 
         except Exception as e:
             print(f"❌ 获取统计信息失败: {e}")
 
+    def do_metrics(self, arg):
+        """导出 Prometheus 指标: metrics export <file> | metrics serve [port] | metrics stop | metrics reset"""
+        args = shlex.split(arg)
+        if not args:
+            print("❌ 用法: metrics export <file> | metrics serve [port] | metrics stop | metrics reset")
+            return
+
+        command = args[0].lower()
+        try:
+            if command == 'export':
+                if len(args) < 2:
+                    print("❌ 请指定导出文件: metrics export <file>")
+                    return
+                write_prometheus(args[1], self.buffer_pool, self.file_manager)
+                print(f"✅ 指标已导出到: {os.path.abspath(args[1])}")
+            elif command == 'serve':
+                if self.metrics_server:
+                    host, port = self.metrics_server.address
+                    print(f"⚠️  指标服务已在运行: http://{host}:{port}/metrics")
+                    return
+                port = int(args[1]) if len(args) > 1 else 9187
+                self.metrics_server = MetricsServer(self.buffer_pool, self.file_manager, port)
+                self.metrics_server.start()
+                host, port = self.metrics_server.address
+                print(f"✅ 指标服务已启动: http://{host}:{port}/metrics")
+            elif command == 'stop':
+                if self.metrics_server:
+                    self.metrics_server.stop()
+                    self.metrics_server = None
+                    print("✅ 指标服务已停止")
+            elif command == 'reset':
+                self.buffer_pool.reset_stats()
+                self.file_manager.reset_stats()
+                print("✅ 统计计数已清零")
+            else:
+                print(f"❌ 未知的子命令: {command}")
+        except Exception as e:
+            print(f"❌ 指标操作失败: {e}")
+
+    def do_set(self, arg):
+        """调整运行时配置: set [buffer_pool_size <size> | table_quota <table> <pages|default>]"""
+        args = shlex.split(arg)
+        try:
+            if not args:
+                print("⚙️  当前配置:")
+                print(f"  buffer_pool_size    = {format_size(self.buffer_pool.memory_budget)} "
+                      f"({self.buffer_pool.capacity} 页)")
+                print(f"  buffer_pool_timeout = {self.buffer_pool.wait_timeout}s")
+                print(f"  table_quota         = {self.buffer_pool.table_quota}")
+                for table_name, max_pages in self.buffer_pool.table_quotas.items():
+                    print(f"  table_quota[{table_name}] = {max_pages} 页")
+                return
+
+            option = args[0].lower()
+            if option == 'buffer_pool_size' and len(args) == 2:
+                capacity = max(1, parse_size(args[1]) // PAGE_SIZE)
+                self.buffer_pool.resize(capacity)
+                self.config['buffer_pool_size'] = self.buffer_pool.memory_budget
+                print(f"✅ 缓冲池已调整为 {capacity} 页 ({format_size(self.buffer_pool.memory_budget)})")
+            elif option == 'buffer_pool_timeout' and len(args) == 2:
+                self.buffer_pool.wait_timeout = float(args[1])
+                self.config['buffer_pool_timeout'] = self.buffer_pool.wait_timeout
+                print(f"✅ 缓冲池等待超时已设置为 {self.buffer_pool.wait_timeout}s")
+            elif option == 'table_quota' and len(args) == 2:
+                self.buffer_pool.table_quota = float(args[1])
+                self.config['table_quota'] = self.buffer_pool.table_quota
+                print(f"✅ 单表默认配额已设置为缓冲池的 {self.buffer_pool.table_quota:.0%}")
+            elif option == 'table_quota' and len(args) == 3:
+                max_pages = None if args[2].lower() == 'default' else int(args[2])
+                self.buffer_pool.set_table_quota(args[1], max_pages)
+                print(f"✅ 表 '{args[1]}' 的缓冲池配额: "
+                      f"{self.buffer_pool.get_table_quota(args[1])} 页")
+            else:
+                print("❌ 用法: set buffer_pool_size <size> | set buffer_pool_timeout <seconds> | "
+                      "set table_quota <ratio> | set table_quota <table> <pages|default>")
+        except ValueError as e:
+            print(f"❌ 设置失败: {e}")
+
     def do_shell(self, arg):
         """执行系统命令: shell <command>"""
         if not arg:
@@ -273,13 +571,47 @@ class DatabaseCLI(cmd.Cmd):
             print("=" * 50)
             print("SQL 命令:")
             print("  SELECT * FROM table_name [WHERE condition];")
-            print("  INSERT INTO table_name VALUES (value1, value2, ...);")
-            print("  CREATE TABLE table_name (col1 TYPE, col2 TYPE, ...);")
+            print("  SELECT COUNT(*), SUM(col), MIN(col), MAX(col), AVG(col) FROM table_name [WHERE condition];")
+            print("  SELECT col, COUNT(*), SUM(col2) FROM table_name [WHERE condition] GROUP BY col;")
+            print("  INSERT INTO table_name VALUES (value1, value2, ...)[, (...), ...];")
+            print("  UPDATE table_name SET col = value[, ...] [WHERE condition];")
+            print("  DELETE FROM table_name [WHERE condition];")
+            print("  CREATE TABLE table_name (col1 TYPE, col2 TYPE, ...) [WITH (bloom_filter = 'col, ...')];")
+            print("  CREATE TABLE table_name (...) WITH (format = 'columnar');  -- 列式（PAX）存储")
+            print("  CREATE TABLE table_name (...) WITH (compression = 'zlib');  -- 页压缩（zlib / lz4）")
+            print("  CREATE TABLE table_name (...) WITH (dictionary = 'col, ...');  -- 低基数 VARCHAR 列字典编码")
+            print("  CREATE TABLE table_name (...) PARTITION BY RANGE (col) "
+                  "(PARTITION p0 VALUES LESS THAN (100), PARTITION p1 VALUES LESS THAN MAXVALUE);")
+            print("  CREATE TABLE table_name (...) PARTITION BY HASH (col) PARTITIONS 4;")
+            print("  ALTER TABLE table_name ADD PARTITION p VALUES LESS THAN (v);  -- RANGE 分区")
+            print("  ALTER TABLE table_name DROP PARTITION p[, ...];  - 删除分区的数据文件")
+            print("  CREATE TABLESPACE name LOCATION '/path';  -- 表文件放在另一目录（磁盘）")
+            print("  CREATE TABLE table_name (...) [WITH (...)] TABLESPACE name;")
+            print("  DROP TABLESPACE name;  - 删除空的表空间")
+            print("  CREATE TEMP TABLE table_name (...);  -- 内存表，同 ENGINE = MEMORY")
+            print("  CREATE TABLE table_name (...) ENGINE = MEMORY;  -- 数据不落盘，关闭后丢弃，只保存表模式")
+            print("  CREATE MATERIALIZED VIEW view_name AS SELECT ... [GROUP BY col];  -- 插入时增量维护")
+            print("  TRUNCATE [TABLE] table_name[, ...];  - 清空表数据")
+            print("  DROP TABLE table_name[, ...];")
+            print("  VACUUM [table_name];  - 回收旧版本并紧凑页")
+            print("  ANALYZE [table_name];  - 收集统计信息，并据此确定 Bloom 过滤器大小")
+            print("  COPY table_name FROM|TO 'file' [WITH (format csv|binary, header, delimiter ',')];")
+            print("  BEGIN; ... COMMIT; | ROLLBACK;  - 事务（提交时批量写入）")
+            print()
+            print("预编译语句:")
+            print("  prepare <name> AS <sql>      - 预编译带 ? 或 :name 占位符的语句")
+            print("  execute <name> [(v1, ...)]   - 绑定参数并执行")
+            print("  deallocate <name>            - 释放预编译语句")
             print()
             print("系统命令:")
             print("  tables              - 显示所有表")
             print("  desc <table_name>   - 显示表结构")
+            print("  tablespaces         - 显示所有表空间")
             print("  stats               - 显示统计信息")
+            print("  gc [table_name]     - 回收不再被任何快照引用的旧版本")
+            print("  set [option value]  - 查看/调整运行时配置（如缓冲池大小）")
+            print("  metrics export <f>  - 导出 Prometheus 指标到文件")
+            print("  metrics serve [p]   - 在本地端口提供 /metrics")
             print("  clear               - 清空屏幕")
             print("  shell <command>     - 执行系统命令")
             print("  help [command]      - 显示帮助信息")
@@ -287,12 +619,33 @@ class DatabaseCLI(cmd.Cmd):
             print("=" * 50)
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    arg_parser = argparse.ArgumentParser(description="LearnDB 数据库系统")
+    arg_parser.add_argument('--config', help="配置文件路径（JSON）")
+    arg_parser.add_argument('--data-dir', dest='data_dir', help="数据目录")
+    arg_parser.add_argument('--buffer-pool-size', dest='buffer_pool_size',
+                            help="缓冲池内存预算，如 400KB、64MB")
+    arg_parser.add_argument('--buffer-pool-timeout', dest='buffer_pool_timeout', type=float,
+                            help="缓冲池耗尽时的等待超时（秒）")
+    arg_parser.add_argument('--table-quota', dest='table_quota', type=float,
+                            help="单表最多占用缓冲池的比例 (0, 1]")
+    return arg_parser.parse_args(argv)
+
+
 def main():
     """主函数"""
+    args = parse_args()
     print("🚀 正在启动 LearnDB 数据库系统...")
 
     try:
-        cli = DatabaseCLI()
+        config = load_config(args.config, {
+            'data_dir': args.data_dir,
+            'buffer_pool_size': args.buffer_pool_size,
+            'buffer_pool_timeout': args.buffer_pool_timeout,
+            'table_quota': args.table_quota,
+        })
+        cli = DatabaseCLI(config)
         cli.cmdloop()
     except KeyboardInterrupt:
         print("\n👋 用户中断，正在退出...")
@@ -1 +1,3 @@
-from .executer import Executor
\ No newline at end of file
+from .executer import Executor
+from .database import Database
+from .dbapi import connect
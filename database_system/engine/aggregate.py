@@ -0,0 +1,120 @@
+"""
+聚合函数：COUNT / SUM / MIN / MAX / AVG
+
+聚合状态是普通的列表，可以在扫描工作进程中部分累积，再由主进程合并后求最终值。
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+AGGREGATE_FUNCTIONS = ('COUNT', 'SUM', 'MIN', 'MAX', 'AVG')
+
+# (函数名, 列名)，COUNT(*) 的列名为 '*'
+Aggregate = Tuple[str, str]
+
+
+def aggregate_name(aggregate: Aggregate) -> str:
+    """结果集中聚合列的名称，如 COUNT(*)、SUM(age)"""
+    return f"{aggregate[0]}({aggregate[1]})"
+
+
+def aggregate_column_name(aggregate: Aggregate) -> str:
+    """聚合结果存为表的列时的列名，如 count、sum_amount"""
+    func, column = aggregate
+    return func.lower() if column == '*' else f"{func.lower()}_{column}"
+
+
+def aggregate_indexes(aggregates: Sequence[Aggregate], schema) -> List[Optional[int]]:
+    """各聚合参数列在记录中的下标，COUNT(*) 为 None"""
+    return [None if column == '*' else schema.get_column_index(column) for _, column in aggregates]
+
+
+def init_states(aggregates: Sequence[Aggregate]) -> List[Any]:
+    return [[0, 0] if func == 'AVG' else (0 if func == 'COUNT' else None) for func, _ in aggregates]
+
+
+def accumulate(states: List[Any], aggregates: Sequence[Aggregate], indexes: Sequence[Optional[int]],
+               record: Sequence[Any]):
+    """把一条记录累加到聚合状态中，NULL 值不参与聚合（COUNT(*) 除外）"""
+    for i, (func, _) in enumerate(aggregates):
+        index = indexes[i]
+        if index is None:
+            states[i] += 1
+            continue
+        value = record[index]
+        if value is None:
+            continue
+        if func == 'COUNT':
+            states[i] += 1
+        elif func == 'SUM':
+            states[i] = value if states[i] is None else states[i] + value
+        elif func == 'MIN':
+            if states[i] is None or value < states[i]:
+                states[i] = value
+        elif func == 'MAX':
+            if states[i] is None or value > states[i]:
+                states[i] = value
+        else:
+            states[i][0] += value
+            states[i][1] += 1
+
+
+def merge_states(states: List[Any], aggregates: Sequence[Aggregate], other: List[Any]):
+    """把另一份部分聚合状态合并进 states"""
+    for i, (func, _) in enumerate(aggregates):
+        value = other[i]
+        if func == 'COUNT':
+            states[i] += value
+        elif func == 'AVG':
+            states[i][0] += value[0]
+            states[i][1] += value[1]
+        elif value is None:
+            continue
+        elif states[i] is None:
+            states[i] = value
+        elif func == 'SUM':
+            states[i] += value
+        elif func == 'MIN':
+            states[i] = min(states[i], value)
+        else:
+            states[i] = max(states[i], value)
+
+
+def finalize(states: List[Any], aggregates: Sequence[Aggregate]) -> List[Any]:
+    """由聚合状态求最终结果"""
+    result = []
+    for state, (func, _) in zip(states, aggregates):
+        if func == 'AVG':
+            result.append(state[0] / state[1] if state[1] else None)
+        else:
+            result.append(state)
+    return result
+
+
+def group_rows(records: Iterable[Sequence[Any]], group_indexes: Sequence[int], output_indexes: Sequence[int],
+               aggregates: Sequence[Aggregate], indexes: Sequence[Optional[int]]) -> Iterator[List[Any]]:
+    """
+    GROUP BY：按 group_indexes 列的取值分组累积聚合状态，
+    每组产出 output_indexes 列（均为分组列）的值加各聚合的结果，按组首次出现的顺序
+    """
+    groups: Dict[tuple, List[Any]] = {}
+    for record in records:
+        key = tuple(record[i] for i in group_indexes)
+        states = groups.get(key)
+        if states is None:
+            states = groups[key] = init_states(aggregates)
+        accumulate(states, aggregates, indexes, record)
+    positions = [list(group_indexes).index(i) for i in output_indexes]
+    for key, states in groups.items():
+        yield [key[p] for p in positions] + finalize(states, aggregates)
+
+
+def result_column(aggregate: Aggregate, schema) -> dict:
+    """聚合结果列的定义"""
+    func, column = aggregate
+    if func == 'COUNT':
+        col_type = 'INT'
+    elif func == 'AVG':
+        col_type = 'FLOAT'
+    else:
+        col_type = schema.column_dict[column]['type']
+    length = None if func in ('COUNT', 'AVG') else schema.column_dict[column].get('length')
+    return {'name': aggregate_name(aggregate), 'type': col_type, 'length': length}
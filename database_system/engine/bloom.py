@@ -0,0 +1,182 @@
+"""
+Bloom 过滤器：为声明了 bloom_filter 的列，每 BLOOM_RANGE_PAGES 页维护一个过滤器，
+等值条件 col = 常量 的扫描跳过过滤器判定"一定不含该值"的页区间。
+
+过滤器按区间内预计的不同值个数确定大小：ANALYZE 统计过的表取 min(区间行数, 列的不同值数)，
+否则按页容量估计区间行数。保存与重建方式与区域映射相同（见 zone_map.py）。
+"""
+import base64
+import hashlib
+import math
+from typing import Any, Dict, List, Optional, Sequence
+from sql_compiler.catalog import Schema
+from sql_compiler.parser import BinaryOpExpr, ColumnRef, Constant
+from utils.constants import BLOOM_RANGE_PAGES, BLOOM_FP_RATE
+from .zone_map import PageSummary, stored_value
+
+BLOOM_SUFFIX = '.bloom'
+
+
+def bloom_key(value: Any) -> Optional[bytes]:
+    """值的哈希键；整数值的浮点数与整数等值比较为真，按整数处理"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int):
+        return b'i%d' % value
+    if isinstance(value, str):
+        return b's' + value.encode('utf-8')
+    return b'r' + repr(value).encode('utf-8')
+
+
+class BloomFilter:
+    """位数组 + k 个哈希（由一次 blake2b 摘要做双重哈希得到）"""
+
+    __slots__ = ('num_bits', 'num_hashes', 'bits')
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = BLOOM_FP_RATE) -> 'BloomFilter':
+        """按预计元素个数与目标误判率确定位数和哈希个数"""
+        capacity = max(1, capacity)
+        num_bits = max(64, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: bytes):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_json(self) -> list:
+        return [self.num_bits, self.num_hashes, base64.b64encode(bytes(self.bits)).decode('ascii')]
+
+    @classmethod
+    def from_json(cls, data: list) -> 'BloomFilter':
+        return cls(data[0], data[1], bytearray(base64.b64decode(data[2])))
+
+
+def bloom_may_match(condition, schema: Schema, lookup) -> bool:
+    """
+    条件是否可能被满足；lookup(列下标, 键) 返回该列的过滤器是否可能含有该键，
+    只有等值比较和 IN 能被排除，其余条件视为可能满足
+    """
+    if not isinstance(condition, BinaryOpExpr):
+        return True
+    if condition.op == 'AND':
+        return bloom_may_match(condition.left, schema, lookup) and bloom_may_match(condition.right, schema, lookup)
+    if condition.op == 'OR':
+        return bloom_may_match(condition.left, schema, lookup) or bloom_may_match(condition.right, schema, lookup)
+    if condition.op == 'IN':
+        return any(bloom_may_match(BinaryOpExpr(condition.left, '=', item), schema, lookup)
+                   for item in condition.right.items)
+    if condition.op != '=':
+        return True
+    column, constant = condition.left, condition.right
+    if isinstance(column, Constant) and isinstance(constant, ColumnRef):
+        column, constant = constant, column
+    if not (isinstance(column, ColumnRef) and isinstance(constant, Constant)):
+        return True
+    col_index = schema.get_column_index(column.name)
+    key = bloom_key(constant.value)
+    if col_index == -1 or key is None:
+        return True
+    return lookup(col_index, key)
+
+
+class BloomIndex(PageSummary):
+    """
+    一张表的 Bloom 过滤器。filters[列下标][区间号] 覆盖第 区间号 * range_pages 起的 range_pages 页，
+    区间内还没有写入记录时为 None
+    """
+
+    def __init__(self, path: str, capacities: Dict[int, int], range_pages: int = BLOOM_RANGE_PAGES,
+                 filters: Optional[Dict[int, List[Optional[BloomFilter]]]] = None):
+        super().__init__(path)
+        # 列下标 -> 每个区间预计的不同值个数
+        self.capacities = capacities
+        self.range_pages = range_pages
+        self.filters: Dict[int, List[Optional[BloomFilter]]] = (
+            filters if filters is not None else {col_index: [] for col_index in capacities})
+
+    @classmethod
+    def load(cls, path: str, capacities: Dict[int, int], page_count: int) -> Optional['BloomIndex']:
+        """加载过滤器；文件与表文件不一致或过滤器大小已改变（如重新 ANALYZE）时返回 None"""
+        data = cls.read_file(path, page_count)
+        if (not data or data.get('range_pages') != BLOOM_RANGE_PAGES
+                or data.get('capacities') != {str(k): v for k, v in capacities.items()}):
+            return None
+        filters = {int(col_index): [BloomFilter.from_json(f) if f else None for f in ranges]
+                   for col_index, ranges in data.get('filters', {}).items()}
+        if set(filters) != set(capacities):
+            return None
+        index = cls(path, capacities, BLOOM_RANGE_PAGES, filters)
+        index.saved = True
+        return index
+
+    def _dump(self, page_count: int) -> dict:
+        return {
+            'range_pages': self.range_pages,
+            'capacities': {str(k): v for k, v in self.capacities.items()},
+            'filters': {str(col_index): [f.to_json() if f else None for f in ranges]
+                        for col_index, ranges in self.filters.items()},
+        }
+
+    def widen(self, page_id: int, rows: Sequence[Sequence[Any]], columns: Sequence[dict]):
+        """把写入 page_id 的记录加入所在区间的过滤器"""
+        if not rows:
+            return
+        range_id = page_id // self.range_pages
+        with self._lock:
+            self._mark_dirty()
+            for col_index, ranges in self.filters.items():
+                while len(ranges) <= range_id:
+                    ranges.append(None)
+                bloom = ranges[range_id]
+                if bloom is None:
+                    bloom = ranges[range_id] = BloomFilter.for_capacity(self.capacities[col_index])
+                col_def = columns[col_index]
+                for row in rows:
+                    key = bloom_key(stored_value(row[col_index], col_def))
+                    if key is not None:
+                        bloom.add(key)
+
+    def truncate(self, page_count: int):
+        """表文件截断到 page_count 页；仍有页的区间保留原过滤器（结果是超集）"""
+        keep = -(-page_count // self.range_pages)
+        with self._lock:
+            if any(len(ranges) > keep for ranges in self.filters.values()):
+                self._mark_dirty()
+                for ranges in self.filters.values():
+                    del ranges[keep:]
+
+    def filter_pages(self, condition, schema: Schema, page_ids: Sequence[int]) -> List[int]:
+        """从候选页中去掉过滤器判定不可能满足条件的页"""
+        def lookup(col_index: int, key: bytes) -> bool:
+            ranges = self.filters.get(col_index)
+            if ranges is None or range_id >= len(ranges) or ranges[range_id] is None:
+                return True
+            return ranges[range_id].might_contain(key)
+
+        result = []
+        verdicts: Dict[int, bool] = {}
+        for page_id in page_ids:
+            range_id = page_id // self.range_pages
+            if range_id not in verdicts:
+                verdicts[range_id] = bloom_may_match(condition, schema, lookup)
+            if verdicts[range_id]:
+                result.append(page_id)
+        return result
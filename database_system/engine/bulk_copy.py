@@ -0,0 +1,235 @@
+"""
+COPY 导入导出：CSV 流式导入/导出与二进制页转储
+"""
+import csv
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sql_compiler.catalog import Schema
+from utils.constants import PAGE_SIZE
+from .mvcc import stamp_page
+
+# 每个解析任务包含的CSV行数
+COPY_CHUNK_ROWS = 20000
+# 文件小于该大小时直接在当前进程解析，避免进程池启动开销
+COPY_PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+# 二进制页转储文件头: 魔数、版本、记录大小、页数
+BINARY_MAGIC = b'LDBPAGES'
+BINARY_HEADER = struct.Struct('>8sHii')
+BINARY_VERSION = 1
+
+
+def _convert_field(field: str, col_def: Dict) -> Any:
+    """将CSV字段转换为列类型对应的Python值，空字段视为NULL"""
+    if field == '':
+        return None
+    if col_def['type'] == 'INT':
+        return int(field)
+    return field
+
+
+def parse_csv_chunk(columns: List[Dict], lines: List[str], delimiter: str,
+                    first_line_no: int) -> List[List[Any]]:
+    """解析并校验一批CSV行（在工作进程中执行）"""
+    schema = Schema('__copy__', columns)
+    rows = []
+    line_no = first_line_no
+    for fields in csv.reader(lines, delimiter=delimiter):
+        if len(fields) != len(columns):
+            raise ValueError(f"第 {line_no} 行: 期望 {len(columns)} 列，实际 {len(fields)} 列")
+        values = []
+        for field, col_def in zip(fields, columns):
+            try:
+                value = _convert_field(field, col_def)
+            except ValueError:
+                raise ValueError(f"第 {line_no} 行: 列 '{col_def['name']}' 的值 '{field}' 类型不匹配")
+            if not schema.validate_value(col_def['name'], value):
+                raise ValueError(f"第 {line_no} 行: 列 '{col_def['name']}' 的值 '{field}' 类型不匹配")
+            values.append(value)
+        rows.append(values)
+        line_no += 1
+    return rows
+
+
+def _read_csv_chunks(f, chunk_rows: int, skip_header: bool) -> Iterator[Tuple[int, List[str]]]:
+    """按记录边界切分CSV文件，保证带引号的多行字段不被拆开"""
+    line_no = 1
+    if skip_header:
+        f.readline()
+        line_no += 1
+
+    chunk: List[str] = []
+    chunk_start = line_no
+    in_quotes = False
+    for line in f:
+        if not chunk and not line.strip():
+            chunk_start += 1
+            continue
+        chunk.append(line)
+        if line.count('"') % 2 == 1:
+            in_quotes = not in_quotes
+        if not in_quotes and len(chunk) >= chunk_rows:
+            yield chunk_start, chunk
+            chunk_start += len(chunk)
+            chunk = []
+    if chunk:
+        yield chunk_start, chunk
+
+
+def _throughput(rows: int, started: float) -> Dict[str, Any]:
+    seconds = time.perf_counter() - started
+    return {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else float(rows)
+    }
+
+
+def copy_from_csv(storage_engine, table_name: str, schema: Schema, file_path: str,
+                  delimiter: str = ',', header: bool = False,
+                  workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    从CSV文件导入：工作进程解析校验，主进程按批写入；整个导入成功完成后才对快照可见，
+    中途失败时已写入的版本被撤销，不会在之后发布更大的事务号时变为可见
+    """
+    versions = storage_engine.versions
+    xid = versions.allocate() if schema.versioned else None
+    try:
+        result = _copy_from_csv(storage_engine, table_name, schema, file_path, delimiter, header, workers, xid)
+        if xid:
+            versions.publish(xid)
+        return result
+    except BaseException:
+        if xid:
+            storage_engine.abort_xid(table_name, schema, xid)
+        raise
+    finally:
+        storage_engine.bump_table_version(table_name)
+
+
+def _copy_from_csv(storage_engine, table_name: str, schema: Schema, file_path: str, delimiter: str,
+                   header: bool, workers: Optional[int], xid: Optional[int]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    workers = workers or min(4, os.cpu_count() or 1)
+    parallel = workers > 1 and os.path.getsize(file_path) >= COPY_PARALLEL_MIN_BYTES
+    total = 0
+
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        chunks = _read_csv_chunks(f, COPY_CHUNK_ROWS, header)
+        if not parallel:
+            for line_no, lines in chunks:
+                rows = parse_csv_chunk(schema.columns, lines, delimiter, line_no)
+                total += storage_engine.bulk_insert(table_name, schema, rows, xmin=xid)
+            return _throughput(total, started)
+
+        # 限制在途任务数量，保证内存占用有界，并按文件顺序写入
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for line_no, lines in chunks:
+                pending.append(pool.submit(parse_csv_chunk, schema.columns, lines, delimiter, line_no))
+                if len(pending) >= workers * 2:
+                    total += storage_engine.bulk_insert(table_name, schema, pending.pop(0).result(), xmin=xid)
+            for future in pending:
+                total += storage_engine.bulk_insert(table_name, schema, future.result(), xmin=xid)
+
+    return _throughput(total, started)
+
+
+def copy_to_csv(storage_engine, table_name: str, schema: Schema, file_path: str,
+                delimiter: str = ',', header: bool = False) -> Dict[str, Any]:
+    """导出到CSV文件：直接从 scan_records 流式写出，内存占用有界"""
+    started = time.perf_counter()
+    total = 0
+    with open(file_path, 'w', newline='', encoding='utf-8', buffering=1024 * 1024) as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        if header:
+            writer.writerow([col['name'] for col in schema.columns])
+        for record in storage_engine.scan_records(table_name, schema):
+            writer.writerow(['' if value is None else value for value in record])
+            total += 1
+    return _throughput(total, started)
+
+
+def copy_to_binary(storage_engine, table_name: str, schema: Schema, file_path: str) -> Dict[str, Any]:
+    """二进制页转储：文件头 + 表的原始页"""
+    started = time.perf_counter()
+    buffer_pool = storage_engine.buffer_pool
+    file_manager = storage_engine.file_manager
+    record_size = storage_engine._calculate_record_size(schema)
+
+    # 先把该表在缓冲池中的脏页写回，保证磁盘上的页是最新的
+    buffer_pool.flush_table(table_name)
+    page_count = file_manager.get_page_count(table_name)
+
+    total = 0
+    with open(file_path, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, record_size, page_count))
+        buffers = [bytearray(PAGE_SIZE) for _ in range(storage_engine.readahead_pages)]
+        for start_page in range(0, page_count, len(buffers)):
+            batch = buffers[:min(len(buffers), page_count - start_page)]
+            pages_read = file_manager.read_pages_into(table_name, start_page, batch)
+            for buffer in batch[:pages_read]:
+                total += struct.unpack_from('>i', buffer, 0)[0]
+                f.write(buffer)
+    return _throughput(total, started)
+
+
+def copy_from_binary(storage_engine, table_name: str, schema: Schema, file_path: str) -> Dict[str, Any]:
+    """
+    导入二进制页转储：整页追加到表文件末尾；版本化表的记录改写为由本次导入创建，
+    全部页写入后才发布。中途失败时版本化表撤销已追加的版本，普通表截掉已追加的页
+    """
+    started = time.perf_counter()
+    file_manager = storage_engine.file_manager
+    versions = storage_engine.versions
+    xid = versions.allocate() if schema.versioned else 0
+    first_page_id = file_manager.get_page_count(table_name)
+    try:
+        total = _copy_from_binary(storage_engine, table_name, schema, file_path, xid)
+        if xid:
+            versions.publish(xid)
+    except BaseException:
+        if xid:
+            storage_engine.abort_xid(table_name, schema, xid, start_page=first_page_id)
+        else:
+            storage_engine.drop_tail_pages(table_name, first_page_id, file_manager.get_page_count(table_name))
+        raise
+    finally:
+        storage_engine.bump_table_version(table_name)
+    return _throughput(total, started)
+
+
+def _copy_from_binary(storage_engine, table_name: str, schema: Schema, file_path: str, xid: int) -> int:
+    """逐批读取转储文件中的页并追加到表中，返回导入的记录数"""
+    file_manager = storage_engine.file_manager
+    record_size = storage_engine._calculate_record_size(schema)
+    total = 0
+    with open(file_path, 'rb') as f:
+        magic, version, dump_record_size, page_count = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"不是有效的页转储文件: {file_path}")
+        if dump_record_size != record_size:
+            raise ValueError(f"记录大小不匹配: 转储文件为 {dump_record_size} 字节，表 {table_name} 为 {record_size} 字节")
+
+        batch_pages = storage_engine.readahead_pages
+        for start in range(0, page_count, batch_pages):
+            count = min(batch_pages, page_count - start)
+            data = f.read(count * PAGE_SIZE)
+            if len(data) != count * PAGE_SIZE:
+                raise ValueError(f"页转储文件不完整: {file_path}")
+            if xid:
+                pages = [bytearray(data[i * PAGE_SIZE:(i + 1) * PAGE_SIZE]) for i in range(count)]
+                total += sum(stamp_page(page, record_size, xid) for page in pages)
+            else:
+                pages = [data[i * PAGE_SIZE:(i + 1) * PAGE_SIZE] for i in range(count)]
+                total += sum(struct.unpack_from('>i', page, 0)[0] for page in pages)
+
+            first_page_id = file_manager.allocate_pages(table_name, count)
+            if first_page_id == -1:
+                raise IOError(f"无法为表 {table_name} 分配新页")
+            if not file_manager.write_pages(table_name, first_page_id, pages):
+                raise IOError(f"无法写入表 {table_name} 的新页")
+            storage_engine.record_raw_pages(table_name, schema, first_page_id, pages)
+    return total
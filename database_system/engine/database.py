@@ -0,0 +1,219 @@
+"""
+数据库实例：统一组装文件管理、缓冲池、目录、存储引擎、执行器和SQL编译器
+"""
+import contextlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from storage.file_manager import FileManager, DataDirectoryLock
+from storage.buffer import BufferPool
+from storage.latch import ReadWriteLatch
+from sql_compiler.planner import QueryPlan
+from sql_compiler.prepared import StatementCompiler, Params
+from utils.config import load_config
+from .catalog_manager import DBCatalogManager
+from .storage_engine import StorageEngine
+from .executer import Executor
+from .transaction import Transaction, TransactionManager, SerializationError
+from .vacuum import AutoVacuum
+from .parallel_scan import ParallelScanner
+from .result_cache import ResultCache
+from .materialized_view import ViewMaintainer
+from . import vectorized
+
+
+class Database:
+    """一个数据目录对应的全部引擎组件"""
+
+    # 同一进程内按数据目录共享实例，避免多个缓冲池同时写同一批文件
+    _instances: Dict[str, 'Database'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or load_config()
+        self.data_dir = self.config['data_dir']
+        # 创建者持有第一个引用
+        self.ref_count = 1
+        self.closed = False
+        # 语句级读写锁：查询可以并发执行，修改数据或模式的语句独占执行
+        self.lock = ReadWriteLatch()
+        # 编译器（解析器状态、计划缓存）不是线程安全的
+        self.compile_lock = threading.Lock()
+
+        # 创建数据目录并加进程锁
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.dir_lock = DataDirectoryLock(self.data_dir)
+        self.dir_lock.acquire()
+
+        # 初始化各组件
+        self.file_manager = FileManager(self.data_dir)
+        self.buffer_pool = BufferPool.from_memory_budget(
+            self.config['buffer_pool_size'], self.file_manager,
+            wait_timeout=self.config['buffer_pool_timeout'],
+            table_quota=self.config['table_quota'])
+        self.catalog_manager = DBCatalogManager(self.data_dir)
+        for physical in self.catalog_manager.physical_schemas().values():
+            if physical.engine == 'memory':
+                # 内存表的数据不落盘，重新打开后为空表
+                self.file_manager.create_file(physical.table_name, memory=True)
+            elif physical.tablespace:
+                # 表空间中的表：登记其文件所在的目录
+                self.file_manager.set_table_directory(
+                    physical.table_name, self.catalog_manager.tablespace_location(physical.tablespace))
+        self.storage_engine = StorageEngine(self.buffer_pool, self.file_manager)
+        self.executor = Executor(self.storage_engine, self.catalog_manager)
+        self.transaction_manager = TransactionManager(self.storage_engine, self.config['lock_timeout'])
+        self.executor.parallel_scanner = ParallelScanner(
+            self.storage_engine, self.config['parallel_scan_workers'], self.config['parallel_scan_min_pages'])
+        self.executor.vectorized_scan = self.config['vectorized_scan'] and vectorized.HAS_NUMPY
+        if self.config['result_cache_size'] > 0:
+            self.executor.result_cache = ResultCache(self.config['result_cache_size'])
+        self.executor.views = ViewMaintainer(self.executor)
+        self.transaction_manager.view_maintainer = self.executor.views
+
+        # SQL编译器（带执行计划缓存）
+        self.compiler = StatementCompiler(self.catalog_manager, self.config['plan_cache_size'])
+
+        # 后台增量清理旧版本
+        self.autovacuum = AutoVacuum(self, self.config['autovacuum_interval'],
+                                     self.config['autovacuum_pages'], self.config['autovacuum_threshold'])
+        self.autovacuum.start()
+
+    @classmethod
+    def open(cls, data_dir: Optional[str] = None, **options) -> 'Database':
+        """打开（或复用同一进程内已打开的）数据库实例"""
+        overrides = dict(options)
+        overrides['data_dir'] = data_dir
+        config = load_config(overrides.pop('config_file', None), overrides)
+        key = os.path.abspath(config['data_dir'])
+
+        with cls._instances_lock:
+            database = cls._instances.get(key)
+            if database is None:
+                database = cls(config)
+                cls._instances[key] = database
+            else:
+                database.ref_count += 1
+            return database
+
+    def acquire(self) -> 'Database':
+        """增加一个引用（如服务器为每个会话创建连接时）"""
+        with self._instances_lock:
+            self.ref_count += 1
+            return self
+
+    def release(self):
+        """释放一个引用，最后一个引用释放时刷盘并关闭"""
+        with self._instances_lock:
+            self.ref_count -= 1
+            if self.ref_count > 0:
+                return
+            self._instances.pop(os.path.abspath(self.data_dir), None)
+        self.close()
+
+    def compile(self, sql: str, params: Params = None) -> QueryPlan:
+        """编译SQL并绑定参数"""
+        with self.compile_lock:
+            return self.compiler.compile(sql, params)
+
+    def execute(self, sql: str, params: Params = None,
+                txn: Optional[Transaction] = None) -> Tuple[QueryPlan, Any]:
+        """编译并执行一条SQL语句，返回 (执行计划, 结果)"""
+        plan = self.compile(sql, params)
+        return plan, self.execute_plan(plan, txn)
+
+    def execute_plan(self, plan: QueryPlan, txn: Optional[Transaction] = None, stream: bool = False) -> Any:
+        """
+        执行计划。先按语句类型加事务锁，再在语句闩锁内执行；
+        txn 为 None 时为自动提交，语句结束即释放锁。stream=True 时 SELECT 返回生成器。
+        """
+        implicit = txn is None
+        if implicit:
+            txn = self.transaction_manager.begin(implicit=True)
+        try:
+            self.transaction_manager.lock_for_plan(txn, plan)
+            exec_txn = None if implicit else txn
+            if plan.plan_type in ('DELETE', 'UPDATE') and plan.details['schema'].versioned:
+                return self._execute_row_write(plan, txn, implicit)
+            if plan.plan_type == 'SELECT':
+                if stream:
+                    return self.executor.iter_select(plan, exec_txn)
+                with self.read_latch(plan):
+                    return self.executor.execute(plan, exec_txn)
+            with self.lock.write():
+                return self.executor.execute(plan, exec_txn)
+        finally:
+            if implicit:
+                self.transaction_manager.release(txn)
+
+    def _execute_row_write(self, plan: QueryPlan, txn: Transaction, implicit: bool) -> int:
+        """
+        版本化表的 DELETE / UPDATE：在语句闩锁外按快照扫描目标行并加行锁（等待行锁时不阻塞其他语句），
+        再在闩锁内确认这些行仍是最新版本后执行。自动提交的语句遇到并发修改时重新扫描；
+        显式事务快照中的行已被其他事务修改时回滚事务并报串行化失败
+        """
+        table_name = plan.details['table_name']
+        schema = plan.details['schema']
+        versions = self.storage_engine.versions
+        while True:
+            snapshot = versions.acquire_snapshot() if implicit else self.executor.transaction_snapshot(txn)
+            try:
+                targets = self.executor.matching_rows(plan, snapshot, None if implicit else txn)
+                rids = [rid for rid, _ in targets]
+                self.transaction_manager.lock_rows(txn, table_name, rids)
+                with self.lock.write():
+                    if self.storage_engine.rows_current(table_name, schema, rids, snapshot):
+                        return self.executor.execute(plan, None if implicit else txn, targets)
+            finally:
+                if implicit:
+                    versions.release_snapshot(snapshot)
+            if not implicit:
+                self.transaction_manager.rollback(txn)
+                raise SerializationError(f"Could not serialize access to {table_name} due to concurrent update")
+
+    def read_latch(self, plan: QueryPlan):
+        """读取时需要持有的语句闩锁；版本化表按快照读，不需要与写者互斥"""
+        if getattr(plan.details.get('schema'), 'versioned', False):
+            return contextlib.nullcontext()
+        return self.lock.read()
+
+    def collect_garbage(self, table_name: Optional[str] = None) -> int:
+        """回收已不被任何快照引用的旧版本，返回回收的版本数"""
+        if table_name:
+            schema = self.catalog_manager.get_schema(table_name)
+            if schema is None:
+                raise ValueError(f"Table {table_name} does not exist")
+            schemas = schema.physical_schemas
+        else:
+            schemas = list(self.catalog_manager.physical_schemas().values())
+        # 分区表按分区回收
+        return sum(self.storage_engine.collect_garbage(schema.table_name, schema) for schema in schemas)
+
+    def begin(self) -> Transaction:
+        return self.transaction_manager.begin()
+
+    def commit(self, txn: Transaction) -> int:
+        """提交事务，返回写入的行数"""
+        with self.lock.write():
+            return self.transaction_manager.commit(txn)
+
+    def rollback(self, txn: Transaction):
+        self.transaction_manager.rollback(txn)
+
+    def flush(self):
+        """将所有脏页写回磁盘，并保存区域映射和 Bloom 过滤器"""
+        self.buffer_pool.flush_all()
+        self.storage_engine.save_page_summaries()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.autovacuum.stop()
+            self.executor.parallel_scanner.close()
+            self.flush()
+            # 内存表的数据随会话结束丢弃
+            self.file_manager.memory_tables.clear()
+        finally:
+            self.closed = True
+            self.dir_lock.release()
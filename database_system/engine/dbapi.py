@@ -0,0 +1,350 @@
+"""
+嵌入式 DB-API 2.0 (PEP 249) 接口
+
+    from engine import connect
+
+    conn = connect('data')
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM users WHERE id = ?", (1,))
+    row = cur.fetchone()
+
+连接默认自动提交；执行 BEGIN 或 conn.begin() 开启显式事务，
+以 commit()/rollback() 结束。autocommit=False 时第一条语句自动开启事务。
+"""
+import itertools
+from typing import Any, Iterator, List, Optional, Sequence
+from storage.buffer import BufferPoolExhaustedError
+from storage.file_manager import DataDirectoryLockedError
+from sql_compiler.planner import QueryPlan
+from sql_compiler.prepared import Params
+from .database import Database
+from .lock_manager import DeadlockError, LockTimeoutError
+from .transaction import Transaction, TransactionError, SerializationError, TRANSACTION_PLANS
+
+apilevel = '2.0'
+# 线程可以共享模块，但不能共享连接
+threadsafety = 1
+# 同时支持 ? 与 :name，默认为 qmark
+paramstyle = 'qmark'
+
+
+class Warning(Exception):
+    pass
+
+
+class Error(Exception):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class DataError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class InternalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
+
+
+class DBAPITypeObject:
+    def __init__(self, *values):
+        self.values = frozenset(values)
+
+    def __eq__(self, other):
+        return other in self.values
+
+    def __hash__(self):
+        return hash(self.values)
+
+
+STRING = DBAPITypeObject('VARCHAR', 'STRING')
+NUMBER = DBAPITypeObject('INT', 'FLOAT')
+BINARY = DBAPITypeObject()
+DATETIME = DBAPITypeObject()
+ROWID = DBAPITypeObject()
+
+
+def _translate_error(e: Exception) -> Error:
+    """把引擎内部异常转换为 DB-API 异常"""
+    if isinstance(e, Error):
+        return e
+    if isinstance(e, SyntaxError):
+        return ProgrammingError(str(e))
+    if isinstance(e, (BufferPoolExhaustedError, DataDirectoryLockedError, DeadlockError, LockTimeoutError)):
+        return OperationalError(str(e))
+    if isinstance(e, SerializationError):
+        return OperationalError(str(e))
+    if isinstance(e, TransactionError):
+        return ProgrammingError(str(e))
+    if isinstance(e, (ValueError, KeyError)):
+        return ProgrammingError(str(e))
+    if isinstance(e, (IOError, OSError)):
+        return OperationalError(str(e))
+    return DatabaseError(str(e))
+
+
+class Cursor:
+    """游标：SELECT 结果直接从执行器的生成器流式读取"""
+
+    def __init__(self, connection: 'Connection'):
+        self.connection = connection
+        self.arraysize = 1
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows: Optional[Iterator[List[Any]]] = None
+        self._latch_plan: Optional[QueryPlan] = None
+        self._closed = False
+
+    def _check_open(self):
+        if self._closed:
+            raise InterfaceError("Cursor is closed")
+        self.connection._check_open()
+
+    def _reset(self):
+        if self._rows is not None and hasattr(self._rows, 'close'):
+            self._rows.close()
+        self._rows = None
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, operation: str, parameters: Params = None) -> 'Cursor':
+        """执行一条SQL语句"""
+        self._check_open()
+        self._reset()
+        database = self.connection.database
+        try:
+            plan = database.compile(operation, parameters)
+            if plan.plan_type in TRANSACTION_PLANS:
+                self.connection._transaction_statement(plan.plan_type)
+            elif plan.plan_type == 'SELECT':
+                self._start_select(plan)
+            else:
+                result = database.execute_plan(plan, self.connection._current_transaction())
+                self.rowcount = result if isinstance(result, int) and not isinstance(result, bool) else -1
+                if isinstance(result, dict) and 'rows' in result:
+                    self.rowcount = result['rows']
+        except Exception as e:
+            raise _translate_error(e) from e
+        return self
+
+    def executemany(self, operation: str, seq_of_parameters: Sequence[Params]) -> 'Cursor':
+        """对每组参数执行同一条语句；INSERT 会合并为一次批量写入"""
+        self._check_open()
+        self._reset()
+        database = self.connection.database
+        try:
+            with database.compile_lock:
+                stmt = database.compiler.prepare(operation)
+            plans = [stmt.bind(params) for params in seq_of_parameters]
+            txn = self.connection._current_transaction()
+            if stmt.plan.plan_type == 'INSERT':
+                # 所有参数组合并为一条多行插入
+                rows = [row for plan in plans for row in plan.details['rows']]
+                details = dict(stmt.plan.details, rows=rows, values=rows[0] if rows else [])
+                self.rowcount = database.execute_plan(QueryPlan('INSERT', details), txn) if rows else 0
+            elif stmt.plan.plan_type in ('SELECT',) + TRANSACTION_PLANS:
+                raise ProgrammingError(f"executemany() cannot be used with {stmt.plan.plan_type}")
+            else:
+                self.rowcount = 0
+                for plan in plans:
+                    result = database.execute_plan(plan, txn)
+                    if isinstance(result, int) and not isinstance(result, bool):
+                        self.rowcount += result
+        except Exception as e:
+            raise _translate_error(e) from e
+        return self
+
+    def _start_select(self, plan: QueryPlan):
+        executor = self.connection.database.executor
+        self.description = tuple(
+            (col['name'], col['type'], None, col.get('length'), None, None, True)
+            for col in executor.result_columns(plan)
+        )
+        self._latch_plan = plan
+        self._rows = self.connection.database.execute_plan(
+            plan, self.connection._current_transaction(), stream=True)
+
+    def fetchone(self) -> Optional[tuple]:
+        self._check_open()
+        if self._rows is None:
+            raise ProgrammingError("No result set to fetch from")
+        try:
+            with self.connection.database.read_latch(self._latch_plan):
+                return tuple(next(self._rows))
+        except StopIteration:
+            return None
+        except Exception as e:
+            raise _translate_error(e) from e
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        size = self.arraysize if size is None else size
+        self._check_open()
+        if self._rows is None:
+            raise ProgrammingError("No result set to fetch from")
+        try:
+            with self.connection.database.read_latch(self._latch_plan):
+                return [tuple(row) for row in itertools.islice(self._rows, size)]
+        except Exception as e:
+            raise _translate_error(e) from e
+
+    def fetchall(self) -> List[tuple]:
+        rows = []
+        while True:
+            batch = self.fetchmany(max(self.arraysize, 1000))
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def setoutputsize(self, size, column=None):
+        pass
+
+    def close(self):
+        if not self._closed:
+            self._reset()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class Connection:
+    """数据库连接，同一进程内连接同一数据目录的连接共享引擎实例"""
+
+    Warning = Warning
+    Error = Error
+    InterfaceError = InterfaceError
+    DatabaseError = DatabaseError
+    DataError = DataError
+    OperationalError = OperationalError
+    IntegrityError = IntegrityError
+    InternalError = InternalError
+    ProgrammingError = ProgrammingError
+    NotSupportedError = NotSupportedError
+
+    def __init__(self, database: Database, autocommit: bool = True):
+        self.database = database
+        self.autocommit = autocommit
+        self.transaction: Optional[Transaction] = None
+        self._closed = False
+
+    def _check_open(self):
+        if self._closed:
+            raise InterfaceError("Connection is closed")
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.transaction is not None and self.transaction.is_active
+
+    def _current_transaction(self) -> Optional[Transaction]:
+        """当前语句所属的事务；None 表示自动提交"""
+        if self.transaction is not None and not self.transaction.is_active:
+            # 事务已被回滚（如被选为死锁牺牲者）
+            self.transaction = None
+        if self.transaction is None and not self.autocommit:
+            self.transaction = self.database.begin()
+        return self.transaction
+
+    def _transaction_statement(self, action: str):
+        if action == 'BEGIN':
+            self.begin()
+        elif action == 'COMMIT':
+            self.commit()
+        else:
+            self.rollback()
+
+    def begin(self):
+        """开启显式事务"""
+        self._check_open()
+        if self.in_transaction:
+            raise ProgrammingError("A transaction is already in progress")
+        self.transaction = self.database.begin()
+
+    def cursor(self) -> Cursor:
+        self._check_open()
+        return Cursor(self)
+
+    def execute(self, operation: str, parameters: Params = None) -> Cursor:
+        """非标准的便捷方法：创建游标并执行"""
+        return self.cursor().execute(operation, parameters)
+
+    def commit(self):
+        """提交：事务写集合批量写入并 fsync；自动提交模式下把已写入的数据持久化到磁盘"""
+        self._check_open()
+        txn, self.transaction = self.transaction, None
+        try:
+            if txn is not None and txn.is_active:
+                self.database.commit(txn)
+            else:
+                self.database.flush()
+        except Exception as e:
+            raise _translate_error(e) from e
+
+    def rollback(self):
+        """回滚：丢弃当前事务的全部写入"""
+        self._check_open()
+        txn, self.transaction = self.transaction, None
+        if txn is not None:
+            self.database.rollback(txn)
+
+    def close(self):
+        if not self._closed:
+            # 未提交的事务随连接关闭而回滚
+            if self.transaction is not None:
+                self.database.rollback(self.transaction)
+                self.transaction = None
+            self._closed = True
+            self.database.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+
+def connect(data_dir: str = 'data', autocommit: bool = True, **options) -> Connection:
+    """打开数据目录并返回连接；options 可覆盖配置项，如 buffer_pool_size='64MB'"""
+    try:
+        return Connection(Database.open(data_dir, **options), autocommit)
+    except Exception as e:
+        raise _translate_error(e) from e
@@ -0,0 +1,182 @@
+"""
+字典编码：声明了 dictionary 的 VARCHAR 列在记录中只存 4 字节编码，0 为 NULL，其余为字典下标 + 1。
+字典保存在数据目录下的 <表名>.dict，首次使用时加载并常驻内存；新值在写入记录前追加并保存，
+编码一经分配不再改变，因此已写入的记录总能还原。
+
+查询可以让字典列保持编码：该列在 WHERE 中只出现在与常量的 =、!=、<>、IN 比较里时，
+先把常量换成编码再逐行比较整数，只有满足条件、需要输出的记录才把编码还原为字符串。
+"""
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set
+from sql_compiler.catalog import Schema
+from sql_compiler.parser import BinaryOpExpr, ColumnRef, Constant, ValueList
+from .zone_map import stored_value
+
+DICTIONARY_SUFFIX = '.dict'
+
+# 可以改为比较编码的运算符
+_CODE_OPERATORS = ('=', '!=', '<>', 'IN')
+# 不在字典中的常量的编码，不等于任何记录的编码
+_MISSING_CODE = -1
+
+
+class TableDictionary:
+    """一张表的字典：values[列下标] 为按编码排列的取值"""
+
+    def __init__(self, path: Optional[str], values: Dict[int, List[str]]):
+        self.path = path
+        self.values = values
+        self.codes: Dict[int, Dict[str, int]] = {
+            col_index: {value: code for code, value in enumerate(col_values, 1)}
+            for col_index, col_values in values.items()}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[str], schema: Schema) -> 'TableDictionary':
+        """加载字典文件，文件不存在（或内存表没有文件，path 为 None）时为空字典"""
+        data = {}
+        if path is not None:
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                pass
+        return cls(path, {i: list(data.get(schema.columns[i]['name'], [])) for i in schema.dictionary_columns})
+
+    def _save(self, schema: Schema):
+        if self.path is None:
+            return
+        data = {schema.columns[i]['name']: col_values for i, col_values in self.values.items()}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def encode_rows(self, schema: Schema, rows: Sequence[Sequence[Any]]) -> List[List[Any]]:
+        """把各行字典列的取值换成编码（新值追加到字典并保存），返回新的行列表"""
+        encoded = [list(row) for row in rows]
+        added = False
+        for col_index, codes in self.codes.items():
+            col_def = schema.columns[col_index]
+            for row in encoded:
+                value = stored_value(row[col_index], col_def)
+                if value is None:
+                    row[col_index] = None
+                    continue
+                code = codes.get(value)
+                if code is None:
+                    with self._lock:
+                        code = codes.get(value)
+                        if code is None:
+                            self.values[col_index].append(value)
+                            code = codes[value] = len(self.values[col_index])
+                            added = True
+                row[col_index] = code
+        if added:
+            with self._lock:
+                self._save(schema)
+        return encoded
+
+    def lookup(self, col_index: int, value: Any) -> int:
+        """常量对应的编码；不在字典中（包括非字符串常量）时返回不会出现在记录中的编码"""
+        if not isinstance(value, str):
+            return _MISSING_CODE
+        return self.codes[col_index].get(value, _MISSING_CODE)
+
+
+
+class CodedScan(NamedTuple):
+    """
+    字典表的一次扫描：condition 为常量换成编码后的 WHERE 条件，codes 为保持编码扫描的列，
+    values 为各字典列的取值，output 为满足条件后需要还原为字符串的编码列
+    """
+    condition: Any
+    codes: List[int]
+    values: Dict[int, List[str]]
+    output: List[int]
+
+
+def coded_scan(dictionary: TableDictionary, schema: Schema, where_clause,
+               output_columns: Optional[Sequence[int]]) -> CodedScan:
+    """为一次扫描选择保持编码的列并改写条件；output_columns 为结果用到的列，None 表示全部列"""
+    codes = code_columns(where_clause, schema)
+    condition = encode_condition(where_clause, schema, codes, dictionary.lookup)
+    output = [i for i in sorted(codes) if output_columns is None or i in output_columns]
+    return CodedScan(condition, sorted(codes), dictionary.values, output)
+
+
+def string_columns(schema: Schema, codes: Sequence[int], columns: Optional[Sequence[int]]) -> List[int]:
+    """扫描时需要还原为字符串的字典列：不保持编码、且在用到的列 columns（None 为全部列）中"""
+    return [i for i in schema.dictionary_columns if i not in codes and (columns is None or i in columns)]
+
+
+def decode_codes(record: List[Any], values: Dict[int, Sequence[str]], col_indexes):
+    """把记录中 col_indexes 各列的编码原地还原为字符串"""
+    for col_index in col_indexes:
+        code = record[col_index]
+        if code is not None:
+            col_values = values[col_index]
+            record[col_index] = col_values[code - 1] if 0 < code <= len(col_values) else None
+
+
+def _comparisons(condition) -> List[BinaryOpExpr]:
+    """条件中的全部比较（展开 AND / OR）"""
+    if not isinstance(condition, BinaryOpExpr):
+        return []
+    if condition.op in ('AND', 'OR'):
+        return _comparisons(condition.left) + _comparisons(condition.right)
+    return [condition]
+
+
+def _coded_operand(comparison: BinaryOpExpr, schema: Schema):
+    """比较为 字典列 op 常量 的形式时返回 (列下标, 常量一侧)，否则为 None"""
+    column, constant = comparison.left, comparison.right
+    if isinstance(column, Constant) and comparison.op != 'IN':
+        column, constant = constant, column
+    if not isinstance(column, ColumnRef) or comparison.op not in _CODE_OPERATORS:
+        return None
+    if comparison.op == 'IN':
+        if not all(isinstance(item, Constant) for item in constant.items):
+            return None
+    elif not isinstance(constant, Constant):
+        return None
+    col_index = schema.get_column_index(column.name)
+    return (col_index, constant) if col_index in schema.dictionary_columns else None
+
+
+def code_columns(condition, schema: Schema) -> Set[int]:
+    """可以保持编码扫描的字典列：在条件中只出现在与常量的等值、不等或 IN 比较里"""
+    columns = set(schema.dictionary_columns)
+    for comparison in _comparisons(condition):
+        coded = _coded_operand(comparison, schema)
+        for operand in (comparison.left, comparison.right):
+            if isinstance(operand, ColumnRef):
+                col_index = schema.get_column_index(operand.name)
+                if coded is None or coded[0] != col_index:
+                    columns.discard(col_index)
+    return columns
+
+
+def encode_condition(condition, schema: Schema, columns: Set[int], lookup: Callable[[int, Any], int]):
+    """把条件中与 columns 中字典列比较的常量换成编码，返回新的条件"""
+    if not isinstance(condition, BinaryOpExpr):
+        return condition
+    if condition.op in ('AND', 'OR'):
+        return BinaryOpExpr(encode_condition(condition.left, schema, columns, lookup), condition.op,
+                            encode_condition(condition.right, schema, columns, lookup))
+    coded = _coded_operand(condition, schema)
+    if coded is None or coded[0] not in columns:
+        return condition
+    col_index, constant = coded
+
+    def encode(item: Constant) -> Constant:
+        # 与 NULL 比较仍为假
+        return item if item.value is None else Constant(lookup(col_index, item.value), 'NUMBER')
+
+    if condition.op == 'IN':
+        return BinaryOpExpr(condition.left, 'IN', ValueList([encode(item) for item in constant.items]))
+    if constant is condition.right:
+        return BinaryOpExpr(condition.left, condition.op, encode(constant))
+    return BinaryOpExpr(encode(constant), condition.op, condition.right)
@@ -0,0 +1,145 @@
+"""
+锁管理器：表级意向锁 + 行级共享/排他锁，等待图死锁检测
+"""
+import threading
+import time
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+# 锁模式
+IS = 'IS'
+IX = 'IX'
+S = 'S'
+SIX = 'SIX'
+X = 'X'
+
+# 兼容矩阵：COMPATIBLE[已持有][请求]
+COMPATIBLE = {
+    IS:  {IS: True,  IX: True,  S: True,  SIX: True,  X: False},
+    IX:  {IS: True,  IX: True,  S: False, SIX: False, X: False},
+    S:   {IS: True,  IX: False, S: True,  SIX: False, X: False},
+    SIX: {IS: True,  IX: False, S: False, SIX: False, X: False},
+    X:   {IS: False, IX: False, S: False, SIX: False, X: False},
+}
+
+# 锁升级：已持有 a 又请求 b 时实际需要的模式
+_STRENGTH = {IS: 0, IX: 1, S: 1, SIX: 2, X: 3}
+
+
+def combine_modes(held: str, requested: str) -> str:
+    if held == requested:
+        return held
+    if {held, requested} == {IX, S}:
+        return SIX
+    return held if _STRENGTH[held] >= _STRENGTH[requested] else requested
+
+
+def table_resource(table_name: str) -> Tuple:
+    return ('table', table_name)
+
+
+def row_resource(table_name: str, rid: int) -> Tuple:
+    return ('row', table_name, rid)
+
+
+class DeadlockError(Exception):
+    """等待锁会形成环，请求方事务被选为牺牲者"""
+    pass
+
+
+class LockTimeoutError(TimeoutError):
+    pass
+
+
+class LockManager:
+    """按资源维护持有者集合；所有状态由一把互斥锁保护，等待方在条件变量上等待"""
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.holders: Dict[Hashable, Dict[int, str]] = {}  # resource -> {txn_id: mode}
+        self.txn_locks: Dict[int, Set[Hashable]] = {}  # txn_id -> resources
+        self.waiting: Dict[int, Tuple[Hashable, str]] = {}  # txn_id -> (resource, mode)
+        self.deadlocks = 0
+        self._cond = threading.Condition()
+
+    def _conflicts(self, txn_id: int, resource: Hashable, mode: str) -> Set[int]:
+        """与请求模式冲突的其他持有者"""
+        return {other for other, held in self.holders.get(resource, {}).items()
+                if other != txn_id and not COMPATIBLE[held][mode]}
+
+    def _has_cycle(self, start: int) -> bool:
+        """从 start 出发沿等待图查找环"""
+        stack = [start]
+        visited = set()
+        while stack:
+            txn_id = stack.pop()
+            if txn_id in visited:
+                continue
+            visited.add(txn_id)
+            if txn_id not in self.waiting:
+                continue
+            resource, mode = self.waiting[txn_id]
+            for blocker in self._conflicts(txn_id, resource, mode):
+                if blocker == start:
+                    return True
+                stack.append(blocker)
+        return False
+
+    def acquire(self, txn_id: int, resource: Hashable, mode: str, timeout: Optional[float] = None):
+        """为事务获取锁（可重入，必要时升级），冲突时等待；检测到死锁或超时时抛出异常"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            held = self.holders.get(resource, {}).get(txn_id)
+            if held is not None:
+                mode = combine_modes(held, mode)
+                if mode == held:
+                    return
+
+            while self._conflicts(txn_id, resource, mode):
+                self.waiting[txn_id] = (resource, mode)
+                if self._has_cycle(txn_id):
+                    del self.waiting[txn_id]
+                    self.deadlocks += 1
+                    raise DeadlockError(f"Deadlock detected while waiting for {mode} lock on {resource}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    del self.waiting[txn_id]
+                    raise LockTimeoutError(f"Timed out waiting for {mode} lock on {resource}")
+                self._cond.wait(min(remaining, 0.1))
+            self.waiting.pop(txn_id, None)
+
+            self.holders.setdefault(resource, {})[txn_id] = mode
+            self.txn_locks.setdefault(txn_id, set()).add(resource)
+
+    def release(self, txn_id: int, resource: Hashable):
+        with self._cond:
+            self._release(txn_id, resource)
+            self.txn_locks.get(txn_id, set()).discard(resource)
+            self._cond.notify_all()
+
+    def release_all(self, txn_id: int):
+        """释放事务持有的全部锁（提交或回滚时）"""
+        with self._cond:
+            for resource in self.txn_locks.pop(txn_id, set()):
+                self._release(txn_id, resource)
+            self.waiting.pop(txn_id, None)
+            self._cond.notify_all()
+
+    def _release(self, txn_id: int, resource: Hashable):
+        holders = self.holders.get(resource)
+        if holders is not None:
+            holders.pop(txn_id, None)
+            if not holders:
+                del self.holders[resource]
+
+    def held_mode(self, txn_id: int, resource: Hashable) -> Optional[str]:
+        with self._cond:
+            return self.holders.get(resource, {}).get(txn_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'locked_resources': len(self.holders),
+                'waiting': len(self.waiting),
+                'deadlocks': self.deadlocks,
+            }
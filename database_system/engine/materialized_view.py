@@ -0,0 +1,207 @@
+"""
+物化视图：CREATE MATERIALIZED VIEW v AS SELECT ... [GROUP BY ...] 的结果保存为一张普通的版本化表，
+查询视图就是读这张（通常很小的）表。
+
+基表插入的行按增量规则合并进视图，不重新计算：
+  - 过滤：只有满足定义查询 WHERE 条件的行参与；
+  - 投影：没有聚合和分组的视图直接追加投影后的行；
+  - 聚合：按分组键累积插入行的 COUNT / SUM / MIN / MAX 部分状态，与视图中已有的分组行合并，
+    新出现的分组追加为新行（扫描的只是视图表本身）。
+删除、更新、TRUNCATE 和 COPY 导入无法按插入的行增量维护，对基表上的视图整体重新计算。
+视图的维护在基表写入可见之后进行，与基表的写入不在同一个事务中。
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sql_compiler.catalog import Schema
+from sql_compiler.parser import Parser, SelectStmt
+from sql_compiler.planner import QueryPlan
+from . import aggregate as agg
+from .executer import evaluate_condition
+from .zone_map import stored_value
+
+
+def read_back(value: Any, col_def: dict) -> Any:
+    """值写入表文件后再读出的结果（整数 0 与 NULL 一样存为全 0）"""
+    value = stored_value(value, col_def)
+    return None if col_def['type'] == 'INT' and value == 0 else value
+
+
+def view_columns(base: Schema, query: SelectStmt) -> List[dict]:
+    """视图表的列：选择的普通列（沿用基表的类型），其后是各聚合的结果列"""
+    names = [col['name'] for col in base.columns] if query.columns == ['*'] else query.columns
+    columns = [{'name': name, 'type': base.column_dict[name]['type'], 'length': base.column_dict[name].get('length')}
+               for name in names]
+    for func, column in query.aggregates:
+        if func in ('COUNT', 'SUM'):
+            col_type, length = 'INT', None
+        else:
+            col_type, length = base.column_dict[column]['type'], base.column_dict[column].get('length')
+        columns.append({'name': agg.aggregate_column_name((func, column)), 'type': col_type, 'length': length})
+    seen = set()
+    for col in columns:
+        if col['name'] in seen:
+            raise ValueError(f"Duplicate column in materialized view: {col['name']}")
+        seen.add(col['name'])
+    return columns
+
+
+def select_plan(query: SelectStmt, base: Schema) -> QueryPlan:
+    """定义查询的SELECT计划，用于首次填充和重新计算"""
+    return QueryPlan('SELECT', {
+        'table_name': query.table_name,
+        'columns': query.columns,
+        'where_clause': query.where_clause,
+        'aggregates': query.aggregates,
+        'group_by': query.group_by,
+        'schema': base,
+    })
+
+
+class MaterializedView:
+    """解析后的视图定义，以及增量维护用到的列下标"""
+
+    def __init__(self, schema: Schema, base: Schema, query: SelectStmt):
+        self.schema = schema
+        self.base = base
+        self.query = query
+        self.where_clause = query.where_clause
+        self.aggregates = query.aggregates
+        self.grouped = bool(query.aggregates or query.group_by)
+        names = [col['name'] for col in base.columns] if query.columns == ['*'] else query.columns
+        # 选择的普通列在基表中的下标
+        self.column_indexes = [base.get_column_index(name) for name in names]
+        self.agg_indexes = agg.aggregate_indexes(query.aggregates, base)
+        # 分组列在基表记录和视图记录中的位置
+        self.group_indexes = [base.get_column_index(name) for name in query.group_by]
+        self.key_positions = [names.index(name) for name in query.group_by]
+        self.plain_count = len(names)
+
+    def matching(self, rows: Sequence[Sequence[Any]]) -> List[List[Any]]:
+        """插入的行中满足定义查询条件的行（先换成写入后读出的值，与扫描看到的一致）"""
+        columns = self.base.columns
+        result = []
+        for row in rows:
+            record = [read_back(value, col) for value, col in zip(row, columns)]
+            if self.where_clause is None or evaluate_condition(self.where_clause, record, self.base):
+                result.append(record)
+        return result
+
+    def group_deltas(self, records: Sequence[Sequence[Any]]) -> Dict[tuple, List[Any]]:
+        """按分组键累积插入行的部分聚合状态"""
+        deltas: Dict[tuple, List[Any]] = {}
+        for record in records:
+            key = tuple(record[i] for i in self.group_indexes)
+            states = deltas.get(key)
+            if states is None:
+                states = deltas[key] = agg.init_states(self.aggregates)
+            agg.accumulate(states, self.aggregates, self.agg_indexes, record)
+        return deltas
+
+    def view_states(self, record: Sequence[Any]) -> List[Any]:
+        """视图记录中的聚合状态；COUNT 为 0 时读出为 NULL"""
+        states = list(record[self.plain_count:])
+        for i, (func, _) in enumerate(self.aggregates):
+            if func == 'COUNT' and states[i] is None:
+                states[i] = 0
+        return states
+
+    def new_row(self, key: tuple, states: List[Any]) -> List[Any]:
+        """新分组的视图记录：普通列的值取自分组键"""
+        values: List[Any] = [None] * self.plain_count
+        for position, value in zip(self.key_positions, key):
+            values[position] = value
+        return values + agg.finalize(states, self.aggregates)
+
+
+class ViewMaintainer:
+    """维护定义在各基表上的物化视图"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.storage_engine = executor.storage_engine
+        self.catalog_manager = executor.catalog_manager
+        # 视图名 -> (解析时的目录版本, 视图定义)
+        self._definitions: Dict[str, Tuple[int, MaterializedView]] = {}
+        # 同一时刻只有一个写入在合并视图
+        self._lock = threading.RLock()
+
+    def definition(self, schema: Schema) -> MaterializedView:
+        """解析视图定义（按目录版本缓存）"""
+        version = self.catalog_manager.version
+        cached = self._definitions.get(schema.table_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        query = Parser(self.catalog_manager).parse(schema.view['query'])
+        view = MaterializedView(schema, self.catalog_manager.get_schema(schema.view['base']), query)
+        self._definitions[schema.table_name] = (version, view)
+        return view
+
+    def create(self, view_name: str, query: SelectStmt, query_sql: str) -> int:
+        """创建视图表并用定义查询填充，返回视图的行数"""
+        base = self.catalog_manager.get_schema(query.table_name)
+        columns = view_columns(base, query)
+        # 视图与基表使用同一存储引擎：内存基表重新打开后为空，其上的视图也应为空
+        schema = self.catalog_manager.create_table(view_name, columns, versioned=True,
+                                                   view={'base': query.table_name, 'query': query_sql},
+                                                   engine=base.engine)
+        self.storage_engine.create_table(view_name, schema)
+        with self._lock:
+            return self._populate(schema, query, base)
+
+    def _populate(self, schema: Schema, query: SelectStmt, base: Schema) -> int:
+        rows = list(self.executor.iter_select(select_plan(query, base)))
+        return self.storage_engine.bulk_insert(schema.table_name, schema, rows) if rows else 0
+
+    def rows_inserted(self, table_name: str, rows: Sequence[Sequence[Any]]):
+        """基表插入了 rows（已对新查询可见），把增量合并进其上的视图"""
+        views = self.catalog_manager.views_of(table_name)
+        if not views or not rows:
+            return
+        with self._lock:
+            for schema in views:
+                self._apply_inserts(self.definition(schema), rows)
+
+    def _apply_inserts(self, view: MaterializedView, rows: Sequence[Sequence[Any]]):
+        records = view.matching(rows)
+        if not records:
+            return
+        view_name = view.schema.table_name
+        if not view.grouped:
+            self.storage_engine.bulk_insert(view_name, view.schema,
+                                            [[record[i] for i in view.column_indexes] for record in records])
+            return
+
+        deltas = view.group_deltas(records)
+        updates = []
+        for rid, record in self.storage_engine.scan_with_rids(view_name, view.schema):
+            key = tuple(record[p] for p in view.key_positions)
+            delta = deltas.pop(key, None)
+            if delta is None:
+                continue
+            if view.aggregates:
+                states = view.view_states(record)
+                agg.merge_states(states, view.aggregates, delta)
+                updates.append((rid, list(record[:view.plain_count]) + agg.finalize(states, view.aggregates)))
+            if not deltas:
+                break
+        if updates:
+            self.storage_engine.update_records(view_name, view.schema, updates)
+        if deltas:
+            self.storage_engine.bulk_insert(view_name, view.schema,
+                                            [view.new_row(key, states) for key, states in deltas.items()])
+
+    def table_changed(self, table_name: str):
+        """基表发生了无法增量维护的修改（删除、更新、清空、导入），重新计算其上的视图"""
+        views = self.catalog_manager.views_of(table_name)
+        if not views:
+            return
+        with self._lock:
+            for schema in views:
+                self.refresh(schema)
+
+    def refresh(self, schema: Schema):
+        """清空视图表并重新计算"""
+        view = self.definition(schema)
+        with self._lock:
+            self.storage_engine.truncate_table(schema.table_name)
+            self._populate(schema, view.query, view.base)
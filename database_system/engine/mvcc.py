@@ -0,0 +1,131 @@
+"""
+多版本并发控制：记录版本头、事务号分配与快照可见性
+
+版本化表的每条记录前有 8 字节版本头 [xmin(4B), xmax(4B)]：
+  xmin  创建该版本的事务号，0 表示空闲槽位
+  xmax  删除该版本的事务号，0 表示未删除
+写入只在提交时落盘，因此事务号在提交时分配，按提交顺序递增；
+快照即获取时已提交的最大事务号，版本可见当且仅当 xmin <= 快照 且 (xmax == 0 或 xmax > 快照)。
+"""
+import os
+import struct
+import threading
+from collections import Counter
+from typing import Optional
+
+VERSION_HEADER = struct.Struct('>II')
+VERSION_HEADER_SIZE = VERSION_HEADER.size
+# 事务号按块预留并持久化，每分配这么多个事务号才写一次文件
+XID_BLOCK_SIZE = 1000
+XID_FILE_NAME = 'xid'
+
+
+def stamp_page(page_data: bytearray, record_size: int, xid: int) -> int:
+    """
+    将页内的存活版本改写为由 xid 创建（用于导入其他数据库导出的页），
+    已删除的版本清为空闲槽位，返回存活的版本数
+    """
+    num_records = struct.unpack_from('>i', page_data, 0)[0]
+    empty_slot = bytes(record_size)
+    live = 0
+    for record_id in range(num_records):
+        offset = 8 + record_id * record_size
+        xmin, xmax = VERSION_HEADER.unpack_from(page_data, offset)
+        if xmin and not xmax:
+            VERSION_HEADER.pack_into(page_data, offset, xid, 0)
+            live += 1
+        else:
+            page_data[offset:offset + record_size] = empty_slot
+    return live
+
+
+class Snapshot:
+    """一致性读快照"""
+
+    __slots__ = ('xid',)
+
+    def __init__(self, xid: int):
+        self.xid = xid
+
+    def is_visible(self, xmin: int, xmax: int) -> bool:
+        return 0 < xmin <= self.xid and (xmax == 0 or xmax > self.xid)
+
+    def __repr__(self):
+        return f"Snapshot({self.xid})"
+
+
+class VersionClock:
+    """分配提交事务号并登记活跃快照；事务号块的上界持久化在数据目录的 xid 文件中"""
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, XID_FILE_NAME)
+        reserved = 1
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = f.read(4)
+            if len(data) == 4:
+                reserved = max(1, struct.unpack('>I', data)[0])
+        # 重启后从上次预留块的上界继续，磁盘上已有的版本全部可见
+        self.next_xid = reserved
+        self.reserved = reserved
+        self.committed = reserved - 1
+        self.snapshots: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _persist(self, reserved: int):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack('>I', reserved))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def allocate(self) -> int:
+        """分配一个提交事务号"""
+        with self._lock:
+            if self.next_xid >= self.reserved:
+                self.reserved = self.next_xid + XID_BLOCK_SIZE
+                self._persist(self.reserved)
+            xid = self.next_xid
+            self.next_xid += 1
+            return xid
+
+    def publish(self, xid: int):
+        """事务号对应的版本已全部写入，对之后获取的快照可见"""
+        with self._lock:
+            self.committed = max(self.committed, xid)
+
+    def acquire_snapshot(self) -> Snapshot:
+        with self._lock:
+            snapshot = Snapshot(self.committed)
+            self.snapshots[snapshot.xid] += 1
+            return snapshot
+
+    def release_snapshot(self, snapshot: Optional[Snapshot]):
+        if snapshot is None:
+            return
+        with self._lock:
+            self.snapshots[snapshot.xid] -= 1
+            if self.snapshots[snapshot.xid] <= 0:
+                del self.snapshots[snapshot.xid]
+
+    def run_if_idle(self, action) -> bool:
+        """没有活跃快照时执行 action（期间不能获取新快照），返回是否执行"""
+        with self._lock:
+            if self.snapshots:
+                return False
+            action()
+            return True
+
+    def oldest_snapshot(self) -> int:
+        """仍可能被读取的最老快照；xmax 不大于它的旧版本可以回收"""
+        with self._lock:
+            return min(self.snapshots) if self.snapshots else self.committed
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'next_xid': self.next_xid,
+                'committed_xid': self.committed,
+                'active_snapshots': sum(self.snapshots.values()),
+            }
@@ -0,0 +1,177 @@
+"""
+并行顺序扫描：把表的页范围切分成若干块，交给进程池中的工作进程，
+由工作进程自行读取表文件并完成解码、过滤、投影或部分聚合，主进程按块的顺序收集结果
+"""
+import os
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, List, Optional, Sequence
+from sql_compiler.catalog import Schema
+from storage.scan import page_runs
+from storage.compression import PageMap, page_map_path, read_page_run
+from utils.constants import PAGE_SIZE, READAHEAD_PAGES
+from .mvcc import Snapshot, VERSION_HEADER
+from .storage_engine import deserialize_record, decode_columns, page_layout
+from .executer import evaluate_condition, scan_columns
+from .dictionary import CodedScan, decode_codes, string_columns
+from . import aggregate as agg
+
+# 每个工作进程任务至少包含的页数，避免任务调度开销超过扫描本身
+MIN_CHUNK_PAGES = 64
+
+
+def scan_chunk(file_path: str, schema: Schema, start_page: int, end_page: int,
+               snapshot_xid: Optional[int], where_clause, col_indexes: Optional[List[int]],
+               aggregates: Sequence[agg.Aggregate], coded: Optional[CodedScan] = None) -> Any:
+    """
+    扫描表文件的 [start_page, end_page) 页（在工作进程中执行）。
+    有聚合时返回部分聚合状态，否则返回过滤、投影后的行；
+    字典表按 coded 比较编码，只为满足条件的记录还原结果用到的编码列
+    """
+    layout = page_layout(schema)
+    snapshot = Snapshot(snapshot_xid) if schema.versioned else None
+    if aggregates:
+        states = agg.init_states(aggregates)
+        agg_indexes = agg.aggregate_indexes(aggregates, schema)
+    columns = scan_columns(schema, col_indexes, where_clause, aggregates)
+    strings = []
+    if coded is not None:
+        strings = string_columns(schema, coded.codes, columns)
+        where_clause = coded.condition
+    rows = []
+
+    def records(data: bytes, page_offset: int) -> Iterator[List[Any]]:
+        if layout.columnar:
+            # 列式页只解码用到的列
+            page_data = memoryview(data)[page_offset:page_offset + PAGE_SIZE]
+            for _, record in decode_columns(schema, layout, page_data, snapshot, columns):
+                yield record
+            return
+        num_records = min(struct.unpack_from('>i', data, page_offset)[0], layout.capacity)
+        for record_id in range(num_records):
+            offset = page_offset + 8 + record_id * layout.record_size
+            if snapshot is not None and not snapshot.is_visible(*VERSION_HEADER.unpack_from(data, offset)):
+                continue
+            yield deserialize_record(schema, data[offset:offset + layout.record_size])
+
+    # 压缩表的页由工作进程自行解压
+    page_map = PageMap.load(page_map_path(file_path))
+    with open(file_path, 'rb') as f:
+        for batch_start in range(start_page, end_page, READAHEAD_PAGES):
+            batch_pages = min(READAHEAD_PAGES, end_page - batch_start)
+            data = read_page_run(f, page_map, batch_start, batch_pages)
+            for page_offset in range(0, len(data) - PAGE_SIZE + 1, PAGE_SIZE):
+                for record in records(data, page_offset):
+                    if strings:
+                        decode_codes(record, coded.values, strings)
+                    if where_clause is not None and not evaluate_condition(where_clause, record, schema):
+                        continue
+                    if coded is not None:
+                        decode_codes(record, coded.values, coded.output)
+                    if aggregates:
+                        agg.accumulate(states, aggregates, agg_indexes, record)
+                    elif col_indexes is None:
+                        rows.append(record)
+                    else:
+                        rows.append([record[i] for i in col_indexes])
+
+    return states if aggregates else rows
+
+
+class ParallelScanner:
+    """按需创建的进程池；表的页数达到 min_pages 时查询改用并行扫描"""
+
+    def __init__(self, storage_engine, workers: int = 0, min_pages: int = 1024):
+        self.storage_engine = storage_engine
+        self.workers = workers or os.cpu_count() or 1
+        self.min_pages = min_pages
+        self.scans = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def should_parallelize(self, table_name: str) -> bool:
+        # 工作进程直接读表文件，内存表只能在本进程中扫描
+        file_manager = self.storage_engine.file_manager
+        return (self.workers > 1 and self.min_pages > 0 and not file_manager.is_memory(table_name)
+                and file_manager.get_page_count(table_name) >= self.min_pages)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _submit_chunks(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot],
+                       where_clause, col_indexes, aggregates,
+                       coded: Optional[CodedScan] = None) -> Iterator[Any]:
+        """按页范围提交任务并按提交顺序产出结果，同时在途的任务数有上限，内存占用有界"""
+        # 工作进程直接读文件，先把缓冲池中的脏页写回
+        self.storage_engine.buffer_pool.flush_table(table_name)
+        page_count = self.storage_engine.file_manager.get_page_count(table_name)
+        # 区域映射排除的页不分配给工作进程
+        page_ids = self.storage_engine.candidate_pages(table_name, schema, where_clause, page_count)
+        if page_ids is None:
+            page_ids = range(page_count)
+        chunk_pages = max(MIN_CHUNK_PAGES, -(-len(page_ids) // (self.workers * 4)))
+        file_path = self.storage_engine.file_manager.get_file_path(table_name)
+        snapshot_xid = snapshot.xid if snapshot is not None else None
+        if coded is not None:
+            # 快照之前提交的记录用到的编码都已在字典中，复制一份交给工作进程
+            coded = coded._replace(values={i: list(values) for i, values in coded.values.items()})
+
+        pool = self._get_pool()
+        self.scans += 1
+        pending = deque()
+        try:
+            for start, count in page_runs(page_ids, chunk_pages):
+                pending.append(pool.submit(scan_chunk, file_path, schema, start, start + count,
+                                           snapshot_xid, where_clause, col_indexes, aggregates, coded))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _acquire_snapshot(self, schema: Schema, snapshot: Optional[Snapshot]):
+        """版本化表未指定快照时，为整个并行扫描获取一个快照，返回 (快照, 是否需要释放)"""
+        if schema.versioned and snapshot is None:
+            return self.storage_engine.versions.acquire_snapshot(), True
+        return snapshot, False
+
+    def scan(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot], where_clause,
+             col_indexes: Optional[List[int]], coded: Optional[CodedScan] = None) -> Iterator[List[Any]]:
+        """并行扫描，按表中的物理顺序产出过滤、投影后的行"""
+        snapshot, own_snapshot = self._acquire_snapshot(schema, snapshot)
+        try:
+            for rows in self._submit_chunks(table_name, schema, snapshot, where_clause, col_indexes, [], coded):
+                yield from rows
+        finally:
+            if own_snapshot:
+                self.storage_engine.versions.release_snapshot(snapshot)
+
+    def aggregate(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot], where_clause,
+                  aggregates: Sequence[agg.Aggregate], coded: Optional[CodedScan] = None) -> List[Any]:
+        """并行部分聚合，返回合并后的聚合状态"""
+        states = agg.init_states(aggregates)
+        snapshot, own_snapshot = self._acquire_snapshot(schema, snapshot)
+        try:
+            for partial in self._submit_chunks(table_name, schema, snapshot, where_clause, None, aggregates,
+                                               coded):
+                agg.merge_states(states, aggregates, partial)
+        finally:
+            if own_snapshot:
+                self.storage_engine.versions.release_snapshot(snapshot)
+        return states
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def get_stats(self) -> dict:
+        return {'workers': self.workers, 'min_pages': self.min_pages, 'scans': self.scans}
@@ -0,0 +1,106 @@
+"""
+查询结果缓存：按 (规范化的查询计划, 表版本号) 缓存自动提交 SELECT 的结果，按估算的内存占用做 LRU 淘汰。
+
+存储引擎在表的数据变化并对新查询可见之后递增表版本号，命中的缓存项一定是当前数据上的结果；
+旧版本的缓存项不再被命中，随 LRU 淘汰。显式事务中的查询依赖事务快照和未提交的行，不使用缓存。
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from sql_compiler.planner import QueryPlan
+from sql_compiler.parser import BinaryOpExpr, ColumnRef, Constant, ValueList
+
+# 每行、每个值的固定开销（元组与对象头）的估算
+_ROW_OVERHEAD = sys.getsizeof(()) + 8
+_VALUE_OVERHEAD = 8
+
+
+def expression_key(expr) -> Hashable:
+    """把条件表达式转换为可哈希的键，结构相同的条件得到相同的键"""
+    if expr is None:
+        return None
+    if isinstance(expr, BinaryOpExpr):
+        return (expr.op, expression_key(expr.left), expression_key(expr.right))
+    if isinstance(expr, ColumnRef):
+        return ('col', expr.name)
+    if isinstance(expr, Constant):
+        # 区分 1 与 '1'、1 与 1.0
+        return ('const', type(expr.value).__name__, expr.value)
+    if isinstance(expr, ValueList):
+        return ('list',) + tuple(expression_key(item) for item in expr.items)
+    raise ValueError(f"Unsupported expression: {expr}")
+
+
+def plan_key(plan: QueryPlan) -> Tuple:
+    """SELECT 计划的规范化键（不含表版本号）"""
+    details = plan.details
+    aggregates = details.get('aggregates') or ()
+    return (details['table_name'], tuple(details['columns']), expression_key(details['where_clause']),
+            tuple(tuple(aggregate) for aggregate in aggregates), tuple(details.get('group_by') or ()))
+
+
+def estimate_size(rows: List[Tuple[Any, ...]]) -> int:
+    """结果集占用内存的估算（字节）"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += _ROW_OVERHEAD
+        for value in row:
+            size += _VALUE_OVERHEAD + (len(value) + 49 if isinstance(value, str) else 28)
+    return size
+
+
+class ResultCache:
+    """按内存预算淘汰的 LRU 结果缓存"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[Tuple, Tuple[List[Tuple[Any, ...]], int]]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[List[Tuple[Any, ...]]]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, rows: List[Tuple[Any, ...]]):
+        """缓存结果；超过整个预算的结果不缓存"""
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (rows, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / total if total else 0.0
+        }
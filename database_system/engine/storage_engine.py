@@ -1,107 +1,932 @@
-from typing import List, Optional, Any, Iterator
+import itertools
+import os
+import struct
+import threading
+from collections import Counter
+from typing import List, Optional, Any, Iterator, Dict, Sequence, Set, Tuple
 from storage.buffer import BufferPool
 from storage.file_manager import FileManager
+from storage.scan import RingScan
+from storage.page import Page
+from storage.layout import RowLayout, PaxLayout
 from sql_compiler.catalog import Schema
+from sql_compiler.partition import partition_index
 from utils.helpers import *
+from utils.constants import PAGE_SIZE, RING_SCAN_THRESHOLD, READAHEAD_PAGES, BLOOM_RANGE_PAGES, PARTITION_RID_SHIFT
+from .mvcc import VersionClock, Snapshot, VERSION_HEADER, VERSION_HEADER_SIZE
+from . import vectorized
+from .zone_map import PageSummary, ZoneMap, ZONE_MAP_SUFFIX, stored_value
+from .bloom import BloomIndex, BLOOM_SUFFIX
+from .dictionary import TableDictionary, DICTIONARY_SUFFIX, decode_codes, string_columns
 
 
 class StorageEngine:
     def __init__(self, buffer_pool: BufferPool, file_manager: FileManager):
         self.buffer_pool = buffer_pool
         self.file_manager = file_manager
+        # 超过该比例缓冲池容量的表使用环形缓冲区 + 预读扫描
+        self.ring_scan_threshold = RING_SCAN_THRESHOLD
+        self.readahead_pages = READAHEAD_PAGES
+        # 版本化表的事务号分配与快照
+        self.versions = VersionClock(file_manager.data_dir)
+        # 空闲空间映射：表 -> 有空闲槽位或尾部空间的页（删除、回收后登记，插入时优先复用）
+        self.free_pages: Dict[str, Set[int]] = {}
+        # 各表尚未回收的旧版本数，供后台 VACUUM 判断是否需要清理
+        self.dead_versions: Counter = Counter()
+        self._fsm_lock = threading.Lock()
+        # 区域映射：表 -> 每页各列的最小/最大值，首次使用时加载或重建
+        self.zone_maps: Dict[str, ZoneMap] = {}
+        # Bloom 过滤器：表 -> 声明了 bloom_filter 的列每个页区间的过滤器
+        self.bloom_indexes: Dict[str, BloomIndex] = {}
+        # 扫描时由区域映射和 Bloom 过滤器跳过的页数
+        self.skipped_pages = 0
+        # 表的数据版本号：数据变化并对新查询可见后取全局递增的新值（删除重建的表也不会重复），供结果缓存失效
+        self.table_versions: Dict[str, int] = {}
+        self._version_counter = itertools.count(1)
+        self._zone_lock = threading.Lock()
+        # 字典编码列的字典：表 -> TableDictionary，首次使用时加载
+        self.dictionaries: Dict[str, TableDictionary] = {}
 
-    def create_table(self, table_name: str, schema: Schema) -> bool:
-        """创建新表文件"""
-        return self.file_manager.create_file(table_name)
+    def create_table(self, table_name: str, schema: Schema, directory: Optional[str] = None) -> bool:
+        """
+        创建新表文件（声明了 compression 的表按页压缩存储，分区表每个分区一个文件）；
+        directory 为表空间的目录，表的全部文件都放在其中，None 表示数据目录
+        """
+        self.bump_table_version(table_name)
+        if schema.partition:
+            return all([self.create_table(partition.table_name, partition, directory)
+                        for partition in schema.partitions])
+        self.file_manager.set_table_directory(table_name, directory)
+        return self.file_manager.create_file(table_name, compression=schema.compression,
+                                             memory=schema.engine == 'memory')
 
-    def drop_table(self, table_name: str) -> bool:
-        """删除表文件"""
+    def drop_table(self, table_name: str, schema: Optional[Schema] = None) -> bool:
+        """删除表文件（给出分区表的 schema 时删除全部分区的文件）"""
+        if schema is not None and schema.partition:
+            try:
+                return all([self.drop_table(partition.table_name) for partition in schema.partitions])
+            finally:
+                self.bump_table_version(table_name)
         try:
-            # 从缓冲池中移除所有相关页面
-            self._remove_table_pages_from_buffer(table_name)
+            # 缓冲的页直接丢弃，不写回即将删除的文件
+            self._discard_table_state(table_name)
 
             # 删除表文件
             return self.file_manager.delete_file(table_name)
         except Exception as e:
             print(f"❌ 删除表文件失败: {e}")
             return False
+        finally:
+            self.bump_table_version(table_name)
 
-    def _remove_table_pages_from_buffer(self, table_name: str):
-                """从缓冲池中移除指定表的所有页面"""
-                # 收集要移除的键
-                keys_to_remove = []
-                for key in list(self.buffer_pool.pages.keys()):
-                    if key[0] == table_name:
-                        keys_to_remove.append(key)
-
-                # 移除页面
-                for key in keys_to_remove:
-                    table_name, page_id = key
-                    # 如果是脏页，先刷新到磁盘
-                    if key in self.buffer_pool.dirty_pages:
-                        self.buffer_pool.flush_page(table_name, page_id)
-                    # 从缓冲池中移除
-                    if key in self.buffer_pool.pages:
-                        del self.buffer_pool.pages[key]
-                    if key in self.buffer_pool.pin_counts:
-                        del self.buffer_pool.pin_counts[key]
-
-                # 从LRU列表中移除
-                self.buffer_pool.lru_list = [key for key in self.buffer_pool.lru_list if key[0] != table_name]
-
-                # 从脏页集合中移除
-                self.buffer_pool.dirty_pages = {key for key in self.buffer_pool.dirty_pages if key[0] != table_name}
-
-    def insert_record(self, table_name: str, schema: Schema, values: List[Any]) -> Optional[int]:
-        """插入记录"""
+    def truncate_table(self, table_name: str, schema: Optional[Schema] = None) -> bool:
+        """清空表：丢弃缓冲的页并把表文件重置为空文件，代价与表大小无关（分区表清空全部分区）"""
+        if schema is not None and schema.partition:
+            try:
+                return all([self.truncate_table(partition.table_name) for partition in schema.partitions])
+            finally:
+                self.bump_table_version(table_name)
+        self._discard_table_state(table_name)
+        try:
+            return self.file_manager.reset_file(table_name)
+        finally:
+            self.bump_table_version(table_name)
+
+    def _discard_table_state(self, table_name: str):
+        """丢弃表在缓冲池和空闲空间映射中的全部状态"""
+        self.buffer_pool.discard_table_pages(table_name, page_count=self.file_manager.get_page_count(table_name))
+        with self._fsm_lock:
+            self.free_pages.pop(table_name, None)
+        self.dead_versions.pop(table_name, None)
+        with self._zone_lock:
+            self.zone_maps.pop(table_name, None)
+            self.bloom_indexes.pop(table_name, None)
+            self.dictionaries.pop(table_name, None)
+        for suffix in (ZONE_MAP_SUFFIX, BLOOM_SUFFIX, DICTIONARY_SUFFIX):
+            path = self._summary_path(table_name, suffix)
+            if path is None:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _summary_path(self, table_name: str, suffix: str) -> Optional[str]:
+        """区域映射、Bloom 过滤器和字典的文件路径；内存表的这些结构只在内存中，返回 None"""
+        if self.file_manager.is_memory(table_name):
+            return None
+        return self.file_manager.table_path(table_name, suffix)
+
+    def _use_ring_scan(self, table_name: str, page_count: int) -> bool:
+        """大表绕开共享LRU扫描；内存表的页常驻内存，总是直接读页"""
+        return (page_count > self.buffer_pool.capacity * self.ring_scan_threshold
+                and not self.file_manager.is_memory(table_name))
+
+    def table_version(self, table_name: str) -> int:
+        """表的数据版本号，版本号相同时查询结果相同"""
+        return self.table_versions.get(table_name, 0)
+
+    def bump_table_version(self, table_name: str):
+        """表的数据已变化：写入对新查询可见之后调用（版本化表在发布事务号之后）"""
+        self.table_versions[table_name] = next(self._version_counter)
+
+    def sync_table(self, table_name: str, schema: Optional[Schema] = None) -> bool:
+        """刷出表的脏页并 fsync 表文件（分区表同步全部分区）"""
+        if schema is not None and schema.partition:
+            return all([self.sync_table(partition.table_name) for partition in schema.partitions])
+        self.buffer_pool.flush_table(table_name)
+        return self.file_manager.sync_file(table_name)
+
+    def _zone_map(self, table_name: str, schema: Schema) -> ZoneMap:
+        return self._page_summary(self.zone_maps, table_name, schema, self._load_zone_map)
+
+    def _bloom_index(self, table_name: str, schema: Schema) -> Optional[BloomIndex]:
+        """表的 Bloom 过滤器，没有声明 bloom_filter 列的表为 None"""
+        if not schema.bloom_columns:
+            return None
+        return self._page_summary(self.bloom_indexes, table_name, schema, self._load_bloom_index)
+
+    def table_dictionary(self, table_name: str, schema: Schema) -> Optional[TableDictionary]:
+        """表的字典，没有字典编码列的表为 None；分区表的字典属于各分区，逻辑表也为 None"""
+        if not schema.dictionary_columns or schema.partition:
+            return None
+        return self._page_summary(self.dictionaries, table_name, schema, self._load_dictionary)
+
+    def _load_dictionary(self, table_name: str, schema: Schema) -> TableDictionary:
+        return TableDictionary.load(self._summary_path(table_name, DICTIONARY_SUFFIX), schema)
+
+    def _encode_rows(self, table_name: str, schema: Schema, rows: List[List[Any]]) -> List[List[Any]]:
+        """写入前把字典列的取值换成编码"""
+        dictionary = self.table_dictionary(table_name, schema)
+        return rows if dictionary is None else dictionary.encode_rows(schema, rows)
+
+    def _page_summary(self, cache: Dict[str, Any], table_name: str, schema: Schema, load):
+        summary = cache.get(table_name)
+        if summary is None:
+            with self._zone_lock:
+                summary = cache.get(table_name)
+                if summary is None:
+                    summary = load(table_name, schema)
+                    cache[table_name] = summary
+        return summary
+
+    def _load_zone_map(self, table_name: str, schema: Schema) -> ZoneMap:
+        """加载区域映射；文件缺失或与表文件不一致（上次未正常关闭）时扫描全表重建"""
+        path = self._summary_path(table_name, ZONE_MAP_SUFFIX)
+        page_count = self.file_manager.get_page_count(table_name)
+        zone_map = ZoneMap.load(path, len(schema.columns), page_count)
+        if zone_map is None:
+            zone_map = ZoneMap(path, len(schema.columns))
+            self._rebuild_summary(table_name, schema, zone_map, page_count)
+        return zone_map
+
+    def _load_bloom_index(self, table_name: str, schema: Schema) -> BloomIndex:
+        """加载 Bloom 过滤器；文件缺失、不一致或过滤器大小已改变时扫描全表重建"""
+        path = self._summary_path(table_name, BLOOM_SUFFIX)
+        page_count = self.file_manager.get_page_count(table_name)
+        capacities = self._bloom_capacities(schema)
+        index = BloomIndex.load(path, capacities, page_count)
+        if index is None:
+            index = BloomIndex(path, capacities)
+            self._rebuild_summary(table_name, schema, index, page_count)
+        return index
+
+    def _bloom_capacities(self, schema: Schema) -> Dict[int, int]:
+        """每个过滤器预计的不同值个数：区间行数，ANALYZE 统计过的列不超过其不同值数"""
+        range_rows = page_layout(schema).capacity * BLOOM_RANGE_PAGES
+        column_stats = (schema.stats or {}).get('columns', {})
+        capacities = {}
+        for col_index in schema.bloom_columns:
+            distinct = column_stats.get(schema.columns[col_index]['name'], {}).get('distinct')
+            capacities[col_index] = min(range_rows, max(1, distinct)) if distinct is not None else range_rows
+        return capacities
+
+    def _rebuild_summary(self, table_name: str, schema: Schema, summary: PageSummary, page_count: int):
+        """读取表文件的全部页重建区域映射或 Bloom 过滤器"""
+        summary.remove_file()
+        layout = page_layout(schema)
+        dictionary = self.table_dictionary(table_name, schema)
+        self.buffer_pool.flush_table(table_name)
+        buffers = [bytearray(PAGE_SIZE) for _ in range(self.readahead_pages)]
+        for start_page in range(0, page_count, len(buffers)):
+            batch = buffers[:min(len(buffers), page_count - start_page)]
+            pages_read = self.file_manager.read_pages_into(table_name, start_page, batch)
+            for i in range(pages_read):
+                summary.widen(start_page + i, self._page_rows(schema, layout, batch[i], dictionary), schema.columns)
+
+    def rebuild_bloom_index(self, table_name: str, schema: Schema):
+        """按当前统计信息重新确定过滤器大小并重建（ANALYZE 之后调用）"""
+        with self._zone_lock:
+            self.bloom_indexes.pop(table_name, None)
+        self._bloom_index(table_name, schema)
+
+    def _page_rows(self, schema: Schema, layout: RowLayout, page_data,
+                   dictionary: Optional[TableDictionary] = None) -> List[List[Any]]:
+        """页内全部记录（含旧版本，不含空闲槽位），字典列还原为字符串"""
+        num_records = min(struct.unpack_from('>i', page_data, 0)[0], layout.capacity)
+        rows = []
+        for record_id in range(num_records):
+            if schema.versioned and VERSION_HEADER.unpack_from(page_data, layout.field_offset(record_id))[0] == 0:
+                continue
+            rows.append(deserialize_record(schema, layout.record_at(page_data, record_id)))
+        if dictionary is not None:
+            for row in rows:
+                decode_codes(row, dictionary.values, schema.dictionary_columns)
+        return rows
+
+    def _widen_page(self, table_name: str, schema: Schema, page_id: int, rows: List[List[Any]]):
+        """把写入 page_id 的记录登记到区域映射和 Bloom 过滤器"""
+        self._zone_map(table_name, schema).widen(page_id, rows, schema.columns)
+        bloom_index = self._bloom_index(table_name, schema)
+        if bloom_index is not None:
+            bloom_index.widen(page_id, rows, schema.columns)
+
+    def _widen_pages(self, table_name: str, schema: Schema, rids: List[int], rows: List[List[Any]]):
+        """按 RID 所在的页登记写入的记录，rids 与 rows 一一对应"""
+        by_page: Dict[int, List[List[Any]]] = {}
+        for rid, row in zip(rids, rows):
+            by_page.setdefault(rid >> 16, []).append(row)
+        for page_id, page_rows in by_page.items():
+            self._widen_page(table_name, schema, page_id, page_rows)
+
+    def record_raw_pages(self, table_name: str, schema: Schema, first_page_id: int, pages: List[bytes]):
+        """登记绕过插入路径直接写入的整页（如二进制页导入）"""
+        layout = page_layout(schema)
+        dictionary = self.table_dictionary(table_name, schema)
+        for i, page_data in enumerate(pages):
+            self._widen_page(table_name, schema, first_page_id + i,
+                             self._page_rows(schema, layout, page_data, dictionary))
+        self.bump_table_version(table_name)
+
+    def candidate_pages(self, table_name: str, schema: Schema, where_clause,
+                        page_count: int) -> Optional[List[int]]:
+        """
+        由区域映射和 Bloom 过滤器筛选可能有记录满足条件的页；
+        没有条件时返回 None，表示扫描全部页
+        """
+        if where_clause is None:
+            return None
+        pages = self._zone_map(table_name, schema).candidate_pages(where_clause, schema, page_count)
+        bloom_index = self._bloom_index(table_name, schema)
+        if bloom_index is not None:
+            pages = bloom_index.filter_pages(where_clause, schema, pages)
+        self.skipped_pages += page_count - len(pages)
+        return pages
+
+    def save_page_summaries(self):
+        """检查点：保存所有修改过的区域映射和 Bloom 过滤器"""
+        for cache in (self.zone_maps, self.bloom_indexes):
+            for table_name, summary in list(cache.items()):
+                summary.save(self.file_manager.get_page_count(table_name))
+
+    def partition_rows(self, schema: Schema, rows: Sequence[List[Any]]) -> List[Tuple[int, List[List[Any]]]]:
+        """
+        按分区键（写入后读出的值）把行分到各分区，返回 [(分区下标, 行), ...]；
+        有行不属于任何分区时抛出 ValueError
+        """
+        col_index = schema.get_column_index(schema.partition['column'])
+        col_def = schema.columns[col_index]
+        groups: Dict[int, List[List[Any]]] = {}
+        for row in rows:
+            groups.setdefault(partition_index(schema, stored_value(row[col_index], col_def)), []).append(row)
+        return sorted(groups.items())
+
+    @staticmethod
+    def _split_rids(rids: Sequence[int]) -> List[Tuple[int, List[int]]]:
+        """把分区表的 RID 按分区下标分组，返回 [(分区下标, 分区内的 RID), ...]"""
+        mask = (1 << PARTITION_RID_SHIFT) - 1
+        groups: Dict[int, List[int]] = {}
+        for rid in rids:
+            groups.setdefault(rid >> PARTITION_RID_SHIFT, []).append(rid & mask)
+        return sorted(groups.items())
+
+    def _write_xid(self, schema: Schema, xmin: Optional[int]) -> int:
+        """写入版本化表时使用的事务号；未指定时为本次写入单独分配一个"""
+        if not schema.versioned:
+            return 0
+        return xmin if xmin is not None else self.versions.allocate()
+
+    def insert_record(self, table_name: str, schema: Schema, values: List[Any],
+                      xmin: Optional[int] = None) -> Optional[int]:
+        """插入记录；xmin 为提交事务号，由调用方在写完后发布"""
+        xid = self._write_xid(schema, xmin)
+        try:
+            return self._insert_record(table_name, schema, values, xid)
+        finally:
+            if xid and xmin is None:
+                self.versions.publish(xid)
+            self.bump_table_version(table_name)
+
+    def _insert_record(self, table_name: str, schema: Schema, values: List[Any], xid: int) -> Optional[int]:
+        if schema.partition:
+            # 写入分区键所在的分区，RID 带上分区下标
+            index = self.partition_rows(schema, [values])[0][0]
+            partition = schema.partitions[index]
+            rid = self._insert_record(partition.table_name, partition, values, xid)
+            return None if rid is None else (index << PARTITION_RID_SHIFT) | rid
+        rid = self._place_record(table_name, schema, values, xid)
+        if rid is not None:
+            self._widen_page(table_name, schema, rid >> 16, [values])
+        return rid
+
+    def _place_record(self, table_name: str, schema: Schema, values: List[Any], xid: int) -> Optional[int]:
         # 序列化记录
-        record_data = self._serialize_record(schema, values)
+        record_data = self._serialize_record(schema, self._encode_rows(table_name, schema, [values])[0], xid)
 
-        # 尝试在现有页中插入
+        # 优先复用删除/回收后空出的槽位
+        layout = page_layout(schema)
+        rids = self._fill_free_space(table_name, schema, layout, [record_data])
+        if rids:
+            return rids[0]
+
+        # 其余页都已写满，只需尝试最后一页
         page_count = self.file_manager.get_page_count(table_name)
-        for page_id in range(page_count):
-            page = self.buffer_pool.pin_page(table_name, page_id)
-            if page and page.has_free_space(len(record_data)):
-                record_id = page.insert_record(record_data)
-                self.buffer_pool.unpin_page(table_name, page_id, True)
+        if page_count > 0:
+            page_id = page_count - 1
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if page:
+                record_id = layout.insert_record(page, record_data)
+                self.buffer_pool.unpin_page(table_name, page_id, record_id is not None)
                 if record_id is not None:
                     return (page_id << 16) | record_id  # 组合页ID和记录ID
 
         # 需要分配新页
         new_page = self.buffer_pool.allocate_page(table_name)
         if new_page:
-            record_id = new_page.insert_record(record_data)
+            record_id = layout.insert_record(new_page, record_data)
             self.buffer_pool.unpin_page(table_name, new_page.page_id, True)
             if record_id is not None:
                 return (new_page.page_id << 16) | record_id
 
         return None
 
-    def scan_records(self, table_name: str, schema: Schema) -> Iterator[List[Any]]:
-        """扫描所有记录"""
+    def bulk_insert(self, table_name: str, schema: Schema, rows: List[List[Any]],
+                    xmin: Optional[int] = None) -> int:
+        """批量插入记录：一次性编码，先填满最后一页，其余记录直接写入新分配的连续页"""
+        if not rows:
+            return 0
+
+        xid = self._write_xid(schema, xmin)
+        try:
+            return self._bulk_insert(table_name, schema, rows, xid)
+        finally:
+            if xid and xmin is None:
+                self.versions.publish(xid)
+            self.bump_table_version(table_name)
+
+    def _bulk_insert(self, table_name: str, schema: Schema, rows: List[List[Any]], xid: int) -> int:
+        if schema.partition:
+            # 各分区的写入使用同一事务号，发布后一起可见
+            return sum(self._bulk_insert(schema.partitions[index].table_name, schema.partitions[index],
+                                         partition_rows, xid)
+                       for index, partition_rows in self.partition_rows(schema, rows))
+
+        # 一次性序列化所有记录
+        records = [self._serialize_record(schema, values, xid)
+                   for values in self._encode_rows(table_name, schema, rows)]
+        layout = page_layout(schema)
+
+        # 先复用空闲槽位，再补满最后一页的剩余空间
+        rids = self._fill_free_space(table_name, schema, layout, records)
+        inserted = len(rids)
+        self._widen_pages(table_name, schema, rids, rows)
+        page_count = self.file_manager.get_page_count(table_name)
+        if page_count > 0 and inserted < len(records):
+            page_id = page_count - 1
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if page:
+                appended = layout.append_records(page, records[inserted:])
+                self.buffer_pool.unpin_page(table_name, page_id, appended > 0)
+                self._widen_page(table_name, schema, page_id, rows[inserted:inserted + appended])
+                inserted += appended
+
+        remaining = len(records) - inserted
+        if remaining == 0:
+            return inserted
+
+        # 剩余记录按页打包，一次扩展文件、一次写入，不经过缓冲池
+        per_page = layout.capacity
+        if per_page == 0:
+            raise ValueError(f"记录大小 {layout.record_size} 字节超过单页容量")
+        new_page_count = (remaining + per_page - 1) // per_page
+        first_page_id = self.file_manager.allocate_pages(table_name, new_page_count)
+        if first_page_id == -1:
+            raise IOError(f"无法为表 {table_name} 分配新页")
+
+        page_datas = []
+        for i in range(new_page_count):
+            page = Page(first_page_id + i)
+            start = inserted + i * per_page
+            layout.append_records(page, records[start:start + per_page])
+            page_datas.append(page.data)
+            self._widen_page(table_name, schema, first_page_id + i, rows[start:start + per_page])
+        self.file_manager.write_pages(table_name, first_page_id, page_datas)
+
+        return len(records)
+
+    def _fill_free_space(self, table_name: str, schema: Schema, layout: RowLayout,
+                         records: List[bytes]) -> List[int]:
+        """把记录写入空闲空间映射中登记的页（空闲槽位或页尾空间），返回写入记录的RID"""
+        with self._fsm_lock:
+            candidates = sorted(self.free_pages.get(table_name, ()))
+        if not candidates:
+            return []
+
+        rids = []
+        for page_id in candidates:
+            if len(rids) == len(records):
+                break
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if not page:
+                self._mark_full(table_name, page_id)
+                continue
+            written = 0
+            try:
+                if schema.versioned:
+                    # xmin 为 0 的槽位是已回收的空闲槽位
+                    for record_id in range(page.num_records):
+                        if len(rids) == len(records):
+                            break
+                        if VERSION_HEADER.unpack_from(page.data, layout.field_offset(record_id))[0] == 0:
+                            layout.update_record(page, record_id, records[len(rids)])
+                            rids.append((page_id << 16) | record_id)
+                            written += 1
+                first_appended = page.num_records
+                appended = layout.append_records(page, records[len(rids):])
+                rids.extend((page_id << 16) | record_id
+                            for record_id in range(first_appended, first_appended + appended))
+                written += appended
+                if len(rids) < len(records):
+                    # 还有剩余记录说明这一页已经写满
+                    self._mark_full(table_name, page_id)
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id, written > 0)
+        return rids
+
+    def _mark_free(self, table_name: str, page_ids):
+        with self._fsm_lock:
+            self.free_pages.setdefault(table_name, set()).update(page_ids)
+
+    def _mark_full(self, table_name: str, page_id: int):
+        with self._fsm_lock:
+            pages = self.free_pages.get(table_name)
+            if pages is not None:
+                pages.discard(page_id)
+                if not pages:
+                    del self.free_pages[table_name]
+
+    def scan_records(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot] = None,
+                     where_clause=None, columns: Optional[Sequence[int]] = None,
+                     codes: Sequence[int] = (), partitions: Optional[Sequence[int]] = None) -> Iterator[List[Any]]:
+        """
+        扫描所有记录；版本化表只返回对快照可见的版本，未指定快照时使用扫描开始时的快照。
+        给出 where_clause 时按区域映射跳过不可能匹配的页，返回的记录仍需调用方过滤；
+        columns 为调用方用到的列下标，列式表只解码这些列，其余列为 None；
+        codes 中的字典列保持编码，其余字典列还原为字符串；
+        partitions 为分区表要扫描的分区下标（计划器裁剪的结果），None 表示全部分区
+        """
+        for _, record in self._scan(table_name, schema, snapshot, with_rids=False, where_clause=where_clause,
+                                    columns=columns, codes=codes, partitions=partitions):
+            yield record
+
+    def scan_with_rids(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot] = None,
+                       where_clause=None, partitions: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, List[Any]]]:
+        """扫描所有记录并带上RID，供 DELETE / UPDATE 定位记录"""
+        return self._scan(table_name, schema, snapshot, with_rids=True, where_clause=where_clause,
+                          partitions=partitions)
+
+    def _scan(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot],
+              with_rids: bool, where_clause=None, columns: Optional[Sequence[int]] = None,
+              codes: Sequence[int] = (),
+              partitions: Optional[Sequence[int]] = None) -> Iterator[Tuple[Optional[int], List[Any]]]:
+        own_snapshot = schema.versioned and snapshot is None
+        if own_snapshot:
+            snapshot = self.versions.acquire_snapshot()
+        try:
+            if schema.partition:
+                # 各分区使用同一快照依次扫描，RID 带上分区下标
+                for index in (range(len(schema.partitions)) if partitions is None else partitions):
+                    partition = schema.partitions[index]
+                    for rid, record in self._scan(partition.table_name, partition, snapshot, with_rids,
+                                                  where_clause, columns):
+                        yield (index << PARTITION_RID_SHIFT) | rid if with_rids else None, record
+                return
+            records = self._scan_records(table_name, schema, snapshot, with_rids, where_clause, columns)
+            dictionary = self.table_dictionary(table_name, schema)
+            decoded = [] if dictionary is None else string_columns(schema, codes, columns)
+            if not decoded:
+                yield from records
+                return
+            for rid, record in records:
+                decode_codes(record, dictionary.values, decoded)
+                yield rid, record
+        finally:
+            if own_snapshot:
+                self.versions.release_snapshot(snapshot)
+
+    def _scan_records(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot],
+                      with_rids: bool, where_clause=None,
+                      columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[Optional[int], List[Any]]]:
+        page_count = self.file_manager.get_page_count(table_name)
+        layout = page_layout(schema)
+        page_ids = self.candidate_pages(table_name, schema, where_clause, page_count)
+
+        if self._use_ring_scan(table_name, page_count):
+            # 大表：绕开共享LRU，避免一次全表扫描冲掉缓冲池
+            ring_scan = RingScan(self.buffer_pool, table_name, page_count, self.readahead_pages, page_ids)
+            for page in ring_scan.pages():
+                yield from self._decode_page(schema, page, layout, snapshot, with_rids, columns)
+            return
+
+        for page_id in (range(page_count) if page_ids is None else page_ids):
+            page = self.buffer_pool.pin_page(table_name, page_id)
+            if page:
+                # 先解码整页再解除固定，调用方逐行消费（如流式游标）期间不占用页
+                try:
+                    records = self._decode_page(schema, page, layout, snapshot, with_rids, columns)
+                finally:
+                    self.buffer_pool.unpin_page(table_name, page_id, False)
+                yield from records
+
+    def scan_batches(self, table_name: str, schema: Schema, snapshot: Optional[Snapshot] = None,
+                     batch_pages: Optional[int] = None, where_clause=None,
+                     columns: Optional[Sequence[int]] = None,
+                     partitions: Optional[Sequence[int]] = None) -> Iterator[vectorized.ColumnBatch]:
+        """
+        向量化扫描（需要 numpy）：每 batch_pages 页的记录一次解码为一个列式批次；
+        列式表的批次只包含 columns 中的列，字典列在批次中是编码；分区表的批次不跨分区
+        """
+        if schema.partition:
+            own_snapshot = snapshot is None
+            if own_snapshot:
+                snapshot = self.versions.acquire_snapshot()
+            try:
+                for index in (range(len(schema.partitions)) if partitions is None else partitions):
+                    partition = schema.partitions[index]
+                    yield from self.scan_batches(partition.table_name, partition, snapshot, batch_pages,
+                                                 where_clause, columns)
+            finally:
+                if own_snapshot:
+                    self.versions.release_snapshot(snapshot)
+            return
+
+        batch_pages = batch_pages or self.readahead_pages
+        layout = page_layout(schema)
+        dtype = vectorized.record_dtype(schema)
+        dictionary = self.table_dictionary(table_name, schema)
+        dictionaries = None if dictionary is None else {
+            schema.columns[i]['name']: dictionary.values[i] for i in schema.dictionary_columns}
+        if layout.columnar:
+            if columns is None:
+                columns = range(len(schema.columns))
+            first_column = 1 if schema.versioned else 0
+            fields = ([0] if schema.versioned else []) + [first_column + i for i in columns]
+            names = [schema.columns[i]['name'] for i in columns]
+
+            def extract(page_data, num_records):
+                return [layout.column_bytes(page_data, num_records, field) for field in fields]
+
+            def decode(chunks):
+                # 各页同一字段的取值首尾相接
+                data = [b''.join(parts) for parts in zip(*chunks)]
+                header = data.pop(0) if schema.versioned else None
+                return vectorized.decode_columns(schema, header, dict(zip(names, data)), snapshot, dtype,
+                                                 dictionaries)
+        else:
+            def extract(page_data, num_records):
+                return bytes(page_data[8:8 + num_records * layout.record_size])
+
+            def decode(chunks):
+                return vectorized.decode_batch(schema, b''.join(chunks), snapshot, dtype, dictionaries)
+
+        own_snapshot = schema.versioned and snapshot is None
+        if own_snapshot:
+            snapshot = self.versions.acquire_snapshot()
+        try:
+            chunks = []
+            for data in self._page_records(table_name, schema, layout, extract, where_clause):
+                chunks.append(data)
+                if len(chunks) >= batch_pages:
+                    yield decode(chunks)
+                    chunks = []
+            if chunks:
+                yield decode(chunks)
+        finally:
+            if own_snapshot:
+                self.versions.release_snapshot(snapshot)
+
+    def _page_records(self, table_name: str, schema: Schema, layout: RowLayout, extract,
+                      where_clause=None) -> Iterator[Any]:
+        """按页号顺序产出 extract(页数据, 记录数) 复制出的记录数据，跳过区域映射排除的页"""
         page_count = self.file_manager.get_page_count(table_name)
-        record_size = self._calculate_record_size(schema)
+        page_ids = self.candidate_pages(table_name, schema, where_clause, page_count)
+        if self._use_ring_scan(table_name, page_count):
+            ring_scan = RingScan(self.buffer_pool, table_name, page_count, self.readahead_pages, page_ids)
+            for page in ring_scan.pages():
+                yield extract(page.data, min(page.num_records, layout.capacity))
+            return
 
-        for page_id in range(page_count):
+        for page_id in (range(page_count) if page_ids is None else page_ids):
             page = self.buffer_pool.pin_page(table_name, page_id)
             if page:
+                try:
+                    data = extract(page.data, min(page.num_records, layout.capacity))
+                finally:
+                    self.buffer_pool.unpin_page(table_name, page_id, False)
+                yield data
+
+    def _decode_page(self, schema: Schema, page: Page, layout: RowLayout, snapshot: Optional[Snapshot],
+                     with_rids: bool = False,
+                     columns: Optional[Sequence[int]] = None) -> List[Tuple[Optional[int], List[Any]]]:
+        """解码页中的记录，版本化表跳过对快照不可见的版本和空闲槽位"""
+        if layout.columnar:
+            return [((page.page_id << 16) | record_id if with_rids else None, record)
+                    for record_id, record in decode_columns(schema, layout, page.data, snapshot, columns)]
+
+        records = []
+        for record_id in range(page.num_records):
+            record_data = page.get_record(record_id, layout.record_size)
+            if not record_data:
+                continue
+            if schema.versioned:
+                xmin, xmax = VERSION_HEADER.unpack_from(record_data)
+                if not snapshot.is_visible(xmin, xmax):
+                    continue
+            rid = (page.page_id << 16) | record_id if with_rids else None
+            records.append((rid, self._deserialize_record(schema, record_data)))
+        return records
+
+    def _group_by_page(self, rids: List[int]) -> Dict[int, List[int]]:
+        pages: Dict[int, List[int]] = {}
+        for rid in rids:
+            pages.setdefault(rid >> 16, []).append(rid & 0xFFFF)
+        return pages
+
+    def delete_records(self, table_name: str, schema: Schema, rids: List[int],
+                       xmax: Optional[int] = None) -> int:
+        """
+        删除记录，返回删除的条数。版本化表只在版本头写入删除事务号（墓碑），
+        旧版本对已有快照仍然可见，由 VACUUM 回收；普通表直接从页中移除
+        """
+        xid = self._write_xid(schema, xmax)
+        try:
+            return self._delete_records(table_name, schema, rids, xid)
+        finally:
+            if xid and xmax is None:
+                self.versions.publish(xid)
+            self.bump_table_version(table_name)
+
+    def _delete_records(self, table_name: str, schema: Schema, rids: List[int], xid: int) -> int:
+        if schema.partition:
+            return sum(self._delete_records(schema.partitions[index].table_name, schema.partitions[index],
+                                            partition_rids, xid)
+                       for index, partition_rids in self._split_rids(rids))
+
+        layout = page_layout(schema)
+        deleted = 0
+        for page_id, record_ids in self._group_by_page(rids).items():
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if not page:
+                continue
+            page_deleted = 0
+            try:
+                if schema.versioned:
+                    for record_id in record_ids:
+                        offset = layout.field_offset(record_id)
+                        xmin, old_xmax = VERSION_HEADER.unpack_from(page.data, offset)
+                        if record_id < page.num_records and xmin and not old_xmax:
+                            VERSION_HEADER.pack_into(page.data, offset, xmin, xid)
+                            page_deleted += 1
+                else:
+                    # 从后往前删除，前移的记录不影响尚未删除的记录ID
+                    for record_id in sorted(set(record_ids), reverse=True):
+                        if layout.delete_record(page, record_id):
+                            page_deleted += 1
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id, page_deleted > 0)
+            if page_deleted and not schema.versioned:
+                self._mark_free(table_name, [page_id])
+            deleted += page_deleted
+
+        if schema.versioned:
+            self.dead_versions[table_name] += deleted
+        return deleted
+
+    def rows_current(self, table_name: str, schema: Schema, rids: List[int], snapshot: Snapshot) -> bool:
+        """版本化表中这些行在快照中可见且仍是最新版本（之后没有被删除或更新）"""
+        if schema.partition:
+            return all(self.rows_current(schema.partitions[index].table_name, schema.partitions[index],
+                                         partition_rids, snapshot)
+                       for index, partition_rids in self._split_rids(rids))
+
+        layout = page_layout(schema)
+        for page_id, record_ids in self._group_by_page(rids).items():
+            page = self.buffer_pool.pin_page(table_name, page_id)
+            if not page:
+                return False
+            try:
+                for record_id in record_ids:
+                    if record_id >= page.num_records:
+                        return False
+                    xmin, xmax = VERSION_HEADER.unpack_from(page.data, layout.field_offset(record_id))
+                    if xmax or not snapshot.is_visible(xmin, xmax):
+                        return False
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id)
+        return True
+
+    def update_records(self, table_name: str, schema: Schema, updates: List[Tuple[int, List[Any]]]) -> int:
+        """
+        更新记录，返回更新的条数。普通表定长记录原地覆盖；
+        版本化表标记旧版本删除并写入新版本（优先复用空闲槽位），两者使用同一事务号
+        """
+        if not updates:
+            return 0
+        if not schema.versioned:
+            layout = page_layout(schema)
+            new_values = dict(updates)
+            encoded = dict(zip(new_values, self._encode_rows(table_name, schema, list(new_values.values()))))
+            updated = 0
+            for page_id, record_ids in self._group_by_page([rid for rid, _ in updates]).items():
+                page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+                if not page:
+                    continue
+                page_rows = []
+                try:
+                    for record_id in record_ids:
+                        values = new_values[(page_id << 16) | record_id]
+                        record_data = self._serialize_record(schema, encoded[(page_id << 16) | record_id])
+                        if (len(record_data) == layout.record_size
+                                and layout.update_record(page, record_id, record_data)):
+                            page_rows.append(values)
+                finally:
+                    self.buffer_pool.unpin_page(table_name, page_id, len(page_rows) > 0)
+                self._widen_page(table_name, schema, page_id, page_rows)
+                updated += len(page_rows)
+            self.bump_table_version(table_name)
+            return updated
+
+        xid = self.versions.allocate()
+        try:
+            self._delete_records(table_name, schema, [rid for rid, _ in updates], xid)
+            return self._bulk_insert(table_name, schema, [values for _, values in updates], xid)
+        finally:
+            self.versions.publish(xid)
+            self.bump_table_version(table_name)
+
+    def vacuum_table(self, table_name: str, schema: Schema, start_page: int = 0,
+                     max_pages: Optional[int] = None) -> Dict[str, int]:
+        """
+        清理表：回收对所有快照都不可见的旧版本，把页内存活记录紧凑到页首，
+        有空间的页登记到空闲空间映射，扫描到表尾时把末尾的空页归还给文件系统。
+        可从 start_page 开始只处理 max_pages 页，分批增量执行；返回统计及下一批的起始页。
+        会移动记录（改变RID），调用方需保证期间没有并发的 DELETE / UPDATE
+        """
+        horizon = self.versions.oldest_snapshot()
+        layout = page_layout(schema)
+        page_count = self.file_manager.get_page_count(table_name)
+        end_page = page_count if max_pages is None else min(page_count, start_page + max_pages)
+        stats = {'pages': 0, 'reclaimed': 0, 'freed_pages': 0, 'next_page': end_page}
+
+        free_pages = []
+        for page_id in range(start_page, end_page):
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if not page:
+                continue
+            removed = 0
+            try:
+                if schema.versioned:
+                    live_ids = []
+                    for record_id in range(page.num_records):
+                        xmin, xmax = VERSION_HEADER.unpack_from(page.data, layout.field_offset(record_id))
+                        if xmin and not (xmax and xmax <= horizon):
+                            live_ids.append(record_id)
+                    removed = layout.compact(page, live_ids)
+                if page.num_records < layout.capacity:
+                    free_pages.append(page_id)
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id, removed > 0)
+            stats['pages'] += 1
+            stats['reclaimed'] += removed
+
+        if free_pages:
+            self._mark_free(table_name, free_pages)
+        if stats['reclaimed']:
+            self.dead_versions[table_name] = max(0, self.dead_versions[table_name] - stats['reclaimed'])
+        if end_page == page_count:
+            stats['freed_pages'] = self._truncate_empty_pages(table_name, page_count)
+            stats['next_page'] = 0
+        return stats
+
+    def _truncate_empty_pages(self, table_name: str, page_count: int) -> int:
+        """把表尾连续的空页截掉；版本化表的读者不持有语句锁，只在没有活跃快照时进行"""
+        keep = page_count
+        while keep > 0:
+            page = self.buffer_pool.pin_page(table_name, keep - 1)
+            if not page:
+                break
+            empty = page.num_records == 0
+            self.buffer_pool.unpin_page(table_name, keep - 1, False)
+            if not empty:
+                break
+            keep -= 1
+        if keep == page_count:
+            return 0
+        if not self.versions.run_if_idle(lambda: self.drop_tail_pages(table_name, keep, page_count)):
+            return 0
+        return page_count - keep
+
+    def drop_tail_pages(self, table_name: str, keep: int, page_count: int):
+        """丢弃页号不小于 keep 的页（缓冲页、表文件中的页及辅助结构），调用方保证没有读者在读这些页"""
+        self.buffer_pool.discard_table_pages(table_name, from_page=keep, page_count=page_count)
+        self.file_manager.truncate_pages(table_name, keep)
+        for cache in (self.zone_maps, self.bloom_indexes):
+            summary = cache.get(table_name)
+            if summary is not None:
+                summary.truncate(keep)
+        with self._fsm_lock:
+            pages = self.free_pages.get(table_name)
+            if pages:
+                pages.difference_update(range(keep, page_count))
+
+    def abort_xid(self, table_name: str, schema: Schema, xid: int, start_page: int = 0) -> int:
+        """
+        撤销未发布的事务号 xid 的写入（导入或提交中途失败）：它写入的版本标记为被同一事务号删除，
+        之后发布更大的事务号时也不可见，由 VACUUM 回收；它写入的删除标记清除。
+        只检查页号不小于 start_page 的页，返回撤销的版本数
+        """
+        if schema.partition:
+            return sum(self.abort_xid(partition.table_name, partition, xid) for partition in schema.partitions)
+
+        layout = page_layout(schema)
+        aborted = restored = 0
+        for page_id in range(start_page, self.file_manager.get_page_count(table_name)):
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if not page:
+                continue
+            page_changed = 0
+            try:
+                for record_id in range(min(page.num_records, layout.capacity)):
+                    offset = layout.field_offset(record_id)
+                    xmin, xmax = VERSION_HEADER.unpack_from(page.data, offset)
+                    if xmin == xid and not xmax:
+                        VERSION_HEADER.pack_into(page.data, offset, xid, xid)
+                        aborted += 1
+                        page_changed += 1
+                    elif xmin and xmin != xid and xmax == xid:
+                        VERSION_HEADER.pack_into(page.data, offset, xmin, 0)
+                        restored += 1
+                        page_changed += 1
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id, page_changed > 0)
+        self.dead_versions[table_name] = max(0, self.dead_versions[table_name] + aborted - restored)
+        return aborted
+
+    def collect_garbage(self, table_name: str, schema: Schema) -> int:
+        """
+        回收旧版本：删除事务号不大于最老活跃快照的版本对任何读者都不可见，
+        将其槽位清零（xmin=0）标记为空闲，返回回收的版本数
+        """
+        if not schema.versioned:
+            return 0
+        horizon = self.versions.oldest_snapshot()
+        layout = page_layout(schema)
+        reclaimed = 0
+        free_pages = []
+
+        for page_id in range(self.file_manager.get_page_count(table_name)):
+            page = self.buffer_pool.pin_page(table_name, page_id, exclusive=True)
+            if not page:
+                continue
+            page_reclaimed = 0
+            try:
                 for record_id in range(page.num_records):
-                    record_data = page.get_record(record_id, record_size)
-                    if record_data:
-                        record = self._deserialize_record(schema, record_data)
-                        yield record
-                self.buffer_pool.unpin_page(table_name, page_id, False)
+                    xmin, xmax = VERSION_HEADER.unpack_from(page.data, layout.field_offset(record_id))
+                    if xmin and xmax and xmax <= horizon:
+                        layout.clear_record(page.data, record_id)
+                        page_reclaimed += 1
+            finally:
+                self.buffer_pool.unpin_page(table_name, page_id, page_reclaimed > 0)
+            if page_reclaimed:
+                free_pages.append(page_id)
+            reclaimed += page_reclaimed
+
+        if free_pages:
+            self._mark_free(table_name, free_pages)
+        self.dead_versions[table_name] = max(0, self.dead_versions[table_name] - reclaimed)
+        return reclaimed
 
-    def _serialize_record(self, schema: Schema, values: List[Any]) -> bytes:
-        """序列化记录"""
-        record_data = bytearray()
+    def _serialize_record(self, schema: Schema, values: List[Any], xmin: int = 0) -> bytes:
+        """序列化记录（版本化表带版本头）"""
+        record_data = bytearray(VERSION_HEADER.pack(xmin, 0) if schema.versioned else b'')
 
         for value, col_def in zip(values, schema.columns):
             if value is None:
                 # 处理NULL值 - 填充适当大小的空字节
-                size = get_type_size(col_def['type'], col_def.get('length', 0))
+                size = get_column_size(col_def)
                 record_data.extend(b'\x00' * size)
-            elif col_def['type'] == 'INT':
+            elif col_def['type'] == 'INT' or col_def.get('dictionary'):
+                # 字典列已换成编码
                 record_data.extend(serialize_int(value))
             elif col_def['type'] == 'VARCHAR':
                 record_data.extend(serialize_string(value, col_def.get('length', 255)))
@@ -114,45 +939,82 @@ class StorageEngine:
 
     def _deserialize_record(self, schema: Schema, record_data: bytes) -> List[Any]:
         """反序列化记录"""
-        record = []
-        offset = 0
+        return deserialize_record(schema, record_data)
 
-        for col_def in schema.columns:
-            col_type = col_def['type']
-            col_length = col_def.get('length', 0)
-            size = get_type_size(col_type, col_length)
+    def _calculate_record_size(self, schema: Schema) -> int:
+        """计算记录大小"""
+        return calculate_record_size(schema)
 
-            if offset + size > len(record_data):
-                # 数据不完整，填充NULL
-                record.append(None)
-                continue
 
-            chunk = record_data[offset:offset + size]
+def decode_value(col_def: dict, chunk: bytes) -> Any:
+    """解码一个字段，全 0 字节为 NULL；字典列解码为编码"""
+    if not any(chunk):
+        return None
+    col_type = col_def['type']
+    try:
+        if col_type == 'INT' or col_def.get('dictionary'):
+            return deserialize_int(chunk)
+        if col_type == 'VARCHAR':
+            return deserialize_string(chunk)
+    except:
+        return None
+    return None
 
-            # 检查是否为NULL值（全0字节）
-            if all(b == 0 for b in chunk):
-                value = None
-            elif col_type == 'INT':
-                try:
-                    value = deserialize_int(chunk)
-                except:
-                    value = None
-            elif col_type == 'VARCHAR':
-                try:
-                    value = deserialize_string(chunk)
-                except:
-                    value = None
-            else:
-                value = None
 
-            record.append(value)
-            offset += size
+def deserialize_record(schema: Schema, record_data: bytes) -> List[Any]:
+    """反序列化记录（模块级函数，可在扫描工作进程中使用）"""
+    record = []
+    offset = VERSION_HEADER_SIZE if schema.versioned else 0
 
-        return record
+    for col_def in schema.columns:
+        size = get_column_size(col_def)
 
-    def _calculate_record_size(self, schema: Schema) -> int:
-        """计算记录大小"""
-        size = 0
-        for col_def in schema.columns:
-            size += get_type_size(col_def['type'], col_def.get('length', 0))
-        return size
\ No newline at end of file
+        if offset + size > len(record_data):
+            # 数据不完整，填充NULL
+            record.append(None)
+            continue
+
+        record.append(decode_value(col_def, record_data[offset:offset + size]))
+        offset += size
+
+    return record
+
+def calculate_record_size(schema: Schema) -> int:
+    """计算记录大小"""
+    size = VERSION_HEADER_SIZE if schema.versioned else 0
+    for col_def in schema.columns:
+        size += get_column_size(col_def)
+    return size
+
+
+def page_layout(schema: Schema) -> RowLayout:
+    """表的页内记录布局；字段依次为版本头（版本化表）和各列"""
+    field_sizes = [VERSION_HEADER_SIZE] if schema.versioned else []
+    field_sizes += [get_column_size(col) for col in schema.columns]
+    return PaxLayout(field_sizes) if schema.storage_format == 'columnar' else RowLayout(field_sizes)
+
+
+def decode_columns(schema: Schema, layout: PaxLayout, page_data, snapshot: Optional[Snapshot],
+                   columns: Optional[Sequence[int]] = None) -> List[Tuple[int, List[Any]]]:
+    """
+    解码列式页中对快照可见的记录，返回 (记录号, 记录)；
+    只读取版本头和 columns 中各列的小页，其余列为 None
+    """
+    num_records = min(struct.unpack_from('>i', page_data, 0)[0], layout.capacity)
+    first_column = 0
+    if schema.versioned:
+        first_column = 1
+        headers = VERSION_HEADER.iter_unpack(layout.column_bytes(page_data, num_records, 0))
+        record_ids = [record_id for record_id, (xmin, xmax) in enumerate(headers)
+                      if snapshot.is_visible(xmin, xmax)]
+    else:
+        record_ids = list(range(num_records))
+
+    rows = [[None] * len(schema.columns) for _ in record_ids]
+    for col_index in (range(len(schema.columns)) if columns is None else columns):
+        col_def = schema.columns[col_index]
+        size = layout.field_sizes[first_column + col_index]
+        data = layout.column_bytes(page_data, num_records, first_column + col_index)
+        for row, record_id in zip(rows, record_ids):
+            row[col_index] = decode_value(col_def, data[record_id * size:(record_id + 1) * size])
+    return list(zip(record_ids, rows))
@@ -0,0 +1,235 @@
+"""
+事务：延迟写集合 + 提交时一次性批量写入并持久化；版本化表的删除和更新对目标行加行级排他锁
+"""
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set
+from sql_compiler.catalog import Schema
+from sql_compiler.planner import QueryPlan
+from .lock_manager import (LockManager, DeadlockError, LockTimeoutError, IS, IX, S, SIX, X, table_resource,
+                           row_resource)
+
+ACTIVE = 'ACTIVE'
+COMMITTED = 'COMMITTED'
+ABORTED = 'ABORTED'
+
+# 会话级语句，由连接/命令行直接处理，不交给执行器
+TRANSACTION_PLANS = ('BEGIN', 'COMMIT', 'ROLLBACK')
+
+# 一条语句要锁定的行数超过该值时升级为表级 SIX 锁，不再逐行加锁
+LOCK_ESCALATION_ROWS = 5000
+
+
+class TransactionError(Exception):
+    pass
+
+
+class SerializationError(TransactionError):
+    """显式事务按快照读到的行已被其他事务修改或删除，事务已回滚"""
+    pass
+
+
+class Transaction:
+    """一个事务：写入先进入写集合，提交前对其他事务不可见"""
+
+    def __init__(self, txn_id: int, implicit: bool = False):
+        self.txn_id = txn_id
+        self.implicit = implicit  # 自动提交模式下为单条语句创建的事务
+        self.state = ACTIVE
+        # table_name -> (schema, 待插入的行)
+        self.write_set: 'OrderedDict[str, Any]' = OrderedDict()
+        # table_name -> (schema, 待删除的已提交行的RID)，提交时写入删除标记
+        self.delete_set: 'OrderedDict[str, Any]' = OrderedDict()
+        # 显式事务首次读取版本化表时获取的快照，事务内的读都基于它
+        self.snapshot = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state == ACTIVE
+
+    def add_rows(self, table_name: str, schema: Schema, rows: List[List[Any]]):
+        if table_name in self.write_set:
+            self.write_set[table_name][1].extend(rows)
+        else:
+            self.write_set[table_name] = (schema, list(rows))
+
+    def pending_rows(self, table_name: str) -> List[List[Any]]:
+        """本事务尚未提交的行（读自己的写）"""
+        entry = self.write_set.get(table_name)
+        return entry[1] if entry else []
+
+    def add_deletes(self, table_name: str, schema: Schema, rids: Sequence[int]):
+        if table_name in self.delete_set:
+            self.delete_set[table_name][1].update(rids)
+        else:
+            self.delete_set[table_name] = (schema, set(rids))
+
+    def deleted_rids(self, table_name: str) -> Set[int]:
+        """本事务已删除（或更新）、提交前仍在表中的行"""
+        entry = self.delete_set.get(table_name)
+        return entry[1] if entry else set()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(rows) for _, rows in self.write_set.values())
+
+    def __repr__(self):
+        return f"Transaction({self.txn_id}, {self.state}, pending={self.pending_count})"
+
+
+class TransactionManager:
+    """分配事务号、按执行计划加锁，提交时批量写入并 fsync 一次"""
+
+    def __init__(self, storage_engine, lock_timeout: float = 10.0):
+        self.storage_engine = storage_engine
+        self.lock_manager = LockManager(lock_timeout)
+        self._txn_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.active: Dict[int, Transaction] = {}
+        self.commits = 0
+        self.rollbacks = 0
+        # 物化视图的维护（ViewMaintainer），由 Database 设置
+        self.view_maintainer = None
+
+    def begin(self, implicit: bool = False) -> Transaction:
+        with self._lock:
+            txn = Transaction(next(self._txn_ids), implicit)
+            self.active[txn.txn_id] = txn
+        return txn
+
+    def lock_table(self, txn: Transaction, table_name: str, mode: str):
+        self._acquire(txn, table_resource(table_name), mode)
+
+    def try_lock_table(self, txn: Transaction, table_name: str, mode: str) -> bool:
+        """不等待地获取表锁，与其他事务的锁冲突时返回 False"""
+        try:
+            self._acquire(txn, table_resource(table_name), mode, timeout=0)
+            return True
+        except LockTimeoutError:
+            return False
+
+    def lock_rows(self, txn: Transaction, table_name: str, rids: Sequence[int]):
+        """
+        对要删除或更新的行加排他锁（表上已有 IX 锁）。行数超过 LOCK_ESCALATION_ROWS 时
+        改为表级 SIX 锁：排斥其他写者，快照读者不受影响
+        """
+        if len(rids) > LOCK_ESCALATION_ROWS:
+            self._acquire(txn, table_resource(table_name), SIX)
+            return
+        for rid in rids:
+            self._acquire(txn, row_resource(table_name, rid), X)
+
+    def _acquire(self, txn: Transaction, resource, mode: str, timeout: Optional[float] = None):
+        if not txn.is_active:
+            raise TransactionError(f"Transaction {txn.txn_id} is not active")
+        try:
+            self.lock_manager.acquire(txn.txn_id, resource, mode, timeout)
+        except DeadlockError:
+            # 请求方被选为牺牲者，回滚后再抛出
+            self.rollback(txn)
+            raise
+
+    def lock_for_plan(self, txn: Transaction, plan: QueryPlan):
+        """按语句类型加表级锁；必须在获取语句闩锁之前调用，避免锁等待与闩锁互相阻塞"""
+        table_name = plan.details.get('table_name')
+        if table_name is None or plan.plan_type in TRANSACTION_PLANS:
+            return
+        if plan.plan_type == 'SELECT' and getattr(plan.details.get('schema'), 'versioned', False):
+            # 版本化表按快照读，只加意向锁防止表被删除，不阻塞写者
+            mode = IS
+        elif plan.plan_type == 'SELECT':
+            # 显式事务中的全表扫描直接加表级共享锁（相当于行锁升级）
+            mode = IS if txn.implicit else S
+        elif plan.plan_type == 'INSERT':
+            mode = IX
+        elif plan.plan_type in ('COPY_TO', 'ANALYZE'):
+            mode = S
+        elif plan.plan_type in ('DELETE', 'UPDATE') and plan.details['schema'].versioned:
+            # 版本化表的删除/更新不影响快照读者，表上只加意向锁，目标行另加行锁（lock_rows）
+            mode = IX
+        else:
+            mode = X
+        # DROP / TRUNCATE 可以一次作用于多张表
+        for name in plan.details.get('table_names', [table_name]):
+            self.lock_table(txn, name, mode)
+
+    def commit(self, txn: Transaction) -> int:
+        """
+        提交：先给删除集合中的行写入删除标记，再把写集合按表批量写入，每张表只 fsync 一次，
+        返回写入的行数。所有版本带同一个提交事务号，全部落盘后才发布，快照要么全看到要么全看不到
+        """
+        if not txn.is_active:
+            raise TransactionError(f"Transaction {txn.txn_id} is not active")
+        written = 0
+        versions = self.storage_engine.versions
+        xid = versions.allocate() if txn.write_set or txn.delete_set else 0
+        tables = OrderedDict((name, schema) for name, (schema, _) in
+                             itertools.chain(txn.delete_set.items(), txn.write_set.items()))
+        try:
+            # 删除集合中的行持有行锁，提交前不会被其他事务修改
+            for table_name, (schema, rids) in txn.delete_set.items():
+                self.storage_engine.delete_records(table_name, schema, list(rids), xmax=xid)
+            for table_name, (schema, rows) in txn.write_set.items():
+                if rows:
+                    written += self.storage_engine.bulk_insert(table_name, schema, rows, xmin=xid)
+            for table_name, schema in tables.items():
+                self.storage_engine.sync_table(table_name, schema)
+            if xid:
+                versions.publish(xid)
+            # 写入在发布后才可见，此时再使结果缓存失效
+            for table_name in tables:
+                self.storage_engine.bump_table_version(table_name)
+            txn.state = COMMITTED
+            self.commits += 1
+        except Exception:
+            txn.state = ABORTED
+            self.rollbacks += 1
+            # 撤销已写入的删除标记和新版本，之后发布的事务号不会使它们可见
+            if xid:
+                for table_name, schema in tables.items():
+                    if schema.versioned:
+                        self.storage_engine.abort_xid(table_name, schema, xid)
+            raise
+        finally:
+            self._finish(txn)
+        # 提交的行合并进基表上的物化视图，有删除的表重新计算
+        if self.view_maintainer is not None:
+            for table_name in txn.delete_set:
+                self.view_maintainer.table_changed(table_name)
+            for table_name, (_, rows) in txn.write_set.items():
+                if table_name not in txn.delete_set:
+                    self.view_maintainer.rows_inserted(table_name, rows)
+        return written
+
+    def rollback(self, txn: Transaction):
+        """回滚：丢弃写集合、删除集合并释放锁"""
+        if txn.state == ACTIVE:
+            txn.state = ABORTED
+            self.rollbacks += 1
+        txn.write_set.clear()
+        txn.delete_set.clear()
+        self._finish(txn)
+
+    def release(self, txn: Transaction):
+        """结束自动提交的隐式事务（语句已直接写入存储）"""
+        if txn.state == ACTIVE:
+            txn.state = COMMITTED
+        self._finish(txn)
+
+    def _finish(self, txn: Transaction):
+        self.storage_engine.versions.release_snapshot(txn.snapshot)
+        txn.snapshot = None
+        self.lock_manager.release_all(txn.txn_id)
+        with self._lock:
+            self.active.pop(txn.txn_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            'active': len(self.active),
+            'commits': self.commits,
+            'rollbacks': self.rollbacks,
+        }
+        stats.update(self.lock_manager.get_stats())
+        stats.update(self.storage_engine.versions.get_stats())
+        return stats
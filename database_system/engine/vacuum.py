@@ -0,0 +1,89 @@
+"""
+后台增量 VACUUM：定期检查各表的旧版本数，超过阈值时分批清理
+"""
+import threading
+from typing import Any, Dict
+from .lock_manager import S
+
+
+class AutoVacuum:
+    """后台清理线程：每批只处理少量页并在语句写锁内完成，不会长时间阻塞写者"""
+
+    def __init__(self, database, interval: float = 10.0, pages_per_step: int = 64, threshold: int = 500):
+        self.database = database
+        self.interval = interval
+        self.pages_per_step = pages_per_step
+        self.threshold = threshold
+        # 表 -> 下一批的起始页
+        self.positions: Dict[str, int] = {}
+        self.runs = 0
+        self.reclaimed = 0
+        self.freed_pages = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='autovacuum', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ 后台清理失败: {e}")
+
+    def run_once(self) -> int:
+        """对旧版本数超过阈值（或上一轮未处理完）的表各清理一批页，返回回收的版本数"""
+        storage_engine = self.database.storage_engine
+        catalog = self.database.catalog_manager
+        transaction_manager = self.database.transaction_manager
+        reclaimed = 0
+        for logical_name, logical in list(catalog.schemas.items()):
+            if self._stop.is_set():
+                break
+            # 分区表的各分区分别计数、分别清理
+            pending = [physical.table_name for physical in logical.physical_schemas
+                       if self.positions.get(physical.table_name, 0)
+                       or storage_engine.dead_versions[physical.table_name] >= self.threshold]
+            if not pending:
+                continue
+            txn = transaction_manager.begin(implicit=True)
+            try:
+                # 清理会移动记录、改变RID，与持有行锁的写者互斥；有写者时本轮跳过该表
+                if not transaction_manager.try_lock_table(txn, logical_name, S):
+                    continue
+                for table_name in pending:
+                    with self.database.lock.write():
+                        schema = catalog.physical_schemas().get(table_name)
+                        if schema is None:
+                            self.positions.pop(table_name, None)
+                            continue
+                        stats = storage_engine.vacuum_table(table_name, schema, self.positions.get(table_name, 0),
+                                                            self.pages_per_step)
+                    self.positions[table_name] = stats['next_page']
+                    reclaimed += stats['reclaimed']
+                    self.freed_pages += stats['freed_pages']
+            finally:
+                transaction_manager.release(txn)
+        if reclaimed:
+            self.runs += 1
+            self.reclaimed += reclaimed
+        return reclaimed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self._thread is not None,
+            'runs': self.runs,
+            'reclaimed': self.reclaimed,
+            'freed_pages': self.freed_pages,
+        }
@@ -0,0 +1,235 @@
+"""
+向量化扫描：用 numpy 结构化 dtype 把一批页的记录一次性解码为列数组，
+WHERE 过滤和聚合以数组表达式计算，省去逐行反序列化和逐行求值的解释器开销。
+
+numpy 是可选依赖：未安装时 HAS_NUMPY 为 False，执行器继续使用逐行扫描。
+"""
+import operator
+from typing import Any, Dict, List, Optional, Sequence
+from sql_compiler.catalog import Schema
+from sql_compiler.parser import BinaryOpExpr, ColumnRef, Constant
+from utils.helpers import get_type_size
+from .mvcc import Snapshot
+from . import aggregate as agg
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+# 版本头字段名，不会与列名冲突
+XMIN_FIELD = '.xmin'
+XMAX_FIELD = '.xmax'
+
+_COMPARISONS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+
+def supports_schema(schema: Schema) -> bool:
+    """只有 INT 和定长 VARCHAR 列的表可以向量化解码"""
+    return all(col['type'] == 'INT' or (col['type'] == 'VARCHAR' and col.get('length'))
+               for col in schema.columns)
+
+
+def record_dtype(schema: Schema):
+    """由表结构得到记录的结构化 dtype：INT 和字典列（编码）为 >i4，VARCHAR(n) 为 S<n>"""
+    fields = []
+    if schema.versioned:
+        fields += [(XMIN_FIELD, '>u4'), (XMAX_FIELD, '>u4')]
+    for col in schema.columns:
+        if col['type'] == 'INT' or col.get('dictionary'):
+            fields.append((col['name'], '>i4'))
+        else:
+            fields.append((col['name'], f"S{get_type_size(col['type'], col.get('length', 0))}"))
+    return np.dtype(fields)
+
+
+class ColumnBatch:
+    """
+    一批记录的列式视图；NULL 以全 0 字节存储，对应整数 0 或空字节串。
+    字典列是编码，dictionaries（列名 -> 按编码排列的取值）给出时转换为 Python 值会还原为字符串
+    """
+
+    def __init__(self, schema: Schema, records, dictionaries: Optional[Dict[str, Sequence[str]]] = None):
+        self.schema = schema
+        self.records = records
+        self.dictionaries = dictionaries or {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, name: str):
+        return self.records[name]
+
+    def null_mask(self, name: str):
+        values = self.records[name]
+        return values == (b'' if values.dtype.kind == 'S' else 0)
+
+    def filter(self, mask) -> 'ColumnBatch':
+        return ColumnBatch(self.schema, self.records[mask], self.dictionaries)
+
+    def column_values(self, name: str) -> List[Any]:
+        """把一列转换为 Python 值列表，NULL 为 None"""
+        values = self.records[name].tolist()
+        if self.records[name].dtype.kind == 'S':
+            values = [value.decode('utf-8', errors='ignore') if value else None for value in values]
+        elif name in self.dictionaries:
+            strings = self.dictionaries[name]
+            values = [strings[value - 1] if 0 < value <= len(strings) else None for value in values]
+        else:
+            values = [value if value else None for value in values]
+        return values
+
+    def to_rows(self, col_indexes: Optional[List[int]] = None) -> List[List[Any]]:
+        """转换回行格式，col_indexes 为投影列下标"""
+        columns = self.schema.columns if col_indexes is None else [self.schema.columns[i] for i in col_indexes]
+        if not columns:
+            return [[] for _ in range(len(self))]
+        return [list(row) for row in zip(*(self.column_values(col['name']) for col in columns))]
+
+
+def _visible(xmin, xmax, snapshot: Snapshot):
+    return (xmin > 0) & (xmin <= snapshot.xid) & ((xmax == 0) | (xmax > snapshot.xid))
+
+
+def decode_batch(schema: Schema, data: bytes, snapshot: Optional[Snapshot], dtype=None,
+                 dictionaries: Optional[Dict[str, Sequence[str]]] = None) -> ColumnBatch:
+    """解码连续存放的记录，版本化表只保留对快照可见的版本"""
+    records = np.frombuffer(data, dtype=dtype if dtype is not None else record_dtype(schema))
+    if schema.versioned:
+        records = records[_visible(records[XMIN_FIELD], records[XMAX_FIELD], snapshot)]
+    return ColumnBatch(schema, records, dictionaries)
+
+
+class ColumnArrays:
+    """
+    列式表的一批记录：每列一个独立的数组，免去拼成结构化数组的复制；
+    按列名取列和按布尔数组筛选的用法与结构化数组相同
+    """
+
+    def __init__(self, arrays: Dict[str, Any], count: int):
+        self.arrays = arrays
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.arrays[key]
+        return ColumnArrays({name: values[key] for name, values in self.arrays.items()},
+                            int(np.count_nonzero(key)))
+
+
+def decode_columns(schema: Schema, header: Optional[bytes], columns: Dict[str, bytes],
+                   snapshot: Optional[Snapshot], dtype=None,
+                   dictionaries: Optional[Dict[str, Sequence[str]]] = None) -> ColumnBatch:
+    """
+    解码列式表按列存放的数据：header 为连续的版本头，columns 为 列名 -> 该列连续的取值，
+    批次只包含给出的列，版本化表只保留对快照可见的版本
+    """
+    dtype = dtype if dtype is not None else record_dtype(schema)
+    arrays = {name: np.frombuffer(data, dtype=dtype[name]) for name, data in columns.items()}
+    if header is None:
+        return ColumnBatch(schema, ColumnArrays(arrays, len(next(iter(arrays.values())))), dictionaries)
+    versions = np.frombuffer(header, dtype=np.dtype([(XMIN_FIELD, '>u4'), (XMAX_FIELD, '>u4')]))
+    records = ColumnArrays(arrays, len(versions))
+    return ColumnBatch(schema, records[_visible(versions[XMIN_FIELD], versions[XMAX_FIELD], snapshot)],
+                       dictionaries)
+
+
+def can_vectorize(condition, schema: Schema) -> bool:
+    """条件是否只由列、常量、比较和 AND / OR 组成"""
+    if not supports_schema(schema):
+        return False
+    if condition is None:
+        return True
+    if not isinstance(condition, BinaryOpExpr):
+        return False
+    if condition.op in ('AND', 'OR'):
+        return can_vectorize(condition.left, schema) and can_vectorize(condition.right, schema)
+    if condition.op == 'IN':
+        return (isinstance(condition.left, ColumnRef) and schema.get_column_index(condition.left.name) != -1
+                and all(isinstance(item, Constant) for item in condition.right.items))
+    if condition.op not in _COMPARISONS:
+        return False
+    return all(isinstance(operand, Constant)
+               or (isinstance(operand, ColumnRef) and schema.get_column_index(operand.name) != -1)
+               for operand in (condition.left, condition.right))
+
+
+def _operand(expr, batch: ColumnBatch):
+    """返回 (值或数组, NULL 标记或标记数组, 类别)，类别为 'S'（字符串）或 'n'（数值）"""
+    if isinstance(expr, ColumnRef):
+        values = batch.column(expr.name)
+        return values, batch.null_mask(expr.name), 'S' if values.dtype.kind == 'S' else 'n'
+    value = expr.value
+    if value is None:
+        return None, True, None
+    if isinstance(value, str):
+        return value.encode('utf-8'), False, 'S'
+    return value, False, 'n'
+
+
+def condition_mask(condition, batch: ColumnBatch):
+    """对整批记录求 WHERE 条件，返回布尔数组；语义与逐行求值相同（与 NULL 比较为假）"""
+    if condition is None:
+        return None
+    if condition.op in ('AND', 'OR'):
+        left = condition_mask(condition.left, batch)
+        right = condition_mask(condition.right, batch)
+        return left & right if condition.op == 'AND' else left | right
+    if condition.op == 'IN':
+        # 等于列表中任一常量
+        mask = np.zeros(len(batch), dtype=bool)
+        for item in condition.right.items:
+            mask |= condition_mask(BinaryOpExpr(condition.left, '=', item), batch)
+        return mask
+
+    left, left_null, left_kind = _operand(condition.left, batch)
+    right, right_null, right_kind = _operand(condition.right, batch)
+    valid = ~np.broadcast_to(np.logical_or(left_null, right_null), (len(batch),))
+    if left_kind is None or right_kind is None:
+        return np.zeros(len(batch), dtype=bool)
+    if left_kind != right_kind:
+        # 整数与字符串：不相等恒为真，其余比较恒为假
+        return valid if condition.op in ('!=', '<>') else np.zeros(len(batch), dtype=bool)
+    result = np.broadcast_to(_COMPARISONS[condition.op](left, right), (len(batch),))
+    return result & valid
+
+
+def aggregate_states(batch: ColumnBatch, aggregates: Sequence[agg.Aggregate], mask=None) -> List[Any]:
+    """整批计算部分聚合状态，结果与逐行 accumulate 相同，可用 merge_states 合并"""
+    states = agg.init_states(aggregates)
+    for i, (func, column) in enumerate(aggregates):
+        if column == '*':
+            states[i] = len(batch) if mask is None else int(np.count_nonzero(mask))
+            continue
+        valid = ~batch.null_mask(column)
+        if mask is not None:
+            valid &= mask
+        values = batch.column(column)[valid]
+        if not len(values):
+            continue
+        if func == 'COUNT':
+            states[i] = len(values)
+        elif func == 'SUM':
+            states[i] = int(values.sum(dtype=np.int64))
+        elif func == 'AVG':
+            states[i] = [int(values.sum(dtype=np.int64)), len(values)]
+        elif values.dtype.kind == 'S':
+            # UTF-8 字节序与字符序一致，直接比较字节串
+            value = min(values.tolist()) if func == 'MIN' else max(values.tolist())
+            states[i] = value.decode('utf-8', errors='ignore')
+        else:
+            states[i] = int(values.min() if func == 'MIN' else values.max())
+    return states
@@ -0,0 +1,203 @@
+"""
+区域映射（zone map）：记录表中每页各列的最小值和最大值，
+带范围条件的扫描先查区域映射，跳过不可能有匹配记录的页，这些页既不读盘也不进缓冲池。
+
+区域只会扩大不会缩小，删除、清理后仍是页内真实取值范围的超集，因此跳页总是安全的。
+区域映射在检查点（flush / 关闭数据库）时保存为数据目录下的 <表名>.zmap，
+保存后第一次修改会先删除该文件，异常退出后文件缺失，下次使用时扫描全表重建。
+Bloom 过滤器（bloom.py）沿用同样的保存与重建方式。
+"""
+import json
+import os
+import threading
+from typing import Any, List, Optional, Sequence
+from sql_compiler.catalog import Schema
+from sql_compiler.parser import BinaryOpExpr, ColumnRef, Constant
+
+ZONE_MAP_SUFFIX = '.zmap'
+
+# 交换比较两侧时对应的运算符：5 < col 等价于 col > 5
+_FLIPPED = {'=': '=', '!=': '!=', '<>': '<>', '<': '>', '>': '<', '<=': '>=', '>=': '<='}
+
+
+def stored_value(value: Any, col_def: dict) -> Any:
+    """值写入表文件后再读出的结果：VARCHAR 按字节长度截断，空串与 NULL 一样存为全 0"""
+    if isinstance(value, str) and col_def['type'] == 'VARCHAR':
+        length = col_def.get('length', 255)
+        if len(value) * 4 > length:
+            encoded = value.encode('utf-8')
+            if len(encoded) > length:
+                value = encoded[:length].rstrip(b'\x00').decode('utf-8', errors='ignore')
+        return value or None
+    return value
+
+
+def _comparison_may_match(op: str, bounds: Optional[list], value: Any) -> bool:
+    """取值范围为 bounds 的列中是否可能有值满足 列 op value"""
+    if value is None or bounds is None:
+        # 与 NULL 比较为假；整页该列都是 NULL
+        return False
+    low, high = bounds
+    try:
+        if op == '=':
+            return low <= value <= high
+        if op in ('!=', '<>'):
+            return not (low == high == value)
+        if op == '<':
+            return low < value
+        if op == '<=':
+            return low <= value
+        if op == '>':
+            return high > value
+        if op == '>=':
+            return high >= value
+    except TypeError:
+        # 类型不可比较时交给逐行求值
+        return True
+    return True
+
+
+def zone_may_match(condition, zone: Optional[List[Optional[list]]], schema: Schema) -> bool:
+    """页的区域是否可能满足条件；无法判断的条件视为可能满足"""
+    if zone is None or not isinstance(condition, BinaryOpExpr):
+        return True
+    if condition.op == 'AND':
+        return zone_may_match(condition.left, zone, schema) and zone_may_match(condition.right, zone, schema)
+    if condition.op == 'OR':
+        return zone_may_match(condition.left, zone, schema) or zone_may_match(condition.right, zone, schema)
+    if condition.op == 'IN':
+        return any(zone_may_match(BinaryOpExpr(condition.left, '=', item), zone, schema)
+                   for item in condition.right.items)
+    if condition.op not in _FLIPPED:
+        return True
+
+    column, constant, op = condition.left, condition.right, condition.op
+    if isinstance(column, Constant) and isinstance(constant, ColumnRef):
+        column, constant, op = constant, column, _FLIPPED[op]
+    if not (isinstance(column, ColumnRef) and isinstance(constant, Constant)):
+        return True
+    col_index = schema.get_column_index(column.name)
+    if col_index == -1:
+        return True
+    return _comparison_may_match(op, zone[col_index], constant.value)
+
+
+class PageSummary:
+    """
+    按页维护、在检查点保存的辅助结构（区域映射、Bloom 过滤器）的公共部分：
+    保存后第一次修改时删除磁盘文件，加载时校验页数，不一致则由调用方扫描全表重建
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        # 磁盘上的文件与内存中的结构一致
+        self.saved = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_file(path: str, page_count: int) -> Optional[dict]:
+        """读取保存的文件；缺失、损坏或页数与表文件不一致时返回 None"""
+        if path is None:
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('page_count') != page_count:
+            return None
+        return data
+
+    def save(self, page_count: int):
+        with self._lock:
+            # 内存表的辅助结构不保存（path 为 None）
+            if self.saved or self.path is None:
+                return
+            data = self._dump(page_count)
+            data['page_count'] = page_count
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            self.saved = True
+
+    def _dump(self, page_count: int) -> dict:
+        raise NotImplementedError
+
+    def _mark_dirty(self):
+        if self.saved:
+            self.saved = False
+            self.remove_file()
+
+    def remove_file(self):
+        if self.path is None:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ZoneMap(PageSummary):
+    """
+    一张表的区域映射。zones[page_id] 为各列的 [最小值, 最大值]，
+    该列在页内没有非 NULL 值时为 None；整页为 None 表示范围未知（总是扫描）
+    """
+
+    def __init__(self, path: str, num_columns: int, zones: Optional[list] = None):
+        super().__init__(path)
+        self.num_columns = num_columns
+        self.zones: List[Optional[List[Optional[list]]]] = zones if zones is not None else []
+
+    @classmethod
+    def load(cls, path: str, num_columns: int, page_count: int) -> Optional['ZoneMap']:
+        """加载区域映射；文件缺失、损坏或页数与表文件不一致时返回 None"""
+        data = cls.read_file(path, page_count)
+        zones = data.get('zones') if data else None
+        if not isinstance(zones, list) or len(zones) != page_count:
+            return None
+        zone_map = cls(path, num_columns, zones)
+        zone_map.saved = True
+        return zone_map
+
+    def _dump(self, page_count: int) -> dict:
+        # 没有登记范围的页（如被中断的写入分配的页）记为范围未知
+        del self.zones[page_count:]
+        self.zones.extend([None] * (page_count - len(self.zones)))
+        return {'zones': self.zones}
+
+    def widen(self, page_id: int, rows: Sequence[Sequence[Any]], columns: Sequence[dict]):
+        """把写入 page_id 的记录并入该页的区域"""
+        if not rows:
+            return
+        with self._lock:
+            self._mark_dirty()
+            while len(self.zones) <= page_id:
+                # 新分配的页
+                self.zones.append([None] * self.num_columns)
+            zone = self.zones[page_id]
+            if zone is None:
+                return
+            for i, col_def in enumerate(columns):
+                values = [value for value in (stored_value(row[i], col_def) for row in rows) if value is not None]
+                if not values:
+                    continue
+                low, high = min(values), max(values)
+                if zone[i] is not None:
+                    low, high = min(low, zone[i][0]), max(high, zone[i][1])
+                zone[i] = [low, high]
+
+    def truncate(self, page_count: int):
+        """表文件截断到 page_count 页"""
+        with self._lock:
+            if len(self.zones) > page_count:
+                self._mark_dirty()
+                del self.zones[page_count:]
+
+    def candidate_pages(self, condition, schema: Schema, page_count: int) -> List[int]:
+        """可能有记录满足条件的页号（递增）"""
+        with self._lock:
+            zones = self.zones[:page_count]
+        pages = [page_id for page_id, zone in enumerate(zones) if zone_may_match(condition, zone, schema)]
+        pages.extend(range(len(zones), page_count))
+        return pages
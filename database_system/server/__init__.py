@@ -0,0 +1,2 @@
+from .server import DatabaseServer
+from .client import connect, ConnectionPool
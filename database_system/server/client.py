@@ -0,0 +1,345 @@
+"""
+服务器客户端库：DB-API 风格的远程连接与线程安全的连接池
+
+    from server.client import ConnectionPool
+
+    pool = ConnectionPool('127.0.0.1:5544', max_size=16)
+    with pool.connection() as conn:
+        rows = conn.execute("SELECT * FROM users WHERE id = ?", [1]).fetchall()
+"""
+import contextlib
+import queue
+import socket
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from engine import dbapi
+from sql_compiler.prepared import Params
+from .protocol import send_message, recv_message, ProtocolError, DEFAULT_FETCH_SIZE
+from .server import DEFAULT_HOST, DEFAULT_PORT
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: Address) -> Tuple[int, Any]:
+    """解析服务器地址：'host:port'、('host', port) 或 Unix 套接字路径（可带 unix: 前缀）"""
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    if '/' in address or address.endswith('.sock'):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(':')
+    if not host:
+        return socket.AF_INET, (port or DEFAULT_HOST, DEFAULT_PORT)
+    return socket.AF_INET, (host, int(port))
+
+
+class ClientCursor:
+    """远程游标：SELECT 结果按批从服务器拉取"""
+
+    def __init__(self, connection: 'ClientConnection'):
+        self.connection = connection
+        self.arraysize = 1
+        self.fetch_size = connection.fetch_size
+        self.description = None
+        self.rowcount = -1
+        self._rows: List[tuple] = []
+        self._position = 0
+        self._cursor_id: Optional[int] = None
+        self._has_result = False
+        self._closed = False
+
+    def _check_open(self):
+        if self._closed:
+            raise dbapi.InterfaceError("Cursor is closed")
+
+    def _reset(self):
+        if self._cursor_id is not None and not self.connection.closed:
+            self.connection._request({'op': 'close_cursor', 'cursor': self._cursor_id})
+        self._cursor_id = None
+        self._rows = []
+        self._position = 0
+        self._has_result = False
+        self.description = None
+        self.rowcount = -1
+
+    def _load(self, response: Dict[str, Any]):
+        self._rows = [tuple(row) for row in response.get('rows', [])]
+        self._position = 0
+        self._cursor_id = response.get('cursor')
+
+    def execute(self, operation: str, parameters: Params = None) -> 'ClientCursor':
+        self._check_open()
+        self._reset()
+        if isinstance(parameters, tuple):
+            parameters = list(parameters)
+        response = self.connection._request({
+            'op': 'execute', 'sql': operation, 'params': parameters, 'size': self.fetch_size})
+        if 'description' in response:
+            self.description = tuple(tuple(col) for col in response['description'])
+            self._has_result = True
+            self._load(response)
+        else:
+            self.rowcount = response.get('rowcount', -1)
+        return self
+
+    def executemany(self, operation: str, seq_of_parameters: Sequence[Params]) -> 'ClientCursor':
+        self._check_open()
+        self._reset()
+        seq = [list(p) if isinstance(p, tuple) else p for p in seq_of_parameters]
+        response = self.connection._request({'op': 'executemany', 'sql': operation, 'seq': seq})
+        self.rowcount = response.get('rowcount', -1)
+        return self
+
+    def fetchone(self) -> Optional[tuple]:
+        self._check_open()
+        if not self._has_result:
+            raise dbapi.ProgrammingError("No result set to fetch from")
+        if self._position >= len(self._rows):
+            if self._cursor_id is None:
+                return None
+            self._load(self.connection._request(
+                {'op': 'fetch', 'cursor': self._cursor_id, 'size': self.fetch_size}))
+            if not self._rows:
+                return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        size = self.arraysize if size is None else size
+        rows = []
+        for _ in range(size):
+            row = self.fetchone()
+            if row is None:
+                break
+            rows.append(row)
+        return rows
+
+    def fetchall(self) -> List[tuple]:
+        rows = []
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return rows
+            rows.append(row)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return self
+
+    def __next__(self) -> tuple:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def setoutputsize(self, size, column=None):
+        pass
+
+    def close(self):
+        if not self._closed:
+            self._reset()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ClientConnection:
+    """到服务器的一个连接（对应服务器上的一个会话），不能跨线程共享"""
+
+    Error = dbapi.Error
+    InterfaceError = dbapi.InterfaceError
+    DatabaseError = dbapi.DatabaseError
+    OperationalError = dbapi.OperationalError
+    ProgrammingError = dbapi.ProgrammingError
+    NotSupportedError = dbapi.NotSupportedError
+
+    def __init__(self, address: Address = (DEFAULT_HOST, DEFAULT_PORT), timeout: Optional[float] = None,
+                 fetch_size: int = DEFAULT_FETCH_SIZE):
+        self.address = address
+        self.fetch_size = fetch_size
+        family, target = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(target)
+        except OSError as e:
+            self._sock.close()
+            raise dbapi.OperationalError(f"Cannot connect to {address}: {e}") from e
+        if family == socket.AF_INET:
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.closed = False
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if self.closed:
+            raise dbapi.InterfaceError("Connection is closed")
+        try:
+            send_message(self._sock, message)
+            response = recv_message(self._sock)
+        except (OSError, ProtocolError, ValueError) as e:
+            self._abort()
+            raise dbapi.OperationalError(f"Connection to server lost: {e}") from e
+        if response is None:
+            self._abort()
+            raise dbapi.OperationalError("Connection closed by server")
+        if not response.get('ok'):
+            error = response.get('error', {})
+            error_class = getattr(dbapi, error.get('type', ''), None)
+            if not (isinstance(error_class, type) and issubclass(error_class, dbapi.Error)):
+                error_class = dbapi.DatabaseError
+            raise error_class(error.get('message', 'Unknown server error'))
+        return response
+
+    def _abort(self):
+        self.closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def cursor(self) -> ClientCursor:
+        if self.closed:
+            raise dbapi.InterfaceError("Connection is closed")
+        return ClientCursor(self)
+
+    def execute(self, operation: str, parameters: Params = None) -> ClientCursor:
+        """非标准的便捷方法：创建游标并执行"""
+        return self.cursor().execute(operation, parameters)
+
+    def ping(self) -> bool:
+        try:
+            self._request({'op': 'ping'})
+            return True
+        except dbapi.Error:
+            return False
+
+    def reset(self):
+        """关闭服务端所有未读完的游标，并回滚未提交的事务"""
+        self._request({'op': 'reset'})
+
+    def commit(self):
+        self._request({'op': 'commit'})
+
+    def rollback(self):
+        self._request({'op': 'rollback'})
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            send_message(self._sock, {'op': 'close'})
+        except OSError:
+            pass
+        self._abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+
+def connect(address: Address = (DEFAULT_HOST, DEFAULT_PORT), **kwargs) -> ClientConnection:
+    return ClientConnection(address, **kwargs)
+
+
+class ConnectionPool:
+    """线程安全的连接池：连接按需创建，最多 max_size 个，归还时复用"""
+
+    def __init__(self, address: Address = (DEFAULT_HOST, DEFAULT_PORT), min_size: int = 0,
+                 max_size: int = 10, timeout: float = 30.0, **connect_kwargs):
+        if max_size <= 0 or min_size > max_size:
+            raise ValueError("Invalid pool size")
+        self.address = address
+        self.max_size = max_size
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+        self._idle: 'queue.LifoQueue[ClientConnection]' = queue.LifoQueue()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(min_size):
+            self._idle.put(self._create())
+
+    def _create(self) -> ClientConnection:
+        with self._lock:
+            self._size += 1
+        try:
+            return ClientConnection(self.address, **self.connect_kwargs)
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+
+    def _discard(self, conn: ClientConnection):
+        conn.close()
+        with self._lock:
+            self._size -= 1
+
+    def acquire(self, timeout: Optional[float] = None) -> ClientConnection:
+        """取出一个连接；池已满时等待其他线程归还，超时抛出 OperationalError"""
+        if self._closed:
+            raise dbapi.InterfaceError("Connection pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._size < self.max_size
+                if can_create:
+                    return self._create()
+                try:
+                    conn = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise dbapi.OperationalError(
+                        f"No connection available within {timeout}s (max_size={self.max_size})")
+            if not conn.closed:
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: ClientConnection):
+        """归还连接：先关闭服务端游标，失效的连接直接丢弃"""
+        if self._closed or conn.closed:
+            self._discard(conn)
+            return
+        try:
+            conn.reset()
+        except dbapi.Error:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[ClientConnection]:
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'size': self._size, 'idle': self._idle.qsize(), 'max_size': self.max_size}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+数据库服务器启动入口
+"""
+
+import os
+import sys
+import argparse
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.database import Database
+from server.server import DatabaseServer, DEFAULT_HOST, DEFAULT_PORT
+from server.protocol import DEFAULT_FETCH_SIZE
+from utils.config import load_config, format_size
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    arg_parser = argparse.ArgumentParser(description="LearnDB 数据库服务器")
+    arg_parser.add_argument('--config', help="配置文件路径（JSON）")
+    arg_parser.add_argument('--data-dir', dest='data_dir', help="数据目录")
+    arg_parser.add_argument('--buffer-pool-size', dest='buffer_pool_size',
+                            help="缓冲池内存预算，如 400KB、64MB")
+    arg_parser.add_argument('--host', default=DEFAULT_HOST, help="监听地址（仅限本机）")
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    arg_parser.add_argument('--socket', help="改为监听 Unix 套接字路径")
+    arg_parser.add_argument('--fetch-size', dest='fetch_size', type=int, default=DEFAULT_FETCH_SIZE,
+                            help="SELECT 每批返回的行数")
+    return arg_parser.parse_args(argv)
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    print("🚀 正在启动 LearnDB 数据库服务器...")
+
+    try:
+        config = load_config(args.config, {
+            'data_dir': args.data_dir,
+            'buffer_pool_size': args.buffer_pool_size,
+        })
+        database = Database(config)
+    except Exception as e:
+        print(f"❌ 数据库初始化失败: {e}")
+        sys.exit(1)
+
+    try:
+        server = DatabaseServer(database, args.host, args.port, args.socket, args.fetch_size)
+    except Exception as e:
+        print(f"❌ 无法监听: {e}")
+        database.close()
+        sys.exit(1)
+
+    print(f"📁 数据目录: {os.path.abspath(database.data_dir)}")
+    print(f"💾 缓冲池大小: {database.buffer_pool.capacity} 页 "
+          f"({format_size(database.buffer_pool.memory_budget)})")
+    address = server.address
+    print(f"🔌 正在监听: {address if isinstance(address, str) else '%s:%d' % address}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 用户中断，正在退出...")
+    finally:
+        server.stop()
+        database.close()
+        print("✅ 服务器已安全关闭")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+客户端/服务器之间的帧协议：每帧为 4 字节大端长度 + UTF-8 编码的 JSON 消息
+
+请求:  {"op": "execute", "sql": "...", "params": [...] | {...}}
+       {"op": "executemany", "sql": "...", "seq": [[...], ...]}
+       {"op": "fetch", "cursor": 1, "size": 1000}
+       {"op": "close_cursor", "cursor": 1}
+       {"op": "commit"} / {"op": "rollback"} / {"op": "reset"} / {"op": "ping"} / {"op": "close"}
+响应:  {"ok": true, ...} 或 {"ok": false, "error": {"type": "ProgrammingError", "message": "..."}}
+"""
+import json
+import socket
+import struct
+from typing import Any, Dict, Optional
+
+FRAME_HEADER = struct.Struct('>I')
+# 单帧最大长度，防止异常长度导致分配过多内存
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+# SELECT 每批返回的行数
+DEFAULT_FETCH_SIZE = 1000
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """读取恰好 size 字节，连接在帧边界关闭时返回 None"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ProtocolError("Connection closed in the middle of a frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]):
+    payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Message too large: {len(payload)} bytes")
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """接收一条消息，对端正常关闭连接时返回 None"""
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    payload = _recv_exact(sock, length) if length else b''
+    if payload is None:
+        raise ProtocolError("Connection closed in the middle of a frame")
+    return json.loads(payload.decode('utf-8'))
@@ -0,0 +1,220 @@
+"""
+多客户端服务器：所有会话共享同一个数据库实例（存储引擎、缓冲池、目录）
+"""
+import itertools
+import os
+import socketserver
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+from engine.database import Database
+from engine.dbapi import Connection, Cursor, _translate_error
+from .protocol import send_message, recv_message, ProtocolError, DEFAULT_FETCH_SIZE
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5544
+
+
+def _to_json(value: Any) -> Any:
+    """把执行结果转换为可JSON序列化的值"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return str(value)
+
+
+class Session:
+    """一个客户端会话：持有一个 DB-API 连接以及尚未读完的服务端游标"""
+
+    def __init__(self, database: Database, fetch_size: int = DEFAULT_FETCH_SIZE):
+        self.connection = Connection(database.acquire())
+        self.fetch_size = fetch_size
+        self.cursors: Dict[int, Cursor] = {}
+        self._cursor_ids = itertools.count(1)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get('op')
+        try:
+            handler = getattr(self, f"_op_{op}", None)
+            if handler is None:
+                raise ProtocolError(f"Unknown operation: {op}")
+            response = handler(request)
+            response['ok'] = True
+            return response
+        except Exception as e:
+            error = e if isinstance(e, ProtocolError) else _translate_error(e)
+            name = 'InterfaceError' if isinstance(e, ProtocolError) else type(error).__name__
+            return {'ok': False, 'error': {'type': name, 'message': str(e)}}
+
+    def _op_ping(self, request):
+        return {}
+
+    def _op_execute(self, request):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(request['sql'], request.get('params'))
+        except Exception:
+            # 执行失败的游标不会再被使用，立即关闭
+            cursor.close()
+            raise
+        # 关闭游标会清空 description 和 rowcount，须先读出
+        description, rowcount = cursor.description, cursor.rowcount
+        if description is None:
+            cursor.close()
+            return {'rowcount': rowcount}
+        cursor_id = next(self._cursor_ids)
+        self.cursors[cursor_id] = cursor
+        response = self._fetch(cursor_id, request.get('size'))
+        response['description'] = [list(col) for col in description]
+        return response
+
+    def _op_executemany(self, request):
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(request['sql'], request.get('seq') or [])
+            return {'rowcount': cursor.rowcount}
+        finally:
+            cursor.close()
+
+    def _op_fetch(self, request):
+        return self._fetch(request['cursor'], request.get('size'))
+
+    def _fetch(self, cursor_id: int, size: Optional[int]) -> Dict[str, Any]:
+        cursor = self.cursors.get(cursor_id)
+        if cursor is None:
+            raise ProtocolError(f"Unknown cursor: {cursor_id}")
+        size = size or self.fetch_size
+        rows = cursor.fetchmany(size)
+        more = len(rows) == size
+        if not more:
+            self.cursors.pop(cursor_id).close()
+        return {'cursor': cursor_id if more else None, 'rows': _to_json(rows)}
+
+    def _op_close_cursor(self, request):
+        cursor = self.cursors.pop(request['cursor'], None)
+        if cursor is not None:
+            cursor.close()
+        return {}
+
+    def _op_reset(self, request):
+        """关闭所有服务端游标并回滚未提交的事务，连接归还连接池时调用"""
+        self._close_cursors()
+        self.connection.rollback()
+        return {}
+
+    def _op_commit(self, request):
+        self.connection.commit()
+        return {}
+
+    def _op_rollback(self, request):
+        self.connection.rollback()
+        return {}
+
+    def _close_cursors(self):
+        for cursor in self.cursors.values():
+            cursor.close()
+        self.cursors.clear()
+
+    def close(self):
+        self._close_cursors()
+        self.connection.close()
+
+
+class SessionHandler(socketserver.BaseRequestHandler):
+    """每个客户端连接由一个线程处理"""
+
+    def handle(self):
+        server: 'DatabaseServer' = self.server.owner
+        session = Session(server.database, server.fetch_size)
+        server._session_started()
+        try:
+            while True:
+                try:
+                    request = recv_message(self.request)
+                except (ProtocolError, ValueError, OSError):
+                    break
+                if request is None or request.get('op') == 'close':
+                    break
+                send_message(self.request, session.handle(request))
+        except OSError:
+            pass
+        finally:
+            session.close()
+            server._session_ended()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _ThreadingUnixServer = None
+
+
+class DatabaseServer:
+    """监听 Unix 套接字或本机 TCP 端口，为每个客户端创建一个会话"""
+
+    def __init__(self, database: Database, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 socket_path: Optional[str] = None, fetch_size: int = DEFAULT_FETCH_SIZE):
+        self.database = database
+        self.fetch_size = fetch_size
+        self.socket_path = socket_path
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self._sessions_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        if socket_path:
+            if _ThreadingUnixServer is None:
+                raise ValueError("Unix sockets are not supported on this platform")
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self._server = _ThreadingUnixServer(socket_path, SessionHandler)
+        else:
+            self._server = _ThreadingTCPServer((host, port), SessionHandler)
+        self._server.owner = self
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        if self.socket_path:
+            return self.socket_path
+        return self._server.server_address[:2]
+
+    def _session_started(self):
+        with self._sessions_lock:
+            self.active_sessions += 1
+            self.total_sessions += 1
+
+    def _session_ended(self):
+        with self._sessions_lock:
+            self.active_sessions -= 1
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """在后台线程中运行服务器"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'address': self.address,
+            'active_sessions': self.active_sessions,
+            'total_sessions': self.total_sessions,
+        }
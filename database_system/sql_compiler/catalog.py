@@ -4,12 +4,64 @@ from typing import Dict, List, Optional
 from utils.constants import *
 
 
+def partition_table_name(table_name: str, partition_name: str) -> str:
+    """分区的物理表名（数据文件为 <表名>$<分区名>.dat）"""
+    return f"{table_name}{PARTITION_SEPARATOR}{partition_name}"
+
+
 class Schema:
-    def __init__(self, table_name: str, columns: List[Dict], primary_key: str = None):
+    def __init__(self, table_name: str, columns: List[Dict], primary_key: str = None,
+                 versioned: bool = False, stats: Optional[Dict] = None, storage_format: str = 'row',
+                 compression: Optional[str] = None, view: Optional[Dict] = None,
+                 partition: Optional[Dict] = None, tablespace: Optional[str] = None, engine: str = 'disk'):
         self.table_name = table_name
         self.columns = columns
         self.primary_key = primary_key
+        # 版本化表的记录带 MVCC 版本头（xmin/xmax），旧版本创建的表没有
+        self.versioned = versioned
+        # ANALYZE 收集的统计信息：行数、页数及各列的不同值数和 NULL 数
+        self.stats = stats
+        # 页内记录布局：'row' 行式，'columnar' 列式（PAX，每页按列划分小页）
+        self.storage_format = storage_format
+        # 页压缩编码（zlib / lz4），None 表示不压缩
+        self.compression = compression
+        # 物化视图的定义 {'base': 基表名, 'query': 定义查询}，普通表为 None
+        self.view = view
+        # 分区方式 {'method': 'RANGE' / 'HASH', 'column': 分区列, 'partitions': [{'name', 'bound'}, ...]}，
+        # RANGE 分区的 bound 为上界（不含），None 表示 MAXVALUE；不分区的表为 None
+        self.partition = partition
+        # 表文件所在的表空间，None 表示数据目录；分区表的各分区都在该表空间中
+        self.tablespace = tablespace
+        # 存储引擎：'disk' 表文件，'memory' 页只在内存中（目录只保存表模式，重新打开后为空表）
+        self.engine = engine
         self.column_dict = {col['name']: col for col in columns}
+        self._partitions: Optional[List['Schema']] = None
+
+    @property
+    def partitions(self) -> List['Schema']:
+        """各分区的物理表模式（按分区定义的顺序），不分区的表为空列表；统计信息沿用整张表的"""
+        if self._partitions is None:
+            self._partitions = [
+                Schema(partition_table_name(self.table_name, part['name']), self.columns, self.primary_key,
+                       self.versioned, self.stats, storage_format=self.storage_format,
+                       compression=self.compression, tablespace=self.tablespace, engine=self.engine)
+                for part in (self.partition['partitions'] if self.partition else [])]
+        return self._partitions
+
+    @property
+    def physical_schemas(self) -> List['Schema']:
+        """实际存储数据的表：分区表为各分区，其余为表本身"""
+        return self.partitions if self.partition else [self]
+
+    @property
+    def bloom_columns(self) -> List[int]:
+        """声明了 Bloom 过滤器的列下标"""
+        return [i for i, col in enumerate(self.columns) if col.get('bloom_filter')]
+
+    @property
+    def dictionary_columns(self) -> List[int]:
+        """字典编码的列下标"""
+        return [i for i, col in enumerate(self.columns) if col.get('dictionary')]
 
     def get_column_index(self, column_name: str) -> int:
         for i, col in enumerate(self.columns):
@@ -22,12 +74,12 @@ class Schema:
         if not col:
             return False
 
-        if value is None and not col.get('nullable', True):
-            return False
+        if value is None:
+            return col.get('nullable', True)
 
         if col['type'] == INT_TYPE and not isinstance(value, int):
             return False
-        elif col['type'] == STRING_TYPE and not isinstance(value, str):
+        elif col['type'] in (STRING_TYPE, VARCHAR_TYPE) and not isinstance(value, str):
             return False
         elif col['type'] == FLOAT_TYPE and not isinstance(value, float):
             return False
@@ -41,6 +93,10 @@ class CatalogManager:
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
         self.schemas: Dict[str, Schema] = {}
+        # 表空间：名称 -> 目录（绝对路径）
+        self.tablespaces: Dict[str, str] = {}
+        # 模式版本号，每次 CREATE/DROP 后递增，用于使缓存的执行计划失效
+        self.version = 0
         self.load_catalog()
 
     def load_catalog(self):
@@ -54,6 +110,10 @@ class CatalogManager:
                         self.schemas[table_name] = Schema(table_name, **schema_data)
             except:
                 self.schemas = {}
+        tablespace_file = os.path.join(self.data_dir, TABLESPACE_FILE_NAME)
+        if os.path.exists(tablespace_file):
+            with open(tablespace_file, 'r') as f:
+                self.tablespaces = json.load(f)
 
     def save_catalog(self):
         """保存系统目录"""
@@ -65,20 +125,123 @@ class CatalogManager:
                 'columns': schema.columns,
                 'primary_key': schema.primary_key
             }
+            if schema.versioned:
+                catalog_data[table_name]['versioned'] = True
+            if schema.stats:
+                catalog_data[table_name]['stats'] = schema.stats
+            if schema.storage_format != 'row':
+                catalog_data[table_name]['storage_format'] = schema.storage_format
+            if schema.compression:
+                catalog_data[table_name]['compression'] = schema.compression
+            if schema.view:
+                catalog_data[table_name]['view'] = schema.view
+            if schema.partition:
+                catalog_data[table_name]['partition'] = schema.partition
+            if schema.tablespace:
+                catalog_data[table_name]['tablespace'] = schema.tablespace
+            if schema.engine != 'disk':
+                catalog_data[table_name]['engine'] = schema.engine
 
         with open(catalog_file, 'w') as f:
             json.dump(catalog_data, f, indent=2)
 
-    def create_table(self, table_name: str, columns: List[Dict], primary_key: str = None):
-        """创建新表"""
+    def create_table(self, table_name: str, columns: List[Dict], primary_key: str = None,
+                     versioned: bool = False, storage_format: str = 'row', compression: Optional[str] = None,
+                     view: Optional[Dict] = None, partition: Optional[Dict] = None,
+                     tablespace: Optional[str] = None, engine: str = 'disk'):
+        """
+        创建新表（view 给出时为物化视图，partition 给出时为分区表，tablespace 为表文件所在的表空间，
+        engine 为 'memory' 时为内存表）
+        """
         if table_name in self.schemas:
             raise ValueError(f"Table {table_name} already exists")
+        if tablespace is not None and tablespace not in self.tablespaces:
+            raise ValueError(f"Tablespace {tablespace} does not exist")
+
+        schema = Schema(table_name, columns, primary_key, versioned, storage_format=storage_format,
+                        compression=compression, view=view, partition=partition, tablespace=tablespace,
+                        engine=engine)
+        self.schemas[table_name] = schema
+        self.version += 1
+        self.save_catalog()
+        return schema
 
-        schema = Schema(table_name, columns, primary_key)
+    def drop_table(self, table_name: str) -> bool:
+        """删除表的元数据"""
+        return self.drop_tables([table_name]) == 1
+
+    def drop_tables(self, table_names: List[str]) -> int:
+        """一次删除多张表的元数据，只写一次目录文件，返回删除的表数"""
+        dropped = [name for name in table_names if self.schemas.pop(name, None) is not None]
+        if dropped:
+            self.version += 1
+            self.save_catalog()
+        return len(dropped)
+
+    def set_partition(self, table_name: str, partition: Dict) -> Schema:
+        """修改表的分区定义（增删分区），替换表模式并使缓存的执行计划失效"""
+        old = self.schemas[table_name]
+        schema = Schema(table_name, old.columns, old.primary_key, old.versioned, old.stats,
+                        storage_format=old.storage_format, compression=old.compression, view=old.view,
+                        partition=partition, tablespace=old.tablespace, engine=old.engine)
         self.schemas[table_name] = schema
+        self.version += 1
         self.save_catalog()
         return schema
 
+    def create_tablespace(self, name: str, location: str) -> str:
+        """登记表空间（目录不存在时创建），返回其目录的绝对路径"""
+        if name in self.tablespaces:
+            raise ValueError(f"Tablespace {name} already exists")
+        location = os.path.abspath(location)
+        if os.path.exists(location) and not os.path.isdir(location):
+            raise ValueError(f"Tablespace location is not a directory: {location}")
+        os.makedirs(location, exist_ok=True)
+        self.tablespaces[name] = location
+        self.save_tablespaces()
+        return location
+
+    def drop_tablespace(self, name: str):
+        """删除表空间的登记（不删除目录）；仍有表在其中时抛出 ValueError"""
+        if name not in self.tablespaces:
+            raise ValueError(f"Tablespace {name} does not exist")
+        tables = self.tables_in_tablespace(name)
+        if tables:
+            raise ValueError(f"Tablespace {name} is not empty: {', '.join(tables)}")
+        del self.tablespaces[name]
+        self.save_tablespaces()
+
+    def save_tablespaces(self):
+        """保存表空间的登记"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(os.path.join(self.data_dir, TABLESPACE_FILE_NAME), 'w') as f:
+            json.dump(self.tablespaces, f, indent=2)
+
+    def tablespace_location(self, name: Optional[str]) -> Optional[str]:
+        """表空间的目录，None（数据目录）返回 None"""
+        return self.tablespaces[name] if name is not None else None
+
+    def tables_in_tablespace(self, name: str) -> List[str]:
+        """表空间中的表"""
+        return [schema.table_name for schema in self.schemas.values() if schema.tablespace == name]
+
+    def set_stats(self, table_name: str, stats: Dict):
+        """保存 ANALYZE 收集的统计信息（不影响已缓存的执行计划）"""
+        schema = self.schemas[table_name]
+        schema.stats = stats
+        for partition in schema.partitions:
+            partition.stats = stats
+        self.save_catalog()
+
+    def views_of(self, table_name: str) -> List[Schema]:
+        """定义在表上的物化视图"""
+        return [schema for schema in self.schemas.values() if schema.view and schema.view['base'] == table_name]
+
+    def physical_schemas(self) -> Dict[str, Schema]:
+        """全部实际存储数据的表（分区表展开为各分区），按物理表名索引"""
+        return {physical.table_name: physical
+                for schema in list(self.schemas.values()) for physical in schema.physical_schemas}
+
     def get_schema(self, table_name: str) -> Optional[Schema]:
         """获取表模式"""
         return self.schemas.get(table_name)
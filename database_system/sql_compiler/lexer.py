@@ -14,10 +14,31 @@ class Token:
         return f"Token({self.type}, '{self.value}', {self.position})"
 
 
+TOKEN_SPECIFICATION = [
+    ('NUMBER', r'\d+(\.\d*)?'),  # 整数或小数
+    ('STRING', r"'(?:[^'\\]|\\.)*'"),  # 字符串
+    ('PARAM', r'\?|:[a-zA-Z_][a-zA-Z0-9_]*'),  # 参数占位符 ? 或 :name
+    ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'),  # 标识符
+    ('OP', r'<>|[=<>!]=?|\+|-|\*|\/'),  # 操作符
+    ('COMMA', r','),
+    ('LPAREN', r'\('),
+    ('RPAREN', r'\)'),
+    ('SEMI', r';'),
+    ('WS', r'\s+'),  # 空白字符
+]
+
+# 正则只在模块加载时编译一次
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION))
+LINE_COMMENT_REGEX = re.compile(r'--.*?$', re.MULTILINE)
+BLOCK_COMMENT_REGEX = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+
 class Lexer:
     def __init__(self):
         self.tokens = []
         self.position = 0
+        # 去掉注释后的语句文本，token 的 position 是其中的偏移
+        self.source = ''
 
     def tokenize(self, sql: str) -> List[Token]:
         """将SQL语句转换为token序列"""
@@ -26,24 +47,11 @@ class Lexer:
         sql = sql.strip()
 
         # 移除SQL注释
-        sql = re.sub(r'--.*?$', '', sql, flags=re.MULTILINE)  # 单行注释
-        sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)  # 多行注释
-
-        token_specification = [
-            ('NUMBER', r'\d+(\.\d*)?'),  # 整数或小数
-            ('STRING', r"'(?:[^'\\]|\\.)*'"),  # 字符串
-            ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'),  # 标识符
-            ('OP', r'[=<>!]=?|<>|\+|-|\*|\/'),  # 操作符
-            ('COMMA', r','),
-            ('LPAREN', r'\('),
-            ('RPAREN', r'\)'),
-            ('SEMI', r';'),
-            ('WS', r'\s+'),  # 空白字符
-        ]
-
-        tok_regex = '|'.join(f'(?P<{pair[0]}>{pair[1]})' for pair in token_specification)
-
-        for mo in re.finditer(tok_regex, sql):
+        sql = LINE_COMMENT_REGEX.sub('', sql)  # 单行注释
+        sql = BLOCK_COMMENT_REGEX.sub('', sql)  # 多行注释
+        self.source = sql
+
+        for mo in TOKEN_REGEX.finditer(sql):
             kind = mo.lastgroup
             value = mo.group()
 
@@ -58,4 +66,4 @@ class Lexer:
             self.tokens.append(Token(kind, value, mo.start()))
 
         self.tokens.append(Token('EOF', '', len(sql)))
-        return self.tokens
\ No newline at end of file
+        return self.tokens
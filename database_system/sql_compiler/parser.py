@@ -9,27 +9,114 @@ class ASTNode:
 
 
 class SelectStmt(ASTNode):
-    def __init__(self, columns: List[str], table_name: str, where_clause=None):
+    def __init__(self, columns: List[str], table_name: str, where_clause=None, aggregates: List[Any] = None,
+                 group_by: List[str] = None):
         self.columns = columns
         self.table_name = table_name
         self.where_clause = where_clause
+        # 选择列表中的聚合函数 [(函数名, 列名), ...]
+        self.aggregates = aggregates or []
+        # GROUP BY 的列名
+        self.group_by = group_by or []
 
 class DropTableStmt(ASTNode):
-    def __init__(self, table_name: str):
+    def __init__(self, table_name: str, table_names: List[str] = None):
         self.table_name = table_name
+        # DROP TABLE a, b, ... 一次删除的全部表，table_name 为第一个
+        self.table_names = table_names or [table_name]
         self.type = 'DROP_TABLE'
 
+
+class TruncateTableStmt(ASTNode):
+    def __init__(self, table_names: List[str]):
+        self.table_name = table_names[0]
+        self.table_names = table_names
+
 class InsertStmt(ASTNode):
-    def __init__(self, table_name: str, values: List[Any]):
+    def __init__(self, table_name: str, values: List[Any], rows: List[List[Any]] = None):
         self.table_name = table_name
         self.values = values
+        # 多行 INSERT 的全部值列表，values 为第一行
+        self.rows = rows if rows is not None else [values]
+
+
+class DeleteStmt(ASTNode):
+    def __init__(self, table_name: str, where_clause=None):
+        self.table_name = table_name
+        self.where_clause = where_clause
+
+
+class UpdateStmt(ASTNode):
+    def __init__(self, table_name: str, assignments: List[Any], where_clause=None):
+        self.table_name = table_name
+        self.assignments = assignments  # [(列名, 值), ...]
+        self.where_clause = where_clause
+
+
+class VacuumStmt(ASTNode):
+    def __init__(self, table_name: str = None):
+        self.table_name = table_name  # None 表示清理所有表
+
+
+class AnalyzeStmt(ASTNode):
+    def __init__(self, table_name: str = None):
+        self.table_name = table_name  # None 表示统计所有表
+
+
+class CopyStmt(ASTNode):
+    def __init__(self, table_name: str, direction: str, file_path: str, options: Dict[str, Any] = None):
+        self.table_name = table_name
+        self.direction = direction  # 'FROM' 导入 / 'TO' 导出
+        self.file_path = file_path
+        self.options = options or {}
+
+
+class TransactionStmt(ASTNode):
+    def __init__(self, action: str):
+        self.action = action  # 'BEGIN' / 'COMMIT' / 'ROLLBACK'
 
 
 class CreateTableStmt(ASTNode):
-    def __init__(self, table_name: str, columns: List[Dict], primary_key: str = None):
+    def __init__(self, table_name: str, columns: List[Dict], primary_key: str = None,
+                 options: Dict[str, Any] = None, partition: Dict[str, Any] = None, tablespace: str = None,
+                 engine: str = None):
         self.table_name = table_name
         self.columns = columns
         self.primary_key = primary_key
+        self.options = options or {}  # WITH (...) 表选项
+        self.partition = partition  # PARTITION BY ... 分区定义，格式同 Schema.partition
+        self.tablespace = tablespace  # TABLESPACE name，None 表示数据目录
+        self.engine = engine  # 'disk' / 'memory'（ENGINE = ... 或 CREATE TEMP TABLE），None 为默认
+
+
+class CreateTablespaceStmt(ASTNode):
+    """CREATE TABLESPACE name LOCATION '/path'"""
+    def __init__(self, name: str, location: str):
+        self.name = name
+        self.location = location
+
+
+class DropTablespaceStmt(ASTNode):
+    """DROP TABLESPACE name"""
+    def __init__(self, name: str):
+        self.name = name
+
+
+class AlterTableStmt(ASTNode):
+    """ALTER TABLE t ADD PARTITION p VALUES LESS THAN (...) / ALTER TABLE t DROP PARTITION p[, ...]"""
+    def __init__(self, table_name: str, action: str, partitions: List[Dict]):
+        self.table_name = table_name
+        self.action = action  # 'ADD_PARTITION' / 'DROP_PARTITION'
+        self.partitions = partitions  # [{'name', 'bound'}, ...]，删除时只有 name
+
+
+class CreateViewStmt(ASTNode):
+    """CREATE MATERIALIZED VIEW name AS SELECT ..."""
+    def __init__(self, view_name: str, query: SelectStmt, query_sql: str):
+        self.view_name = view_name
+        self.query = query
+        # 定义查询的原文，保存在目录中，重新打开时据此重建
+        self.query_sql = query_sql
 
 
 class Expr(ASTNode):
@@ -54,11 +141,28 @@ class Constant(Expr):
         self.type = type
 
 
+class ValueList(Expr):
+    """IN 右侧的值列表，元素为 Constant 或 Parameter"""
+    def __init__(self, items: List[Expr]):
+        self.items = items
+
+
+class Parameter(Expr):
+    """参数占位符：? 按位置编号，:name 按名称绑定"""
+    def __init__(self, index: int = None, name: str = None):
+        self.index = index
+        self.name = name
+
+    def __repr__(self):
+        return f"Parameter(:{self.name})" if self.name else f"Parameter(?{self.index})"
+
+
 class Parser:
     def __init__(self, catalog: CatalogManager):
         self.catalog = catalog
         self.tokens: List[Token] = []
         self.pos = 0
+        self.parameters: List[Parameter] = []
 
     def current_token(self) -> Token:
         return self.tokens[self.pos] if self.pos < len(self.tokens) else self.tokens[-1]
@@ -72,24 +176,64 @@ class Parser:
         self.pos += 1
         return token
 
-    def parse_drop_table(self) -> DropTableStmt:
+    def parse_drop_table(self) -> ASTNode:
         """解析DROP TABLE语句"""
         self.eat('KEYWORD', 'DROP')
+        if self.current_token().value == 'TABLESPACE':
+            self.eat('KEYWORD', 'TABLESPACE')
+            stmt = DropTablespaceStmt(self.eat('ID').value)
+            if self.current_token().type == 'SEMI':
+                self.eat('SEMI')
+            return stmt
         self.eat('KEYWORD', 'TABLE')
 
-        table_name = self.current_token().value
-        self.eat('ID')
+        table_names = self.parse_table_list()
 
         if self.current_token().type == 'SEMI':
             self.eat('SEMI')
 
-        return DropTableStmt(table_name)
+        return DropTableStmt(table_names[0], table_names)
+
+    def parse_truncate_table(self) -> TruncateTableStmt:
+        """解析 TRUNCATE [TABLE] table [, ...]"""
+        self.eat('KEYWORD', 'TRUNCATE')
+        if self.current_token().value == 'TABLE':
+            self.eat('KEYWORD', 'TABLE')
+
+        table_names = self.parse_table_list()
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return TruncateTableStmt(table_names)
+
+    def parse_table_list(self) -> List[str]:
+        """解析逗号分隔的表名列表"""
+        table_names = []
+        while True:
+            table_names.append(self.current_token().value)
+            self.eat('ID')
+            if self.current_token().type != 'COMMA':
+                break
+            self.eat('COMMA')
+        return table_names
 
     def parse(self, sql: str) -> ASTNode:
         lexer = Lexer()
         self.tokens = lexer.tokenize(sql)
+        self.source = lexer.source
         self.pos = 0
+        self.parameters = []
+
+        stmt = self._parse_statement()
+        # 语句之后只能是结尾，多余的内容（如无法解析的条件）报错而不是被忽略
+        if self.current_token().type != 'EOF':
+            raise SyntaxError(f"Unexpected token: {self.current_token().value}")
+        # 记录语句中出现的参数占位符，供预编译语句绑定
+        stmt.parameters = self.parameters
+        return stmt
 
+    def _parse_statement(self) -> ASTNode:
         token = self.current_token()
         if token.type == 'KEYWORD':
             if token.value == 'SELECT':
@@ -98,16 +242,57 @@ class Parser:
                 return self.parse_insert()
             elif token.value == 'CREATE':
                 return self.parse_create_table()
+            elif token.value == 'ALTER':
+                return self.parse_alter_table()
             elif token.value == 'DROP':  # 添加DROP语句解析
                 return self.parse_drop_table()
+            elif token.value == 'TRUNCATE':
+                return self.parse_truncate_table()
+            elif token.value == 'COPY':
+                return self.parse_copy()
+            elif token.value == 'DELETE':
+                return self.parse_delete()
+            elif token.value == 'UPDATE':
+                return self.parse_update()
+            elif token.value == 'VACUUM':
+                return self.parse_vacuum()
+            elif token.value == 'ANALYZE':
+                return self.parse_analyze()
+            elif token.value in ('BEGIN', 'COMMIT', 'ROLLBACK'):
+                return self.parse_transaction()
 
         raise SyntaxError(f"Unexpected token: {token.value}")
 
+    def parse_transaction(self) -> TransactionStmt:
+        """解析 BEGIN / COMMIT / ROLLBACK [TRANSACTION | WORK]"""
+        action = self.eat('KEYWORD').value
+        token = self.current_token()
+        if token.type == 'KEYWORD' and token.value in ('TRANSACTION', 'WORK'):
+            self.eat('KEYWORD')
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+        return TransactionStmt(action)
+
+    def parse_parameter(self) -> Parameter:
+        """解析参数占位符，同一语句中不能混用 ? 与 :name"""
+        token = self.eat('PARAM')
+        if token.value == '?':
+            if any(p.name for p in self.parameters):
+                raise SyntaxError("Cannot mix positional and named parameters")
+            param = Parameter(index=len(self.parameters))
+        else:
+            if any(p.name is None for p in self.parameters):
+                raise SyntaxError("Cannot mix positional and named parameters")
+            param = Parameter(name=token.value[1:])
+        self.parameters.append(param)
+        return param
+
     def parse_select(self) -> SelectStmt:
         self.eat('KEYWORD', 'SELECT')
 
         # 解析列列表
         columns = []
+        aggregates = []
         if self.current_token().value == '*':
             self.eat('OP')  # 吃掉 * 符号
             columns = ['*']
@@ -117,7 +302,11 @@ class Parser:
                 if self.current_token().type != 'ID':
                     raise SyntaxError(f"Expected column name, got {self.current_token().type}")
                 self.eat('ID')
-                columns.append(self.tokens[self.pos - 1].value)
+                name = self.tokens[self.pos - 1].value
+                if self.current_token().type == 'LPAREN':
+                    aggregates.append(self.parse_aggregate(name))
+                else:
+                    columns.append(name)
                 if self.current_token().type != 'COMMA':
                     break
                 self.eat('COMMA')
@@ -140,10 +329,36 @@ class Parser:
             self.eat('KEYWORD', 'WHERE')
             where_clause = self.parse_condition()
 
+        group_by = []
+        if self.current_token().value == 'GROUP':
+            self.eat('KEYWORD', 'GROUP')
+            self.eat('KEYWORD', 'BY')
+            group_by = [self.eat('ID').value]
+            while self.current_token().type == 'COMMA':
+                self.eat('COMMA')
+                group_by.append(self.eat('ID').value)
+
         if self.current_token().type == 'SEMI':
             self.eat('SEMI')
 
-        return SelectStmt(columns, table_name, where_clause)
+        return SelectStmt(columns, table_name, where_clause, aggregates, group_by)
+
+    def parse_aggregate(self, func_name: str):
+        """解析聚合函数调用 FUNC(column) 或 COUNT(*)，函数名已被读取"""
+        func = func_name.upper()
+        if func not in ('COUNT', 'SUM', 'MIN', 'MAX', 'AVG'):
+            raise SyntaxError(f"Unknown function: {func_name}")
+        self.eat('LPAREN')
+        token = self.current_token()
+        if token.type == 'OP' and token.value == '*':
+            if func != 'COUNT':
+                raise SyntaxError(f"{func}(*) is not supported")
+            self.eat('OP')
+            column = '*'
+        else:
+            column = self.eat('ID').value
+        self.eat('RPAREN')
+        return func, column
 
     def parse_insert(self) -> InsertStmt:
         self.eat('KEYWORD', 'INSERT')
@@ -153,47 +368,218 @@ class Parser:
         self.eat('ID')
 
         self.eat('KEYWORD', 'VALUES')
+
+        # 支持 VALUES (...), (...), ... 多行插入
+        rows = [self.parse_value_list()]
+        while self.current_token().type == 'COMMA':
+            self.eat('COMMA')
+            rows.append(self.parse_value_list())
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return InsertStmt(table_name, rows[0], rows)
+
+    def parse_value_list(self) -> List[Any]:
+        """解析一个括号括起的值列表 (v1, v2, ...)"""
         self.eat('LPAREN')
 
         values = []
         while True:
+            values.append(self.parse_value())
+            if self.current_token().type != 'COMMA':
+                break
+            self.eat('COMMA')
+
+        self.eat('RPAREN')
+        return values
+
+    def parse_value(self) -> Any:
+        """解析一个字面量值或参数占位符"""
+        token = self.current_token()
+        if token.type == 'NUMBER':
+            self.eat('NUMBER')
+            return float(token.value) if '.' in token.value else int(token.value)
+        elif token.type == 'STRING':
+            self.eat('STRING')
+            return token.value
+        elif token.type == 'KEYWORD' and token.value == 'NULL':
+            self.eat('KEYWORD')
+            return None
+        elif token.type == 'PARAM':
+            return self.parse_parameter()
+        elif token.type == 'ID':
+            self.eat('ID')
+            # 处理标识符类型的值（可能是NULL、TRUE、FALSE等）
+            value = token.value.upper()
+            if value == 'NULL':
+                return None
+            elif value == 'TRUE':
+                return True
+            elif value == 'FALSE':
+                return False
+            # 如果是其他标识符，可能是列名引用或未加引号的字符串
+            return token.value
+        raise SyntaxError(f"Unexpected value type: {token.type}")
+
+    def parse_delete(self) -> DeleteStmt:
+        """解析 DELETE FROM table [WHERE condition]"""
+        self.eat('KEYWORD', 'DELETE')
+        self.eat('KEYWORD', 'FROM')
+
+        table_name = self.current_token().value
+        self.eat('ID')
+
+        where_clause = None
+        if self.current_token().value == 'WHERE':
+            self.eat('KEYWORD', 'WHERE')
+            where_clause = self.parse_condition()
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return DeleteStmt(table_name, where_clause)
+
+    def parse_update(self) -> UpdateStmt:
+        """解析 UPDATE table SET col = value [, ...] [WHERE condition]"""
+        self.eat('KEYWORD', 'UPDATE')
+
+        table_name = self.current_token().value
+        self.eat('ID')
+        self.eat('KEYWORD', 'SET')
+
+        assignments = []
+        while True:
+            col_name = self.current_token().value
+            self.eat('ID')
+            self.eat('OP', '=')
+            assignments.append((col_name, self.parse_value()))
+            if self.current_token().type != 'COMMA':
+                break
+            self.eat('COMMA')
+
+        where_clause = None
+        if self.current_token().value == 'WHERE':
+            self.eat('KEYWORD', 'WHERE')
+            where_clause = self.parse_condition()
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return UpdateStmt(table_name, assignments, where_clause)
+
+    def parse_vacuum(self) -> VacuumStmt:
+        """解析 VACUUM [table]"""
+        self.eat('KEYWORD', 'VACUUM')
+
+        table_name = None
+        if self.current_token().type == 'ID':
+            table_name = self.current_token().value
+            self.eat('ID')
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return VacuumStmt(table_name)
+
+    def parse_analyze(self) -> AnalyzeStmt:
+        """解析 ANALYZE [table]"""
+        self.eat('KEYWORD', 'ANALYZE')
+
+        table_name = None
+        if self.current_token().type == 'ID':
+            table_name = self.current_token().value
+            self.eat('ID')
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return AnalyzeStmt(table_name)
+
+    def parse_copy(self) -> CopyStmt:
+        """解析 COPY table FROM|TO 'file' [WITH] [(option value, ...)]"""
+        self.eat('KEYWORD', 'COPY')
+
+        table_name = self.current_token().value
+        self.eat('ID')
+
+        direction = self.current_token().value
+        if direction not in ('FROM', 'TO'):
+            raise SyntaxError(f"Expected FROM or TO, got {direction}")
+        self.eat('KEYWORD')
+
+        file_path = self.current_token().value
+        self.eat('STRING')
+
+        options = {}
+        if self.current_token().value == 'WITH':
+            self.eat('KEYWORD', 'WITH')
+        if self.current_token().type == 'LPAREN':
+            options = self.parse_options()
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+
+        return CopyStmt(table_name, direction, file_path, options)
+
+    def parse_options(self) -> Dict[str, Any]:
+        """解析选项列表 (name [=] value, ...)，省略值的选项视为 TRUE"""
+        self.eat('LPAREN')
+
+        options = {}
+        while True:
+            name_token = self.current_token()
+            if name_token.type not in ('ID', 'KEYWORD'):
+                raise SyntaxError(f"Expected option name, got {name_token.type}")
+            self.pos += 1
+            name = name_token.value.lower()
+
+            if self.current_token().type == 'OP' and self.current_token().value == '=':
+                self.eat('OP')
+
             token = self.current_token()
             if token.type == 'NUMBER':
-                value = float(token.value) if '.' in token.value else int(token.value)
-                values.append(value)
+                options[name] = float(token.value) if '.' in token.value else int(token.value)
                 self.eat('NUMBER')
             elif token.type == 'STRING':
-                values.append(token.value)
+                options[name] = token.value
                 self.eat('STRING')
-            elif token.type == 'ID':
-                # 处理标识符类型的值（可能是NULL、TRUE、FALSE等）
-                value = token.value.upper()
-                if value == 'NULL':
-                    values.append(None)
-                elif value == 'TRUE':
-                    values.append(True)
-                elif value == 'FALSE':
-                    values.append(False)
-                else:
-                    # 如果是其他标识符，可能是列名引用或未加引号的字符串
-                    values.append(token.value)
-                self.eat('ID')
+            elif token.type in ('ID', 'KEYWORD'):
+                value = token.value.lower()
+                options[name] = {'true': True, 'false': False}.get(value, value)
+                self.pos += 1
             else:
-                raise SyntaxError(f"Unexpected value type: {token.type}")
+                options[name] = True
 
             if self.current_token().type != 'COMMA':
                 break
             self.eat('COMMA')
 
         self.eat('RPAREN')
-
-        if self.current_token().type == 'SEMI':
-            self.eat('SEMI')
-
-        return InsertStmt(table_name, values)
-
-    def parse_create_table(self) -> CreateTableStmt:
+        return options
+
+    def parse_create_view(self) -> CreateViewStmt:
+        """解析 CREATE MATERIALIZED VIEW name AS SELECT ...（CREATE 已被读取）"""
+        self.eat('KEYWORD', 'MATERIALIZED')
+        self.eat('KEYWORD', 'VIEW')
+        view_name = self.eat('ID').value
+        self.eat('KEYWORD', 'AS')
+        start = self.current_token().position
+        query = self.parse_select()
+        query_sql = self.source[start:self.current_token().position].strip().rstrip(';').rstrip()
+        return CreateViewStmt(view_name, query, query_sql)
+
+    def parse_create_table(self) -> ASTNode:
         self.eat('KEYWORD', 'CREATE')
+        if self.current_token().value == 'MATERIALIZED':
+            return self.parse_create_view()
+        if self.current_token().value == 'TABLESPACE':
+            return self.parse_create_tablespace()
+        # CREATE TEMP / TEMPORARY TABLE：内存表
+        engine = None
+        if self.current_token().value in ('TEMP', 'TEMPORARY'):
+            self.eat('KEYWORD')
+            engine = 'memory'
         self.eat('KEYWORD', 'TABLE')
 
         table_name = self.current_token().value
@@ -235,15 +621,147 @@ class Parser:
             self.eat('COMMA')
 
         self.eat('RPAREN')
+
+        # ENGINE = MEMORY / DISK
+        if self.current_token().value == 'ENGINE':
+            self.eat('KEYWORD', 'ENGINE')
+            self.eat('OP', '=')
+            engine = self.eat('ID').value.lower()
+
+        # PARTITION BY RANGE (col) (...) / PARTITION BY HASH (col) PARTITIONS n
+        partition = None
+        if self.current_token().value == 'PARTITION':
+            partition = self.parse_partition_by()
+
+        # WITH (bloom_filter = 'col, ...')
+        options = {}
+        if self.current_token().value == 'WITH':
+            self.eat('KEYWORD', 'WITH')
+            options = self.parse_options()
+
+        # TABLESPACE name
+        tablespace = None
+        if self.current_token().value == 'TABLESPACE':
+            self.eat('KEYWORD', 'TABLESPACE')
+            tablespace = self.eat('ID').value
+
         if self.current_token().type == 'SEMI':
             self.eat('SEMI')
 
-        return CreateTableStmt(table_name, columns, primary_key)
+        return CreateTableStmt(table_name, columns, primary_key, options, partition, tablespace, engine)
+
+    def parse_create_tablespace(self) -> CreateTablespaceStmt:
+        """解析 CREATE TABLESPACE name LOCATION '/path'（CREATE 已被读取）"""
+        self.eat('KEYWORD', 'TABLESPACE')
+        name = self.eat('ID').value
+        self.eat('KEYWORD', 'LOCATION')
+        location = self.eat('STRING').value
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+        return CreateTablespaceStmt(name, location)
+
+    def parse_partition_by(self) -> Dict[str, Any]:
+        """
+        解析 PARTITION BY RANGE (col) (PARTITION p VALUES LESS THAN (v | MAXVALUE), ...)
+        或 PARTITION BY HASH (col) PARTITIONS n
+        """
+        self.eat('KEYWORD', 'PARTITION')
+        self.eat('KEYWORD', 'BY')
+        method = self.current_token().value
+        if method not in ('RANGE', 'HASH'):
+            raise SyntaxError(f"Expected RANGE or HASH, got {method}")
+        self.eat('KEYWORD')
+        self.eat('LPAREN')
+        column = self.eat('ID').value
+        self.eat('RPAREN')
+
+        if method == 'HASH':
+            self.eat('KEYWORD', 'PARTITIONS')
+            count = int(self.eat('NUMBER').value)
+            return {'method': 'HASH', 'column': column, 'partitions': [{'name': f"p{i}"} for i in range(count)]}
+
+        self.eat('LPAREN')
+        partitions = []
+        while True:
+            partitions.append(self.parse_range_partition())
+            if self.current_token().type != 'COMMA':
+                break
+            self.eat('COMMA')
+        self.eat('RPAREN')
+        return {'method': 'RANGE', 'column': column, 'partitions': partitions}
+
+    def parse_range_partition(self) -> Dict[str, Any]:
+        """解析 PARTITION p VALUES LESS THAN (v | MAXVALUE)，也接受不带括号的 MAXVALUE"""
+        self.eat('KEYWORD', 'PARTITION')
+        name = self.eat('ID').value
+        self.eat('KEYWORD', 'VALUES')
+        self.eat('KEYWORD', 'LESS')
+        self.eat('KEYWORD', 'THAN')
+        if self.current_token().value == 'MAXVALUE':
+            self.eat('KEYWORD', 'MAXVALUE')
+            return {'name': name, 'bound': None}
+        self.eat('LPAREN')
+        if self.current_token().value == 'MAXVALUE':
+            self.eat('KEYWORD', 'MAXVALUE')
+            bound = None
+        else:
+            bound = self.parse_value()
+        self.eat('RPAREN')
+        return {'name': name, 'bound': bound}
+
+    def parse_alter_table(self) -> AlterTableStmt:
+        """解析 ALTER TABLE t ADD PARTITION ... / ALTER TABLE t DROP PARTITION p[, ...]"""
+        self.eat('KEYWORD', 'ALTER')
+        self.eat('KEYWORD', 'TABLE')
+        table_name = self.eat('ID').value
+
+        if self.current_token().value == 'ADD':
+            self.eat('KEYWORD', 'ADD')
+            stmt = AlterTableStmt(table_name, 'ADD_PARTITION', [self.parse_range_partition()])
+        else:
+            self.eat('KEYWORD', 'DROP')
+            self.eat('KEYWORD', 'PARTITION')
+            stmt = AlterTableStmt(table_name, 'DROP_PARTITION',
+                                  [{'name': name} for name in self.parse_table_list()])
+
+        if self.current_token().type == 'SEMI':
+            self.eat('SEMI')
+        return stmt
 
     def parse_condition(self) -> Expr:
+        """解析 WHERE 条件：OR 的优先级低于 AND，括号改变结合顺序"""
+        condition = self.parse_and_condition()
+        while self.current_token().type == 'KEYWORD' and self.current_token().value == 'OR':
+            self.eat('KEYWORD', 'OR')
+            condition = BinaryOpExpr(condition, 'OR', self.parse_and_condition())
+        return condition
+
+    def parse_and_condition(self) -> Expr:
+        condition = self.parse_predicate()
+        while self.current_token().type == 'KEYWORD' and self.current_token().value == 'AND':
+            self.eat('KEYWORD', 'AND')
+            condition = BinaryOpExpr(condition, 'AND', self.parse_predicate())
+        return condition
+
+    def parse_predicate(self) -> Expr:
+        """解析 (条件)、col op value 或 col IN (v1, v2, ...)"""
+        if self.current_token().type == 'LPAREN':
+            self.eat('LPAREN')
+            condition = self.parse_condition()
+            self.eat('RPAREN')
+            return condition
+
         left = ColumnRef(self.current_token().value)
         self.eat('ID')
 
+        if self.current_token().type == 'KEYWORD' and self.current_token().value == 'IN':
+            # col IN (v1, v2, ...)
+            self.eat('KEYWORD', 'IN')
+            items = [value if isinstance(value, Parameter)
+                     else Constant(value, 'STRING' if isinstance(value, str) else 'NUMBER')
+                     for value in self.parse_value_list()]
+            return BinaryOpExpr(left, 'IN', ValueList(items))
+
         op = self.current_token().value
         self.eat('OP')
 
@@ -255,6 +773,8 @@ class Parser:
         elif right_token.type == 'STRING':
             right = Constant(right_token.value, 'STRING')
             self.eat('STRING')
+        elif right_token.type == 'PARAM':
+            right = self.parse_parameter()
         else:
             right = ColumnRef(right_token.value)
             self.eat('ID')
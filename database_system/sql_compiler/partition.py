@@ -0,0 +1,109 @@
+"""
+表分区：PARTITION BY RANGE (col) 按各分区的上界划分取值区间，PARTITION BY HASH (col) 按取值的哈希
+分到固定个数的分区。每个分区是一张单独存储的物理表（<表名>$<分区名>.dat），逻辑表本身没有数据文件。
+
+计划器按 WHERE 条件裁剪分区：只有可能包含满足条件的记录的分区才会被扫描。
+分区键为 NULL 的记录放在第一个（RANGE）或 0 号（HASH）分区，它们不满足任何比较，裁剪时不必考虑。
+"""
+import bisect
+import zlib
+from typing import Any, List, Optional, Set
+from .catalog import Schema
+from .parser import BinaryOpExpr, ColumnRef, Constant
+
+# 交换比较两侧时对应的运算符：5 < col 等价于 col > 5
+_FLIPPED = {'=': '=', '!=': '!=', '<>': '<>', '<': '>', '>': '<', '<=': '>=', '>=': '<='}
+
+
+def hash_key(value: Any) -> int:
+    """HASH 分区使用的哈希值，与进程无关（字符串不能用内置 hash）"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return zlib.crc32(value.encode('utf-8'))
+    return int(value)
+
+
+def range_bounds(schema: Schema) -> List[Any]:
+    """RANGE 分区的有限上界（MAXVALUE 分区只能是最后一个，不在其中）"""
+    return [part['bound'] for part in schema.partition['partitions'] if part['bound'] is not None]
+
+
+def partition_index(schema: Schema, value: Any) -> int:
+    """
+    分区键取值（写入后读出的值）所在分区的下标；
+    没有分区能容纳该值时（大于所有上界且没有 MAXVALUE 分区）抛出 ValueError
+    """
+    partitions = schema.partition['partitions']
+    if schema.partition['method'] == 'HASH':
+        return hash_key(value) % len(partitions)
+    if value is None:
+        return 0
+    index = bisect.bisect_right(range_bounds(schema), value)
+    if index == len(partitions):
+        raise ValueError(f"No partition of table {schema.table_name} for value {value!r}")
+    return index
+
+
+def prune_partitions(schema: Schema, condition) -> List[int]:
+    """可能有记录满足条件的分区下标（递增）"""
+    return sorted(_matching_partitions(schema, condition))
+
+
+def _matching_partitions(schema: Schema, condition) -> Set[int]:
+    everything = set(range(len(schema.partition['partitions'])))
+    if not isinstance(condition, BinaryOpExpr):
+        return everything
+    if condition.op == 'AND':
+        return _matching_partitions(schema, condition.left) & _matching_partitions(schema, condition.right)
+    if condition.op == 'OR':
+        return _matching_partitions(schema, condition.left) | _matching_partitions(schema, condition.right)
+    if condition.op == 'IN':
+        matched = set()
+        for item in condition.right.items:
+            matched |= _matching_partitions(schema, BinaryOpExpr(condition.left, '=', item))
+        return matched
+    if condition.op not in _FLIPPED:
+        return everything
+
+    column, constant, op = condition.left, condition.right, condition.op
+    if isinstance(column, Constant) and isinstance(constant, ColumnRef):
+        column, constant, op = constant, column, _FLIPPED[op]
+    if not (isinstance(column, ColumnRef) and isinstance(constant, Constant)
+            and column.name == schema.partition['column']):
+        # 参数占位符在绑定后重新裁剪
+        return everything
+    if constant.value is None:
+        # 与 NULL 比较为假
+        return set()
+    try:
+        if schema.partition['method'] == 'HASH':
+            return {partition_index(schema, constant.value)} if op == '=' else everything
+        return {i for i, (low, high) in enumerate(_ranges(schema))
+                if _range_may_match(op, low, high, constant.value)}
+    except (TypeError, ValueError):
+        # 类型不可比较或没有分区能容纳该值时交给逐行求值
+        return everything
+
+
+def _ranges(schema: Schema) -> List[tuple]:
+    """各 RANGE 分区的 [下界, 上界)，None 表示无界"""
+    ranges = []
+    low = None
+    for part in schema.partition['partitions']:
+        ranges.append((low, part['bound']))
+        low = part['bound']
+    return ranges
+
+
+def _range_may_match(op: str, low: Optional[Any], high: Optional[Any], value: Any) -> bool:
+    """取值范围为 [low, high) 的分区中是否可能有值满足 列 op value"""
+    if op == '=':
+        return (low is None or low <= value) and (high is None or value < high)
+    if op == '<':
+        return low is None or low < value
+    if op == '<=':
+        return low is None or low <= value
+    if op in ('>', '>='):
+        return high is None or high > value
+    return True
@@ -1,6 +1,9 @@
 from typing import Dict, Any
-from .parser import ASTNode, SelectStmt, InsertStmt, CreateTableStmt, DropTableStmt
-from .catalog import CatalogManager
+from .parser import (ASTNode, SelectStmt, InsertStmt, CreateTableStmt, DropTableStmt, CopyStmt, TransactionStmt,
+                     DeleteStmt, UpdateStmt, VacuumStmt, AnalyzeStmt, TruncateTableStmt, CreateViewStmt,
+                     AlterTableStmt, CreateTablespaceStmt, DropTablespaceStmt)
+from .catalog import CatalogManager, Schema
+from .partition import prune_partitions
 
 
 class QueryPlan:
@@ -23,8 +26,31 @@ class Planner:
             return self._create_insert_plan(ast)
         elif isinstance(ast, CreateTableStmt):
             return self._create_create_table_plan(ast)
+        elif isinstance(ast, CreateViewStmt):
+            return self._create_create_view_plan(ast)
+        elif isinstance(ast, AlterTableStmt):
+            return QueryPlan('ALTER_TABLE', {'table_name': ast.table_name, 'action': ast.action,
+                                             'definitions': ast.partitions})
+        elif isinstance(ast, CreateTablespaceStmt):
+            return QueryPlan('CREATE_TABLESPACE', {'tablespace': ast.name, 'location': ast.location})
+        elif isinstance(ast, DropTablespaceStmt):
+            return QueryPlan('DROP_TABLESPACE', {'tablespace': ast.name})
         elif isinstance(ast, DropTableStmt):  # 添加DROP TABLE支持
             return self._create_drop_table_plan(ast)
+        elif isinstance(ast, CopyStmt):
+            return self._create_copy_plan(ast)
+        elif isinstance(ast, TransactionStmt):
+            return QueryPlan(ast.action)
+        elif isinstance(ast, DeleteStmt):
+            return self._create_delete_plan(ast)
+        elif isinstance(ast, UpdateStmt):
+            return self._create_update_plan(ast)
+        elif isinstance(ast, TruncateTableStmt):
+            return QueryPlan('TRUNCATE_TABLE', {'table_name': ast.table_name, 'table_names': ast.table_names})
+        elif isinstance(ast, VacuumStmt):
+            return QueryPlan('VACUUM', {'table_name': ast.table_name})
+        elif isinstance(ast, AnalyzeStmt):
+            return QueryPlan('ANALYZE', {'table_name': ast.table_name})
         else:
             raise ValueError(f"Unsupported AST node type: {type(ast)}")
 
@@ -34,30 +60,88 @@ class Planner:
             'table_name': stmt.table_name,
             'columns': stmt.columns,
             'where_clause': stmt.where_clause,
+            'aggregates': stmt.aggregates,
+            'group_by': stmt.group_by,
             'schema': schema
         }
+        self._prune(plan_details)
         return QueryPlan('SELECT', plan_details)
 
+    @staticmethod
+    def _prune(plan_details: Dict[str, Any]):
+        """分区表：按 WHERE 条件裁剪出需要扫描的分区下标，记入计划的 partitions"""
+        schema: Schema = plan_details['schema']
+        if schema is not None and schema.partition:
+            plan_details['partitions'] = prune_partitions(schema, plan_details['where_clause'])
+
     def _create_insert_plan(self, stmt: InsertStmt) -> QueryPlan:
         schema = self.catalog.get_schema(stmt.table_name)
         plan_details = {
             'table_name': stmt.table_name,
             'values': stmt.values,
+            'rows': stmt.rows,
             'schema': schema
         }
         return QueryPlan('INSERT', plan_details)
 
+    def _create_delete_plan(self, stmt: DeleteStmt) -> QueryPlan:
+        plan_details = {
+            'table_name': stmt.table_name,
+            'where_clause': stmt.where_clause,
+            'schema': self.catalog.get_schema(stmt.table_name)
+        }
+        self._prune(plan_details)
+        return QueryPlan('DELETE', plan_details)
+
+    def _create_update_plan(self, stmt: UpdateStmt) -> QueryPlan:
+        plan_details = {
+            'table_name': stmt.table_name,
+            'assignments': stmt.assignments,
+            'where_clause': stmt.where_clause,
+            'schema': self.catalog.get_schema(stmt.table_name)
+        }
+        self._prune(plan_details)
+        return QueryPlan('UPDATE', plan_details)
+
     def _create_create_table_plan(self, stmt: CreateTableStmt) -> QueryPlan:
         plan_details = {
             'table_name': stmt.table_name,
             'columns': stmt.columns,
-            'primary_key': stmt.primary_key
+            'primary_key': stmt.primary_key,
+            'options': stmt.options,
+            'partition': stmt.partition,
+            'tablespace': stmt.tablespace,
+            'engine': stmt.engine
         }
         return QueryPlan('CREATE_TABLE', plan_details)
 
+    def _create_create_view_plan(self, stmt: CreateViewStmt) -> QueryPlan:
+        """生成CREATE MATERIALIZED VIEW执行计划，query 为解析后的定义查询"""
+        plan_details = {
+            'table_name': stmt.view_name,
+            'query': stmt.query,
+            'query_sql': stmt.query_sql
+        }
+        return QueryPlan('CREATE_VIEW', plan_details)
+
     def _create_drop_table_plan(self, stmt: DropTableStmt) -> QueryPlan:
         """生成DROP TABLE执行计划"""
         plan_details = {
-            'table_name': stmt.table_name
+            'table_name': stmt.table_name,
+            'table_names': stmt.table_names
+        }
+        return QueryPlan('DROP_TABLE', plan_details)
+
+    def _create_copy_plan(self, stmt: CopyStmt) -> QueryPlan:
+        """生成COPY执行计划"""
+        plan_details = {
+            'table_name': stmt.table_name,
+            'file_path': stmt.file_path,
+            'format': stmt.options.get('format', 'csv'),
+            'header': bool(stmt.options.get('header', False)),
+            'delimiter': stmt.options.get('delimiter', ','),
+            'workers': stmt.options.get('workers'),
+            'schema': self.catalog.get_schema(stmt.table_name)
         }
-        return QueryPlan('DROP_TABLE', plan_details)
\ No newline at end of file
+        plan_type = 'COPY_FROM' if stmt.direction == 'FROM' else 'COPY_TO'
+        return QueryPlan(plan_type, plan_details)
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+预编译语句与执行计划缓存
+"""
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+from .lexer import LINE_COMMENT_REGEX, BLOCK_COMMENT_REGEX
+from .parser import (Parser, Parameter, BinaryOpExpr, Constant, ValueList, SelectStmt, InsertStmt, DeleteStmt,
+                     UpdateStmt)
+from .semantic import SemanticAnalyzer
+from .planner import Planner, QueryPlan
+from .catalog import CatalogManager
+from .partition import prune_partitions
+
+# 折叠字符串字面量以外的连续空白
+_NORMALIZE_REGEX = re.compile(r"('(?:[^'\\]|\\.)*')|\s+")
+
+Params = Union[Sequence[Any], Mapping[str, Any], None]
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    规范化SQL文本作为缓存键：按词法分析器的规则去掉注释，再去掉首尾空白和末尾分号、折叠多余空白。
+    注释须先于折叠空白去掉，否则 -- 注释会吞掉被折叠到同一行的后续子句
+    """
+    sql = LINE_COMMENT_REGEX.sub('', sql)
+    sql = BLOCK_COMMENT_REGEX.sub('', sql).strip()
+    if sql.endswith(';'):
+        sql = sql[:-1].rstrip()
+    return _NORMALIZE_REGEX.sub(lambda m: m.group(1) or ' ', sql)
+
+
+class PreparedStatement:
+    """预编译语句：保存带占位符的执行计划，每次执行时只做参数绑定"""
+
+    def __init__(self, sql: str, plan: QueryPlan, parameters: List[Parameter]):
+        self.sql = sql
+        self.plan = plan
+        self.parameters = parameters
+
+    @property
+    def param_count(self) -> int:
+        return len(self.parameters)
+
+    def bind(self, params: Params = None) -> QueryPlan:
+        """绑定参数，返回可直接执行的计划"""
+        if not self.parameters:
+            if params:
+                raise ValueError(f"Statement takes no parameters, got {len(params)}")
+            return self.plan
+
+        if self.parameters[0].name is not None:
+            if not isinstance(params, Mapping):
+                raise ValueError("Named parameters require a mapping")
+            missing = [p.name for p in self.parameters if p.name not in params]
+            if missing:
+                raise ValueError(f"Missing parameters: {', '.join(missing)}")
+            resolve = lambda p: params[p.name]
+        else:
+            if params is None or isinstance(params, (Mapping, str)) or len(params) != len(self.parameters):
+                got = 0 if params is None else len(params)
+                raise ValueError(f"Expected {len(self.parameters)} parameters, got {got}")
+            resolve = lambda p: params[p.index]
+
+        details = dict(self.plan.details)
+        if 'rows' in details:
+            details['rows'] = [[resolve(v) if isinstance(v, Parameter) else v for v in row]
+                               for row in details['rows']]
+            details['values'] = details['rows'][0]
+        if 'assignments' in details:
+            details['assignments'] = [(column, resolve(v) if isinstance(v, Parameter) else v)
+                                      for column, v in details['assignments']]
+        if details.get('where_clause') is not None:
+            details['where_clause'] = self._bind_expression(details['where_clause'], resolve)
+        if 'partitions' in details:
+            # 条件中的参数绑定后才能裁剪
+            details['partitions'] = prune_partitions(details['schema'], details['where_clause'])
+        return QueryPlan(self.plan.plan_type, details)
+
+    def _bind_expression(self, expr, resolve):
+        if isinstance(expr, Parameter):
+            value = resolve(expr)
+            return Constant(value, 'STRING' if isinstance(value, str) else 'NUMBER')
+        if isinstance(expr, BinaryOpExpr):
+            return BinaryOpExpr(self._bind_expression(expr.left, resolve), expr.op,
+                                self._bind_expression(expr.right, resolve))
+        if isinstance(expr, ValueList):
+            return ValueList([self._bind_expression(item, resolve) for item in expr.items])
+        return expr
+
+
+class PlanCache:
+    """按规范化SQL缓存预编译语句的LRU缓存，目录模式版本变化时整体失效"""
+
+    def __init__(self, catalog: CatalogManager, capacity: int = 256):
+        self.catalog = catalog
+        self.capacity = capacity
+        self.entries: 'OrderedDict[str, PreparedStatement]' = OrderedDict()
+        self.catalog_version = catalog.version
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        if self.catalog.version != self.catalog_version:
+            self.entries.clear()
+            self.catalog_version = self.catalog.version
+
+    def get(self, key: str) -> Optional[PreparedStatement]:
+        self._check_version()
+        stmt = self.entries.get(key)
+        if stmt is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return stmt
+
+    def put(self, key: str, stmt: PreparedStatement):
+        self._check_version()
+        if self.capacity <= 0:
+            return
+        self.entries[key] = stmt
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0
+        }
+
+
+class StatementCompiler:
+    """SQL编译流水线：词法 -> 语法 -> 语义 -> 计划，增删改查语句的结果进入计划缓存"""
+
+    CACHEABLE = (SelectStmt, InsertStmt, DeleteStmt, UpdateStmt)
+
+    def __init__(self, catalog: CatalogManager, cache_size: int = 256):
+        self.catalog = catalog
+        self.parser = Parser(catalog)
+        self.semantic_analyzer = SemanticAnalyzer(catalog)
+        self.planner = Planner(catalog)
+        self.plan_cache = PlanCache(catalog, cache_size)
+
+    def prepare(self, sql: str) -> PreparedStatement:
+        """预编译SQL语句，命中缓存时跳过词法、语法分析和计划生成"""
+        key = normalize_sql(sql)
+        stmt = self.plan_cache.get(key)
+        if stmt is not None:
+            return stmt
+
+        # 规范化文本只作缓存键，语法分析用原始语句
+        ast = self.parser.parse(sql)
+        validated_ast = self.semantic_analyzer.analyze(ast)
+        plan = self.planner.create_plan(validated_ast)
+        stmt = PreparedStatement(key, plan, getattr(ast, 'parameters', []))
+
+        if isinstance(ast, self.CACHEABLE):
+            self.plan_cache.put(key, stmt)
+        return stmt
+
+    def compile(self, sql: str, params: Params = None) -> QueryPlan:
+        """编译并绑定参数，返回可执行计划"""
+        return self.prepare(sql).bind(params)
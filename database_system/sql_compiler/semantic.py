@@ -1,5 +1,9 @@
-from .parser import ASTNode, SelectStmt, InsertStmt, CreateTableStmt, DropTableStmt, BinaryOpExpr, ColumnRef
+import os
+from .parser import (ASTNode, SelectStmt, InsertStmt, CreateTableStmt, DropTableStmt, CopyStmt, TransactionStmt,
+                     DeleteStmt, UpdateStmt, VacuumStmt, AnalyzeStmt, TruncateTableStmt, BinaryOpExpr, ColumnRef, Parameter,
+                     CreateViewStmt, AlterTableStmt, CreateTablespaceStmt, DropTablespaceStmt)
 from .catalog import CatalogManager
+from storage.compression import available_codecs
 
 
 class SemanticAnalyzer:
@@ -13,8 +17,24 @@ class SemanticAnalyzer:
             return self.analyze_insert(ast)
         elif isinstance(ast, CreateTableStmt):
             return self.analyze_create_table(ast)
-        elif isinstance(ast, DropTableStmt):  # 添加DROP TABLE支持
+        elif isinstance(ast, CreateViewStmt):
+            return self.analyze_create_view(ast)
+        elif isinstance(ast, AlterTableStmt):
+            return self.analyze_alter_table(ast)
+        elif isinstance(ast, (CreateTablespaceStmt, DropTablespaceStmt)):
+            return self.analyze_tablespace(ast)
+        elif isinstance(ast, (DropTableStmt, TruncateTableStmt)):  # 添加DROP TABLE支持
             return self.analyze_drop_table(ast)
+        elif isinstance(ast, CopyStmt):
+            return self.analyze_copy(ast)
+        elif isinstance(ast, TransactionStmt):
+            return ast
+        elif isinstance(ast, DeleteStmt):
+            return self.analyze_delete(ast)
+        elif isinstance(ast, UpdateStmt):
+            return self.analyze_update(ast)
+        elif isinstance(ast, (VacuumStmt, AnalyzeStmt)):
+            return self.analyze_vacuum(ast)
         else:
             raise ValueError(f"Unsupported AST node type: {type(ast)}")
 
@@ -31,25 +51,102 @@ class SemanticAnalyzer:
                 if column not in schema.column_dict:
                     raise ValueError(f"Column {column} does not exist in table {stmt.table_name}")
 
+        # 检查聚合函数的参数列
+        for func, column in stmt.aggregates:
+            if column == '*':
+                continue
+            if column not in schema.column_dict:
+                raise ValueError(f"Column {column} does not exist in table {stmt.table_name}")
+            if func in ('SUM', 'AVG') and schema.column_dict[column]['type'] != 'INT':
+                raise ValueError(f"{func} requires a numeric column, got {column}")
+        # 检查 GROUP BY 的列；分组或聚合查询中的普通列必须出现在 GROUP BY 中
+        for column in stmt.group_by:
+            if column not in schema.column_dict:
+                raise ValueError(f"Column {column} does not exist in table {stmt.table_name}")
+        if stmt.aggregates or stmt.group_by:
+            for column in stmt.columns:
+                if column not in stmt.group_by:
+                    raise ValueError(f"Column {column} must appear in GROUP BY or be used in an aggregate function")
+
         # 检查WHERE条件中的列
         if stmt.where_clause:
             self._validate_expression(stmt.where_clause, schema)
 
         return stmt
 
+    def analyze_create_view(self, stmt: CreateViewStmt):
+        """语义分析 CREATE MATERIALIZED VIEW：定义查询须能按插入的行增量维护"""
+        if self.catalog.table_exists(stmt.view_name):
+            raise ValueError(f"Table {stmt.view_name} already exists")
+        if stmt.parameters:
+            raise ValueError("Materialized view query cannot have parameters")
+        query = self.analyze_select(stmt.query)
+        if self.catalog.get_schema(query.table_name).view:
+            raise ValueError("Materialized view cannot be defined on another materialized view")
+        for func, _ in query.aggregates:
+            if func == 'AVG':
+                raise ValueError("AVG is not supported in materialized views; use SUM and COUNT")
+        for column in query.group_by:
+            if column not in query.columns:
+                raise ValueError(f"Materialized view must select every GROUP BY column: {column}")
+        return stmt
+
+    def _check_writable(self, table_name: str):
+        """物化视图只由基表的写入维护，不能直接修改"""
+        schema = self.catalog.get_schema(table_name)
+        if schema is not None and schema.view:
+            raise ValueError(f"Cannot modify materialized view {table_name}")
+
     def analyze_insert(self, stmt: InsertStmt):
         if not self.catalog.table_exists(stmt.table_name):
             raise ValueError(f"Table {stmt.table_name} does not exist")
+        self._check_writable(stmt.table_name)
 
         schema = self.catalog.get_schema(stmt.table_name)
 
-        if len(stmt.values) != len(schema.columns):
-            raise ValueError(f"Expected {len(schema.columns)} values, got {len(stmt.values)}")
+        for values in stmt.rows:
+            if len(values) != len(schema.columns):
+                raise ValueError(f"Expected {len(schema.columns)} values, got {len(values)}")
+
+            for i, (value, col_def) in enumerate(zip(values, schema.columns)):
+                # 参数占位符在绑定时由执行器校验
+                if isinstance(value, Parameter):
+                    continue
+                if not schema.validate_value(col_def['name'], value):
+                    raise ValueError(f"Invalid value for column {col_def['name']}: {value}")
 
-        for i, (value, col_def) in enumerate(zip(stmt.values, schema.columns)):
-            if not schema.validate_value(col_def['name'], value):
-                raise ValueError(f"Invalid value for column {col_def['name']}: {value}")
+        return stmt
+
+    def analyze_delete(self, stmt: DeleteStmt):
+        if not self.catalog.table_exists(stmt.table_name):
+            raise ValueError(f"Table {stmt.table_name} does not exist")
+        self._check_writable(stmt.table_name)
 
+        if stmt.where_clause:
+            self._validate_expression(stmt.where_clause, self.catalog.get_schema(stmt.table_name))
+        return stmt
+
+    def analyze_update(self, stmt: UpdateStmt):
+        if not self.catalog.table_exists(stmt.table_name):
+            raise ValueError(f"Table {stmt.table_name} does not exist")
+        self._check_writable(stmt.table_name)
+
+        schema = self.catalog.get_schema(stmt.table_name)
+        for column, value in stmt.assignments:
+            if column not in schema.column_dict:
+                raise ValueError(f"Column {column} does not exist in table {stmt.table_name}")
+            # 参数占位符在绑定时由执行器校验
+            if not isinstance(value, Parameter) and not schema.validate_value(column, value):
+                raise ValueError(f"Invalid value for column {column}: {value}")
+
+        if stmt.where_clause:
+            self._validate_expression(stmt.where_clause, schema)
+        return stmt
+
+    def analyze_vacuum(self, stmt):
+        """语义分析VACUUM / ANALYZE语句"""
+        if stmt.table_name is not None and not self.catalog.table_exists(stmt.table_name):
+            raise ValueError(f"Table '{stmt.table_name}' does not exist")
         return stmt
 
     def analyze_create_table(self, stmt: CreateTableStmt):
@@ -61,14 +158,171 @@ class SemanticAnalyzer:
             if col['type'] not in ['INT', 'VARCHAR']:
                 raise ValueError(f"Unsupported data type: {col['type']}")
 
+        # 验证表选项
+        column_names = {col['name'] for col in stmt.columns}
+        column_types = {col['name']: col['type'] for col in stmt.columns}
+        for name, value in stmt.options.items():
+            if name == 'bloom_filter':
+                if not isinstance(value, str):
+                    raise ValueError("bloom_filter must be a comma-separated list of columns")
+                for column in value.split(','):
+                    if column.strip() not in column_names:
+                        raise ValueError(f"Column {column.strip()} does not exist")
+            elif name == 'dictionary':
+                if not isinstance(value, str):
+                    raise ValueError("dictionary must be a comma-separated list of columns")
+                for column in value.split(','):
+                    if column.strip() not in column_names:
+                        raise ValueError(f"Column {column.strip()} does not exist")
+                    if column_types[column.strip()] != 'VARCHAR':
+                        raise ValueError(f"Dictionary encoding requires a VARCHAR column: {column.strip()}")
+            elif name == 'format':
+                if not isinstance(value, str) or value.lower() not in ('row', 'columnar'):
+                    raise ValueError(f"Unsupported table format: {value}")
+            elif name == 'compression':
+                if not isinstance(value, str) or value.lower() not in available_codecs():
+                    raise ValueError(f"Unsupported compression codec: {value} "
+                                     f"(available: {', '.join(available_codecs())})")
+            else:
+                raise ValueError(f"Unsupported table option: {name}")
+
+        if stmt.partition:
+            self._validate_partition(stmt.partition, column_types)
+
+        if stmt.tablespace is not None and stmt.tablespace not in self.catalog.tablespaces:
+            raise ValueError(f"Tablespace {stmt.tablespace} does not exist")
+
+        if stmt.engine is not None and stmt.engine not in ('disk', 'memory'):
+            raise ValueError(f"Unsupported storage engine: {stmt.engine}")
+        if stmt.engine == 'memory':
+            # 内存表没有表文件
+            if stmt.tablespace is not None:
+                raise ValueError("MEMORY tables cannot be placed in a tablespace")
+            if stmt.options.get('compression'):
+                raise ValueError("Compression is not supported for MEMORY tables")
+
+        return stmt
+
+    def analyze_tablespace(self, stmt):
+        """语义分析 CREATE / DROP TABLESPACE 语句"""
+        if isinstance(stmt, CreateTablespaceStmt):
+            if stmt.name in self.catalog.tablespaces:
+                raise ValueError(f"Tablespace {stmt.name} already exists")
+            if not stmt.location:
+                raise ValueError("Tablespace location must not be empty")
+            if os.path.exists(stmt.location) and not os.path.isdir(stmt.location):
+                raise ValueError(f"Tablespace location is not a directory: {stmt.location}")
+            return stmt
+        if stmt.name not in self.catalog.tablespaces:
+            raise ValueError(f"Tablespace {stmt.name} does not exist")
+        tables = self.catalog.tables_in_tablespace(stmt.name)
+        if tables:
+            raise ValueError(f"Tablespace {stmt.name} is not empty: {', '.join(tables)}")
+        return stmt
+
+    def _validate_partition(self, partition, column_types):
+        """检查分区定义：分区列存在，分区名不重复，RANGE 分区的上界与列同类型且严格递增"""
+        column = partition['column']
+        if column not in column_types:
+            raise ValueError(f"Partition column {column} does not exist")
+        partitions = partition['partitions']
+        if not partitions:
+            raise ValueError("Partitioned table must have at least one partition")
+        names = [part['name'] for part in partitions]
+        for name in names:
+            if names.count(name) > 1:
+                raise ValueError(f"Duplicate partition name: {name}")
+        if partition['method'] == 'HASH':
+            return
+
+        value_type = int if column_types[column] == 'INT' else str
+        previous = None
+        for i, part in enumerate(partitions):
+            bound = part['bound']
+            if bound is None:
+                if i != len(partitions) - 1:
+                    raise ValueError("MAXVALUE must be the bound of the last partition")
+                continue
+            if isinstance(bound, Parameter) or type(bound) is not value_type:
+                raise ValueError(f"Partition bound {bound!r} does not match the type of column {column}")
+            if previous is not None and bound <= previous:
+                raise ValueError("Partition bounds must be strictly increasing")
+            previous = bound
+
+    def analyze_alter_table(self, stmt: AlterTableStmt):
+        """语义分析 ALTER TABLE ... ADD / DROP PARTITION：只支持 RANGE 分区表"""
+        schema = self.catalog.get_schema(stmt.table_name)
+        if schema is None:
+            raise ValueError(f"Table {stmt.table_name} does not exist")
+        if not schema.partition:
+            raise ValueError(f"Table {stmt.table_name} is not partitioned")
+        if schema.partition['method'] != 'RANGE':
+            raise ValueError("Partitions can only be added to or dropped from RANGE partitioned tables")
+
+        existing = [part['name'] for part in schema.partition['partitions']]
+        if stmt.action == 'DROP_PARTITION':
+            names = [part['name'] for part in stmt.partitions]
+            for name in names:
+                if name not in existing:
+                    raise ValueError(f"Partition {name} does not exist in table {stmt.table_name}")
+            if set(existing) <= set(names):
+                raise ValueError(f"Cannot drop every partition of table {stmt.table_name}; use DROP TABLE")
+            return stmt
+
+        # 新分区追加在最后，上界须大于现有的全部上界
+        partitions = schema.partition['partitions'] + stmt.partitions
+        if schema.partition['partitions'][-1]['bound'] is None:
+            raise ValueError(f"Table {stmt.table_name} already has a MAXVALUE partition")
+        self._validate_partition(dict(schema.partition, partitions=partitions),
+                                 {col['name']: col['type'] for col in schema.columns})
         return stmt
 
     def analyze_drop_table(self, stmt: DropTableStmt):
-        """语义分析DROP TABLE语句"""
+        """语义分析DROP TABLE / TRUNCATE语句"""
         # 检查表是否存在
+        for table_name in stmt.table_names:
+            if not self.catalog.table_exists(table_name):
+                raise ValueError(f"Table '{table_name}' does not exist")
+            if isinstance(stmt, TruncateTableStmt):
+                self._check_writable(table_name)
+                continue
+            # 删除基表时，其上的物化视图必须一并删除
+            for view in self.catalog.views_of(table_name):
+                if view.table_name not in stmt.table_names:
+                    raise ValueError(f"Cannot drop table {table_name}: materialized view {view.table_name} "
+                                     f"depends on it")
+
+        return stmt
+
+    def analyze_copy(self, stmt: CopyStmt):
+        """语义分析COPY语句"""
         if not self.catalog.table_exists(stmt.table_name):
             raise ValueError(f"Table '{stmt.table_name}' does not exist")
 
+        if stmt.direction == 'FROM':
+            self._check_writable(stmt.table_name)
+
+        copy_format = stmt.options.get('format', 'csv')
+        if copy_format not in ('csv', 'binary'):
+            raise ValueError(f"Unsupported COPY format: {copy_format}")
+        schema = self.catalog.get_schema(stmt.table_name)
+        if copy_format == 'binary' and schema.storage_format != 'row':
+            # 页转储只记录记录大小，不同布局的页无法区分
+            raise ValueError("Binary COPY is not supported for columnar tables")
+        if copy_format == 'binary' and schema.dictionary_columns:
+            # 页中的编码只对本表的字典有效
+            raise ValueError("Binary COPY is not supported for tables with dictionary columns")
+        if copy_format == 'binary' and schema.partition:
+            # 页转储对应单个数据文件，分区表的记录按分区键分散在多个文件中
+            raise ValueError("Binary COPY is not supported for partitioned tables")
+
+        delimiter = stmt.options.get('delimiter', ',')
+        if not isinstance(delimiter, str) or len(delimiter) != 1:
+            raise ValueError("COPY delimiter must be a single character")
+
+        if stmt.direction == 'FROM' and not os.path.exists(stmt.file_path):
+            raise ValueError(f"File '{stmt.file_path}' does not exist")
+
         return stmt
 
     def _validate_expression(self, expr, schema):
@@ -76,4 +330,6 @@ class SemanticAnalyzer:
             if isinstance(expr.left, ColumnRef):
                 if expr.left.name not in schema.column_dict:
                     raise ValueError(f"Column {expr.left.name} does not exist")
+            else:
+                self._validate_expression(expr.left, schema)
             self._validate_expression(expr.right, schema)
\ No newline at end of file
@@ -1,134 +1,510 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, Optional, Tuple, List
 from .page import Page
 from .file_manager import FileManager
-from utils.constants import PAGE_SIZE
+from .latch import ReadWriteLatch
+from .metrics import BufferPoolStats
+from utils.constants import PAGE_SIZE, BUFFER_POOL_PARTITIONS
+
+
+class BufferPoolExhaustedError(TimeoutError):
+    """缓冲池中所有页都被固定，且在超时时间内没有页被释放"""
+    pass
+
+
+class Frame:
+    """缓冲池中的一个页槽：页内容、固定计数、脏标记和页闩锁"""
+
+    __slots__ = ('key', 'page', 'pin_count', 'dirty', 'latch', 'loaded', 'last_used', 'written')
+
+    def __init__(self, key: Tuple[str, int], page: Optional[Page] = None):
+        self.key = key
+        self.page = page
+        self.pin_count = 1
+        self.dirty = False
+        self.latch = ReadWriteLatch()
+        # 页从磁盘载入完成后置位；载入期间其他线程固定该页时在此等待
+        self.loaded = threading.Event()
+        if page is not None:
+            self.loaded.set()
+        # 最近一次使用的逻辑时钟，置换时比较各分区LRU头部的页
+        self.last_used = 0
+        # 页被置换、等待写回磁盘期间存在，写回完成后置位
+        self.written: Optional[threading.Event] = None
+
+
+class _Partition:
+    """页表的一个分区，页表、LRU顺序、待写回的页和统计计数都由分区锁保护"""
+
+    __slots__ = ('lock', 'frames', 'lru', 'writebacks', 'stats')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames: Dict[Tuple[str, int], Frame] = {}
+        # 已载入的页，按最近使用排序（最久未使用的在前）
+        self.lru: 'OrderedDict[Tuple[str, int], Frame]' = OrderedDict()
+        # 已从页表摘下、尚未写回磁盘的脏页
+        self.writebacks: Dict[Tuple[str, int], Frame] = {}
+        self.stats = BufferPoolStats()
 
 
 class BufferPool:
-    def __init__(self, capacity: int, file_manager: FileManager):
+    """
+    线程安全的缓冲池。
+
+    锁的层次（只能按此顺序获取）：
+      _lock（容量、配额与置换） -> 分区锁（页表、固定计数、LRU顺序与统计）
+    每个分区维护自己的LRU，页被使用时记录全局逻辑时钟；置换时取各分区中最久未使用的
+    可置换页里时钟最小的一个，等价于全局LRU。置换只在锁内把页从页表摘下，
+    脏页在释放 _lock 后才写回磁盘，写回期间重新载入该页的线程等待写回完成。
+    页闩锁保护页的内容：pin_page 固定页后加读闩锁（exclusive=True 时加写闩锁），
+    unpin_page 释放；被固定或持有闩锁的页永远不会被置换。
+    """
+
+    def __init__(self, capacity: int, file_manager: FileManager,
+                 wait_timeout: float = 5.0, table_quota: float = 1.0,
+                 partitions: int = BUFFER_POOL_PARTITIONS):
+        if capacity < 1:
+            raise ValueError("Buffer pool capacity must be at least 1 page")
         self.capacity = capacity
         self.file_manager = file_manager
-        self.pages: Dict[Tuple[str, int], Page] = {}  # (table_name, page_id) -> Page
-        self.pin_counts: Dict[Tuple[str, int], int] = {}
-        self.dirty_pages: set = set()
-        self.lru_list: List[Tuple[str, int]] = []
+        self.partitions = [_Partition() for _ in range(max(1, partitions))]
+        self.resident = 0  # 已占用（含正在载入）的页槽数
+        self._clock = itertools.count(1)
+
+        # 缓冲池耗尽时等待其他调用方释放页的超时时间（秒）
+        self.wait_timeout = wait_timeout
+        # 单表默认最多占用缓冲池的比例，以及按表显式设置的页数上限
+        self.table_quota = table_quota
+        self.table_quotas: Dict[str, int] = {}
+        self.table_page_counts: Dict[str, int] = {}
+
+        self._lock = threading.RLock()
+        self._page_released = threading.Condition()
+
+    @classmethod
+    def from_memory_budget(cls, budget_bytes: int, file_manager: FileManager, **kwargs) -> 'BufferPool':
+        """按内存预算（字节）创建缓冲池"""
+        return cls(max(1, budget_bytes // PAGE_SIZE), file_manager, **kwargs)
 
-    def pin_page(self, table_name: str, page_id: int) -> Optional[Page]:
-        """固定页到缓冲池"""
+    @property
+    def memory_budget(self) -> int:
+        """缓冲池内存预算（字节）"""
+        return self.capacity * PAGE_SIZE
+
+    def _partition(self, key: Tuple[str, int]) -> _Partition:
+        return self.partitions[hash(key) % len(self.partitions)]
+
+    @property
+    def stats(self) -> BufferPoolStats:
+        """各分区统计计数的汇总"""
+        stats = BufferPoolStats()
+        for partition in self.partitions:
+            with partition.lock:
+                stats.merge(partition.stats)
+        return stats
+
+    def _touch(self, partition: _Partition, frame: Frame):
+        """把页移到分区LRU尾部（最近使用），调用方持有分区锁"""
+        frame.last_used = next(self._clock)
+        if frame.key in partition.lru:
+            partition.lru.move_to_end(frame.key)
+
+    def _latch(self, frame: Frame, exclusive: bool) -> Optional[Page]:
+        """等待页载入完成并加闩锁；载入失败时返回 None"""
+        frame.loaded.wait()
+        if frame.page is None:
+            return None
+        frame.latch.acquire(exclusive)
+        return frame.page
+
+    def pin_page(self, table_name: str, page_id: int, exclusive: bool = False) -> Optional[Page]:
+        """固定页到缓冲池并加页闩锁（exclusive=True 时为写闩锁）"""
+        memory_table = self.file_manager.memory_tables.get(table_name)
+        if memory_table is not None:
+            # 内存表的页常驻内存，不占用页槽
+            return memory_table.pin(page_id, exclusive)
         key = (table_name, page_id)
+        partition = self._partition(key)
 
         # 如果页已在缓冲池中
-        if key in self.pages:
-            page = self.pages[key]
-            self.pin_counts[key] += 1
-            # 更新LRU
-            if key in self.lru_list:
-                self.lru_list.remove(key)
-            self.lru_list.append(key)
-            return page
-
-        # 如果缓冲池已满，需要置换
-        if len(self.pages) >= self.capacity:
-            self._evict_page()
-
-        # 从磁盘加载页
-        page_data = self.file_manager.read_page(table_name, page_id)
-        if page_data is None:
-            return None
+        with partition.lock:
+            frame = partition.frames.get(key)
+            if frame is not None:
+                frame.pin_count += 1
+                partition.stats.record_hit(table_name)
+                self._touch(partition, frame)
+            else:
+                partition.stats.record_miss(table_name)
+        if frame is not None:
+            return self._latch(frame, exclusive)
 
-        page = Page.from_bytes(page_id, page_data)
-        self.pages[key] = page
-        self.pin_counts[key] = 1
-        self.lru_list.append(key)
+        # 如果缓冲池已满或该表超出配额，需要置换
+        self._reserve(table_name)
 
-        return page
+        with partition.lock:
+            frame = partition.frames.get(key)
+            if frame is not None:
+                # 等待置换期间其他线程已载入同一页
+                frame.pin_count += 1
+                self._touch(partition, frame)
+                loader = False
+            else:
+                frame = Frame(key)
+                partition.frames[key] = frame
+                pending = partition.writebacks.get(key)
+                loader = True
+        if not loader:
+            self._unreserve(table_name)
+            return self._latch(frame, exclusive)
 
-    def unpin_page(self, table_name: str, page_id: int, is_dirty: bool = False):
-        """解除页的固定"""
+        # 从磁盘加载页（不持有任何锁）
+        try:
+            # 该页刚被置换、仍在写回时，先等写回完成再读
+            if pending is not None:
+                pending.written.wait()
+            page_data = self.file_manager.read_page(table_name, page_id)
+            # 表可能已被清空或截断，读不到完整的页
+            if page_data is not None and len(page_data) == PAGE_SIZE:
+                frame.page = Page.from_bytes(page_id, page_data)
+        finally:
+            if frame.page is None:
+                with partition.lock:
+                    partition.frames.pop(key, None)
+                self._unreserve(table_name)
+            else:
+                with partition.lock:
+                    partition.lru[key] = frame
+                    self._touch(partition, frame)
+            frame.loaded.set()
+
+        return self._latch(frame, exclusive)
+
+    def pin_if_resident(self, table_name: str, page_id: int) -> Optional[Page]:
+        """仅当页已在缓冲池中时固定它（读闩锁），不触发磁盘读取和置换"""
+        memory_table = self.file_manager.memory_tables.get(table_name)
+        if memory_table is not None:
+            return memory_table.pin(page_id)
         key = (table_name, page_id)
-        if key not in self.pages:
-            return
+        partition = self._partition(key)
+        with partition.lock:
+            frame = partition.frames.get(key)
+            if frame is None or not frame.loaded.is_set():
+                return None
+            frame.pin_count += 1
+            partition.stats.record_hit(table_name)
+        frame.latch.acquire_read()
+        return frame.page
 
-        self.pin_counts[key] -= 1
+    def unpin_page(self, table_name: str, page_id: int, is_dirty: bool = False):
+        """释放页闩锁并解除页的固定"""
+        memory_table = self.file_manager.memory_tables.get(table_name)
+        if memory_table is not None:
+            # 内存表的页本身就是数据，没有需要写回的内容
+            memory_table.unpin(page_id)
+            return
+        key = (table_name, page_id)
+        partition = self._partition(key)
+        with partition.lock:
+            frame = partition.frames.get(key)
+            if frame is None:
+                return
+            last = frame.pin_count == 1
 
         # 标记为脏页
         if is_dirty:
-            self.dirty_pages.add(key)
-            self.pages[key].dirty = True
-
-        # 如果pin count为0，可以准备置换
-        if self.pin_counts[key] == 0:
-            # 如果是脏页，立即刷新到磁盘
-            if key in self.dirty_pages:
-                self.flush_page(table_name, page_id)
+            frame.dirty = True
+            frame.page.dirty = True
 
-            # 更新LRU位置 - 保持原有逻辑
-            if key in self.lru_list:
-                self.lru_list.remove(key)
-            self.lru_list.append(key)  # 最近使用的放在后面
+        # 最后一个使用者释放时，脏页立即刷新到磁盘（此时仍持有闩锁）
+        if last and frame.dirty:
+            self._write_frame(frame)
+        frame.latch.release()
 
-    def flush_page(self, table_name: str, page_id: int):
-        """将脏页写回磁盘"""
-        key = (table_name, page_id)
-        if key not in self.pages or key not in self.dirty_pages:
+        with partition.lock:
+            frame.pin_count -= 1
+            released = frame.pin_count == 0
+            if released:
+                # 最近使用的放在后面
+                self._touch(partition, frame)
+        if not released:
             return
 
-        page = self.pages[key]
+        # 缩容后仍超出容量时，继续置换刚被释放的页
+        if self.resident > self.capacity:
+            victims = []
+            with self._lock:
+                while self.resident > self.capacity and self._evict_unpinned(victims):
+                    pass
+            self._write_back(victims)
 
-        # 使用正确的方法获取字节数据
-        try:
-            page_data = page.to_bytes()  # 尝试第一种方法名
-        except AttributeError:
+        # 唤醒等待空闲页的调用方
+        with self._page_released:
+            self._page_released.notify_all()
+
+    def _write_frame(self, frame: Frame):
+        """在读闩锁保护下把脏页写回磁盘"""
+        table_name, page_id = frame.key
+        with frame.latch.read():
+            if not frame.dirty:
+                return
+            success = self.file_manager.write_page(table_name, page_id, bytes(frame.page.data))
+            if success:
+                frame.dirty = False
+                frame.page.dirty = False
+        if success:
+            partition = self._partition(frame.key)
+            with partition.lock:
+                partition.stats.dirty_writebacks += 1
+
+    def _write_back(self, victims: List[Frame]):
+        """把置换出的脏页写回磁盘（不持有 _lock），完成后唤醒等待重新载入这些页的线程"""
+        for frame in victims:
             try:
-                page_data = page.to_bytes()  # 尝试第二种方法名
-            except AttributeError:
-                # 如果都没有，直接使用page.data
-                page_data = bytes(page.data)
+                self._write_frame(frame)
+            finally:
+                partition = self._partition(frame.key)
+                with partition.lock:
+                    if partition.writebacks.get(frame.key) is frame:
+                        del partition.writebacks[frame.key]
+                frame.written.set()
 
+    def _frames(self) -> List[Frame]:
+        """所有分区中页的快照"""
+        frames = []
+        for partition in self.partitions:
+            with partition.lock:
+                frames.extend(partition.frames.values())
+        return frames
 
-        success = self.file_manager.write_page(table_name, page_id, page_data)
-        if success:
-            self.dirty_pages.remove(key)
-            page.dirty = False
+    def flush_page(self, table_name: str, page_id: int):
+        """将脏页写回磁盘"""
+        key = (table_name, page_id)
+        partition = self._partition(key)
+        with partition.lock:
+            frame = partition.frames.get(key)
+        if frame is not None and frame.dirty:
+            self._write_frame(frame)
 
+    def flush_table(self, table_name: str):
+        """将指定表的脏页写回磁盘"""
+        for frame in self._frames():
+            if frame.dirty and frame.key[0] == table_name:
+                self._write_frame(frame)
 
     def flush_all(self):
         """将所有脏页写回磁盘"""
-        for key in list(self.dirty_pages):
-            table_name, page_id = key
-            self.flush_page(table_name, page_id)
-
-    def _evict_page(self):
-        """置换最近最少使用的页"""
-        # 从LRU列表前面开始找（最久未使用的）
-        for key in self.lru_list:
-            if self.pin_counts.get(key, 0) == 0:
-                table_name, page_id = key
-                # 如果是脏页，先写回磁盘
-                if key in self.dirty_pages:
-                    self.flush_page(table_name, page_id)
-                # 从缓冲池移除
-                del self.pages[key]
-                del self.pin_counts[key]
-                self.lru_list.remove(key)
-                self.dirty_pages.discard(key)
+        for frame in self._frames():
+            if frame.dirty:
+                self._write_frame(frame)
+
+    def get_table_quota(self, table_name: str) -> int:
+        """获取单表最多可占用的页数"""
+        if table_name in self.table_quotas:
+            return self.table_quotas[table_name]
+        return max(1, int(self.capacity * self.table_quota))
+
+    def set_table_quota(self, table_name: str, max_pages: Optional[int]):
+        """设置单表最多可占用的页数，None 表示恢复默认比例"""
+        if max_pages is None:
+            self.table_quotas.pop(table_name, None)
+        elif max_pages < 1:
+            raise ValueError("Table quota must be at least 1 page")
+        else:
+            self.table_quotas[table_name] = max_pages
+
+    def resize(self, capacity: int) -> int:
+        """在线调整缓冲池容量（页数），缩容时置换未固定的页"""
+        if capacity < 1:
+            raise ValueError("Buffer pool capacity must be at least 1 page")
+
+        victims = []
+        with self._lock:
+            self.capacity = capacity
+            # 仍被固定的页会在解除固定时被置换
+            while self.resident > self.capacity and self._evict_unpinned(victims):
+                pass
+        self._write_back(victims)
+
+        # 扩容后唤醒等待空闲页的调用方
+        with self._page_released:
+            self._page_released.notify_all()
+        return self.capacity
+
+    def _reserve(self, table_name: str):
+        """为即将载入的页预留一个页槽，所有页都被固定时等待释放，超时后报错"""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            victims = []
+            with self._lock:
+                # 该表已达到配额时优先置换它自己的页，避免单表独占缓冲池
+                if self.table_page_counts.get(table_name, 0) >= self.get_table_quota(table_name):
+                    self._evict_unpinned(victims, table_name)
+
+                reserved = self.resident < self.capacity or self._evict_unpinned(victims)
+                if reserved:
+                    self.resident += 1
+                    self.table_page_counts[table_name] = self.table_page_counts.get(table_name, 0) + 1
+            self._write_back(victims)
+            if reserved:
                 return
 
-        raise Exception("Buffer pool full and no unpinned page to evict")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise BufferPoolExhaustedError(
+                    f"Buffer pool full and no unpinned page to evict within {self.wait_timeout}s")
+            with self._page_released:
+                self._page_released.wait(min(remaining, 0.05))
+
+    def _unreserve(self, table_name: str):
+        """归还预留的页槽"""
+        with self._lock:
+            self.resident -= 1
+            count = self.table_page_counts.get(table_name, 0) - 1
+            if count > 0:
+                self.table_page_counts[table_name] = count
+            else:
+                self.table_page_counts.pop(table_name, None)
+        with self._page_released:
+            self._page_released.notify_all()
 
-        raise Exception("Buffer pool full and no unpinned page to evict")
+    def _evict_unpinned(self, victims: List[Frame], table_name: Optional[str] = None) -> bool:
+        """
+        置换一个未固定且未加闩锁的页，可限定只置换指定表的页（调用方持有 _lock）。
+        脏页只从页表摘下并加入 victims，由调用方释放 _lock 后调用 _write_back 写回
+        """
+        while True:
+            # 各分区LRU中最久未使用的可置换页，取逻辑时钟最小的一个
+            candidate = None
+            for partition in self.partitions:
+                with partition.lock:
+                    for frame in partition.lru.values():
+                        if table_name is not None and frame.key[0] != table_name:
+                            continue
+                        if frame.pin_count > 0 or frame.latch.is_latched:
+                            continue
+                        if candidate is None or frame.last_used < candidate[2]:
+                            candidate = (partition, frame, frame.last_used)
+                        break
+            if candidate is None:
+                return False
+
+            partition, frame, last_used = candidate
+            with partition.lock:
+                # 比较期间页被再次使用时重新挑选
+                if (partition.frames.get(frame.key) is not frame or frame.pin_count > 0
+                        or frame.latch.is_latched or frame.last_used != last_used):
+                    continue
+                del partition.frames[frame.key]
+                del partition.lru[frame.key]
+                partition.stats.evictions += 1
+                if frame.dirty:
+                    frame.written = threading.Event()
+                    partition.writebacks[frame.key] = frame
+                    victims.append(frame)
+            break
+
+        self._unreserve(frame.key[0])
+        return True
+
+    def discard_table_pages(self, table_name: str, from_page: int = 0, page_count: Optional[int] = None) -> int:
+        """
+        丢弃指定表页号不小于 from_page 的缓冲页，脏页不写回（表被删除、清空或截断，页内容已不再需要）。
+        该表没有驻留页时立即返回；给出表的页数且少于驻留页数时只按页号探测，
+        否则遍历页表。返回丢弃的页数
+        """
+        removed = []
+        # 已置换、尚未写回的页不再写回，以免写到被清空或截断的文件中（置换在 _lock 内登记待写回的页）
+        cancelled = []
+        with self._lock:
+            for partition in self.partitions:
+                with partition.lock:
+                    cancelled.extend(frame for key, frame in partition.writebacks.items()
+                                     if key[0] == table_name and key[1] >= from_page)
+            if self.table_page_counts.get(table_name):
+                if page_count is not None and page_count - from_page <= self.resident:
+                    for page_id in range(from_page, page_count):
+                        key = (table_name, page_id)
+                        partition = self._partition(key)
+                        with partition.lock:
+                            if partition.frames.pop(key, None) is not None:
+                                partition.lru.pop(key, None)
+                                removed.append(key)
+                else:
+                    for partition in self.partitions:
+                        with partition.lock:
+                            keys = [key for key in partition.frames if key[0] == table_name and key[1] >= from_page]
+                            for key in keys:
+                                del partition.frames[key]
+                                partition.lru.pop(key, None)
+                            removed.extend(keys)
+                self.resident -= len(removed)
+                count = self.table_page_counts.get(table_name, 0) - len(removed)
+                if count > 0:
+                    self.table_page_counts[table_name] = count
+                else:
+                    self.table_page_counts.pop(table_name, None)
+
+        for frame in cancelled:
+            # 写闩锁等待正在进行的写回结束
+            with frame.latch.write():
+                frame.dirty = False
+                frame.page.dirty = False
+        if not removed:
+            return 0
+
+        with self._page_released:
+            self._page_released.notify_all()
+        return len(removed)
 
     def allocate_page(self, table_name: str) -> Optional[Page]:
-        """分配新页"""
+        """分配新页，返回的页已固定并持有写闩锁"""
+        memory_table = self.file_manager.memory_tables.get(table_name)
+        if memory_table is not None:
+            return memory_table.pin(memory_table.allocate(), exclusive=True)
+        self._reserve(table_name)
+
         page_id = self.file_manager.allocate_page(table_name)
         if page_id == -1:
+            self._unreserve(table_name)
             return None
 
-        page = Page(page_id)
         key = (table_name, page_id)
-        self.pages[key] = page
-        self.pin_counts[key] = 1
-        self.lru_list.append(key)
-        self.dirty_pages.add(key)
+        partition = self._partition(key)
+        with partition.lock:
+            frame = partition.frames.get(key)
+            if frame is not None:
+                # 其他线程已经从磁盘载入了这个新页
+                frame.pin_count += 1
+                self._touch(partition, frame)
+                existing = True
+            else:
+                frame = Frame(key, Page(page_id))
+                frame.dirty = True
+                partition.frames[key] = frame
+                partition.lru[key] = frame
+                self._touch(partition, frame)
+                existing = False
+        if existing:
+            self._unreserve(table_name)
+        return self._latch(frame, True)
+
+    def get_stats(self) -> Dict:
+        """获取缓冲池统计信息"""
+        frames = self._frames()
+        stats = self.stats.to_dict()
+        stats['capacity'] = self.capacity
+        stats['memory_budget'] = self.memory_budget
+        stats['pages'] = len(frames)
+        stats['dirty_pages'] = sum(1 for frame in frames if frame.dirty)
+        stats['pinned_pages'] = sum(1 for frame in frames if frame.pin_count > 0)
+        return stats
 
-        return page
\ No newline at end of file
+    def reset_stats(self):
+        """清零统计计数"""
+        for partition in self.partitions:
+            with partition.lock:
+                partition.stats = BufferPoolStats()
@@ -0,0 +1,182 @@
+"""
+页压缩：压缩表的每一页单独压缩，存放在表文件中的变长槽位里（槽位 = 4 字节长度 + 压缩数据），
+页号到槽位的映射保存在 <表名>.pmap，缓冲池中始终是解压后的页。
+
+表文件开头仍是 4 字节页数；映射文件为文件头（魔数 + 编码名）加每页一项 (槽位偏移, 槽位容量)，
+偏移为 0 表示该页尚未写入（全 0 页）。页重写后仍放得下就原地覆盖，否则换到空闲槽位或文件末尾，
+先写数据再改映射项，映射项改写前旧槽位不会被复用。空闲槽位只在内存中维护，加载时由映射推算。
+lz4 是可选依赖，未安装时只能使用 zlib。
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+from utils.constants import PAGE_SIZE, PAGE_COMPRESSION_LEVEL, COMPRESSED_SLOT_ALIGN
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+PAGE_MAP_SUFFIX = '.pmap'
+PAGE_MAP_MAGIC = b'PMAP'
+PAGE_MAP_HEADER = struct.Struct('>4s8s')
+MAP_ENTRY = struct.Struct('>QI')
+SLOT_HEADER = struct.Struct('>I')
+# 表文件中第一个槽位的偏移（页数之后）
+FIRST_SLOT_OFFSET = 4
+
+
+def available_codecs() -> List[str]:
+    return ['zlib'] + (['lz4'] if lz4_frame is not None else [])
+
+
+def compress_page(codec: str, data: bytes) -> bytes:
+    if codec == 'lz4':
+        return lz4_frame.compress(bytes(data))
+    return zlib.compress(data, PAGE_COMPRESSION_LEVEL)
+
+
+def decompress_page(codec: str, data: bytes) -> bytes:
+    if codec == 'lz4':
+        return lz4_frame.decompress(data)
+    return zlib.decompress(data)
+
+
+class PageMap:
+    """压缩表的页 -> 槽位映射及空闲槽位"""
+
+    def __init__(self, path: str, codec: str, entries: Optional[List[Tuple[int, int]]] = None):
+        self.path = path
+        self.codec = codec
+        self.entries: List[Tuple[int, int]] = entries if entries is not None else []
+        self.lock = threading.Lock()
+        self._rebuild_free_slots()
+
+    @classmethod
+    def create(cls, path: str, codec: str) -> 'PageMap':
+        if codec not in available_codecs():
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        with open(path, 'wb') as f:
+            f.write(PAGE_MAP_HEADER.pack(PAGE_MAP_MAGIC, codec.encode('ascii')))
+        return cls(path, codec)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['PageMap']:
+        """加载映射文件，不存在时返回 None（表未压缩）"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        magic, codec = PAGE_MAP_HEADER.unpack_from(data, 0)
+        if magic != PAGE_MAP_MAGIC:
+            raise ValueError(f"Invalid page map file: {path}")
+        body = data[PAGE_MAP_HEADER.size:]
+        body = body[:len(body) - len(body) % MAP_ENTRY.size]
+        entries = [tuple(entry) for entry in MAP_ENTRY.iter_unpack(body)]
+        return cls(path, codec.rstrip(b'\x00').decode('ascii'), entries)
+
+    def _rebuild_free_slots(self):
+        """由映射推算已用区域之间的空隙及文件末尾"""
+        used = sorted((offset, capacity) for offset, capacity in self.entries if offset)
+        self.free_slots: List[Tuple[int, int]] = []
+        position = FIRST_SLOT_OFFSET
+        for offset, capacity in used:
+            if offset > position:
+                self.free_slots.append((position, offset - position))
+            position = max(position, offset + capacity)
+        self.file_end = position
+
+    def slot(self, page_id: int) -> Tuple[int, int]:
+        """页的 (槽位偏移, 容量)，未写入的页为 (0, 0)"""
+        return self.entries[page_id] if page_id < len(self.entries) else (0, 0)
+
+    def place(self, page_id: int, size: int) -> Tuple[int, int]:
+        """为 size 字节的压缩页选择槽位，返回 (偏移, 容量)；调用方写完数据后调用 commit"""
+        offset, capacity = self.slot(page_id)
+        if offset and size <= capacity:
+            return offset, capacity
+        capacity = -(-size // COMPRESSED_SLOT_ALIGN) * COMPRESSED_SLOT_ALIGN
+        for i, (free_offset, free_capacity) in enumerate(self.free_slots):
+            if free_capacity >= capacity:
+                if free_capacity > capacity:
+                    self.free_slots[i] = (free_offset + capacity, free_capacity - capacity)
+                else:
+                    del self.free_slots[i]
+                return free_offset, capacity
+        offset = self.file_end
+        self.file_end += capacity
+        return offset, capacity
+
+    def commit(self, page_id: int, offset: int, capacity: int):
+        """登记页的新槽位并写入映射文件，旧槽位随后才可复用"""
+        old = self.slot(page_id)
+        if old == (offset, capacity):
+            return
+        if page_id >= len(self.entries):
+            self.entries.extend([(0, 0)] * (page_id + 1 - len(self.entries)))
+        self.entries[page_id] = (offset, capacity)
+        with open(self.path, 'r+b') as f:
+            f.seek(PAGE_MAP_HEADER.size + page_id * MAP_ENTRY.size)
+            f.write(MAP_ENTRY.pack(offset, capacity))
+        if old[0]:
+            self.free_slots.append(old)
+
+    def truncate(self, page_count: int):
+        """只保留前 page_count 页的映射，其余页的槽位变为空闲"""
+        if page_count >= len(self.entries):
+            return
+        del self.entries[page_count:]
+        with open(self.path, 'r+b') as f:
+            f.truncate(PAGE_MAP_HEADER.size + page_count * MAP_ENTRY.size)
+        self._rebuild_free_slots()
+
+    @property
+    def stored_bytes(self) -> int:
+        """槽位占用的字节数"""
+        return sum(capacity for offset, capacity in self.entries if offset)
+
+
+def read_slot(f, page_map: PageMap, page_id: int) -> bytes:
+    """从已打开的表文件读取一页并解压，未写入的页为全 0"""
+    offset, capacity = page_map.slot(page_id)
+    if not offset:
+        return bytes(PAGE_SIZE)
+    slot = os.pread(f.fileno(), capacity, offset) if hasattr(os, 'pread') else _read_at(f, offset, capacity)
+    size = SLOT_HEADER.unpack_from(slot, 0)[0]
+    return decompress_page(page_map.codec, slot[SLOT_HEADER.size:SLOT_HEADER.size + size])
+
+
+def _read_at(f, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+def write_slot(f, page_map: PageMap, page_id: int, data: bytes) -> int:
+    """压缩一页写入表文件并更新映射，返回写入的字节数"""
+    payload = compress_page(page_map.codec, data)
+    with page_map.lock:
+        offset, capacity = page_map.place(page_id, SLOT_HEADER.size + len(payload))
+        f.seek(offset)
+        f.write(SLOT_HEADER.pack(len(payload)) + payload)
+        f.flush()
+        page_map.commit(page_id, offset, capacity)
+    return SLOT_HEADER.size + len(payload)
+
+
+def page_map_path(file_path: str) -> str:
+    """表文件对应的映射文件路径"""
+    return os.path.splitext(file_path)[0] + PAGE_MAP_SUFFIX
+
+
+def read_page_run(f, page_map: Optional[PageMap], start_page: int, count: int) -> bytes:
+    """
+    从已打开的表文件读取连续 count 页的（解压后）内容，page_map 为 None 表示未压缩的表；
+    供直接读取表文件的扫描工作进程使用
+    """
+    if page_map is None:
+        f.seek(4 + start_page * PAGE_SIZE)
+        return f.read(count * PAGE_SIZE)
+    return b''.join(read_slot(f, page_map, page_id) for page_id in range(start_page, start_page + count))
@@ -1,23 +1,139 @@
 import os
 import struct
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Optional
 from utils.constants import PAGE_SIZE
+from .metrics import IOStats
+from .compression import PageMap, PAGE_MAP_SUFFIX, FIRST_SLOT_OFFSET, read_slot, write_slot
+from .memory_table import MemoryTable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 数据目录锁文件名
+LOCK_FILE_NAME = '.lock'
+
+
+class DataDirectoryLockedError(RuntimeError):
+    pass
+
+
+class DataDirectoryLock:
+    """数据目录的进程级排他锁，防止多个进程各自打开缓冲池写同一批文件"""
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, LOCK_FILE_NAME)
+        self._file = None
+
+    def acquire(self):
+        if self._file is not None:
+            return
+        f = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.seek(0)
+            owner = f.read().strip()
+            f.close()
+            raise DataDirectoryLockedError(
+                f"Data directory is in use by another process (pid {owner or '?'}); "
+                f"connect through the server instead")
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
 
 
 class FileManager:
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
+        self.stats = IOStats()
+        # 分配新页需要读改写文件头，多线程分配时串行化
+        self._allocation_lock = threading.Lock()
+        # 压缩表的页映射：表 -> PageMap，未压缩的表为 None
+        self._page_maps: Dict[str, Optional[PageMap]] = {}
+        # 表 -> 表文件所在的目录（表空间），未登记的表在数据目录中
+        self.table_directories: Dict[str, str] = {}
+        # 内存表：表 -> MemoryTable，页只在内存中，没有表文件
+        self.memory_tables: Dict[str, MemoryTable] = {}
+
+    def is_memory(self, table_name: str) -> bool:
+        """是否为内存表"""
+        return table_name in self.memory_tables
+
+    def set_table_directory(self, table_name: str, directory: Optional[str]):
+        """登记表的各个文件所在的目录，None 表示数据目录"""
+        if directory is None:
+            self.table_directories.pop(table_name, None)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self.table_directories[table_name] = directory
+
+    def table_path(self, table_name: str, suffix: str) -> str:
+        """表的某个文件（数据文件、页映射、区域映射等）的路径，与表文件在同一目录"""
+        return os.path.join(self.table_directories.get(table_name, self.data_dir), table_name + suffix)
 
     def get_file_path(self, table_name: str) -> str:
-        return os.path.join(self.data_dir, f"{table_name}.dat")
+        return self.table_path(table_name, '.dat')
+
+    def _page_map_path(self, table_name: str) -> str:
+        return self.table_path(table_name, PAGE_MAP_SUFFIX)
+
+    def page_map(self, table_name: str) -> Optional[PageMap]:
+        """压缩表的页映射（首次使用时加载），未压缩的表和内存表返回 None"""
+        if table_name in self.memory_tables:
+            return None
+        if table_name not in self._page_maps:
+            with self._allocation_lock:
+                if table_name not in self._page_maps:
+                    self._page_maps[table_name] = PageMap.load(self._page_map_path(table_name))
+        return self._page_maps[table_name]
+
+    def compression_stats(self, table_name: str) -> Optional[Dict]:
+        """压缩表的编码、页数与槽位占用的字节数，未压缩的表返回 None"""
+        page_map = self.page_map(table_name)
+        if page_map is None:
+            return None
+        page_count = self.get_page_count(table_name)
+        return {'codec': page_map.codec, 'pages': page_count, 'stored_bytes': page_map.stored_bytes,
+                'ratio': page_count * PAGE_SIZE / page_map.stored_bytes if page_map.stored_bytes else 0.0}
 
     def delete_file(self, table_name: str) -> bool:
-        """删除表文件"""
+        """删除表文件（及压缩表的页映射）"""
+        if self.memory_tables.pop(table_name, None) is not None:
+            return True
         file_path = self.get_file_path(table_name)
         try:
+            self._page_maps.pop(table_name, None)
+            if os.path.exists(self._page_map_path(table_name)):
+                os.remove(self._page_map_path(table_name))
             if os.path.exists(file_path):
                 os.remove(file_path)
+                self.table_directories.pop(table_name, None)
                 return True
             else:
                 return False
@@ -26,64 +142,261 @@ class FileManager:
             return False
 
     def file_exists(self, table_name: str) -> bool:
-        return os.path.exists(self.get_file_path(table_name))
+        return table_name in self.memory_tables or os.path.exists(self.get_file_path(table_name))
 
-    def create_file(self, table_name: str) -> bool:
+    def create_file(self, table_name: str, compression: Optional[str] = None, memory: bool = False) -> bool:
+        """
+        创建表文件；compression 为页压缩编码（zlib / lz4），同时创建页映射文件。
+        memory=True 时创建内存表，不创建任何文件
+        """
+        if memory:
+            if table_name in self.memory_tables:
+                return False
+            self.memory_tables[table_name] = MemoryTable()
+            return True
         file_path = self.get_file_path(table_name)
         if not os.path.exists(file_path):
             with open(file_path, 'wb') as f:
                 # 写入文件头（页数）
                 f.write(struct.pack('>i', 0))
+            with self._allocation_lock:
+                self._page_maps[table_name] = (
+                    PageMap.create(self._page_map_path(table_name), compression) if compression else None)
             return True
         return False
 
     def read_page(self, table_name: str, page_id: int) -> Optional[bytes]:
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].read(page_id)
         file_path = self.get_file_path(table_name)
         if not os.path.exists(file_path):
             return None
 
+        page_map = self.page_map(table_name)
+        start = time.perf_counter()
+        if page_map is not None:
+            with open(file_path, 'rb') as f:
+                data = read_slot(f, page_map, page_id)
+            self.stats.table(table_name).record_read(page_map.slot(page_id)[1], time.perf_counter() - start)
+            return data
+
         with open(file_path, 'rb') as f:
             # 跳过文件头
             f.seek(4)
             # 定位到指定页
             f.seek(page_id * PAGE_SIZE, 1)
-            return f.read(PAGE_SIZE)
+            data = f.read(PAGE_SIZE)
+        self.stats.table(table_name).record_read(len(data), time.perf_counter() - start)
+        return data
+
+    def read_pages_into(self, table_name: str, start_page: int, buffers: List[bytearray]) -> int:
+        """一次系统调用连续读取多页到调用方提供的缓冲区中，返回实际读到的完整页数"""
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].read_into(start_page, buffers)
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path) or not buffers:
+            return 0
+
+        page_map = self.page_map(table_name)
+        if page_map is not None:
+            return self._read_compressed_into(table_name, page_map, start_page, buffers)
+
+        start = time.perf_counter()
+        offset = 4 + start_page * PAGE_SIZE
+        with open(file_path, 'rb') as f:
+            if hasattr(os, 'preadv'):
+                nbytes = os.preadv(f.fileno(), buffers, offset)
+            else:
+                f.seek(offset)
+                data = f.read(PAGE_SIZE * len(buffers))
+                nbytes = len(data)
+                for i, buffer in enumerate(buffers):
+                    chunk = data[i * PAGE_SIZE:(i + 1) * PAGE_SIZE]
+                    buffer[:len(chunk)] = chunk
+        self.stats.table(table_name).record_read(nbytes, time.perf_counter() - start)
+        return nbytes // PAGE_SIZE
+
+    def _read_compressed_into(self, table_name: str, page_map: PageMap, start_page: int,
+                              buffers: List[bytearray]) -> int:
+        """逐页读取压缩表的槽位并解压到缓冲区，只读取表的页数以内的页"""
+        count = max(0, min(len(buffers), self.get_page_count(table_name) - start_page))
+        start = time.perf_counter()
+        with open(self.get_file_path(table_name), 'rb') as f:
+            for i in range(count):
+                buffers[i][:] = read_slot(f, page_map, start_page + i)
+        nbytes = sum(page_map.slot(start_page + i)[1] for i in range(count))
+        self.stats.table(table_name).record_read(nbytes, time.perf_counter() - start)
+        return count
+
+    def _write_compressed(self, table_name: str, page_map: PageMap, start_page: int, pages: List[bytes]) -> bool:
+        start = time.perf_counter()
+        with open(self.get_file_path(table_name), 'r+b') as f:
+            nbytes = sum(write_slot(f, page_map, start_page + i, data) for i, data in enumerate(pages))
+        self.stats.table(table_name).record_write(nbytes, time.perf_counter() - start)
+        return True
 
     def write_page(self, table_name: str, page_id: int, data: bytes) -> bool:
         if len(data) != PAGE_SIZE:
             raise ValueError("Page data must be exactly PAGE_SIZE bytes")
 
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].write(page_id, [data])
         file_path = self.get_file_path(table_name)
         if not os.path.exists(file_path):
             return False
 
+        page_map = self.page_map(table_name)
+        if page_map is not None:
+            return self._write_compressed(table_name, page_map, page_id, [data])
+
+        start = time.perf_counter()
         with open(file_path, 'r+b') as f:
             # 定位到指定页
             f.seek(4 + page_id * PAGE_SIZE)
             f.write(data)
+        self.stats.table(table_name).record_write(len(data), time.perf_counter() - start)
         return True
 
     def allocate_page(self, table_name: str) -> int:
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].allocate()
         file_path = self.get_file_path(table_name)
         if not os.path.exists(file_path):
             return -1
 
-        with open(file_path, 'r+b') as f:
+        page_map = self.page_map(table_name)
+        start = time.perf_counter()
+        with self._allocation_lock, open(file_path, 'r+b') as f:
             # 读取当前页数
             num_pages = struct.unpack('>i', f.read(4))[0]
-            # 增加页数
+            # 先扩展文件再增加页数，并发读者看到新页数时新页已可读（压缩表的新页没有槽位，读出全 0）
+            if page_map is None:
+                f.seek(4 + num_pages * PAGE_SIZE)
+                f.write(b'\x00' * PAGE_SIZE)
             f.seek(0)
             f.write(struct.pack('>i', num_pages + 1))
-            # 扩展文件
-            f.seek(0, 2)
-            f.write(b'\x00' * PAGE_SIZE)
+        self.stats.table(table_name).record_write(PAGE_SIZE, time.perf_counter() - start)
+
+        return num_pages
+
+    def reset_file(self, table_name: str) -> bool:
+        """清空表文件：页数置零并截断到只剩文件头"""
+        if table_name in self.memory_tables:
+            self.memory_tables[table_name].truncate(0)
+            return True
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path):
+            return False
+
+        page_map = self.page_map(table_name)
+        start = time.perf_counter()
+        with self._allocation_lock, open(file_path, 'r+b') as f:
+            f.write(struct.pack('>i', 0))
+            f.flush()
+            f.truncate(4)
+            if page_map is not None:
+                with page_map.lock:
+                    page_map.truncate(0)
+        self.stats.table(table_name).record_write(4, time.perf_counter() - start)
+        return True
+
+    def truncate_pages(self, table_name: str, page_count: int) -> bool:
+        """截断表文件，只保留前 page_count 页（用于归还末尾的空页）"""
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].truncate(page_count)
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path):
+            return False
+
+        page_map = self.page_map(table_name)
+        with self._allocation_lock, open(file_path, 'r+b') as f:
+            num_pages = struct.unpack('>i', f.read(4))[0]
+            if page_count >= num_pages:
+                return False
+            # 先减少页数再截断，并发读者不会读到截断后的页
+            f.seek(0)
+            f.write(struct.pack('>i', page_count))
+            f.flush()
+            if page_map is None:
+                f.truncate(4 + page_count * PAGE_SIZE)
+            else:
+                # 截掉最后一个仍在使用的槽位之后的部分
+                with page_map.lock:
+                    page_map.truncate(page_count)
+                    f.truncate(max(FIRST_SLOT_OFFSET, page_map.file_end))
+        return True
+
+    def allocate_pages(self, table_name: str, count: int) -> int:
+        """一次扩展文件分配多个连续新页，返回第一个新页的页号"""
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].allocate(count)
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path):
+            return -1
+
+        start = time.perf_counter()
+        page_map = self.page_map(table_name)
+        with self._allocation_lock, open(file_path, 'r+b') as f:
+            num_pages = struct.unpack('>i', f.read(4))[0]
+            # 扩展文件（稀疏扩展，页内容随后由 write_pages 写入）；压缩表的槽位在写入时分配
+            if page_map is None:
+                f.truncate(4 + (num_pages + count) * PAGE_SIZE)
+            f.seek(0)
+            f.write(struct.pack('>i', num_pages + count))
+        self.stats.table(table_name).record_write(4, time.perf_counter() - start)
 
         return num_pages
 
+    def write_pages(self, table_name: str, start_page: int, pages: List[bytes]) -> bool:
+        """一次写入多个连续页"""
+        if any(len(data) != PAGE_SIZE for data in pages):
+            raise ValueError("Page data must be exactly PAGE_SIZE bytes")
+
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].write(start_page, pages)
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path):
+            return False
+
+        page_map = self.page_map(table_name)
+        if page_map is not None:
+            return self._write_compressed(table_name, page_map, start_page, pages)
+
+        start = time.perf_counter()
+        with open(file_path, 'r+b') as f:
+            f.seek(4 + start_page * PAGE_SIZE)
+            f.write(b''.join(pages))
+        self.stats.table(table_name).record_write(len(pages) * PAGE_SIZE, time.perf_counter() - start)
+        return True
+
+    def sync_file(self, table_name: str) -> bool:
+        """把表文件已写入的数据持久化到磁盘（fsync），内存表无需持久化"""
+        if table_name in self.memory_tables:
+            return True
+        file_path = self.get_file_path(table_name)
+        if not os.path.exists(file_path):
+            return False
+        with open(file_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        if self.page_map(table_name) is not None:
+            with open(self._page_map_path(table_name), 'rb+') as f:
+                os.fsync(f.fileno())
+        return True
+
     def get_page_count(self, table_name: str) -> int:
+        if table_name in self.memory_tables:
+            return self.memory_tables[table_name].page_count
         file_path = self.get_file_path(table_name)
         if not os.path.exists(file_path):
             return 0
 
         with open(file_path, 'rb') as f:
-            return struct.unpack('>i', f.read(4))[0]
\ No newline at end of file
+            return struct.unpack('>i', f.read(4))[0]
+
+    def get_stats(self) -> Dict:
+        """获取文件I/O统计信息"""
+        return self.stats.to_dict()
+
+    def reset_stats(self):
+        """清零统计计数"""
+        self.stats = IOStats()
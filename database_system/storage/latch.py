@@ -0,0 +1,97 @@
+"""
+页闩锁：保护缓冲池中页内容的读写锁
+"""
+import contextlib
+import threading
+from typing import Dict, Iterator, Optional
+
+
+class ReadWriteLatch:
+    """
+    读写闩锁：多个读者可同时持有，写者独占。
+    有写者在等待时新的读者排在其后，持续到来的读者不会让写者饿死；
+    已持有读闩锁的线程再次加读闩锁时不等待，避免与排队的写者互相等待。
+    持有写闩锁的线程可以重入（再次加读或写闩锁），读者不能升级为写者。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        # 各线程持有的读闩锁层数
+        self._read_depths: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    @property
+    def is_latched(self) -> bool:
+        return self._readers > 0 or self._writer is not None
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me not in self._read_depths:
+                while self._writer is not None or self._waiting_writers > 0:
+                    self._cond.wait()
+            self._readers += 1
+            self._read_depths[me] = self._read_depths.get(me, 0) + 1
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers > 0:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def acquire(self, exclusive: bool = False):
+        if exclusive:
+            self.acquire_write()
+        else:
+            self.acquire_read()
+
+    def release(self):
+        """释放当前线程持有的闩锁（自动区分读/写）"""
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+                return
+            if self._readers <= 0:
+                raise RuntimeError("Releasing a latch that is not held")
+            self._readers -= 1
+            depth = self._read_depths.get(threading.get_ident(), 0)
+            if depth > 1:
+                self._read_depths[threading.get_ident()] = depth - 1
+            elif depth == 1:
+                del self._read_depths[threading.get_ident()]
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release()
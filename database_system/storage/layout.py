@@ -0,0 +1,140 @@
+"""
+页内记录布局
+
+RowLayout（行式，NSM）：记录在页头之后按记录号连续存放，一条记录的各字段相邻。
+PaxLayout（列式，PAX）：页按单页容量为每个字段划分一个小页（minipage），
+同一字段的全部取值连续存放，只用到部分列的扫描只需读取这些列的小页。
+
+两种布局的页头、单页容量和记录号都相同，free_space_start 总是 8 + 记录数 * 记录大小，
+因此空闲空间判断、RID 和空闲空间映射与布局无关；接口上的记录总是行格式的字节串。
+"""
+from typing import List, Optional, Sequence
+from .page import Page
+from utils.constants import PAGE_SIZE
+
+
+class RowLayout:
+    """行式布局，记录操作直接使用 Page 的方法"""
+
+    columnar = False
+
+    def __init__(self, field_sizes: Sequence[int]):
+        # 字段依次为版本头（版本化表）和各列
+        self.field_sizes = list(field_sizes)
+        self.record_size = sum(self.field_sizes)
+        self.capacity = (PAGE_SIZE - 8) // self.record_size if self.record_size else 0
+        # 各字段在行格式记录中的偏移
+        self.record_offsets = [sum(self.field_sizes[:i]) for i in range(len(self.field_sizes))]
+
+    def field_offset(self, record_id: int, field: int = 0) -> int:
+        """记录 record_id 的第 field 个字段在页内的偏移"""
+        return 8 + record_id * self.record_size + self.record_offsets[field]
+
+    def record_at(self, page_data, record_id: int) -> bytes:
+        offset = 8 + record_id * self.record_size
+        return bytes(page_data[offset:offset + self.record_size])
+
+    def clear_record(self, page_data, record_id: int):
+        """把槽位清零（版本化表中即为空闲槽位）"""
+        offset = 8 + record_id * self.record_size
+        page_data[offset:offset + self.record_size] = bytes(self.record_size)
+
+    def insert_record(self, page: Page, record: bytes) -> Optional[int]:
+        return page.insert_record(record)
+
+    def append_records(self, page: Page, records: List[bytes]) -> int:
+        return page.append_records(records)
+
+    def update_record(self, page: Page, record_id: int, record: bytes) -> bool:
+        return page.update_record(record_id, record)
+
+    def delete_record(self, page: Page, record_id: int) -> bool:
+        return page.delete_record(record_id, self.record_size)
+
+    def compact(self, page: Page, live_ids: List[int]) -> int:
+        return page.compact(self.record_size, live_ids)
+
+
+class PaxLayout(RowLayout):
+    """列式（PAX）布局：字段 i 的小页从 8 + 容量 * (前面各字段大小之和) 开始"""
+
+    columnar = True
+
+    def __init__(self, field_sizes: Sequence[int]):
+        super().__init__(field_sizes)
+        self.minipage_starts = [8 + self.capacity * offset for offset in self.record_offsets]
+
+    def field_offset(self, record_id: int, field: int = 0) -> int:
+        return self.minipage_starts[field] + record_id * self.field_sizes[field]
+
+    def column_bytes(self, page_data, num_records: int, field: int) -> bytes:
+        """前 num_records 条记录第 field 个字段的取值，连续存放"""
+        start = self.minipage_starts[field]
+        return bytes(page_data[start:start + num_records * self.field_sizes[field]])
+
+    def record_at(self, page_data, record_id: int) -> bytes:
+        return b''.join(bytes(page_data[start + record_id * size:start + (record_id + 1) * size])
+                        for start, size in zip(self.minipage_starts, self.field_sizes))
+
+    def _write(self, page_data, record_id: int, record: bytes):
+        for start, size, offset in zip(self.minipage_starts, self.field_sizes, self.record_offsets):
+            position = start + record_id * size
+            page_data[position:position + size] = record[offset:offset + size]
+
+    def clear_record(self, page_data, record_id: int):
+        self._write(page_data, record_id, bytes(self.record_size))
+
+    def _set_count(self, page: Page, num_records: int):
+        page.num_records = num_records
+        page.free_space_start = 8 + num_records * self.record_size
+        page.write_header()
+
+    def insert_record(self, page: Page, record: bytes) -> Optional[int]:
+        if page.num_records >= self.capacity:
+            return None
+        self._write(page.data, page.num_records, record)
+        self._set_count(page, page.num_records + 1)
+        return page.num_records - 1
+
+    def append_records(self, page: Page, records: List[bytes]) -> int:
+        count = min(len(records), self.capacity - page.num_records)
+        if count <= 0:
+            return 0
+        first = page.num_records
+        for start, size, offset in zip(self.minipage_starts, self.field_sizes, self.record_offsets):
+            position = start + first * size
+            page.data[position:position + count * size] = b''.join(
+                record[offset:offset + size] for record in records[:count])
+        self._set_count(page, first + count)
+        return count
+
+    def update_record(self, page: Page, record_id: int, record: bytes) -> bool:
+        if record_id >= page.num_records:
+            return False
+        self._write(page.data, record_id, record)
+        page.dirty = True
+        return True
+
+    def delete_record(self, page: Page, record_id: int) -> bool:
+        """删除一条记录，每个小页中其后的取值依次前移"""
+        if record_id >= page.num_records:
+            return False
+        for start, size in zip(self.minipage_starts, self.field_sizes):
+            position = start + record_id * size
+            end = start + page.num_records * size
+            page.data[position:end - size] = page.data[position + size:end]
+            page.data[end - size:end] = bytes(size)
+        self._set_count(page, page.num_records - 1)
+        return True
+
+    def compact(self, page: Page, live_ids: List[int]) -> int:
+        removed = page.num_records - len(live_ids)
+        if removed <= 0:
+            return 0
+        for start, size in zip(self.minipage_starts, self.field_sizes):
+            live = b''.join(bytes(page.data[start + i * size:start + (i + 1) * size]) for i in live_ids)
+            end = start + page.num_records * size
+            page.data[start:start + len(live)] = live
+            page.data[start + len(live):end] = bytes(end - start - len(live))
+        self._set_count(page, len(live_ids))
+        return removed
@@ -0,0 +1,83 @@
+"""
+内存表的页存储：页常驻内存（bytearray），从不写入磁盘，数据库关闭后丢失。
+
+缓冲池对内存表直接返回这里的页并加页闩锁，不占用页槽、不置换、不在解除固定时写回；
+FileManager 的页读写接口（批量导入、环形扫描等直接读写页的路径）对内存表改为复制这里的页。
+"""
+import threading
+from typing import List, Optional
+from utils.constants import PAGE_SIZE
+from .latch import ReadWriteLatch
+from .page import Page
+
+
+class MemoryTable:
+    """一张内存表的全部页及各页的闩锁"""
+
+    def __init__(self):
+        self.pages: List[Page] = []
+        self.latches: List[ReadWriteLatch] = []
+        # 分配和截断页串行化
+        self.lock = threading.Lock()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def nbytes(self) -> int:
+        """页占用的内存（字节）"""
+        return len(self.pages) * PAGE_SIZE
+
+    def pin(self, page_id: int, exclusive: bool = False) -> Optional[Page]:
+        """给页加闩锁（exclusive=True 时为写闩锁）并返回页本身，页不存在时返回 None"""
+        if page_id >= len(self.pages):
+            return None
+        self.latches[page_id].acquire(exclusive)
+        return self.pages[page_id]
+
+    def unpin(self, page_id: int):
+        """释放页闩锁"""
+        if page_id < len(self.latches):
+            self.latches[page_id].release()
+
+    def allocate(self, count: int = 1) -> int:
+        """在表尾追加 count 个空页，返回第一个新页的页号"""
+        with self.lock:
+            first_page_id = len(self.pages)
+            for page_id in range(first_page_id, first_page_id + count):
+                self.latches.append(ReadWriteLatch())
+                self.pages.append(Page(page_id))
+            return first_page_id
+
+    def read(self, page_id: int) -> Optional[bytes]:
+        """页内容的副本"""
+        if page_id >= len(self.pages):
+            return None
+        return bytes(self.pages[page_id].data)
+
+    def read_into(self, start_page: int, buffers: List[bytearray]) -> int:
+        """把连续多页复制到调用方的缓冲区，返回复制的页数"""
+        count = max(0, min(len(buffers), len(self.pages) - start_page))
+        for i in range(count):
+            buffers[i][:] = self.pages[start_page + i].data
+        return count
+
+    def write(self, start_page: int, pages: List[bytes]) -> bool:
+        """用整页数据覆盖连续多页（原地修改，已被固定的页对象看到新内容）"""
+        if start_page + len(pages) > len(self.pages):
+            return False
+        for i, data in enumerate(pages):
+            page = self.pages[start_page + i]
+            page.data[:] = data
+            page.read_header()
+        return True
+
+    def truncate(self, page_count: int) -> bool:
+        """只保留前 page_count 页"""
+        with self.lock:
+            if page_count >= len(self.pages):
+                return False
+            del self.pages[page_count:]
+            del self.latches[page_count:]
+            return True
@@ -0,0 +1,272 @@
+"""
+缓冲池与文件I/O的统计指标，以及 Prometheus 文本格式导出
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# 延迟直方图的默认桶边界（单位：秒）
+DEFAULT_LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+    0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+class LatencyHistogram:
+    """延迟直方图，counts 保存落入各区间的次数，最后一个桶对应 +Inf"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        """记录一次耗时"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """返回 (le, 累积计数) 列表，用于 Prometheus 导出"""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((repr(bound), running))
+        result.append(('+Inf', self.count))
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.average,
+            'buckets': dict(self.cumulative())
+        }
+
+
+class TableIOStats:
+    """单张表的文件读写统计"""
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.read_latency = LatencyHistogram()
+        self.write_latency = LatencyHistogram()
+
+    def record_read(self, nbytes: int, seconds: float):
+        self.reads += 1
+        self.bytes_read += nbytes
+        self.read_latency.observe(seconds)
+
+    def record_write(self, nbytes: int, seconds: float):
+        self.writes += 1
+        self.bytes_written += nbytes
+        self.write_latency.observe(seconds)
+
+    def to_dict(self) -> Dict:
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'read_latency': self.read_latency.to_dict(),
+            'write_latency': self.write_latency.to_dict()
+        }
+
+
+class IOStats:
+    """FileManager 的I/O统计，按表分别计数"""
+
+    def __init__(self):
+        self.tables: Dict[str, TableIOStats] = {}
+
+    def table(self, table_name: str) -> TableIOStats:
+        stats = self.tables.get(table_name)
+        if stats is None:
+            stats = TableIOStats()
+            self.tables[table_name] = stats
+        return stats
+
+    def to_dict(self) -> Dict:
+        totals = {'reads': 0, 'writes': 0, 'bytes_read': 0, 'bytes_written': 0}
+        for stats in self.tables.values():
+            totals['reads'] += stats.reads
+            totals['writes'] += stats.writes
+            totals['bytes_read'] += stats.bytes_read
+            totals['bytes_written'] += stats.bytes_written
+        totals['tables'] = {name: stats.to_dict() for name, stats in self.tables.items()}
+        return totals
+
+
+class BufferPoolStats:
+    """缓冲池命中、缺失、置换与脏页回写计数"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dirty_writebacks = 0
+        self.table_hits: Dict[str, int] = {}
+        self.table_misses: Dict[str, int] = {}
+
+    def record_hit(self, table_name: str):
+        self.hits += 1
+        self.table_hits[table_name] = self.table_hits.get(table_name, 0) + 1
+
+    def record_miss(self, table_name: str):
+        self.misses += 1
+        self.table_misses[table_name] = self.table_misses.get(table_name, 0) + 1
+
+    def merge(self, other: 'BufferPoolStats'):
+        """累加另一组计数（汇总各分区的统计）"""
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+        self.dirty_writebacks += other.dirty_writebacks
+        for table_name, count in other.table_hits.items():
+            self.table_hits[table_name] = self.table_hits.get(table_name, 0) + count
+        for table_name, count in other.table_misses.items():
+            self.table_misses[table_name] = self.table_misses.get(table_name, 0) + count
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'dirty_writebacks': self.dirty_writebacks,
+            'hit_ratio': self.hit_ratio,
+            'table_hits': dict(self.table_hits),
+            'table_misses': dict(self.table_misses)
+        }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(buffer_pool, file_manager) -> str:
+    """将缓冲池和文件管理器的统计信息渲染为 Prometheus 文本格式"""
+    lines = []
+
+    def metric(name: str, metric_type: str, help_text: str, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            if labels:
+                label_text = ','.join(f'{k}="{_escape_label(str(v))}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}")
+            else:
+                lines.append(f"{name} {value}")
+
+    pool = buffer_pool.get_stats()
+    metric('learndb_buffer_pool_capacity_pages', 'gauge', 'Buffer pool capacity in pages',
+           [((), pool['capacity'])])
+    metric('learndb_buffer_pool_pages', 'gauge', 'Pages currently cached',
+           [((), pool['pages'])])
+    metric('learndb_buffer_pool_dirty_pages', 'gauge', 'Dirty pages currently cached',
+           [((), pool['dirty_pages'])])
+    metric('learndb_buffer_pool_pinned_pages', 'gauge', 'Pinned pages currently cached',
+           [((), pool['pinned_pages'])])
+    metric('learndb_buffer_pool_hits_total', 'counter', 'Page requests served from the buffer pool',
+           [((('table', t),), n) for t, n in sorted(pool['table_hits'].items())])
+    metric('learndb_buffer_pool_misses_total', 'counter', 'Page requests that required a disk read',
+           [((('table', t),), n) for t, n in sorted(pool['table_misses'].items())])
+    metric('learndb_buffer_pool_hit_ratio', 'gauge', 'Buffer pool hit ratio',
+           [((), pool['hit_ratio'])])
+    metric('learndb_buffer_pool_evictions_total', 'counter', 'Pages evicted from the buffer pool',
+           [((), pool['evictions'])])
+    metric('learndb_buffer_pool_dirty_writebacks_total', 'counter', 'Dirty pages written back to disk',
+           [((), pool['dirty_writebacks'])])
+
+    io_tables = sorted(file_manager.stats.tables.items())
+    metric('learndb_io_reads_total', 'counter', 'Page reads issued to data files',
+           [((('table', t),), s.reads) for t, s in io_tables])
+    metric('learndb_io_writes_total', 'counter', 'Page writes issued to data files',
+           [((('table', t),), s.writes) for t, s in io_tables])
+    metric('learndb_io_read_bytes_total', 'counter', 'Bytes read from data files',
+           [((('table', t),), s.bytes_read) for t, s in io_tables])
+    metric('learndb_io_written_bytes_total', 'counter', 'Bytes written to data files',
+           [((('table', t),), s.bytes_written) for t, s in io_tables])
+
+    for name, attr, help_text in (
+            ('learndb_io_read_latency_seconds', 'read_latency', 'Page read latency'),
+            ('learndb_io_write_latency_seconds', 'write_latency', 'Page write latency')):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for table_name, stats in io_tables:
+            histogram = getattr(stats, attr)
+            label = _escape_label(table_name)
+            for le, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{table="{label}",le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{table="{label}"}} {histogram.total}')
+            lines.append(f'{name}_count{{table="{label}"}} {histogram.count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path: str, buffer_pool, file_manager):
+    """将指标写入文件（供 node_exporter textfile collector 采集）"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(render_prometheus(buffer_pool, file_manager))
+    os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """在本地端口上以 /metrics 暴露 Prometheus 指标"""
+
+    def __init__(self, buffer_pool, file_manager, port: int = 9187, host: str = '127.0.0.1'):
+        buffer_pool_ref = buffer_pool
+        file_manager_ref = file_manager
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = render_prometheus(buffer_pool_ref, file_manager_ref).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = HTTPServer((host, port), _Handler)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
@@ -71,6 +71,63 @@ class Page:
 
         return self.num_records - 1
 
+    def append_records(self, records: List[bytes]) -> int:
+        """按顺序追加一批等长记录，返回实际写入的条数"""
+        if not records:
+            return 0
+
+        record_size = len(records[0])
+        count = min(len(records), (PAGE_SIZE - self.free_space_start) // record_size)
+        if count <= 0:
+            return 0
+
+        record_offset = 8 + self.num_records * record_size
+        self.data[record_offset:record_offset + count * record_size] = b''.join(records[:count])
+
+        # 更新页头
+        self.num_records += count
+        self.free_space_start = 8 + self.num_records * record_size
+        self.write_header()
+        return count
+
+    def update_record(self, record_id: int, record_data: bytes) -> bool:
+        """原地覆盖一条等长记录"""
+        if record_id >= self.num_records:
+            return False
+        record_offset = 8 + record_id * len(record_data)
+        self.data[record_offset:record_offset + len(record_data)] = record_data
+        self.dirty = True
+        return True
+
+    def delete_record(self, record_id: int, record_size: int) -> bool:
+        """删除一条记录，其后的记录依次前移（会改变后续记录的ID）"""
+        if record_id >= self.num_records:
+            return False
+        record_offset = 8 + record_id * record_size
+        end = 8 + self.num_records * record_size
+        self.data[record_offset:end - record_size] = self.data[record_offset + record_size:end]
+        self.data[end - record_size:end] = bytes(record_size)
+
+        self.num_records -= 1
+        self.free_space_start = end - record_size
+        self.write_header()
+        return True
+
+    def compact(self, record_size: int, live_ids: List[int]) -> int:
+        """只保留指定的记录并按原顺序紧凑排列，返回移除的记录数"""
+        removed = self.num_records - len(live_ids)
+        if removed <= 0:
+            return 0
+        live = b''.join(bytes(self.data[8 + i * record_size:8 + (i + 1) * record_size]) for i in live_ids)
+        end = 8 + self.num_records * record_size
+        self.data[8:8 + len(live)] = live
+        self.data[8 + len(live):end] = bytes(end - 8 - len(live))
+
+        self.num_records = len(live_ids)
+        self.free_space_start = 8 + len(live)
+        self.write_header()
+        return removed
+
     def get_record(self, record_id: int, record_size: int) -> Optional[bytes]:
         """获取指定记录"""
         if record_id >= self.num_records:
@@ -0,0 +1,95 @@
+"""
+大表顺序扫描：私有环形缓冲区 + 异步预读
+"""
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterator, List, Optional, Sequence, Tuple
+from .page import Page
+from utils.constants import PAGE_SIZE, READAHEAD_PAGES, READAHEAD_THREADS
+
+_readahead_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_readahead_executor() -> ThreadPoolExecutor:
+    """获取进程内共享的预读线程池（惰性创建）"""
+    global _readahead_executor
+    if _readahead_executor is None:
+        _readahead_executor = ThreadPoolExecutor(max_workers=READAHEAD_THREADS,
+                                                 thread_name_prefix='readahead')
+    return _readahead_executor
+
+
+def page_runs(page_ids: Sequence[int], max_pages: int) -> List[Tuple[int, int]]:
+    """把递增的页号划分为连续区间 (起始页, 页数)，每段不超过 max_pages 页"""
+    runs: List[Tuple[int, int]] = []
+    for page_id in page_ids:
+        if runs and runs[-1][0] + runs[-1][1] == page_id and runs[-1][1] < max_pages:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((page_id, 1))
+    return runs
+
+
+class RingScan:
+    """
+    顺序扫描一张表。不在共享缓冲池中的页只在本次扫描私有的环形缓冲区中流转，
+    不进入共享LRU，因此大表全表扫描不会把其他表的热页挤出缓冲池。
+    环形缓冲区分为两段，每段 readahead 页：一段交给调用方解码的同时，
+    另一段由后台线程用一次多页读取（preadv）预读下一批页。
+    指定 page_ids 时只读取这些页（按连续区间成批读取），其余页直接跳过。
+    """
+
+    def __init__(self, buffer_pool, table_name: str, page_count: int,
+                 readahead: int = READAHEAD_PAGES, page_ids: Optional[Sequence[int]] = None):
+        self.buffer_pool = buffer_pool
+        self.file_manager = buffer_pool.file_manager
+        self.table_name = table_name
+        self.page_count = page_count
+        self.readahead = max(1, readahead)
+        self.ring: List[bytearray] = [bytearray(PAGE_SIZE) for _ in range(2 * self.readahead)]
+        # 每批读取的 (起始页, 页数)
+        if page_ids is None:
+            page_ids = range(page_count)
+        self.chunks: List[Tuple[int, int]] = page_runs(page_ids, self.readahead)
+
+    def _read_chunk(self, chunk_index: int) -> int:
+        """把第 chunk_index 批页读入对应的环形缓冲区段"""
+        start_page, count = self.chunks[chunk_index]
+        segment = (chunk_index % 2) * self.readahead
+        return self.file_manager.read_pages_into(self.table_name, start_page,
+                                                 self.ring[segment:segment + count])
+
+    def _submit(self, chunk_index: int) -> Optional[Future]:
+        if chunk_index >= len(self.chunks):
+            return None
+        return get_readahead_executor().submit(self._read_chunk, chunk_index)
+
+    def pages(self) -> Iterator[Page]:
+        """按页号顺序产出页；调用方处理完一页后再请求下一页"""
+        chunk_index = 0
+        pending = self._submit(0)
+        try:
+            while pending is not None:
+                pages_read = pending.result()
+                # 在解码当前批次的同时预读下一批
+                pending = self._submit(chunk_index + 1)
+
+                start_page = self.chunks[chunk_index][0]
+                segment = (chunk_index % 2) * self.readahead
+                for i in range(pages_read):
+                    page_id = start_page + i
+                    # 已在缓冲池中的页可能比磁盘上的更新，优先使用；
+                    # 在闩锁保护下复制后立即释放，不在 yield 期间持有闩锁
+                    page = self.buffer_pool.pin_if_resident(self.table_name, page_id)
+                    if page is not None:
+                        try:
+                            page = Page.from_bytes(page_id, bytes(page.data))
+                        finally:
+                            self.buffer_pool.unpin_page(self.table_name, page_id, False)
+                        yield page
+                    else:
+                        yield Page.from_bytes(page_id, self.ring[segment + i])
+                chunk_index += 1
+        finally:
+            # 提前结束扫描时等待在途的预读完成，避免其写入已被丢弃的缓冲区
+            if pending is not None:
+                pending.result()
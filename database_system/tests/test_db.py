@@ -0,0 +1,1003 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.database import Database
+from engine import bulk_copy, dbapi, vectorized
+from engine import transaction
+from engine.lock_manager import DeadlockError
+from engine.storage_engine import page_layout
+from engine.transaction import SerializationError
+from server import client
+from server.server import DatabaseServer
+from utils.config import load_config
+from utils.constants import PAGE_SIZE
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """在临时数据目录上打开数据库实例的测试基类"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, 'data')
+        self.db = self.open()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def open(self, **overrides) -> Database:
+        config = {'data_dir': self.data_dir, 'buffer_pool_size': '64KB', 'autovacuum_interval': 0,
+                  'parallel_scan_workers': 1}
+        config.update(overrides)
+        return Database(load_config(overrides=config))
+
+    def reopen(self, **overrides):
+        self.db.close()
+        self.db = self.open(**overrides)
+
+    def query(self, sql: str, params=None, txn=None):
+        return self.db.execute(sql, params, txn)[1]
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+
+class InsertTest(DatabaseTestCase):
+    """多行 INSERT 与批量写入"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+
+    def test_multi_row_insert(self):
+        self.assertEqual(self.query("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, NULL)"), 3)
+        self.reopen()
+        self.assertEqual(self.query("SELECT * FROM t"), [[1, 'a'], [2, 'b'], [3, None]])
+
+    def test_invalid_row_rejects_whole_statement(self):
+        with self.assertRaises(ValueError):
+            self.query("INSERT INTO t VALUES (1, 'a'), ('x', 'b')")
+        self.assertEqual(self.query("SELECT * FROM t"), [])
+
+    def test_bulk_insert_packs_pages(self):
+        rows = [[i, f"n{i}"] for i in range(1, 5001)]
+        self.assertEqual(self.db.executor.insert_many('t', rows), 5000)
+        self.assertEqual(self.db.executor.insert_many('t', [[5001, 'last']]), 1)
+        schema = self.db.catalog_manager.get_schema('t')
+        capacity = page_layout(schema).capacity
+        self.assertEqual(self.db.file_manager.get_page_count('t'), (5001 + capacity - 1) // capacity)
+        self.assertEqual(sorted(row[0] for row in self.query("SELECT * FROM t")), list(range(1, 5002)))
+
+
+class SnapshotTest(DatabaseTestCase):
+    """MVCC 快照读与旧版本回收"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, v INT)")
+        self.db.executor.insert_many('t', [[i, 1] for i in range(1, 201)])
+
+    def stream(self, sql: str):
+        return self.db.execute_plan(self.db.compile(sql), stream=True)
+
+    def test_stream_reads_stable_snapshot(self):
+        rows = self.stream("SELECT * FROM t")
+        first = next(rows)
+        # 读者不持锁，写者不需要等待扫描结束
+        self.assertEqual(self.query("DELETE FROM t WHERE id > 100"), 100)
+        self.assertEqual(self.query("UPDATE t SET v = 2 WHERE id <= 50"), 50)
+        self.query("INSERT INTO t VALUES (201, 3)")
+        self.assertEqual(sorted([first] + list(rows)), [[i, 1] for i in range(1, 201)])
+        expected = [[i, 2] for i in range(1, 51)] + [[i, 1] for i in range(51, 101)] + [[201, 3]]
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), expected)
+
+    def test_garbage_kept_while_snapshot_open(self):
+        rows = self.stream("SELECT * FROM t")
+        next(rows)
+        self.query("DELETE FROM t WHERE id > 150")
+        self.assertEqual(self.db.collect_garbage('t'), 0)
+        rows.close()
+        self.assertEqual(self.db.collect_garbage('t'), 50)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[150]])
+
+
+class VacuumTest(DatabaseTestCase):
+    """DELETE / UPDATE 与 VACUUM 空间回收"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 2001)])
+
+    def page_count(self) -> int:
+        return self.db.file_manager.get_page_count('t')
+
+    def test_update_and_delete_persist(self):
+        self.assertEqual(self.query("UPDATE t SET name = 'x' WHERE id <= 10"), 10)
+        self.assertEqual(self.query("DELETE FROM t WHERE id > 1990"), 10)
+        self.reopen()
+        rows = self.query("SELECT * FROM t WHERE name = 'x'")
+        self.assertEqual(sorted(row[0] for row in rows), list(range(1, 11)))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[1990]])
+
+    def test_compound_predicates(self):
+        self.assertEqual(self.query("DELETE FROM t WHERE id > 100 AND id <= 150"), 50)
+        self.assertEqual(self.query("UPDATE t SET name = 'x' WHERE id <= 10 OR id > 1990"), 20)
+        self.assertEqual(self.query("DELETE FROM t WHERE (id <= 5 OR id > 1995) AND name = 'x'"), 10)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t WHERE name = 'x'"), [[10]])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[1940]])
+
+    def test_trailing_tokens_rejected(self):
+        for sql in ("DELETE FROM t WHERE id = 1 id = 2", "UPDATE t SET name = 'x' WHERE id = 1 2",
+                    "DELETE FROM t WHERE id = 1; DELETE FROM t"):
+            with self.assertRaises(SyntaxError):
+                self.query(sql)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t WHERE name = 'n1'"), [[1]])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[2000]])
+
+    def test_vacuum_reuses_free_slots(self):
+        self.query("DELETE FROM t WHERE id <= 500")
+        pages = self.page_count()
+        stats = self.query("VACUUM t")
+        self.assertEqual(stats['reclaimed'], 500)
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(2001, 2501)])
+        self.assertEqual(self.page_count(), pages)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[2000]])
+
+    def test_vacuum_truncates_empty_tail(self):
+        pages = self.page_count()
+        self.query("DELETE FROM t WHERE id > 200")
+        stats = self.query("VACUUM t")
+        self.assertGreater(stats['freed_pages'], 0)
+        self.assertEqual(self.page_count(), pages - stats['freed_pages'])
+        self.reopen()
+        self.assertEqual(sorted(row[0] for row in self.query("SELECT * FROM t")), list(range(1, 201)))
+
+    def test_incremental_vacuum(self):
+        self.query("DELETE FROM t WHERE id > 1000")
+        schema = self.db.catalog_manager.get_schema('t')
+        start, reclaimed = 0, 0
+        while True:
+            stats = self.db.storage_engine.vacuum_table('t', schema, start, max_pages=2)
+            reclaimed += stats['reclaimed']
+            start = stats['next_page']
+            if start == 0:
+                break
+        self.assertEqual(reclaimed, 1000)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[1000]])
+
+
+class TruncateTest(DatabaseTestCase):
+    """TRUNCATE 与多表 DROP"""
+
+    def setUp(self):
+        super().setUp()
+        for name in ('a', 'b'):
+            self.query(f"CREATE TABLE {name} (id INT, name VARCHAR(16))")
+            self.db.executor.insert_many(name, [[i, f"n{i}"] for i in range(1, 1001)])
+
+    def test_truncate_discards_buffered_pages(self):
+        self.query("UPDATE a SET name = 'x' WHERE id <= 500")
+        pool = self.db.buffer_pool
+        self.assertGreater(pool.table_page_counts['a'], 0)
+        written = self.db.file_manager.stats.table('a').bytes_written
+        self.assertEqual(self.query("TRUNCATE TABLE a, b"), 2)
+        # 缓冲页直接丢弃，不写回，只重写 4 字节的文件头
+        self.assertEqual(self.db.file_manager.stats.table('a').bytes_written, written + 4)
+        self.assertNotIn('a', pool.table_page_counts)
+        self.assertEqual(self.db.file_manager.get_page_count('a'), 0)
+        self.query("INSERT INTO a VALUES (1, 'new')")
+        self.reopen()
+        self.assertEqual(self.query("SELECT * FROM a"), [[1, 'new']])
+        self.assertEqual(self.query("SELECT * FROM b"), [])
+
+    def test_drop_multiple_tables(self):
+        paths = [self.db.file_manager.get_file_path(name) for name in ('a', 'b')]
+        self.assertTrue(self.query("DROP TABLE a, b"))
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        self.reopen()
+        self.assertIsNone(self.db.catalog_manager.get_schema('a'))
+        self.query("CREATE TABLE a (id INT)")
+        self.assertEqual(self.query("SELECT * FROM a"), [])
+
+
+class ParallelScanTest(DatabaseTestCase):
+    """多进程并行扫描与串行扫描结果一致"""
+
+    def setUp(self):
+        super().setUp()
+        self.reopen(parallel_scan_workers=2, parallel_scan_min_pages=4)
+        self.query("CREATE TABLE t (id INT, name VARCHAR(32))")
+        self.db.executor.insert_many('t', [[i, f"name{i % 7}"] for i in range(1, 20001)])
+        self.query("DELETE FROM t WHERE id > 19000")
+
+    def test_matches_serial_scan(self):
+        scanner = self.db.executor.parallel_scanner
+        self.assertGreater(self.db.file_manager.get_page_count('t'), 2 * 64)
+        rows = self.query("SELECT id FROM t WHERE name = 'name3'")
+        self.assertEqual(sorted(row[0] for row in rows), [i for i in range(1, 19001) if i % 7 == 3])
+        self.assertEqual(self.query("SELECT COUNT(*), SUM(id), MIN(id), MAX(id) FROM t"),
+                         [[19000, 19000 * 19001 // 2, 1, 19000]])
+        self.assertEqual(scanner.scans, 2)
+
+    def test_small_table_scanned_serially(self):
+        self.query("CREATE TABLE s (id INT)")
+        self.query("INSERT INTO s VALUES (1), (2)")
+        self.assertEqual(self.query("SELECT * FROM s"), [[1], [2]])
+        self.assertEqual(self.db.executor.parallel_scanner.scans, 0)
+
+
+@unittest.skipUnless(vectorized.HAS_NUMPY, "numpy is not installed")
+class VectorizedScanTest(DatabaseTestCase):
+    """向量化扫描与逐行扫描结果一致"""
+
+    QUERIES = [
+        "SELECT * FROM t WHERE id > 2500",
+        "SELECT id, score FROM t WHERE name = 'n3'",
+        "SELECT * FROM t WHERE score <= 10",
+        "SELECT id FROM t WHERE name IN ('n1', 'n4')",
+        "SELECT COUNT(*), SUM(id), MIN(score), MAX(name), AVG(score) FROM t WHERE id >= 100",
+        "SELECT COUNT(name) FROM t",
+        "SELECT id FROM t WHERE id > 100 AND id <= 200 AND name != 'n1'",
+        "SELECT * FROM t WHERE score = 7 OR name = 'n2' AND id < 50",
+        "SELECT COUNT(*), SUM(score) FROM t WHERE (name = 'n0' OR id IN (1, 2, 3, 11, 22)) AND score > 20",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(8), score INT)")
+        rows = [[i, f"n{i % 5}" if i % 11 else None, i % 50 + 1] for i in range(1, 3001)]
+        self.db.executor.insert_many('t', rows)
+        self.query("DELETE FROM t WHERE id <= 10")
+
+    def run_queries(self):
+        return [sorted(self.query(sql), key=repr) for sql in self.QUERIES]
+
+    def test_matches_row_scan(self):
+        self.assertTrue(self.db.executor.vectorized_scan)
+        with mock.patch.object(vectorized, 'condition_mask', wraps=vectorized.condition_mask) as condition_mask:
+            batched = self.run_queries()
+        # 复合条件也在列批次上整体求值
+        ops = {getattr(call.args[0], 'op', None) for call in condition_mask.call_args_list}
+        self.assertTrue({'AND', 'OR'} <= ops)
+        self.reopen(vectorized_scan=False)
+        self.assertEqual(batched, self.run_queries())
+        self.assertEqual(len(batched[0]), 500)
+
+
+class ZoneMapTest(DatabaseTestCase):
+    """区域映射跳过不可能匹配的页"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 5001)])
+
+    def skipped(self, sql: str):
+        before = self.db.storage_engine.skipped_pages
+        rows = self.query(sql)
+        return rows, self.db.storage_engine.skipped_pages - before
+
+    def test_range_query_skips_pages(self):
+        page_count = self.db.file_manager.get_page_count('t')
+        rows, skipped = self.skipped("SELECT id FROM t WHERE id > 4900")
+        self.assertEqual(sorted(row[0] for row in rows), list(range(4901, 5001)))
+        self.assertGreaterEqual(skipped, page_count - 2)
+
+    def test_compound_conditions_prune(self):
+        page_count = self.db.file_manager.get_page_count('t')
+        rows, skipped = self.skipped("SELECT id FROM t WHERE id > 2000 AND id <= 2010")
+        self.assertEqual(sorted(row[0] for row in rows), list(range(2001, 2011)))
+        self.assertGreaterEqual(skipped, page_count - 2)
+        rows, skipped = self.skipped("SELECT id FROM t WHERE id < 5 OR (id > 4995 AND name != 'n4999')")
+        self.assertEqual(sorted(row[0] for row in rows), [1, 2, 3, 4, 4996, 4997, 4998, 5000])
+        self.assertGreaterEqual(skipped, page_count - 2)
+        # OR 的一侧无法排除任何页时不能跳过
+        rows, skipped = self.skipped("SELECT id FROM t WHERE id < 5 OR name != 'n1'")
+        self.assertEqual(len(rows), 5000)
+        self.assertEqual(skipped, 0)
+
+    def test_maintained_on_insert_and_reopen(self):
+        self.query("SELECT * FROM t WHERE id = 1")
+        self.query("INSERT INTO t VALUES (99999, 'late')")
+        self.assertEqual(self.query("SELECT name FROM t WHERE id = 99999"), [['late']])
+        self.reopen()
+        rows, skipped = self.skipped("SELECT name FROM t WHERE id >= 99999")
+        self.assertEqual(rows, [['late']])
+        self.assertGreater(skipped, 0)
+
+
+class BloomFilterTest(DatabaseTestCase):
+    """Bloom 过滤器跳过一定不含等值条件常量的页区间"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, code VARCHAR(16)) WITH (bloom_filter = 'code')")
+        # code 与页顺序无关，区域映射无法排除页
+        self.db.executor.insert_many('t', [[i, f"c{i * 7919 % 10007}"] for i in range(1, 20001)])
+
+    def probe(self, sql: str):
+        before = self.db.storage_engine.skipped_pages
+        rows = self.query(sql)
+        return rows, self.db.storage_engine.skipped_pages - before
+
+    def test_equality_probe_skips_ranges(self):
+        page_count = self.db.file_manager.get_page_count('t')
+        rows, skipped = self.probe("SELECT id FROM t WHERE code = 'c7919'")
+        self.assertEqual(sorted(row[0] for row in rows), [1, 10008])
+        self.assertGreater(skipped, page_count // 2)
+        rows, skipped = self.probe("SELECT id FROM t WHERE code = 'missing'")
+        self.assertEqual(rows, [])
+        self.assertGreater(skipped, page_count // 2)
+
+    def test_compound_probes(self):
+        page_count = self.db.file_manager.get_page_count('t')
+        rows, skipped = self.probe("SELECT id FROM t WHERE code = 'c7919' OR code = 'c5831'")
+        self.assertEqual(sorted(row[0] for row in rows), [1, 2, 10008, 10009])
+        self.assertGreater(skipped, page_count // 2)
+        rows, skipped = self.probe("SELECT id FROM t WHERE id > 5000 AND code = 'c7919'")
+        self.assertEqual(rows, [[10008]])
+        self.assertGreater(skipped, page_count // 2)
+        # OR 的一侧不是等值条件时不能排除页区间
+        rows, skipped = self.probe("SELECT id FROM t WHERE code = 'c7919' OR code != 'x'")
+        self.assertEqual(len(rows), 20000)
+        self.assertEqual(skipped, 0)
+
+    def test_analyze_rebuilds_filters(self):
+        self.query("INSERT INTO t VALUES (20001, 'fresh')")
+        self.assertEqual(self.query("ANALYZE t")['rows'], 20001)
+        self.reopen()
+        self.assertEqual(self.query("SELECT id FROM t WHERE code = 'fresh'"), [[20001]])
+        rows, skipped = self.probe("SELECT id FROM t WHERE code = 'c7919'")
+        self.assertEqual(len(rows), 2)
+        self.assertGreater(skipped, 0)
+
+
+class ColumnarTableTest(DatabaseTestCase):
+    """PAX 列式表与行式表的查询结果一致"""
+
+    QUERIES = [
+        "SELECT * FROM {table}",
+        "SELECT amount FROM {table} WHERE id > 2990",
+        "SELECT SUM(amount), COUNT(note) FROM {table}",
+        "SELECT region, COUNT(*) FROM {table} GROUP BY region",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        columns = "(id INT, region VARCHAR(8), amount INT, note VARCHAR(64))"
+        self.query(f"CREATE TABLE r {columns}")
+        self.query(f"CREATE TABLE c {columns} WITH (format = 'columnar')")
+        rows = [[i, f"r{i % 4}", i * 3, f"note {i}" if i % 5 else None] for i in range(1, 3001)]
+        for table in ('r', 'c'):
+            self.db.executor.insert_many(table, rows)
+            self.query(f"UPDATE {table} SET amount = 1 WHERE id <= 100")
+            self.query(f"DELETE FROM {table} WHERE region = 'r2'")
+            self.query(f"VACUUM {table}")
+
+    def results(self, table: str):
+        return [sorted(self.query(sql.format(table=table)), key=repr) for sql in self.QUERIES]
+
+    def test_matches_row_table(self):
+        self.assertEqual(self.db.catalog_manager.get_schema('c').storage_format, 'columnar')
+        self.assertEqual(self.results('c'), self.results('r'))
+        self.reopen()
+        self.assertEqual(self.results('c'), self.results('r'))
+
+
+class CompressionTest(DatabaseTestCase):
+    """页压缩表的读写往返"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, body VARCHAR(64)) WITH (compression = 'zlib')")
+        self.rows = [[i, f"status=ok region=r{i % 3}"] for i in range(1, 3001)]
+        self.db.executor.insert_many('t', self.rows)
+
+    def test_round_trip(self):
+        stats = self.db.file_manager.compression_stats('t')
+        self.assertEqual(stats['codec'], 'zlib')
+        self.assertGreater(stats['ratio'], 2)
+        self.assertLess(os.path.getsize(self.db.file_manager.get_file_path('t')), stats['pages'] * PAGE_SIZE)
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), self.rows)
+        self.reopen()
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), self.rows)
+
+    def test_updates_rewrite_pages(self):
+        self.query("UPDATE t SET body = 'changed' WHERE id <= 1000")
+        self.query("DELETE FROM t WHERE id > 2000")
+        self.query("VACUUM t")
+        self.query("INSERT INTO t VALUES (5000, 'tail')")
+        self.reopen()
+        rows = sorted(self.query("SELECT * FROM t"))
+        self.assertEqual(len(rows), 2001)
+        self.assertEqual(rows[0], [1, 'changed'])
+        self.assertEqual(rows[1500], self.rows[1500])
+        self.assertEqual(rows[-1], [5000, 'tail'])
+
+    def test_unknown_codec_rejected(self):
+        with self.assertRaises(ValueError):
+            self.query("CREATE TABLE u (id INT) WITH (compression = 'snappy')")
+
+
+class DictionaryEncodingTest(DatabaseTestCase):
+    """字典编码列的存储与按编码比较的查询"""
+
+    CITIES = ['berlin', 'lisbon', 'oslo', 'paris']
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, city VARCHAR(64)) WITH (dictionary = 'city')")
+        self.rows = [[i, self.CITIES[i % 4] if i % 9 else None] for i in range(1, 2001)]
+        self.db.executor.insert_many('t', self.rows)
+
+    def ids(self, sql: str):
+        return sorted(row[0] for row in self.query(sql))
+
+    def expected(self, match):
+        return [row[0] for row in self.rows if match(row[1])]
+
+    def test_records_store_codes(self):
+        dictionary = self.db.storage_engine.table_dictionary('t', self.db.catalog_manager.get_schema('t'))
+        self.assertEqual(dictionary.values, {1: ['lisbon', 'oslo', 'paris', 'berlin']})
+        self.query("CREATE TABLE plain (id INT, city VARCHAR(64))")
+        self.db.executor.insert_many('plain', self.rows)
+        self.assertLess(self.db.file_manager.get_page_count('t'), self.db.file_manager.get_page_count('plain'))
+
+    def test_coded_predicates(self):
+        self.assertEqual(self.ids("SELECT id FROM t WHERE city = 'oslo'"), self.expected(lambda c: c == 'oslo'))
+        self.assertEqual(self.ids("SELECT id FROM t WHERE city IN ('paris', 'berlin', 'rome')"),
+                         self.expected(lambda c: c in ('paris', 'berlin')))
+        self.assertEqual(self.ids("SELECT id FROM t WHERE city != 'lisbon'"),
+                         self.expected(lambda c: c is not None and c != 'lisbon'))
+        self.assertEqual(self.query("SELECT * FROM t WHERE city = 'rome'"), [])
+        # 范围比较按还原后的字符串进行
+        self.assertEqual(self.ids("SELECT id FROM t WHERE city > 'm'"),
+                         self.expected(lambda c: c is not None and c > 'm'))
+
+    def test_dictionary_survives_reopen(self):
+        self.reopen()
+        self.query("INSERT INTO t VALUES (2001, 'rome')")
+        self.reopen()
+        self.assertEqual(self.query("SELECT id FROM t WHERE city = 'rome'"), [[2001]])
+        self.assertEqual(sorted(self.query("SELECT * FROM t WHERE id <= 2000"), key=repr),
+                         sorted(self.rows, key=repr))
+
+
+class MaterializedViewTest(DatabaseTestCase):
+    """物化视图随基表写入保持与定义查询一致"""
+
+    VIEWS = {
+        'totals': "SELECT region, COUNT(*), SUM(amount), MIN(amount), MAX(amount) FROM t GROUP BY region",
+        'large': "SELECT id, region FROM t WHERE amount > 50",
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, region VARCHAR(8), amount INT)")
+        self.db.executor.insert_many('t', [[i, f"r{i % 3}", i % 97 + 1] for i in range(1, 501)])
+        for name, sql in self.VIEWS.items():
+            self.query(f"CREATE MATERIALIZED VIEW {name} AS {sql}")
+
+    def assertViewsCurrent(self):
+        for name, sql in self.VIEWS.items():
+            self.assertEqual(sorted(self.query(f"SELECT * FROM {name}"), key=repr),
+                             sorted(self.query(sql), key=repr), name)
+
+    def test_incremental_inserts(self):
+        self.assertViewsCurrent()
+        self.query("INSERT INTO t VALUES (501, 'r1', 500), (502, 'r9', 7)")
+        self.db.executor.insert_many('t', [[i, 'r2', 60] for i in range(503, 600)])
+        self.assertViewsCurrent()
+        txn = self.db.begin()
+        self.query("INSERT INTO t VALUES (600, 'r0', 99)", txn=txn)
+        self.db.commit(txn)
+        self.assertViewsCurrent()
+
+    def test_recompute_after_delete_and_update(self):
+        self.query("DELETE FROM t WHERE region = 'r1'")
+        self.assertViewsCurrent()
+        self.query("UPDATE t SET amount = 1 WHERE id <= 100")
+        self.assertViewsCurrent()
+        self.query("TRUNCATE TABLE t")
+        self.assertEqual(self.query("SELECT * FROM totals"), [])
+        self.query("INSERT INTO t VALUES (1, 'r1', 70)")
+        self.reopen()
+        self.assertViewsCurrent()
+        self.assertEqual(self.query("SELECT * FROM large"), [[1, 'r1']])
+
+
+class PartitionTest(DatabaseTestCase):
+    """分区表的写入路由、分区裁剪与 ADD / DROP PARTITION"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16)) PARTITION BY RANGE (id) "
+                   "(PARTITION p0 VALUES LESS THAN (100), PARTITION p1 VALUES LESS THAN (200))")
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 200)])
+
+    def pruned(self, sql: str):
+        return self.db.compile(sql).details.get('partitions')
+
+    def test_pruning(self):
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id = 150"), [1])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id < 100"), [0])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id IN (5, 105)"), [0, 1])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id >= 500"), [])
+        self.assertEqual(self.query("SELECT name FROM t WHERE id = 150"), [['n150']])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t WHERE id >= 100"), [[100]])
+
+    def test_compound_pruning(self):
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id >= 50 AND id < 100"), [0])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id < 10 OR id > 190"), [0, 1])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id > 150 AND (id = 160 OR name = 'n5')"), [1])
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id < 10 AND id > 150"), [])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t WHERE id > 150 AND (id = 160 OR name = 'n5')"), [[1]])
+
+    def test_parenthesized_maxvalue(self):
+        self.query("CREATE TABLE m (id INT) PARTITION BY RANGE (id) "
+                   "(PARTITION p0 VALUES LESS THAN (10), PARTITION p1 VALUES LESS THAN (MAXVALUE))")
+        self.query("INSERT INTO m VALUES (5), (5000)")
+        self.assertEqual(self.db.catalog_manager.get_schema('m').partition['partitions'][1]['bound'], None)
+        self.assertEqual(self.pruned("SELECT * FROM m WHERE id > 100"), [1])
+        self.query("ALTER TABLE t ADD PARTITION p2 VALUES LESS THAN (MAXVALUE)")
+        self.query("INSERT INTO t VALUES (250, 'late')")
+        self.assertEqual(self.query("SELECT name FROM t WHERE id = 250"), [['late']])
+
+    def test_partitions_see_table_stats(self):
+        self.query("CREATE TABLE b (id INT, code VARCHAR(8)) PARTITION BY HASH (id) PARTITIONS 2 "
+                   "WITH (bloom_filter = 'code')")
+        self.db.executor.insert_many('b', [[i, f"c{i % 3}"] for i in range(1, 2001)])
+        self.query("ANALYZE b")
+        for reopen in (False, True):
+            if reopen:
+                self.reopen()
+            schema = self.db.catalog_manager.get_schema('b')
+            for partition in schema.partitions:
+                self.assertEqual(partition.stats['rows'], 2000)
+                # Bloom 过滤器按 ANALYZE 统计的不同值数确定大小
+                self.assertEqual(self.db.storage_engine._bloom_capacities(partition), {1: 3})
+        self.assertEqual(self.query("SELECT COUNT(*) FROM b WHERE code = 'c1'"), [[667]])
+
+    def test_row_outside_partitions_rejected(self):
+        with self.assertRaises(ValueError):
+            self.query("INSERT INTO t VALUES (150, 'a'), (250, 'b')")
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[199]])
+
+    def test_add_and_drop_partition(self):
+        self.query("ALTER TABLE t ADD PARTITION p2 VALUES LESS THAN MAXVALUE")
+        self.query("INSERT INTO t VALUES (250, 'late')")
+        self.assertEqual(self.pruned("SELECT * FROM t WHERE id = 250"), [2])
+        path = self.db.file_manager.get_file_path(self.db.catalog_manager.get_schema('t').partitions[0].table_name)
+        self.query("ALTER TABLE t DROP PARTITION p0")
+        self.assertFalse(os.path.exists(path))
+        self.reopen()
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[101]])
+        self.assertEqual(self.query("SELECT * FROM t WHERE id = 5"), [])
+        self.assertEqual(self.query("SELECT name FROM t WHERE id = 250"), [['late']])
+
+    def test_hash_partitions(self):
+        self.query("CREATE TABLE h (id INT, name VARCHAR(16)) PARTITION BY HASH (id) PARTITIONS 4")
+        self.db.executor.insert_many('h', [[i, f"n{i}"] for i in range(1, 401)])
+        self.assertEqual(len(self.pruned("SELECT * FROM h WHERE id = 42")), 1)
+        self.assertEqual(self.query("SELECT name FROM h WHERE id = 42"), [['n42']])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM h"), [[400]])
+
+
+class TablespaceTest(DatabaseTestCase):
+    """表空间：表文件放在数据目录以外的目录中"""
+
+    def setUp(self):
+        super().setUp()
+        self.location = self.path('fast')
+        self.query(f"CREATE TABLESPACE fast LOCATION '{self.location}'")
+
+    def test_table_files_in_tablespace(self):
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16)) WITH (bloom_filter = 'name') TABLESPACE fast")
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 1001)])
+        self.query("SELECT * FROM t WHERE name = 'n5'")
+        self.reopen()
+        path = self.db.file_manager.get_file_path('t')
+        self.assertEqual(os.path.dirname(path), self.location)
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(any(name.startswith('t.') for name in os.listdir(self.data_dir)))
+        self.assertEqual(self.query("SELECT id FROM t WHERE name = 'n5'"), [[5]])
+
+    def test_partitions_inherit_tablespace(self):
+        self.query("CREATE TABLE p (id INT) PARTITION BY RANGE (id) "
+                   "(PARTITION p0 VALUES LESS THAN (10)) TABLESPACE fast")
+        self.query("ALTER TABLE p ADD PARTITION p1 VALUES LESS THAN MAXVALUE")
+        self.query("INSERT INTO p VALUES (5), (50)")
+        for partition in self.db.catalog_manager.get_schema('p').partitions:
+            self.assertEqual(os.path.dirname(self.db.file_manager.get_file_path(partition.table_name)),
+                             self.location)
+        self.reopen()
+        self.assertEqual(sorted(self.query("SELECT * FROM p")), [[5], [50]])
+
+    def test_drop_tablespace(self):
+        self.query("CREATE TABLE t (id INT) TABLESPACE fast")
+        with self.assertRaises(ValueError):
+            self.query("DROP TABLESPACE fast")
+        with self.assertRaises(ValueError):
+            self.query("CREATE TABLE u (id INT) TABLESPACE missing")
+        self.query("DROP TABLE t")
+        self.query("DROP TABLESPACE fast")
+        self.reopen()
+        self.assertNotIn('fast', self.db.catalog_manager.tablespaces)
+
+
+class MemoryTableTest(DatabaseTestCase):
+    """内存表：页常驻内存，不写磁盘，重新打开后只保留表结构"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TEMP TABLE m (id INT, name VARCHAR(16))")
+        self.query("CREATE TABLE e (id INT, name VARCHAR(16)) ENGINE = MEMORY")
+
+    def data_files(self, table_name: str):
+        return [name for name in os.listdir(self.data_dir) if name.split('.')[0] == table_name]
+
+    def test_queries_without_disk_writes(self):
+        for table in ('m', 'e'):
+            self.db.executor.insert_many(table, [[i, f"n{i}"] for i in range(1, 2001)])
+            self.query(f"INSERT INTO {table} VALUES (2001, 'last')")
+            self.assertEqual(self.query(f"UPDATE {table} SET name = 'x' WHERE id <= 10"), 10)
+            self.assertEqual(self.query(f"DELETE FROM {table} WHERE id > 1000"), 1001)
+            self.query(f"VACUUM {table}")
+            self.assertEqual(self.query(f"SELECT COUNT(*) FROM {table} WHERE name = 'x'"), [[10]])
+            self.assertEqual(self.query(f"SELECT COUNT(*) FROM {table}"), [[1000]])
+            self.assertEqual(self.data_files(table), [])
+            self.assertEqual(self.db.file_manager.stats.table(table).bytes_written, 0)
+            self.assertNotIn(table, self.db.buffer_pool.table_page_counts)
+
+    def test_reopen_keeps_schema_only(self):
+        self.query("INSERT INTO m VALUES (1, 'a'), (2, 'b')")
+        self.reopen()
+        self.assertEqual(self.query("SELECT * FROM m"), [])
+        self.query("INSERT INTO m VALUES (3, 'c')")
+        self.assertEqual(self.query("SELECT * FROM m"), [[3, 'c']])
+
+    def test_memory_options_rejected(self):
+        self.query(f"CREATE TABLESPACE fast LOCATION '{self.path('fast')}'")
+        with self.assertRaises(ValueError):
+            self.query("CREATE TEMP TABLE a (id INT) TABLESPACE fast")
+        with self.assertRaises(ValueError):
+            self.query("CREATE TEMP TABLE b (id INT) WITH (compression = 'zlib')")
+
+
+class PreparedStatementTest(DatabaseTestCase):
+    """预编译语句执行带参数的复合条件"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+        self.db.executor.insert_many('t', [[i, f"n{i % 10}"] for i in range(1, 1001)])
+
+    def ids(self, sql: str, params):
+        return sorted(row[0] for row in self.query(sql, params))
+
+    def test_compound_condition_with_parameters(self):
+        sql = "SELECT id FROM t WHERE (id >= ? AND id < ?) OR name = ?"
+        self.assertEqual(self.ids(sql, [10, 20, 'n7']),
+                         sorted(set(range(10, 20)) | set(range(7, 1001, 10))))
+        self.assertEqual(self.ids(sql, [500, 503, 'none']), [500, 501, 502])
+        self.assertEqual(self.db.compiler.plan_cache.get_stats()['hits'], 1)
+        self.assertEqual(self.query("UPDATE t SET name = :new WHERE name = :old AND id > :low",
+                                    {'new': 'x', 'old': 'n3', 'low': 900}), 10)
+        self.assertEqual(self.ids("SELECT id FROM t WHERE name = ?", ['x']), list(range(903, 1001, 10)))
+        self.assertEqual(len(self.ids("SELECT id FROM t WHERE name = ? OR name = ?", ['x', 'n3'])), 100)
+
+
+class CopyTest(DatabaseTestCase):
+    """COPY 导入导出"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+
+    def test_csv_round_trip(self):
+        rows = [[i, f"name,{i}" if i % 3 else None] for i in range(1, 501)]
+        self.db.executor.insert_many('t', rows)
+        self.query(f"COPY t TO '{self.path('t.csv')}' WITH (header)")
+        self.query("CREATE TABLE u (id INT, name VARCHAR(16))")
+        result = self.query(f"COPY u FROM '{self.path('t.csv')}' WITH (header)")
+        self.assertEqual(result['rows'], 500)
+        self.assertEqual(sorted(self.query("SELECT * FROM u")), sorted(self.query("SELECT * FROM t")))
+
+    def test_binary_round_trip(self):
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 2001)])
+        self.query("DELETE FROM t WHERE id > 1500")
+        self.query(f"COPY t TO '{self.path('t.bin')}' WITH (format binary)")
+        self.query("CREATE TABLE u (id INT, name VARCHAR(16))")
+        result = self.query(f"COPY u FROM '{self.path('t.bin')}' WITH (format binary)")
+        self.assertEqual(result['rows'], 1500)
+        self.assertEqual(sorted(self.query("SELECT * FROM u")), sorted(self.query("SELECT * FROM t")))
+
+    def test_failed_csv_import_stays_invisible(self):
+        with open(self.path('bad.csv'), 'w') as f:
+            for i in range(1, 100):
+                f.write(f"{i},ok\n")
+            f.write("oops,bad\n")
+        # 小批次：出错前已有若干批写入表中
+        with mock.patch.object(bulk_copy, 'COPY_CHUNK_ROWS', 10):
+            with self.assertRaises(ValueError):
+                self.query(f"COPY t FROM '{self.path('bad.csv')}'")
+        # 之后的提交发布更大的事务号，失败导入写入的版本仍不可见
+        self.query("INSERT INTO t VALUES (1000, 'after')")
+        self.assertEqual(self.query("SELECT * FROM t"), [[1000, 'after']])
+
+    def test_failed_binary_import_stays_invisible(self):
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 2001)])
+        self.query(f"COPY t TO '{self.path('t.bin')}' WITH (format binary)")
+        self.query("CREATE TABLE u (id INT, name VARCHAR(16))")
+        # 每批两页，写入若干批后磁盘写失败
+        self.db.storage_engine.readahead_pages = 2
+        write_pages = self.db.file_manager.write_pages
+        calls = []
+
+        def failing_write_pages(table_name, start_page, pages):
+            calls.append(start_page)
+            if len(calls) > 2:
+                raise OSError("disk full")
+            return write_pages(table_name, start_page, pages)
+
+        with mock.patch.object(self.db.file_manager, 'write_pages', failing_write_pages):
+            with self.assertRaises(OSError):
+                self.query(f"COPY u FROM '{self.path('t.bin')}' WITH (format binary)")
+        self.query("INSERT INTO u VALUES (1, 'after')")
+        self.assertEqual(self.query("SELECT * FROM u"), [[1, 'after']])
+
+
+class DBAPITest(unittest.TestCase):
+    """DB-API 2.0 连接与游标"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, 'data')
+        self.conn = self.connect()
+        self.conn.execute("CREATE TABLE t (id INT, name VARCHAR(16))")
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def connect(self, autocommit: bool = True) -> dbapi.Connection:
+        return dbapi.connect(self.data_dir, autocommit, buffer_pool_size='64KB', autovacuum_interval=0)
+
+    def test_parameters_and_fetch(self):
+        cur = self.conn.cursor()
+        cur.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"n{i}") for i in range(1, 11)])
+        self.assertEqual(cur.rowcount, 10)
+        cur.execute("SELECT * FROM t WHERE id = ?", (3,))
+        self.assertEqual([column[0] for column in cur.description], ['id', 'name'])
+        self.assertEqual(cur.fetchone(), (3, 'n3'))
+        self.assertIsNone(cur.fetchone())
+        cur.execute("SELECT id FROM t WHERE id > :low", {'low': 4})
+        self.assertEqual(len(cur.fetchmany(4)), 4)
+        self.assertEqual(len(cur.fetchall()), 2)
+        cur.execute("UPDATE t SET name = ? WHERE id <= ?", ('x', 2))
+        self.assertEqual(cur.rowcount, 2)
+
+    def test_connections_share_instance(self):
+        other = self.connect()
+        try:
+            self.assertIs(other.database, self.conn.database)
+        finally:
+            other.close()
+        # 关闭一个连接不影响另一个
+        self.assertEqual(self.conn.execute("SELECT * FROM t").fetchall(), [])
+
+    def test_commit_and_rollback(self):
+        writer = self.connect(autocommit=False)
+        try:
+            writer.execute("INSERT INTO t VALUES (1, 'a')")
+            self.assertTrue(writer.in_transaction)
+            self.assertEqual(self.conn.execute("SELECT * FROM t").fetchall(), [])
+            writer.commit()
+            writer.execute("INSERT INTO t VALUES (2, 'b')")
+            writer.rollback()
+        finally:
+            writer.close()
+        self.assertEqual(self.conn.execute("SELECT * FROM t").fetchall(), [(1, 'a')])
+
+    def test_errors(self):
+        cur = self.conn.cursor()
+        with self.assertRaises(dbapi.ProgrammingError):
+            cur.execute("SELEC * FROM t")
+        with self.assertRaises(dbapi.ProgrammingError):
+            cur.execute("SELECT * FROM missing")
+        with self.assertRaises(dbapi.ProgrammingError):
+            cur.executemany("SELECT * FROM t WHERE id = ?", [(1,)])
+        with self.assertRaises(dbapi.ProgrammingError):
+            cur.fetchone()
+        cur.close()
+        with self.assertRaises(dbapi.InterfaceError):
+            cur.execute("SELECT * FROM t")
+
+
+class ServerTest(DatabaseTestCase):
+    """客户端经服务器执行语句"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+        self.server = DatabaseServer(self.db, port=0)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        super().tearDown()
+
+    def test_insert_and_select(self):
+        with client.connect(self.server.address, timeout=10) as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO t VALUES (?, ?)", (1, 'a'))
+            self.assertEqual(cursor.rowcount, 1)
+            cursor.executemany("INSERT INTO t VALUES (?, ?)", [(2, 'b'), (3, 'c')])
+            self.assertEqual(cursor.rowcount, 2)
+            # 结果不足一批时服务端游标随即关闭
+            cursor.execute("SELECT id, name FROM t WHERE id < 3")
+            self.assertEqual([col[0] for col in cursor.description], ['id', 'name'])
+            self.assertEqual(sorted(cursor.fetchall()), [(1, 'a'), (2, 'b')])
+            cursor.execute("DELETE FROM t WHERE id = 3")
+            self.assertEqual(cursor.rowcount, 1)
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), [[1, 'a'], [2, 'b']])
+
+    def test_select_in_batches(self):
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 101)])
+        with client.connect(self.server.address, timeout=10, fetch_size=7) as conn:
+            cursor = conn.execute("SELECT id FROM t")
+            self.assertEqual(sorted(row[0] for row in cursor), list(range(1, 101)))
+
+    def test_error_is_reported(self):
+        with client.connect(self.server.address, timeout=10) as conn:
+            with mock.patch.object(dbapi.Cursor, 'close', autospec=True, side_effect=dbapi.Cursor.close) as close:
+                with self.assertRaises(client.ClientConnection.ProgrammingError):
+                    conn.execute("SELECT * FROM missing")
+            # 执行失败的服务端游标已关闭
+            self.assertEqual(close.call_count, 1)
+            self.assertTrue(conn.ping())
+
+
+class TransactionTest(DatabaseTestCase):
+    """显式事务中的增删改与行锁"""
+
+    def setUp(self):
+        super().setUp()
+        self.query("CREATE TABLE t (id INT, v INT)")
+        self.db.executor.insert_many('t', [[i, 1] for i in range(1, 11)])
+
+    def test_writes_visible_only_after_commit(self):
+        txn = self.db.begin()
+        self.assertEqual(self.query("UPDATE t SET v = 2 WHERE id <= 3", txn=txn), 3)
+        self.assertEqual(self.query("DELETE FROM t WHERE id = 10", txn=txn), 1)
+        self.query("INSERT INTO t VALUES (11, 5)", txn=txn)
+        self.assertEqual(self.query("UPDATE t SET v = 6 WHERE id = 11", txn=txn), 1)
+        expected = sorted([[i, 2] for i in range(1, 4)] + [[i, 1] for i in range(4, 10)] + [[11, 6]])
+        # 事务内读到自己的写，其他读者看不到
+        self.assertEqual(sorted(self.query("SELECT * FROM t", txn=txn)), expected)
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), [[i, 1] for i in range(1, 11)])
+        self.db.commit(txn)
+        self.assertEqual(sorted(self.query("SELECT * FROM t")), expected)
+
+    def test_rollback_discards_deletes(self):
+        txn = self.db.begin()
+        self.assertEqual(self.query("DELETE FROM t", txn=txn), 10)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t", txn=txn), [[0]])
+        self.db.rollback(txn)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[10]])
+
+    def test_writer_waits_for_row_lock(self):
+        txn = self.db.begin()
+        self.query("UPDATE t SET v = 2 WHERE id = 1", txn=txn)
+        result = {}
+
+        def writer():
+            result['updated'] = self.query("UPDATE t SET v = 3 WHERE id = 1")
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        time.sleep(0.3)
+        self.assertTrue(thread.is_alive())
+        # 其他行不受影响
+        self.assertEqual(self.query("UPDATE t SET v = 4 WHERE id = 2"), 1)
+        self.db.commit(txn)
+        thread.join(10)
+        # 等待的语句重新扫描，修改的是提交后的新版本
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(sorted(self.query("SELECT * FROM t WHERE id <= 2")), [[1, 3], [2, 4]])
+
+    def test_concurrent_update_fails_serialization(self):
+        txn = self.db.begin()
+        self.query("SELECT * FROM t", txn=txn)
+        self.query("UPDATE t SET v = 2 WHERE id = 5")
+        with self.assertRaises(SerializationError):
+            self.query("UPDATE t SET v = 3 WHERE id = 5", txn=txn)
+        self.assertFalse(txn.is_active)
+        self.assertEqual(self.query("SELECT v FROM t WHERE id = 5"), [[2]])
+
+    def test_deadlock_victim_is_rolled_back(self):
+        first, second = self.db.begin(), self.db.begin()
+        self.query("UPDATE t SET v = 2 WHERE id = 1", txn=first)
+        self.query("UPDATE t SET v = 2 WHERE id = 2", txn=second)
+        errors = []
+
+        def blocked():
+            try:
+                self.query("UPDATE t SET v = 3 WHERE id = 2", txn=first)
+            except DeadlockError as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=blocked)
+        waiter.start()
+        time.sleep(0.3)
+        try:
+            self.query("UPDATE t SET v = 3 WHERE id = 1", txn=second)
+        except DeadlockError as e:
+            errors.append(e)
+        waiter.join(10)
+        self.assertEqual(len(errors), 1)
+        survivor = first if first.is_active else second
+        self.db.commit(survivor)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t WHERE v = 3"), [[1]])
+
+    def test_lock_escalation(self):
+        with mock.patch.object(transaction, 'LOCK_ESCALATION_ROWS', 5):
+            txn = self.db.begin()
+            self.assertEqual(self.query("DELETE FROM t WHERE id > 2", txn=txn), 8)
+            stats = self.db.transaction_manager.get_stats()
+            # 只有表锁，没有逐行的锁
+            self.assertEqual(stats['locked_resources'], 1)
+            self.db.commit(txn)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[2]])
+
+
+class ResultCacheTest(DatabaseTestCase):
+    """查询结果缓存"""
+
+    def setUp(self):
+        super().setUp()
+        self.reopen(result_cache_size='1MB')
+        self.query("CREATE TABLE t (id INT, name VARCHAR(16))")
+        self.db.executor.insert_many('t', [[i, f"n{i}"] for i in range(1, 21)])
+        self.cache = self.db.executor.result_cache
+
+    def test_repeated_query_hits_cache(self):
+        first = self.query("SELECT * FROM t WHERE id > 10")
+        second = self.query("SELECT * FROM t WHERE id > 10")
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+
+    def test_writes_invalidate_cache(self):
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[20]])
+        self.query("INSERT INTO t VALUES (21, 'n21')")
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[21]])
+        self.query("DELETE FROM t WHERE id = 1")
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[20]])
+        self.query("UPDATE t SET name = 'x' WHERE id = 2")
+        self.assertEqual(self.query("SELECT name FROM t WHERE id = 2"), [['x']])
+        txn = self.db.begin()
+        self.query("INSERT INTO t VALUES (22, 'n22')", txn=txn)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[20]])
+        self.db.commit(txn)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM t"), [[21]])
+        self.assertEqual(self.cache.get_stats()['hits'], 0)
+
+    def test_returned_rows_are_not_shared(self):
+        rows = self.query("SELECT * FROM t WHERE id = 1")
+        rows[0][1] = 'changed'
+        rows = self.query("SELECT * FROM t WHERE id = 1")
+        self.assertEqual(rows, [[1, 'n1']])
+        rows[0][1] = 'changed'
+        self.assertEqual(self.query("SELECT * FROM t WHERE id = 1"), [[1, 'n1']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sql_compiler.catalog import CatalogManager
+from sql_compiler.parser import BinaryOpExpr
+from sql_compiler.prepared import StatementCompiler, normalize_sql
+
+
+class CompilerTestCase(unittest.TestCase):
+    """在临时目录的目录管理器上编译语句的测试基类"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog = CatalogManager(self.tmp.name)
+        self.compiler = StatementCompiler(self.catalog)
+        self.create_table("CREATE TABLE t (id INT, name VARCHAR(8))")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def create_table(self, sql: str):
+        plan = self.compiler.compile(sql)
+        self.catalog.create_table(plan.details['table_name'], plan.details['columns'])
+
+
+class ConditionParseTest(CompilerTestCase):
+    """WHERE 条件的 AND / OR 优先级与括号"""
+
+    def where(self, condition: str):
+        return self.compiler.compile(f"SELECT * FROM t WHERE {condition}").details['where_clause']
+
+    def test_and_binds_tighter_than_or(self):
+        condition = self.where("id = 1 OR id = 2 AND name = 'a'")
+        self.assertEqual(condition.op, 'OR')
+        self.assertEqual(condition.right.op, 'AND')
+        condition = self.where("(id = 1 OR id = 2) AND name = 'a'")
+        self.assertEqual(condition.op, 'AND')
+        self.assertEqual(condition.left.op, 'OR')
+
+    def test_chains_are_left_associative(self):
+        condition = self.where("id > 1 AND id < 9 AND name IN ('a', 'b')")
+        self.assertEqual(condition.op, 'AND')
+        self.assertIsInstance(condition.left, BinaryOpExpr)
+        self.assertEqual(condition.left.op, 'AND')
+        self.assertEqual(condition.right.op, 'IN')
+
+    def test_invalid_conditions_rejected(self):
+        for condition in ("id = 1 name = 'a'", "(id = 1", "id = 1 AND", "id = 1)"):
+            with self.assertRaises(SyntaxError):
+                self.where(condition)
+        with self.assertRaises(ValueError):
+            self.where("id = 1 AND missing = 2")
+
+
+class PlanCacheTest(CompilerTestCase):
+    """预编译语句与计划缓存"""
+
+    def test_whitespace_variants_share_plan(self):
+        first = self.compiler.prepare("SELECT * FROM t WHERE id = ?")
+        second = self.compiler.prepare("  SELECT *\n  FROM t\tWHERE id = ?;")
+        self.assertIs(first, second)
+        self.assertEqual(self.compiler.plan_cache.get_stats()['hits'], 1)
+
+    def test_string_literal_whitespace_kept(self):
+        self.assertEqual(normalize_sql("SELECT * FROM t WHERE name = 'a  b'"),
+                         "SELECT * FROM t WHERE name = 'a  b'")
+        self.assertNotEqual(self.compiler.prepare("SELECT * FROM t WHERE name = 'a  b'"),
+                            self.compiler.prepare("SELECT * FROM t WHERE name = 'a b'"))
+
+    def test_line_comment_keeps_following_clause(self):
+        plan = self.compiler.compile("SELECT * FROM t -- c\nWHERE id = 1")
+        self.assertIsNotNone(plan.details['where_clause'])
+        # 同一行的 WHERE 在注释内，两条语句不能共用缓存的计划
+        plan = self.compiler.compile("SELECT * FROM t -- c WHERE id = 1")
+        self.assertIsNone(plan.details['where_clause'])
+        self.assertEqual(normalize_sql("SELECT * FROM t /* c */ WHERE id = 1 -- tail"),
+                         "SELECT * FROM t WHERE id = 1")
+
+    def test_bind_parameters(self):
+        stmt = self.compiler.prepare("INSERT INTO t VALUES (?, ?)")
+        self.assertEqual(stmt.param_count, 2)
+        self.assertEqual(stmt.bind([1, 'a']).details['rows'], [[1, 'a']])
+        with self.assertRaises(ValueError):
+            stmt.bind([1])
+        stmt = self.compiler.prepare("UPDATE t SET name = :name WHERE id = :id")
+        plan = stmt.bind({'name': 'b', 'id': 2})
+        self.assertEqual(plan.details['assignments'], [('name', 'b')])
+        with self.assertRaises(ValueError):
+            stmt.bind({'name': 'b'})
+
+    def test_schema_change_invalidates_cache(self):
+        first = self.compiler.prepare("SELECT * FROM t")
+        self.create_table("CREATE TABLE u (id INT)")
+        self.assertIsNot(self.compiler.prepare("SELECT * FROM t"), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,364 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.file_manager import FileManager
+from storage.buffer import BufferPool, BufferPoolExhaustedError
+from storage.latch import ReadWriteLatch
+from sql_compiler.catalog import Schema
+from storage.scan import page_runs
+from storage.metrics import LatencyHistogram, render_prometheus
+from engine.storage_engine import StorageEngine
+from utils.config import load_config, parse_size
+
+
+class ConcurrentBufferPoolTest(unittest.TestCase):
+    """多线程并发扫描与插入的压力测试"""
+
+    WRITERS = 4
+    READERS = 4
+    ROWS_PER_WRITER = 1500
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_manager = FileManager(self.tmp.name)
+        # 缓冲池远小于表，迫使并发置换
+        self.buffer_pool = BufferPool(16, self.file_manager, wait_timeout=10.0)
+        self.storage_engine = StorageEngine(self.buffer_pool, self.file_manager)
+        # 关闭环形扫描，让所有扫描都经过共享缓冲池
+        self.storage_engine.ring_scan_threshold = float('inf')
+        self.schema = Schema('t', [
+            {'name': 'writer', 'type': 'INT'},
+            {'name': 'seq', 'type': 'INT'},
+            {'name': 'tag', 'type': 'VARCHAR', 'length': 8},
+        ])
+        self.storage_engine.create_table('t', self.schema)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_scan_and_insert(self):
+        errors = []
+        done = threading.Event()
+
+        def writer(writer_id):
+            try:
+                for seq in range(1, self.ROWS_PER_WRITER + 1):
+                    rid = self.storage_engine.insert_record('t', self.schema, [writer_id, seq, f"w{writer_id}"])
+                    self.assertIsNotNone(rid)
+            except Exception as e:
+                errors.append(e)
+
+        def reader():
+            try:
+                while not done.is_set():
+                    last_seq = {}
+                    for writer_id, seq, tag in self.storage_engine.scan_records('t', self.schema):
+                        # 每行都是完整写入的记录，且同一写者的记录按插入顺序出现
+                        self.assertEqual(tag, f"w{writer_id}")
+                        self.assertGreater(seq, last_seq.get(writer_id, 0))
+                        last_seq[writer_id] = seq
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=writer, args=(i,)) for i in range(1, self.WRITERS + 1)]
+        readers = [threading.Thread(target=reader, daemon=True) for _ in range(self.READERS)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        rows = list(self.storage_engine.scan_records('t', self.schema))
+        self.assertEqual(len(rows), self.WRITERS * self.ROWS_PER_WRITER)
+        for writer_id in range(1, self.WRITERS + 1):
+            seqs = [seq for w, seq, _ in rows if w == writer_id]
+            self.assertEqual(seqs, list(range(1, self.ROWS_PER_WRITER + 1)))
+
+        stats = self.buffer_pool.get_stats()
+        self.assertEqual(stats['pinned_pages'], 0)
+        self.assertLessEqual(stats['pages'], self.buffer_pool.capacity)
+        self.assertGreater(stats['evictions'], 0)
+
+
+class ReadWriteLatchTest(unittest.TestCase):
+    """读写闩锁的写者优先"""
+
+    def wait_until(self, predicate):
+        deadline = time.monotonic() + 5
+        while not predicate():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.005)
+
+    def test_queued_writer_blocks_new_readers(self):
+        latch = ReadWriteLatch()
+        order = []
+        latch.acquire_read()
+
+        def writer():
+            with latch.write():
+                order.append('writer')
+
+        def reader():
+            with latch.read():
+                order.append('reader')
+
+        writer_thread = threading.Thread(target=writer, daemon=True)
+        writer_thread.start()
+        self.wait_until(lambda: latch._waiting_writers == 1)
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        reader_thread.start()
+        time.sleep(0.05)
+        # 写者排队时新读者等待，已持有读闩锁的线程仍可重入
+        self.assertEqual(order, [])
+        with latch.read():
+            pass
+        latch.release()
+        writer_thread.join(5)
+        reader_thread.join(5)
+        self.assertEqual(order, ['writer', 'reader'])
+        self.assertFalse(latch.is_latched)
+
+
+class BufferPoolEvictionTest(unittest.TestCase):
+    """多线程反复改写少量页，缓冲池远小于页数时页内容与统计计数仍正确"""
+
+    THREADS = 4
+    PAGES_PER_THREAD = 16
+    ROUNDS = 30
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_manager = FileManager(self.tmp.name)
+        self.file_manager.create_file('t')
+        self.buffer_pool = BufferPool(4, self.file_manager, wait_timeout=10.0)
+        for _ in range(self.THREADS * self.PAGES_PER_THREAD):
+            page = self.buffer_pool.allocate_page('t')
+            self.buffer_pool.unpin_page('t', page.page_id, is_dirty=True)
+        self.buffer_pool.reset_stats()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_update_with_eviction(self):
+        errors = []
+
+        def worker(thread_id):
+            try:
+                page_ids = range(thread_id * self.PAGES_PER_THREAD, (thread_id + 1) * self.PAGES_PER_THREAD)
+                for counter in range(1, self.ROUNDS + 1):
+                    for page_id in page_ids:
+                        page = self.buffer_pool.pin_page('t', page_id, exclusive=True)
+                        # 上一轮的改写没有因置换丢失
+                        self.assertEqual(int.from_bytes(page.data[-4:], 'big'), counter - 1)
+                        page.data[-4:] = counter.to_bytes(4, 'big')
+                        self.buffer_pool.unpin_page('t', page_id, is_dirty=True)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.buffer_pool.flush_all()
+        for page_id in range(self.THREADS * self.PAGES_PER_THREAD):
+            data = self.file_manager.read_page('t', page_id)
+            self.assertEqual(int.from_bytes(data[-4:], 'big'), self.ROUNDS)
+
+        stats = self.buffer_pool.get_stats()
+        self.assertEqual(stats['hits'] + stats['misses'], self.THREADS * self.PAGES_PER_THREAD * self.ROUNDS)
+        self.assertEqual(stats['table_misses']['t'], stats['misses'])
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(stats['pinned_pages'], 0)
+        self.assertLessEqual(stats['pages'], self.buffer_pool.capacity)
+
+    def test_dirty_victim_written_back_before_reload(self):
+        page = self.buffer_pool.pin_page('t', 0, exclusive=True)
+        page.data[-4:] = (7).to_bytes(4, 'big')
+        # 解除固定时写回失败，页保持为脏页，只能在置换时写回
+        with mock.patch.object(self.file_manager, 'write_page', return_value=False):
+            self.buffer_pool.unpin_page('t', 0, is_dirty=True)
+        for page_id in range(1, 9):
+            self.buffer_pool.pin_page('t', page_id)
+            self.buffer_pool.unpin_page('t', page_id)
+        self.assertEqual(int.from_bytes(self.file_manager.read_page('t', 0)[-4:], 'big'), 7)
+        page = self.buffer_pool.pin_page('t', 0)
+        self.assertEqual(int.from_bytes(page.data[-4:], 'big'), 7)
+        self.buffer_pool.unpin_page('t', 0)
+        self.assertGreater(self.buffer_pool.get_stats()['dirty_writebacks'], 0)
+
+
+class MetricsTest(unittest.TestCase):
+    """缓冲池与文件I/O统计及 Prometheus 导出"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_manager = FileManager(self.tmp.name)
+        self.file_manager.create_file('t')
+        self.buffer_pool = BufferPool(2, self.file_manager)
+        for _ in range(4):
+            page = self.buffer_pool.allocate_page('t')
+            self.buffer_pool.unpin_page('t', page.page_id, is_dirty=True)
+        self.buffer_pool.reset_stats()
+        self.file_manager.reset_stats()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hits_misses_and_io(self):
+        for page_id in (0, 0, 1, 2, 3, 3):
+            self.buffer_pool.pin_page('t', page_id)
+            self.buffer_pool.unpin_page('t', page_id)
+        stats = self.buffer_pool.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 4))
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 6)
+        self.assertEqual(stats['table_misses'], {'t': 4})
+        self.assertGreater(stats['evictions'], 0)
+        io = self.file_manager.get_stats()
+        self.assertEqual(io['reads'], 4)
+        self.assertEqual(io['tables']['t']['read_latency']['count'], 4)
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram((0.001, 0.01))
+        for seconds in (0.0005, 0.005, 0.5):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.cumulative(), [('0.001', 1), ('0.01', 2), ('+Inf', 3)])
+        self.assertAlmostEqual(histogram.average, 0.5055 / 3)
+
+    def test_render_prometheus(self):
+        self.buffer_pool.pin_page('t', 0)
+        self.buffer_pool.unpin_page('t', 0)
+        text = render_prometheus(self.buffer_pool, self.file_manager)
+        self.assertIn('learndb_buffer_pool_capacity_pages 2', text)
+        self.assertIn('learndb_buffer_pool_misses_total{table="t"} 1', text)
+        self.assertIn('learndb_io_reads_total{table="t"} 1', text)
+        self.assertIn('learndb_io_read_latency_seconds_count{table="t"} 1', text)
+
+
+class BufferPoolSizingTest(unittest.TestCase):
+    """缓冲池的内存预算、在线调整容量与单表配额"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_manager = FileManager(self.tmp.name)
+        for table_name in ('a', 'b'):
+            self.file_manager.create_file(table_name)
+        self.buffer_pool = BufferPool.from_memory_budget(8 * 4096, self.file_manager, wait_timeout=0.1)
+        for table_name in ('a', 'b'):
+            for _ in range(8):
+                page = self.buffer_pool.allocate_page(table_name)
+                self.buffer_pool.unpin_page(table_name, page.page_id, is_dirty=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, table_name: str, page_ids):
+        for page_id in page_ids:
+            self.buffer_pool.pin_page(table_name, page_id)
+            self.buffer_pool.unpin_page(table_name, page_id)
+
+    def test_parse_size_and_config(self):
+        self.assertEqual(parse_size('64KB'), 64 * 1024)
+        self.assertEqual(parse_size('1.5M'), 1536 * 1024)
+        self.assertEqual(parse_size(4096), 4096)
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+        config = load_config(overrides={'buffer_pool_size': '2MB'})
+        self.assertEqual(config['buffer_pool_size'], 2 * 1024 * 1024)
+
+    def test_resize(self):
+        self.assertEqual(self.buffer_pool.capacity, 8)
+        self.assertEqual(self.buffer_pool.memory_budget, 8 * 4096)
+        self.assertEqual(self.buffer_pool.resize(3), 3)
+        self.assertLessEqual(self.buffer_pool.get_stats()['pages'], 3)
+        self.buffer_pool.resize(16)
+        self.touch('a', range(8))
+        self.touch('b', range(8))
+        self.assertEqual(self.buffer_pool.get_stats()['pages'], 16)
+        with self.assertRaises(ValueError):
+            self.buffer_pool.resize(0)
+
+    def test_shrink_below_pinned_pages(self):
+        pages = [self.buffer_pool.pin_page('a', page_id) for page_id in range(4)]
+        self.buffer_pool.resize(2)
+        # 被固定的页在解除固定时才被置换
+        self.assertEqual(self.buffer_pool.get_stats()['pinned_pages'], 4)
+        for page in pages:
+            self.buffer_pool.unpin_page('a', page.page_id)
+        self.assertLessEqual(self.buffer_pool.get_stats()['pages'], 2)
+
+    def test_table_quota(self):
+        self.buffer_pool.set_table_quota('a', 2)
+        self.touch('b', range(4))
+        self.touch('a', range(8))
+        self.assertLessEqual(self.buffer_pool.table_page_counts.get('a', 0), 2)
+        # 表 a 只置换自己的页，表 b 的页仍在缓冲池中
+        self.assertEqual(self.buffer_pool.table_page_counts['b'], 6)
+        self.buffer_pool.set_table_quota('a', None)
+        self.assertEqual(self.buffer_pool.get_table_quota('a'), 8)
+
+    def test_exhausted_pool_times_out(self):
+        self.buffer_pool.resize(2)
+        pinned = [self.buffer_pool.pin_page('a', page_id) for page_id in range(2)]
+        with self.assertRaises(BufferPoolExhaustedError):
+            self.buffer_pool.pin_page('a', 2)
+        for page in pinned:
+            self.buffer_pool.unpin_page('a', page.page_id)
+        self.assertIsNotNone(self.buffer_pool.pin_page('a', 2))
+
+
+class RingScanTest(unittest.TestCase):
+    """大表顺序扫描经私有环形缓冲区，不挤出缓冲池中的热页"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_manager = FileManager(self.tmp.name)
+        self.buffer_pool = BufferPool(16, self.file_manager)
+        self.storage_engine = StorageEngine(self.buffer_pool, self.file_manager)
+        self.schema = Schema('big', [{'name': 'id', 'type': 'INT'}, {'name': 'tag', 'type': 'VARCHAR', 'length': 32}])
+        self.storage_engine.create_table('big', self.schema)
+        self.storage_engine.bulk_insert('big', self.schema, [[i, f"row{i}"] for i in range(1, 3001)])
+        self.hot = Schema('hot', [{'name': 'id', 'type': 'INT'}])
+        self.storage_engine.create_table('hot', self.hot)
+        self.storage_engine.bulk_insert('hot', self.hot, [[i] for i in range(1, 101)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_runs(self):
+        self.assertEqual(page_runs([0, 1, 2, 5, 6, 9], 2), [(0, 2), (2, 1), (5, 2), (9, 1)])
+        self.assertEqual(page_runs([], 8), [])
+
+    def test_scan_does_not_evict_hot_pages(self):
+        self.assertGreater(self.file_manager.get_page_count('big'), self.buffer_pool.capacity)
+        list(self.storage_engine.scan_records('hot', self.hot))
+        hot_pages = self.buffer_pool.table_page_counts['hot']
+        self.buffer_pool.reset_stats()
+
+        rows = list(self.storage_engine.scan_records('big', self.schema))
+        self.assertEqual(sorted(row[0] for row in rows), list(range(1, 3001)))
+        self.assertEqual(self.buffer_pool.table_page_counts['hot'], hot_pages)
+        self.assertEqual(self.buffer_pool.get_stats()['evictions'], 0)
+
+    def test_scan_sees_cached_changes(self):
+        # 已缓存的页从缓冲池读取，能看到其中尚未写回的修改
+        self.storage_engine.insert_record('big', self.schema, [3001, 'last'])
+        rows = list(self.storage_engine.scan_records('big', self.schema))
+        self.assertEqual(len(rows), 3001)
+        self.assertIn([3001, 'last'], rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# utils/config.py
+"""
+数据库配置加载：默认值 < 配置文件 < 环境变量 < 命令行参数
+"""
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+from .constants import PAGE_SIZE
+
+# 环境变量前缀，例如 LEARNDB_BUFFER_POOL_SIZE=64MB
+ENV_PREFIX = 'LEARNDB_'
+# 未显式指定配置文件时，依次尝试的位置
+DEFAULT_CONFIG_FILES = ('learndb.json', os.path.join('data', 'learndb.json'))
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    'data_dir': 'data',
+    'buffer_pool_size': 100 * PAGE_SIZE,  # 缓冲池内存预算（字节）
+    'buffer_pool_timeout': 5.0,  # 缓冲池耗尽时等待空闲页的最长时间（秒）
+    'table_quota': 1.0,  # 单表最多占用缓冲池的比例
+    'plan_cache_size': 256,  # 执行计划缓存的语句条数，0 表示关闭
+    'lock_timeout': 10.0,  # 事务等待锁的最长时间（秒）
+    'autovacuum_interval': 10.0,  # 后台清理的检查间隔（秒），0 表示关闭
+    'autovacuum_pages': 64,  # 后台清理每批处理的页数
+    'autovacuum_threshold': 500,  # 表的旧版本数达到该值时触发后台清理
+    'parallel_scan_workers': 0,  # 并行扫描的工作进程数，0 表示按CPU核数，1 表示关闭
+    'parallel_scan_min_pages': 1024,  # 表的页数达到该值时查询改用并行扫描
+    'vectorized_scan': True,  # 安装了 numpy 时用列式批次解码、过滤和聚合
+    'result_cache_size': 0,  # 查询结果缓存的内存预算（字节），0 表示关闭
+}
+
+_SIZE_UNITS = {
+    '': 1, 'B': 1,
+    'K': 1024, 'KB': 1024,
+    'M': 1024 ** 2, 'MB': 1024 ** 2,
+    'G': 1024 ** 3, 'GB': 1024 ** 3,
+}
+
+
+def parse_size(value) -> int:
+    """解析内存大小，支持 4096、'400KB'、'64MB'、'1G' 等写法，返回字节数"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*', str(value))
+    if not match or match.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"无法解析的大小: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(nbytes: int) -> str:
+    """将字节数格式化为便于阅读的字符串"""
+    for unit in ('GB', 'MB', 'KB'):
+        if nbytes >= _SIZE_UNITS[unit]:
+            return f"{nbytes / _SIZE_UNITS[unit]:.1f} {unit}"
+    return f"{nbytes} B"
+
+
+def _coerce(key: str, value):
+    """按默认值的类型转换配置项"""
+    if key in ('buffer_pool_size', 'result_cache_size'):
+        return parse_size(value)
+    default = DEFAULT_CONFIG.get(key)
+    if isinstance(default, bool):
+        return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def load_config(config_file: Optional[str] = None,
+                overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """加载配置"""
+    config = dict(DEFAULT_CONFIG)
+
+    # 1. 配置文件（JSON）
+    config_file = config_file or os.environ.get(ENV_PREFIX + 'CONFIG')
+    candidates = [config_file] if config_file else list(DEFAULT_CONFIG_FILES)
+    for path in candidates:
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                for key, value in json.load(f).items():
+                    config[key] = _coerce(key, value)
+            break
+        elif config_file:
+            raise FileNotFoundError(f"配置文件不存在: {config_file}")
+
+    # 2. 环境变量
+    for key in DEFAULT_CONFIG:
+        env_value = os.environ.get(ENV_PREFIX + key.upper())
+        if env_value is not None:
+            config[key] = _coerce(key, env_value)
+
+    # 3. 命令行参数
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            config[key] = _coerce(key, value)
+
+    return config
@@ -6,17 +6,46 @@ RECORD_SIZE = 128  # 每条记录128字节
 # 数据类型
 INT_TYPE = 'INT'
 STRING_TYPE = 'STRING'
+VARCHAR_TYPE = 'VARCHAR'
 FLOAT_TYPE = 'FLOAT'
 BOOL_TYPE = 'BOOL'
 
 # SQL关键字 - 添加DROP关键字
 KEYWORDS = {
     'SELECT', 'FROM', 'WHERE', 'INSERT', 'INTO', 'VALUES', 'CREATE', 'TABLE',
-    'INT', 'VARCHAR', 'PRIMARY', 'KEY', 'AND', 'OR', 'NOT', 'NULL', 'DROP'
+    'INT', 'VARCHAR', 'PRIMARY', 'KEY', 'AND', 'OR', 'NOT', 'NULL', 'DROP',
+    'COPY', 'TO', 'WITH', 'BEGIN', 'COMMIT', 'ROLLBACK', 'TRANSACTION', 'WORK',
+    'DELETE', 'UPDATE', 'SET', 'VACUUM', 'TRUNCATE', 'ANALYZE', 'IN', 'GROUP', 'BY',
+    'MATERIALIZED', 'VIEW', 'AS', 'ALTER', 'ADD', 'PARTITION', 'PARTITIONS', 'RANGE', 'HASH', 'LESS', 'THAN',
+    'MAXVALUE', 'TABLESPACE', 'LOCATION', 'TEMP', 'TEMPORARY', 'ENGINE'
 }
 
 # 操作符
 OPERATORS = {'=', '>', '<', '>=', '<=', '<>', '!=', 'LIKE'}
 
 # 系统表前缀
-SYS_TABLE_PREFIX = 'sys_'
\ No newline at end of file
+SYS_TABLE_PREFIX = 'sys_'
+
+# 顺序扫描：表的页数超过缓冲池容量的该比例时，改用私有环形缓冲区扫描
+RING_SCAN_THRESHOLD = 0.25
+# 每次预读的页数与预读线程数
+READAHEAD_PAGES = 8
+READAHEAD_THREADS = 4
+
+# 缓冲池页表的分区数（每个分区一把锁）
+BUFFER_POOL_PARTITIONS = 16
+
+# Bloom 过滤器：每个过滤器覆盖的页数与目标误判率
+BLOOM_RANGE_PAGES = 16
+BLOOM_FP_RATE = 0.01
+
+# 页压缩：zlib 压缩级别（冷表以读为主，取压缩快的级别），槽位按该字节数对齐以便页增长后原地覆盖
+PAGE_COMPRESSION_LEVEL = 1
+COMPRESSED_SLOT_ALIGN = 256
+
+# 分区表：分区的物理表名为 <表名>$<分区名>；分区表的 RID 在该位以上记录分区下标
+PARTITION_SEPARATOR = '$'
+PARTITION_RID_SHIFT = 48
+
+# 表空间（名称 -> 目录）记录在数据目录的该文件中
+TABLESPACE_FILE_NAME = 'tablespaces.json'
@@ -54,6 +54,12 @@ def get_type_size(data_type, length=0):
         return 8
     elif data_type == BOOL_TYPE:
         return 1
-    elif data_type == STRING_TYPE:
-        return length
-    return 0
\ No newline at end of file
+    elif data_type in (STRING_TYPE, VARCHAR_TYPE):
+        return length or 0
+    return 0
+
+def get_column_size(col_def: dict) -> int:
+    """列在记录中占用的字节数；字典编码的列只存 4 字节编码"""
+    if col_def.get('dictionary'):
+        return 4
+    return get_type_size(col_def['type'], col_def.get('length', 0))
\ No newline at end of file